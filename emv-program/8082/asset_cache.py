@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Static Asset Cache for report generation (8082 app and 8084 HTML service)
+
+Logos, CSS and HTML fragments are read, minified (CSS) and base64-encoded
+(data URIs) once and handed out as prebuilt strings. Entries are keyed by
+path and validated against the file's mtime/size, so an edited asset is
+picked up on the next request. Validation itself is throttled to one
+os.stat per path every ASSET_CACHE_CHECK_SECONDS (default 2), so steady-state
+report generation does no filesystem work for static assets.
+
+Missing files return None so callers keep their existing fallbacks.
+"""
+
+import base64
+import logging
+import mimetypes
+import os
+import re
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHECK_SECONDS = 2.0
+
+_CSS_COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+_CSS_STRING_RE = re.compile(r"""("(?:\\.|[^"\\])*"|'(?:\\.|[^'\\])*')""")
+_CSS_SPACE_RE = re.compile(r"\s+")
+_CSS_PUNCT_RE = re.compile(r"\s*([{};,>])\s*")
+
+
+def minify_css(css):
+    """Strip comments and collapse whitespace outside string literals
+
+    Spaces before ':' are kept, since "a :hover" and "a:hover" differ.
+    """
+    parts = _CSS_STRING_RE.split(_CSS_COMMENT_RE.sub("", css))
+    for i in range(0, len(parts), 2):
+        code = _CSS_SPACE_RE.sub(" ", parts[i])
+        code = _CSS_PUNCT_RE.sub(r"\1", code)
+        parts[i] = code.replace(": ", ":").replace(";}", "}")
+    return "".join(parts).strip()
+
+
+class AssetCache:
+    """Path + mtime keyed cache of prebuilt asset strings"""
+
+    def __init__(self, check_seconds=DEFAULT_CHECK_SECONDS):
+        self.check_seconds = check_seconds
+        self._entries = {}  # (kind, path) -> (version, value, checked_at)
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    @classmethod
+    def from_env(cls):
+        """Build from ASSET_CACHE_CHECK_SECONDS (0 = stat on every access)"""
+        return cls(check_seconds=float(os.environ.get("ASSET_CACHE_CHECK_SECONDS", DEFAULT_CHECK_SECONDS)))
+
+    @staticmethod
+    def _version(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _get(self, kind, path, build):
+        path = os.path.abspath(str(path))
+        key = (kind, path)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and now - entry[2] < self.check_seconds:
+            return entry[1]
+
+        version = self._version(path)
+        if entry is not None and entry[0] == version:
+            with self._lock:
+                self._entries[key] = (version, entry[1], now)
+            return entry[1]
+
+        value = None
+        if version is not None:
+            try:
+                value = build(path)
+                self.loads += 1
+            except OSError as e:
+                logger.warning(f"Could not load asset {path}: {e}")
+                version = None
+        with self._lock:
+            self._entries[key] = (version, value, now)
+        return value
+
+    def exists(self, path):
+        """Cached existence check"""
+        return self._get("exists", path, lambda p: True) is True
+
+    def text(self, path):
+        """File contents as UTF-8 text, or None if missing"""
+        return self._get("text", path, _read_text)
+
+    def css(self, path):
+        """Minified CSS, or None if missing"""
+        return self._get("css", path, lambda p: minify_css(_read_text(p)))
+
+    def data_uri(self, path, mime_type=None):
+        """``data:<mime>;base64,...`` for the file, or None if missing"""
+        def build(p):
+            with open(p, "rb") as f:
+                encoded = base64.b64encode(f.read()).decode("ascii")
+            return f"data:{mime_type or mimetypes.guess_type(p)[0] or 'application/octet-stream'};base64,{encoded}"
+        return self._get(("data_uri", mime_type), path, build)
+
+    def first_data_uri(self, paths, mime_type=None):
+        """Data URI of the first existing file in ``paths`` ("" if none)"""
+        for path in paths:
+            value = self.data_uri(path, mime_type)
+            if value:
+                return value
+        return ""
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+def _read_text(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return f.read()
+
+
+asset_cache = AssetCache.from_env()
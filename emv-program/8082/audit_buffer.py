@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+"""
+Analysis-scoped buffering of audit trail writes for the 8082 app
+
+log_calculation_audit, log_compliance_verification, log_weather_data_audit
+and store_verification_code used to open a connection, write one row and
+commit, so an analysis run paid one transaction (and fsync) per audit row.
+
+Inside batch() - or a function wrapped with batched() - those helpers hand
+their rows to the current AuditBatch instead. The batch writes them at the
+end of the analysis with one executemany per statement, in one transaction
+per database. Outside a batch (or in threads the analysis starts, which do
+not inherit the batch) the helpers write directly, as before.
+
+Every buffered row is also appended to a JSON-lines journal under
+journal_dir as it is recorded, and the journal is removed once the rows
+are committed. If the process dies mid-analysis or the final write fails,
+replay() writes the journaled rows on the next start, so the audit chain
+has no gaps. Journal names start with the pid of the process writing them;
+journals of live processes (a running analysis in another worker) are left
+alone, and a journal is claimed by renaming it before it is replayed, so
+concurrent replays do not write it twice. Rows already present are not
+written again either.
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+JOURNAL_SUFFIX = ".audit.jsonl"
+
+# kind -> (table, columns) for the INSERT statements
+INSERTS = {
+    "calculation_audit": (
+        "calculation_audit",
+        ("analysis_session_id", "calculation_type", "standard_name", "input_values", "output_values",
+         "methodology", "formula", "standards_reference", "calculated_by"),
+    ),
+    "compliance_verification": (
+        "compliance_verification",
+        ("analysis_session_id", "standard_name", "check_type", "calculated_value", "limit_value",
+         "threshold_value", "is_compliant", "verification_method"),
+    ),
+    "weather_data_audit": (
+        "weather_data_audit",
+        ("analysis_session_id", "location_address", "latitude", "longitude", "date_range_start",
+         "date_range_end", "api_source", "data_quality_score", "fetched_by"),
+    ),
+}
+VERIFICATION_CODE_SQL = "UPDATE analysis_sessions SET verification_code = ? WHERE id = ?"
+
+_current = contextvars.ContextVar("audit_batch", default=None)
+_open_journals = set()  # journals of batches still running in this process
+_open_lock = threading.Lock()
+
+
+def statement(kind):
+    """SQL for a kind of audit row"""
+    if kind == "verification_code":
+        return VERIFICATION_CODE_SQL
+    table, columns = INSERTS[kind]
+    return f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' for _ in columns)})"
+
+
+def write(conn, kind, rows):
+    """Write audit rows of one kind (caller commits)"""
+    conn.executemany(statement(kind), rows)
+
+
+def _already_written(conn, kind, params):
+    if kind not in INSERTS:
+        return False  # the UPDATE is idempotent
+    table, columns = INSERTS[kind]
+    where = " AND ".join(f"{column} IS ?" for column in columns)
+    return conn.execute(f"SELECT 1 FROM {table} WHERE {where} LIMIT 1", params).fetchone() is not None
+
+
+def _json_value(value):
+    # numpy scalars and the like
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def _commit(connect, entries, skip_existing=False):
+    """Write journal-style entries grouped per target database, one transaction each"""
+    by_target = {}
+    for entry in entries:
+        by_target.setdefault(entry["target"], []).append(entry)
+    for target, target_entries in by_target.items():
+        with connect(target) as conn:
+            if conn is None:
+                raise RuntimeError(f"no database connection for audit target {target!r}")
+            groups = {}
+            for entry in target_entries:
+                params = tuple(entry["params"])
+                if skip_existing and _already_written(conn, entry["kind"], params):
+                    continue
+                groups.setdefault(entry["kind"], []).append(params)
+            for kind, rows in groups.items():
+                write(conn, kind, rows)
+            conn.commit()
+
+
+class AuditBatch:
+    """Audit rows recorded during one analysis, written together by flush()"""
+
+    def __init__(self, connect, journal_dir=None):
+        self.connect = connect  # target (org_id or None) -> connection context manager
+        self.entries = []
+        self.journal_path = None
+        self._journal = None
+        if journal_dir:
+            try:
+                os.makedirs(journal_dir, exist_ok=True)
+                self.journal_path = os.path.join(journal_dir, _journal_name())
+                self._journal = open(self.journal_path, "a", encoding="utf-8")
+                with _open_lock:
+                    _open_journals.add(self.journal_path)
+            except OSError as e:
+                logger.warning(f"AUDIT BUFFER - Journal unavailable, buffering in memory only: {e}")
+                self.journal_path = None
+
+    def add(self, kind, params, target=None):
+        entry = {"kind": kind, "target": target, "params": list(params)}
+        self.entries.append(entry)
+        if self._journal:
+            self._journal.write(json.dumps(entry, default=_json_value) + "\n")
+            self._journal.flush()
+
+    def flush(self):
+        """Write every recorded row; on failure the journal is kept for replay()"""
+        try:
+            if self.entries:
+                _commit(self.connect, self.entries)
+                logger.info(f"AUDIT BUFFER - Wrote {len(self.entries)} audit rows")
+        except Exception as e:
+            logger.error(f"AUDIT BUFFER - Failed to write {len(self.entries)} audit rows, kept in journal: {e}")
+            if self._journal:
+                os.fsync(self._journal.fileno())
+            self._close(remove=False)
+            return False
+        self._close(remove=True)
+        return True
+
+    def _close(self, remove):
+        if self._journal:
+            self._journal.close()
+            self._journal = None
+            with _open_lock:
+                _open_journals.discard(self.journal_path)
+            if remove:
+                try:
+                    os.remove(self.journal_path)
+                except OSError:
+                    pass
+        self.entries = []
+
+
+def current():
+    return _current.get()
+
+
+def record(kind, params, target=None):
+    """Add a row to the running batch; False if there is none (the caller writes it directly)"""
+    audit_batch = _current.get()
+    if audit_batch is None:
+        return False
+    audit_batch.add(kind, params, target)
+    return True
+
+
+@contextmanager
+def batch(connect, journal_dir=None):
+    """Buffer audit rows until the block exits (nested batches join the outer one)"""
+    if _current.get() is not None:
+        yield _current.get()
+        return
+    audit_batch = AuditBatch(connect, journal_dir)
+    token = _current.set(audit_batch)
+    try:
+        yield audit_batch
+    finally:
+        _current.reset(token)
+        audit_batch.flush()
+
+
+def batched(connect, journal_dir=None):
+    """Decorator running a function inside batch()"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with batch(connect, journal_dir):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def _journal_name():
+    return f"{os.getpid()}_{uuid.uuid4().hex}{JOURNAL_SUFFIX}"
+
+
+def _alive(pid):
+    """Whether the process that wrote a journal is still running (on this host)"""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # exists, owned by someone else
+    return True
+
+
+def _orphaned(name):
+    """Whether a journal was left by a process that is gone (or by this one, outside a batch)"""
+    try:
+        pid = int(name.split("_", 1)[0])
+    except ValueError:
+        return True
+    if pid == os.getpid():
+        return True  # a failed flush here, or a journal of an earlier process with the same pid
+    return not _alive(pid)
+
+
+def replay(connect, journal_dir):
+    """Write rows left in journals by crashed or failed batches; returns the number of journals replayed"""
+    if not journal_dir or not os.path.isdir(journal_dir):
+        return 0
+    replayed = 0
+    for name in sorted(os.listdir(journal_dir)):
+        path = os.path.join(journal_dir, name)
+        with _open_lock:
+            if not name.endswith(JOURNAL_SUFFIX) or path in _open_journals or not _orphaned(name):
+                continue
+            # claim it under this pid: a concurrent replay elsewhere finds it gone (or owned by a
+            # live process), and if this process dies the next start picks it up again
+            claimed = os.path.join(journal_dir, _journal_name())
+            try:
+                os.rename(path, claimed)
+            except OSError:
+                continue
+            _open_journals.add(claimed)
+        try:
+            with open(claimed, encoding="utf-8") as f:
+                entries = []
+                for line in f:
+                    try:
+                        entries.append(json.loads(line))
+                    except ValueError:
+                        logger.warning(f"AUDIT BUFFER - Skipping torn line in {name}")
+            _commit(connect, entries, skip_existing=True)
+            os.remove(claimed)
+            replayed += 1
+            logger.info(f"AUDIT BUFFER - Replayed {len(entries)} audit rows from {name}")
+        except Exception as e:
+            logger.error(f"AUDIT BUFFER - Could not replay {name}: {e}")
+        finally:
+            with _open_lock:
+                _open_journals.discard(claimed)
+    return replayed
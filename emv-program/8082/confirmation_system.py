@@ -8,11 +8,14 @@ import logging
 from typing import Dict, Any, Optional
 from datetime import datetime
 
+from shared_state import shared_state
+
 logger = logging.getLogger(__name__)
 
 class ConfirmationSystem:
-    def __init__(self):
-        self.pending_confirmations = {}
+    def __init__(self, store=None):
+        # store: mapping shared by the app's workers (shared_state); a dict by default
+        self.pending_confirmations = {} if store is None else store
         self.confirmation_timeout = 300  # 5 minutes
     
     def create_confirmation(self, operation_type: str, details: Dict[str, Any]) -> str:
@@ -44,6 +47,7 @@ class ConfirmationSystem:
         confirmation = self.pending_confirmations[confirmation_id]
         confirmation["status"] = "confirmed" if user_confirmed else "denied"
         confirmation["confirmed_at"] = datetime.now()
+        self.pending_confirmations[confirmation_id] = confirmation  # write back for shared stores
         
         logger.info(f"Operation {'confirmed' if user_confirmed else 'denied'}: {confirmation_id}")
         return user_confirmed
@@ -53,20 +57,20 @@ class ConfirmationSystem:
         current_time = datetime.now()
         expired_ids = []
         
-        for conf_id, confirmation in self.pending_confirmations.items():
+        for conf_id, confirmation in list(self.pending_confirmations.items()):
             if confirmation["status"] == "pending":
                 time_diff = (current_time - confirmation["created_at"]).total_seconds()
                 if time_diff > self.confirmation_timeout:
                     expired_ids.append(conf_id)
         
         for conf_id in expired_ids:
-            del self.pending_confirmations[conf_id]
+            self.pending_confirmations.pop(conf_id, None)
             logger.info(f"Expired confirmation removed: {conf_id}")
         
         return len(expired_ids)
 
 # Global instance
-confirmation_system = ConfirmationSystem()
+confirmation_system = ConfirmationSystem(shared_state.mapping("confirmations"))
 
 def require_confirmation(operation_type: str, details: Dict[str, Any]) -> str:
     """Require user confirmation for an operation"""
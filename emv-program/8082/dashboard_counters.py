@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Materialized dashboard counters for the 8082 app
+
+The dashboard used to call four stats endpoints, each running several
+COUNT(*) / SUM queries over raw_meter_data, data_modifications, projects,
+html_reports and users on every page load. Those numbers are now kept in a
+dashboard_counters table (plus dashboard_daily buckets for the "last N
+days" figures) in each database, maintained by SQLite triggers on the
+source tables. The triggers run inside the writing transaction, so every
+upload, clipping, project and PE-review write updates the counters
+atomically, whichever code path (or script) makes it.
+
+Triggers are created lazily by ensure_schema() for the source tables that
+exist in a database; when a table's triggers are created its counters are
+rebuilt from the table, so rows written before that are counted too. The
+same happens when TRIGGER_PREFIX changes: triggers of an older version are
+replaced and the counters rebuilt.
+summary() reads the counters and caches the result per database file for
+DASHBOARD_CACHE_SECONDS (default 5). It only writes while a database is
+being set up (ensure_schema, once per file per process, which also prunes
+old daily buckets); after that a dashboard refresh is read-only.
+"""
+
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_SECONDS = 5
+DAILY_RETENTION_DAYS = 31
+TRIGGER_PREFIX = "dashboard_v2_"  # bumped when trigger bodies change; older ones are replaced
+
+_FINGERPRINTED = "(COALESCE({row}.fingerprint, '') != '')"
+_PE_REVIEWED = "(COALESCE({row}.pe_reviewed, 0) = 1)"
+_IS_PE = "({row}.role = 'pe')"
+
+# table -> counter -> (value of a row, optional column list for UPDATE triggers)
+COUNTER_RULES = {
+    "raw_meter_data": {
+        "raw_files": ("1", None),
+        "raw_bytes": ("COALESCE({row}.file_size, 0)", ("file_size",)),
+        "raw_fingerprinted": (_FINGERPRINTED, ("fingerprint",)),
+    },
+    "data_modifications": {
+        "modifications": ("1", None),
+    },
+    "projects": {
+        "projects": ("1", None),
+    },
+    "html_reports": {
+        "reports": ("1", None),
+        "pe_reviewed_reports": (_PE_REVIEWED, ("pe_reviewed",)),
+    },
+    "users": {
+        "registered_pes": (_IS_PE, ("role",)),
+    },
+}
+
+# Counters of distinct non-NULL values: table -> counter -> column
+DISTINCT_RULES = {
+    "data_modifications": {"clipped_files": "file_id"},
+    "html_reports": {"reported_projects": "project_name"},
+}
+
+# Daily buckets of inserts: table -> bucket name
+DAILY_RULES = {
+    "raw_meter_data": "uploads",
+    "projects": "projects_created",
+}
+TIMESTAMP_COLUMNS = ("created_at", "upload_date")
+SOURCE_TABLES = sorted(set(COUNTER_RULES) | set(DISTINCT_RULES) | set(DAILY_RULES))
+
+
+def _columns(conn, table):
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+def _timestamp_column(columns):
+    return next((column for column in TIMESTAMP_COLUMNS if column in columns), None)
+
+
+def _bump(counter, expression):
+    return f"UPDATE dashboard_counters SET value = value + ({expression}) WHERE name = '{counter}';"
+
+
+def _distinct_added(table, column):
+    """1 if NEW's value of ``column`` is now in the table exactly once (NULLs are not counted)"""
+    return f"(NEW.{column} IS NOT NULL AND (SELECT COUNT(*) FROM {table} WHERE {column} = NEW.{column}) = 1)"
+
+
+def _distinct_removed(table, column):
+    """1 if OLD's value of ``column`` is no longer in the table (NULLs are not counted)"""
+    return f"(OLD.{column} IS NOT NULL AND NOT EXISTS (SELECT 1 FROM {table} WHERE {column} = OLD.{column}))"
+
+
+def _trigger_sql(table, columns):
+    """CREATE TRIGGER statements maintaining every counter of ``table``"""
+    rules = {
+        counter: rule for counter, rule in COUNTER_RULES.get(table, {}).items()
+        if all(column in columns for column in (rule[1] or ()))
+    }
+    distinct = {c: col for c, col in DISTINCT_RULES.get(table, {}).items() if col in columns}
+    daily = DAILY_RULES.get(table)
+    timestamp = _timestamp_column(columns)
+
+    on_insert = [_bump(c, value.format(row="NEW")) for c, (value, _) in rules.items()]
+    on_delete = [_bump(c, f"-({value.format(row='OLD')})") for c, (value, _) in rules.items()]
+    on_insert += [_bump(c, _distinct_added(table, col)) for c, col in distinct.items()]
+    on_delete += [_bump(c, f"-{_distinct_removed(table, col)}") for c, col in distinct.items()]
+    if daily:
+        on_insert.append(
+            "INSERT INTO dashboard_daily (name, day, value) "
+            f"VALUES ('{daily}', date('now'), 1) ON CONFLICT (name, day) DO UPDATE SET value = value + 1;"
+        )
+        if timestamp:
+            on_delete.append(
+                f"UPDATE dashboard_daily SET value = value - 1 WHERE name = '{daily}' AND day = date(OLD.{timestamp});"
+            )
+
+    statements = []
+    for event, body in (("INSERT", on_insert), ("DELETE", on_delete)):
+        statements.append(
+            f"CREATE TRIGGER IF NOT EXISTS {TRIGGER_PREFIX}{table}_{event.lower()} "
+            f"AFTER {event} ON {table} BEGIN {' '.join(body)} END"
+        )
+    for counter, (value, update_columns) in rules.items():
+        if update_columns:
+            statements.append(
+                f"CREATE TRIGGER IF NOT EXISTS {TRIGGER_PREFIX}{table}_update_{counter} "
+                f"AFTER UPDATE OF {', '.join(update_columns)} ON {table} BEGIN "
+                + _bump(counter, f"({value.format(row='NEW')}) - ({value.format(row='OLD')})")
+                + " END"
+            )
+    for counter, column in distinct.items():
+        statements.append(
+            f"CREATE TRIGGER IF NOT EXISTS {TRIGGER_PREFIX}{table}_update_{counter} "
+            f"AFTER UPDATE OF {column} ON {table} WHEN OLD.{column} IS NOT NEW.{column} BEGIN "
+            + _bump(counter, f"{_distinct_added(table, column)} - {_distinct_removed(table, column)}")
+            + " END"
+        )
+    return statements
+
+
+def _rebuild(conn, table, columns):
+    """Recompute ``table``'s counters and daily buckets from its rows"""
+    for counter, (value, update_columns) in COUNTER_RULES.get(table, {}).items():
+        if not all(column in columns for column in (update_columns or ())):
+            continue
+        total = conn.execute(f"SELECT COALESCE(SUM({value.format(row=table)}), 0) FROM {table}").fetchone()[0]
+        conn.execute("INSERT OR REPLACE INTO dashboard_counters (name, value) VALUES (?, ?)", (counter, total))
+    for counter, column in DISTINCT_RULES.get(table, {}).items():
+        if column in columns:
+            total = conn.execute(f"SELECT COUNT(DISTINCT {column}) FROM {table}").fetchone()[0]
+            conn.execute("INSERT OR REPLACE INTO dashboard_counters (name, value) VALUES (?, ?)", (counter, total))
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table} ({column})")
+    daily = DAILY_RULES.get(table)
+    timestamp = _timestamp_column(columns)
+    if daily and timestamp:
+        conn.execute("DELETE FROM dashboard_daily WHERE name = ?", (daily,))
+        conn.execute(
+            f"""
+            INSERT INTO dashboard_daily (name, day, value)
+            SELECT ?, date({timestamp}), COUNT(*) FROM {table}
+            WHERE {timestamp} >= date('now', ?)
+            GROUP BY date({timestamp})
+            """,
+            (daily, f"-{DAILY_RETENTION_DAYS} days"),
+        )
+
+
+def _schema_objects(conn):
+    return dict(conn.execute("SELECT name, type FROM sqlite_master WHERE type IN ('table', 'trigger')").fetchall())
+
+
+def _untriggered(existing):
+    """Source tables that exist without the current version's triggers"""
+    return [
+        table for table in SOURCE_TABLES
+        if existing.get(table) == "table" and f"{TRIGGER_PREFIX}{table}_insert" not in existing
+    ]
+
+
+def _setup_state(conn):
+    """(whether ensure_schema has work to do, whether every source table exists); read-only"""
+    existing = _schema_objects(conn)
+    tables_missing = "dashboard_counters" not in existing or "dashboard_daily" not in existing
+    return bool(_untriggered(existing)) or tables_missing, all(existing.get(t) == "table" for t in SOURCE_TABLES)
+
+
+def ensure_schema(conn):
+    """Create the counter tables and any missing triggers (rebuilding those tables' counters)"""
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS dashboard_counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS dashboard_daily (
+            name TEXT NOT NULL,
+            day TEXT NOT NULL,
+            value INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (name, day)
+        )
+        """
+    )
+    conn.execute(
+        "DELETE FROM dashboard_daily WHERE day < date('now', ?)", (f"-{DAILY_RETENTION_DAYS} days",)
+    )
+    conn.commit()
+
+    for table in _untriggered(_schema_objects(conn)):
+        # IMMEDIATE: no write to the table can slip in between the rebuild and the triggers
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = ?", (f"{TRIGGER_PREFIX}{table}_insert",)
+            ).fetchone():
+                conn.rollback()
+                continue
+            # Triggers of an older version go; the rebuild corrects any drift they caused
+            for (old_trigger,) in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = ? AND name GLOB 'dashboard_v*'",
+                (table,),
+            ).fetchall():
+                conn.execute(f"DROP TRIGGER IF EXISTS {old_trigger}")
+            columns = _columns(conn, table)
+            _rebuild(conn, table, columns)
+            for statement in _trigger_sql(table, columns):
+                conn.execute(statement)
+            conn.commit()
+            logger.info(f"DASHBOARD COUNTERS - Installed triggers on {table}")
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def _counters(conn):
+    return dict(conn.execute("SELECT name, value FROM dashboard_counters").fetchall())
+
+
+def _daily(conn, name, days):
+    row = conn.execute(
+        "SELECT COALESCE(SUM(value), 0) FROM dashboard_daily WHERE name = ? AND day > date('now', ?)",
+        (name, f"-{days} days"),
+    ).fetchone()
+    return row[0]
+
+
+def _count(conn, sql):
+    """Small ad-hoc count for the figures that are not plain counters (0 if the table is missing)"""
+    try:
+        return conn.execute(sql).fetchone()[0] or 0
+    except Exception:
+        return 0
+
+
+def _percent(part, whole, default):
+    return f"{round(part / whole * 100, 1)}%" if whole else default
+
+
+def _sections(counters, recent_uploads=0, recent_projects=0, active_projects=0, active_pes=0):
+    raw_files = counters.get("raw_files", 0)
+    raw_bytes = counters.get("raw_bytes", 0)
+    reports = counters.get("reports", 0)
+    return {
+        "raw_files": {
+            "total_files": raw_files,
+            "total_bytes": raw_bytes,
+            "total_size": f"{round(raw_bytes / (1024 * 1024), 2)} MB",
+            "recent_uploads": recent_uploads,
+        },
+        "clipping": {
+            "clipped_files": counters.get("clipped_files", 0),
+            "modifications": counters.get("modifications", 0),
+            "integrity_status": _percent(counters.get("raw_fingerprinted", 0), raw_files, "100%"),
+        },
+        "projects": {
+            "total_projects": counters.get("projects", 0),
+            "recent_projects": recent_projects,
+            "active_projects": active_projects,
+            "completed_projects": counters.get("reported_projects", 0),
+            "project_files": reports,
+        },
+        "pe": {
+            "registered_pes": counters.get("registered_pes", 0),
+            "active_pes": active_pes,
+            "oversight_level": _percent(counters.get("pe_reviewed_reports", 0), reports, "0%"),
+        },
+    }
+
+
+def empty_summary():
+    """The summary of a database with nothing in it"""
+    return _sections({})
+
+
+class DashboardCounters:
+    """Per-database dashboard summary backed by the counters tables"""
+
+    def __init__(self, cache_seconds=DEFAULT_CACHE_SECONDS):
+        self.cache_seconds = cache_seconds
+        self._cache = {}  # database file -> (deadline, summary)
+        self._set_up = set()  # database files ensure_schema has run on in this process
+        self._ready = set()  # ... and whose source tables all exist with current triggers
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Build from DASHBOARD_CACHE_SECONDS (0 disables caching)"""
+        return cls(cache_seconds=float(os.environ.get("DASHBOARD_CACHE_SECONDS", DEFAULT_CACHE_SECONDS)))
+
+    def _prepare(self, conn, db_file):
+        """Run ensure_schema once per database file per process
+
+        Until every source table exists the schema is re-read on each call
+        (read-only), so a table created later still gets its triggers.
+        """
+        if db_file in self._ready:
+            return
+        needs_setup, complete = _setup_state(conn)
+        if needs_setup or db_file not in self._set_up:
+            ensure_schema(conn)
+            needs_setup, complete = _setup_state(conn)
+            with self._lock:
+                self._set_up.add(db_file)
+        if complete and not needs_setup:
+            with self._lock:
+                self._ready.add(db_file)
+
+    def summary(self, conn):
+        """Everything the dashboard shows for the database behind ``conn`` (read-only once set up)"""
+        db_file = next((row[2] for row in conn.execute("PRAGMA database_list") if row[1] == "main"), "")
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(db_file)
+            if cached and cached[0] > now:
+                return cached[1]
+
+        self._prepare(conn, db_file)
+        summary = _sections(
+            _counters(conn),
+            recent_uploads=_daily(conn, "uploads", 7),
+            recent_projects=_daily(conn, "projects_created", 7),
+            active_projects=_count(
+                conn, "SELECT COUNT(*) FROM projects WHERE updated_at >= datetime('now', '-30 days')"
+            ),
+            active_pes=_count(
+                conn,
+                """
+                SELECT COUNT(DISTINCT s.user_id) FROM user_sessions s
+                JOIN users u ON s.user_id = u.id
+                WHERE s.expires_at > datetime('now') AND u.role = 'pe'
+                """,
+            ),
+        )
+
+        if self.cache_seconds > 0:
+            with self._lock:
+                self._cache[db_file] = (now + self.cache_seconds, summary)
+        return summary
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self._set_up.clear()
+            self._ready.clear()
+
+
+dashboard_counters = DashboardCounters.from_env()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+SQLite connection pool for the 8082 app (per-tenant app.db and sessions.db)
+
+get_db_connection() used to makedirs + connect + close for every use, with
+SQLite's defaults (rollback journal, no busy timeout). The pool keeps a few
+idle connections per database path and sets up each new connection once:
+
+- journal_mode=WAL: readers no longer block the writer and vice versa
+- busy_timeout: writers wait for the lock instead of failing with
+  "database is locked" under concurrent uploads
+- synchronous=NORMAL, cache_size, mmap_size: the usual WAL settings
+
+A connection is handed back exactly as a fresh one would be: any open
+transaction is rolled back (as close() would do) and row_factory is reset
+to sqlite3.Row. Connections that saw an error are closed, not pooled.
+Pools for tenants that have been idle for DB_POOL_IDLE_SECONDS are closed,
+and at most DB_POOL_MAX_DATABASES databases keep idle connections: when
+another one is released, the least recently used database's are closed, so
+hundreds of tenants do not mean hundreds of open files.
+
+Settings: DB_POOL_MAX_IDLE, DB_POOL_IDLE_SECONDS, DB_POOL_MAX_DATABASES,
+DB_BUSY_TIMEOUT_MS, DB_MMAP_SIZE, DB_CACHE_SIZE_KB.
+"""
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_IDLE = 4
+DEFAULT_IDLE_SECONDS = 300
+DEFAULT_MAX_DATABASES = 64
+DEFAULT_BUSY_TIMEOUT_MS = 30000
+DEFAULT_MMAP_SIZE = 64 * 1024 * 1024
+DEFAULT_CACHE_SIZE_KB = 8192
+
+
+class SQLitePool:
+    """Thread-safe pool of SQLite connections keyed by database path"""
+
+    def __init__(self, max_idle=DEFAULT_MAX_IDLE, idle_seconds=DEFAULT_IDLE_SECONDS,
+                 busy_timeout_ms=DEFAULT_BUSY_TIMEOUT_MS, mmap_size=DEFAULT_MMAP_SIZE,
+                 cache_size_kb=DEFAULT_CACHE_SIZE_KB, max_databases=DEFAULT_MAX_DATABASES):
+        self.max_idle = max_idle
+        self.idle_seconds = idle_seconds
+        self.max_databases = max_databases
+        self.busy_timeout_ms = busy_timeout_ms
+        self.mmap_size = mmap_size
+        self.cache_size_kb = cache_size_kb
+        self._idle = OrderedDict()  # db_path -> [(conn, released_at), ...], least recently used first
+        self._in_use = {}  # db_path -> count
+        self._lock = threading.Lock()
+        self._last_eviction = time.monotonic()
+        self._counters = {"opened": 0, "reused": 0, "closed": 0, "evicted": 0, "lru_closed": 0}
+
+    @classmethod
+    def from_env(cls):
+        """Build from DB_POOL_MAX_IDLE / DB_POOL_IDLE_SECONDS / DB_POOL_MAX_DATABASES / DB_BUSY_TIMEOUT_MS / ..."""
+        return cls(
+            max_idle=int(os.environ.get("DB_POOL_MAX_IDLE", DEFAULT_MAX_IDLE)),
+            idle_seconds=float(os.environ.get("DB_POOL_IDLE_SECONDS", DEFAULT_IDLE_SECONDS)),
+            max_databases=int(os.environ.get("DB_POOL_MAX_DATABASES", DEFAULT_MAX_DATABASES)),
+            busy_timeout_ms=int(os.environ.get("DB_BUSY_TIMEOUT_MS", DEFAULT_BUSY_TIMEOUT_MS)),
+            mmap_size=int(os.environ.get("DB_MMAP_SIZE", DEFAULT_MMAP_SIZE)),
+            cache_size_kb=int(os.environ.get("DB_CACHE_SIZE_KB", DEFAULT_CACHE_SIZE_KB)),
+        )
+
+    def _open(self, db_path):
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        conn = sqlite3.connect(db_path, timeout=self.busy_timeout_ms / 1000, check_same_thread=False)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.OperationalError as e:
+            # Another process may hold the lock while switching; the mode is persistent anyway
+            logger.debug(f"DB POOL - Could not enable WAL for {db_path}: {e}")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA cache_size=-{int(self.cache_size_kb)}")
+        conn.execute(f"PRAGMA mmap_size={int(self.mmap_size)}")
+        with self._lock:
+            self._counters["opened"] += 1
+        return conn
+
+    def acquire(self, db_path):
+        """Pooled connection for ``db_path`` (opened and configured on first use)"""
+        conn = None
+        if os.path.exists(db_path):
+            with self._lock:
+                idle = self._idle.get(db_path)
+                if idle:
+                    conn = idle.pop()[0]
+                    self._counters["reused"] += 1
+        else:
+            # Database file was removed (or never existed): drop stale connections
+            self._close_idle(db_path)
+        if conn is None:
+            conn = self._open(db_path)
+        conn.row_factory = sqlite3.Row  # Enable dict-like access
+        with self._lock:
+            self._in_use[db_path] = self._in_use.get(db_path, 0) + 1
+        return conn
+
+    def release(self, db_path, conn, discard=False):
+        """Return ``conn`` to the pool (closed instead if ``discard`` or the pool is full)"""
+        with self._lock:
+            self._in_use[db_path] = max(0, self._in_use.get(db_path, 1) - 1)
+        if not discard:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+            except sqlite3.Error:
+                discard = True
+        least_used = []
+        if not discard:
+            with self._lock:
+                idle = self._idle.setdefault(db_path, [])
+                self._idle.move_to_end(db_path)
+                if len(idle) < self.max_idle:
+                    idle.append((conn, time.monotonic()))
+                    conn = None
+                while len(self._idle) > max(self.max_databases, 1):
+                    _, dropped = self._idle.popitem(last=False)
+                    least_used.extend(c for c, _ in dropped)
+                self._counters["lru_closed"] += len(least_used)
+        if conn is not None:
+            self._close(conn)
+        for idle_conn in least_used:
+            self._close(idle_conn)
+        self.evict_idle()
+
+    @contextmanager
+    def connection(self, db_path):
+        """Context manager around acquire/release"""
+        conn = self.acquire(db_path)
+        try:
+            yield conn
+        except BaseException:
+            self.release(db_path, conn, discard=True)
+            raise
+        self.release(db_path, conn)
+
+    def _close(self, conn):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+        with self._lock:
+            self._counters["closed"] += 1
+
+    def _close_idle(self, db_path):
+        with self._lock:
+            idle = self._idle.pop(db_path, [])
+        for conn, _ in idle:
+            self._close(conn)
+
+    def evict_idle(self, force=False):
+        """Close connections idle for longer than idle_seconds (checked at most every few seconds)"""
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_eviction < min(self.idle_seconds, 5):
+                return
+            self._last_eviction = now
+            expired = []
+            for db_path in list(self._idle):
+                idle = self._idle[db_path]
+                keep = [(conn, t) for conn, t in idle if now - t < self.idle_seconds]
+                expired.extend(conn for conn, t in idle if now - t >= self.idle_seconds)
+                if keep:
+                    self._idle[db_path] = keep
+                else:
+                    del self._idle[db_path]
+            self._counters["evicted"] += len(expired)
+        for conn in expired:
+            self._close(conn)
+
+    def close_all(self):
+        for db_path in list(self._idle):
+            self._close_idle(db_path)
+
+    def stats(self):
+        """Pool counters plus idle / in-use connections per database"""
+        with self._lock:
+            return {
+                **self._counters,
+                "databases": {
+                    db_path: {"idle": len(self._idle.get(db_path, [])), "in_use": self._in_use.get(db_path, 0)}
+                    for db_path in set(self._idle) | {p for p, n in self._in_use.items() if n}
+                },
+            }
+
+
+db_pool = SQLitePool.from_env()
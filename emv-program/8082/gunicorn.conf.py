@@ -0,0 +1,27 @@
+"""
+gunicorn settings for running the 8082 app with several worker processes
+
+    cd 8082 && gunicorn -c gunicorn.conf.py
+
+Turns on multi-worker mode (SYNEREX_MULTI_WORKER=1, see shared_state.py)
+so analysis results, the processing cache and pending confirmations are
+shared by the workers, and only one of them runs the PE verification
+scheduler. Background jobs (job_queue) and tenant databases already
+coordinate through SQLite. The per-process session cache is off in this
+mode (see session_cache.py).
+
+Settings: GUNICORN_WORKERS (default: CPU count), GUNICORN_THREADS (4),
+GUNICORN_TIMEOUT (600 s, synchronous analyses can take minutes), PORT
+(8082), SYNEREX_WSGI_APP (main_hardened_ready_refactored:app).
+"""
+
+import multiprocessing
+import os
+
+os.environ.setdefault("SYNEREX_MULTI_WORKER", "1")
+
+wsgi_app = os.environ.get("SYNEREX_WSGI_APP", "main_hardened_ready_refactored:app")
+bind = f"0.0.0.0:{os.environ.get('PORT', '8082')}"
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count()))
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 600))
@@ -0,0 +1,568 @@
+#!/usr/bin/env python3
+"""
+Persistent background jobs for the 8082 app
+
+Work that does not have to finish inside the HTTP request (profiling an
+uploaded CSV, running an analysis, building an audit or utility submission
+package, generating a report) is submitted as a job: a row in the jobs
+table of results/jobs.db, run by a small thread pool. Clients poll
+/api/jobs/<job_id> for status and progress, fetch /api/jobs/<job_id>/result
+once it has finished, and may cancel it with /api/jobs/<job_id>/cancel.
+
+Views wrapped with JobQueue.deferrable() keep answering synchronously; a
+request with ?async=1 or "Prefer: respond-async" is recorded instead (form
+fields, uploaded files or raw body, and headers), answered 202 with the job
+id, and later replayed through the app inside a worker, so the view code is
+the same either way. The response it produces is kept under files_dir.
+Jobs that are not resumable have their payload cleared from the row as
+soon as a worker claims them, so the Authorization / session headers and
+cookies of a deferred request are not kept in jobs.db while it runs.
+
+The row is committed before the job is handed to a worker, so a job
+survives a restart: resume() (called once the app has registered its
+handlers) requeues jobs that were queued, and jobs of resumable kinds that
+were running, and fails the others as interrupted. Workers claim a job
+with a conditional UPDATE, so a job runs once even if several processes
+share the database; running jobs are only written off when the process
+that claimed them is gone. At most max_per_org jobs of one organization
+run at a time; the rest wait in the queue. Finished jobs and their files
+are deleted after retention_hours.
+
+There is one queue per jobs database per process: from_env() hands back
+the existing one, and the first app, handlers and resume() call stay in
+effect. The refactored app re-imports main_hardened_ready_fixed while it
+handles requests; the fixed module then shares the app's queue instead of
+starting a second one that would take the running jobs for interrupted.
+
+Cancelling a queued job takes effect at once. A running job stops at its
+next progress report or checkpoint() call, by raising JobCancelled.
+
+Settings: JOB_WORKERS (default 4), JOB_MAX_PER_ORG (default 2),
+JOB_RETENTION_HOURS (default 24).
+"""
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from db_pool import db_pool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_PER_ORG = 2
+DEFAULT_RETENTION_HOURS = 24
+PROGRESS_INTERVAL_SECONDS = 1.0
+PURGE_INTERVAL_SECONDS = 600
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (SUCCEEDED, FAILED, CANCELLED)
+
+# Request headers not replayed with a deferred request
+SKIPPED_HEADERS = {"host", "content-type", "content-length", "prefer"}
+
+_current = contextvars.ContextVar("job", default=None)
+
+_queues = {}  # realpath of the jobs database -> the JobQueue using it in this process
+_queues_lock = threading.Lock()
+_running_here = set()  # ids of jobs executing in this process, whichever queue runs them
+
+
+class JobCancelled(BaseException):
+    """
+    Raised inside a job whose cancellation was requested
+
+    A BaseException so that the broad ``except Exception`` handlers in the
+    views it interrupts do not turn it into an error response.
+    """
+
+
+class JobContext:
+    """Handed to a job handler: its id / org and a throttled progress reporter"""
+
+    def __init__(self, queue, job_id, org_id):
+        self.queue = queue
+        self.id = job_id
+        self.org_id = org_id
+        self._last_report = 0.0
+
+    def progress(self, fraction, message=None, force=False):
+        """
+        Record progress (0..1); writes at most once per PROGRESS_INTERVAL_SECONDS
+        unless ``force``. Raises JobCancelled if the job was cancelled.
+        """
+        now = time.monotonic()
+        if not force and now - self._last_report < PROGRESS_INTERVAL_SECONDS:
+            return
+        self._last_report = now
+        with self.queue._connection() as conn:
+            conn.execute(
+                "UPDATE jobs SET progress = ?, message = ? WHERE id = ?",
+                (max(0.0, min(1.0, float(fraction))), message, self.id),
+            )
+            conn.commit()
+            cancel = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (self.id,)).fetchone()
+        if cancel and cancel[0]:
+            raise JobCancelled(self.id)
+
+
+def checkpoint(fraction, message=None):
+    """Report progress of the job running in this thread, if any (see JobContext.progress)"""
+    job = _current.get()
+    if job is not None:
+        job.progress(fraction, message, force=True)
+
+
+def wants_async(request):
+    """Whether a request asks to be run as a background job"""
+    return (
+        request.args.get("async", "").lower() in ("1", "true", "yes")
+        or "respond-async" in request.headers.get("Prefer", "")
+    )
+
+
+class JobQueue:
+    """Thread pool running jobs recorded in a SQLite jobs table"""
+
+    def __init__(self, db_path, workers=DEFAULT_WORKERS, max_per_org=DEFAULT_MAX_PER_ORG,
+                 retention_hours=DEFAULT_RETENTION_HOURS, files_dir=None):
+        self.db_path = db_path
+        self.workers = workers
+        self.max_per_org = max_per_org
+        self.retention_hours = retention_hours
+        self.files_dir = files_dir or os.path.join(os.path.dirname(db_path), "job_files")
+        self.app = None
+        self.org_of = None  # request -> org_id of deferred requests
+        self._handlers = {}  # kind -> (function, resumable)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._dispatch_lock = threading.Lock()
+        self._dispatched = {}  # job id -> org_id, handed to the pool but not yet claimed
+        self._schema_ready = False
+        self._last_purge = 0.0
+        self._resumed = False
+
+    @classmethod
+    def from_env(cls, db_path):
+        """
+        The process's queue for ``db_path``, built with JOB_WORKERS /
+        JOB_MAX_PER_ORG / JOB_RETENTION_HOURS the first time
+        """
+        key = os.path.realpath(db_path)
+        with _queues_lock:
+            if key not in _queues:
+                _queues[key] = cls(
+                    db_path,
+                    workers=int(os.environ.get("JOB_WORKERS", DEFAULT_WORKERS)),
+                    max_per_org=int(os.environ.get("JOB_MAX_PER_ORG", DEFAULT_MAX_PER_ORG)),
+                    retention_hours=float(os.environ.get("JOB_RETENTION_HOURS", DEFAULT_RETENTION_HOURS)),
+                )
+            return _queues[key]
+
+    def init_app(self, app, org_of=None):
+        """
+        Flask app that deferred requests are replayed through, and how to
+        tell their org; the first app registered keeps the queue
+        """
+        if self.app is not None and self.app is not app:
+            logger.debug(f"JOB QUEUE - Keeping {self.app.import_name} as the app for deferred requests")
+            return
+        self.app = app
+        self.org_of = org_of
+
+    def handler(self, kind, resumable=False):
+        """
+        Decorator registering ``func(job, **payload)`` for jobs of ``kind``;
+        its return value is the result. The first registration of a kind is kept.
+        """
+        def decorator(func):
+            self._handlers.setdefault(kind, (func, resumable))
+            return func
+        return decorator
+
+    def _ensure_schema(self):
+        with self._lock:
+            if self._schema_ready:
+                return
+            with db_pool.connection(self.db_path) as conn:
+                conn.execute(
+                    """
+                    CREATE TABLE IF NOT EXISTS jobs (
+                        id TEXT PRIMARY KEY,
+                        kind TEXT NOT NULL,
+                        org_id TEXT,
+                        status TEXT NOT NULL DEFAULT 'queued',
+                        progress REAL DEFAULT 0,
+                        message TEXT,
+                        payload TEXT,
+                        result TEXT,
+                        error TEXT,
+                        worker INTEGER,
+                        cancel_requested INTEGER DEFAULT 0,
+                        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                        started_at TEXT,
+                        finished_at TEXT
+                    )
+                    """
+                )
+                columns = {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}
+                if "cancel_requested" not in columns:
+                    conn.execute("ALTER TABLE jobs ADD COLUMN cancel_requested INTEGER DEFAULT 0")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status)")
+                conn.execute("CREATE INDEX IF NOT EXISTS idx_jobs_org ON jobs(org_id)")
+                conn.commit()
+            self._schema_ready = True
+
+    def _connection(self):
+        if not self._schema_ready:
+            self._ensure_schema()
+        return db_pool.connection(self.db_path)
+
+    def _pool(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=max(self.workers, 1), thread_name_prefix="job")
+            return self._executor
+
+    def submit(self, kind, payload=None, org_id=None, job_id=None):
+        """Record a job and queue it; returns the job id"""
+        if kind not in self._handlers:
+            raise ValueError(f"no job handler registered for {kind!r}")
+        job_id = job_id or uuid.uuid4().hex
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, org_id, status, payload) VALUES (?, ?, ?, ?, ?)",
+                (job_id, kind, org_id, QUEUED, json.dumps(payload or {})),
+            )
+            conn.commit()
+        self._dispatch()
+        return job_id
+
+    def _dispatch(self):
+        """Hand queued jobs to the pool, oldest first, within the per-org limit"""
+        with self._dispatch_lock:
+            with self._connection() as conn:
+                running = {
+                    row[0]: row[1]
+                    for row in conn.execute(
+                        "SELECT org_id, COUNT(*) FROM jobs WHERE status = ? GROUP BY org_id", (RUNNING,)
+                    )
+                }
+                queued = conn.execute(
+                    "SELECT id, kind, org_id FROM jobs WHERE status = ? ORDER BY rowid", (QUEUED,)
+                ).fetchall()
+            for org_id in self._dispatched.values():
+                running[org_id] = running.get(org_id, 0) + 1
+            for row in queued:
+                job_id, org_id = row["id"], row["org_id"]
+                if job_id in self._dispatched or row["kind"] not in self._handlers:
+                    continue
+                if running.get(org_id, 0) >= self.max_per_org:
+                    continue
+                running[org_id] = running.get(org_id, 0) + 1
+                self._dispatched[job_id] = org_id
+                self._pool().submit(self._run, job_id)
+
+    def _update(self, job_id, **fields):
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        with self._connection() as conn:
+            conn.execute(f"UPDATE jobs SET {assignments} WHERE id = ?", (*fields.values(), job_id))
+            conn.commit()
+
+    def _claim(self, job_id):
+        with self._connection() as conn:
+            claimed = conn.execute(
+                """
+                UPDATE jobs SET status = ?, worker = ?, started_at = datetime('now')
+                WHERE id = ? AND status = ?
+                  AND (SELECT COUNT(*) FROM jobs AS other
+                       WHERE other.status = ? AND other.org_id IS jobs.org_id) < ?
+                """,
+                (RUNNING, os.getpid(), job_id, QUEUED, RUNNING, self.max_per_org),
+            ).rowcount
+            if not claimed:
+                conn.commit()
+                return None
+            row = conn.execute("SELECT kind, org_id, payload FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if not self._handlers.get(row["kind"], (None, False))[1]:
+                # Never run again from the row (a restart fails it as interrupted), so drop the
+                # payload now: a deferred request's headers carry the client's credentials
+                conn.execute("UPDATE jobs SET payload = NULL WHERE id = ?", (job_id,))
+            conn.commit()
+            return row
+
+    def _run(self, job_id):
+        try:
+            row = self._claim(job_id)
+        finally:
+            with self._dispatch_lock:
+                self._dispatched.pop(job_id, None)
+        if row is None:
+            return  # taken by another worker, cancelled, or the org is at its limit
+        kind, org_id, payload = row["kind"], row["org_id"], row["payload"]
+        func, _ = self._handlers[kind]
+        job = JobContext(self, job_id, org_id)
+        token = _current.set(job)
+        _running_here.add(job_id)
+        try:
+            result = func(job, **json.loads(payload or "{}"))
+        except JobCancelled:
+            logger.info(f"JOB QUEUE - {kind} job {job_id} cancelled")
+            self._update(job_id, status=CANCELLED, payload=None, finished_at=_now())
+        except Exception as e:
+            logger.error(f"JOB QUEUE - {kind} job {job_id} failed: {e}")
+            self._update(job_id, status=FAILED, error=str(e), payload=None, finished_at=_now())
+        else:
+            status, error = SUCCEEDED, None
+            if isinstance(result, dict) and result.get("status_code", 200) >= 400:
+                status, error = FAILED, f"HTTP {result['status_code']}"
+            self._update(
+                job_id, status=status, progress=1.0, error=error, payload=None,
+                result=json.dumps(result, default=str), finished_at=_now(),
+            )
+            logger.info(f"JOB QUEUE - {kind} job {job_id} finished ({status})")
+        finally:
+            _running_here.discard(job_id)
+            _current.reset(token)
+            self._dispatch()
+            self.purge()
+
+    def get(self, job_id):
+        """Job as a dict (result decoded), or None"""
+        with self._connection() as conn:
+            row = conn.execute(
+                """
+                SELECT id, kind, org_id, status, progress, message, result, error, cancel_requested,
+                       created_at, started_at, finished_at
+                FROM jobs WHERE id = ?
+                """,
+                (job_id,),
+            ).fetchone()
+        return _job(row)
+
+    def list(self, org_id=None, all_orgs=False, limit=50):
+        """Most recent jobs of an organization (or of all of them), without results"""
+        query = """
+            SELECT id, kind, org_id, status, progress, message, NULL AS result, error, cancel_requested,
+                   created_at, started_at, finished_at
+            FROM jobs {where} ORDER BY rowid DESC LIMIT ?
+        """
+        with self._connection() as conn:
+            if all_orgs:
+                rows = conn.execute(query.format(where=""), (limit,)).fetchall()
+            else:
+                rows = conn.execute(query.format(where="WHERE org_id IS ?"), (org_id, limit)).fetchall()
+        return [_job(row) for row in rows]
+
+    def cancel(self, job_id):
+        """Cancel a queued job, or ask a running one to stop; returns the job"""
+        with self._connection() as conn:
+            cancelled = conn.execute(
+                "UPDATE jobs SET status = ?, payload = NULL, finished_at = datetime('now') WHERE id = ? AND status = ?",
+                (CANCELLED, job_id, QUEUED),
+            ).rowcount
+            if not cancelled:
+                conn.execute("UPDATE jobs SET cancel_requested = 1 WHERE id = ? AND status = ?", (job_id, RUNNING))
+            conn.commit()
+        if cancelled:
+            self._remove_files(job_id)
+        return self.get(job_id)
+
+    def resume(self):
+        """
+        Requeue jobs left over from a previous run (see module docstring);
+        returns how many are queued. Only the first call does anything.
+        """
+        with self._lock:
+            if self._resumed:
+                return 0
+            self._resumed = True
+        with self._connection() as conn:
+            running = conn.execute("SELECT id, kind, worker FROM jobs WHERE status = ?", (RUNNING,)).fetchall()
+            for row in running:
+                if _alive(row["worker"], row["id"]):
+                    continue
+                if self._handlers.get(row["kind"], (None, False))[1]:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, progress = 0, worker = NULL WHERE id = ? AND status = ?",
+                        (QUEUED, row["id"], RUNNING),
+                    )
+                else:
+                    conn.execute(
+                        "UPDATE jobs SET status = ?, error = ?, payload = NULL, finished_at = datetime('now') "
+                        "WHERE id = ? AND status = ?",
+                        (FAILED, "interrupted by a restart", row["id"], RUNNING),
+                    )
+            conn.commit()
+            queued = conn.execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (QUEUED,)).fetchone()[0]
+        self.purge(force=True)
+        self._dispatch()
+        if queued:
+            logger.info(f"JOB QUEUE - Resumed {queued} queued jobs")
+        return queued
+
+    def purge(self, force=False):
+        """Delete finished jobs (and their files) older than retention_hours; returns how many"""
+        now = time.monotonic()
+        if not force and now - self._last_purge < PURGE_INTERVAL_SECONDS:
+            return 0
+        self._last_purge = now
+        placeholders = ", ".join("?" for _ in FINISHED)
+        with self._connection() as conn:
+            expired = [
+                row[0]
+                for row in conn.execute(
+                    f"SELECT id FROM jobs WHERE status IN ({placeholders}) AND finished_at < datetime('now', ?)",
+                    (*FINISHED, f"-{self.retention_hours} hours"),
+                )
+            ]
+            conn.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id in expired])
+            conn.commit()
+        for job_id in expired:
+            self._remove_files(job_id)
+        if expired:
+            logger.info(f"JOB QUEUE - Purged {len(expired)} finished jobs")
+        return len(expired)
+
+    def file_path(self, job_id, name):
+        """A file kept for a job (captured request parts, the response of a deferred request)"""
+        return os.path.join(self.files_dir, job_id, name)
+
+    def _remove_files(self, job_id):
+        shutil.rmtree(os.path.join(self.files_dir, job_id), ignore_errors=True)
+
+    def deferrable(self, kind):
+        """
+        Decorator for a Flask view (below @app.route) letting clients run it
+        as a job of ``kind``; the 202 answer carries the job id and its URLs
+        """
+        self._handlers.setdefault(kind, (self._replay, False))
+
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                from flask import jsonify, request
+
+                if _current.get() is not None or not wants_async(request):
+                    return view(*args, **kwargs)
+                job_id = uuid.uuid4().hex
+                payload = self._capture(request, job_id)
+                org_id = self.org_of(request) if self.org_of else None
+                self.submit(kind, payload, org_id=org_id, job_id=job_id)
+                logger.info(f"JOB QUEUE - Deferred {request.path} as {kind} job {job_id}")
+                response = jsonify(
+                    {
+                        "status": "accepted",
+                        "job_id": job_id,
+                        "status_url": f"/api/jobs/{job_id}",
+                        "result_url": f"/api/jobs/{job_id}/result",
+                    }
+                )
+                response.status_code = 202
+                response.headers["Location"] = f"/api/jobs/{job_id}"
+                return response
+            return wrapper
+        return decorator
+
+    def _capture(self, request, job_id):
+        """
+        Everything needed to replay ``request`` later; uploads and bodies go
+        under files_dir. Headers, cookies included for the view's own auth
+        checks, stay in the payload only until a worker claims the job.
+        """
+        os.makedirs(os.path.join(self.files_dir, job_id), exist_ok=True)
+        payload = {
+            "path": request.path,
+            "method": request.method,
+            "query": [(k, v) for k, v in request.args.items(multi=True) if k != "async"],
+            "headers": [(k, v) for k, v in request.headers.items() if k.lower() not in SKIPPED_HEADERS],
+        }
+        if request.mimetype in ("multipart/form-data", "application/x-www-form-urlencoded"):
+            payload["form"] = list(request.form.items(multi=True))
+            payload["files"] = []
+            for number, (field, storage) in enumerate(request.files.items(multi=True)):
+                stored = self.file_path(job_id, f"upload_{number}")
+                storage.save(stored)
+                payload["files"].append((field, stored, storage.filename, storage.content_type))
+        else:
+            with open(self.file_path(job_id, "request.body"), "wb") as f:
+                f.write(request.get_data())
+            payload["content_type"] = request.content_type
+        return payload
+
+    def _replay(self, job, path, method, query, headers, form=None, files=None, content_type=None):
+        """Run a captured request through the app; the response body is kept as response.body"""
+        from werkzeug.datastructures import MultiDict
+
+        if self.app is None:
+            raise RuntimeError("JobQueue.init_app() was not called")
+        opened = []
+        try:
+            if form is not None:
+                data = MultiDict(form)
+                for field, stored, filename, file_type in files or []:
+                    handle = open(stored, "rb")
+                    opened.append(handle)
+                    data.add(field, (handle, filename, file_type))
+                body = {"data": data}
+            else:
+                with open(self.file_path(job.id, "request.body"), "rb") as f:
+                    body = {"data": f.read(), "content_type": content_type}
+            with self.app.test_request_context(path, method=method, query_string=query, headers=headers, **body):
+                response = self.app.make_response(self.app.full_dispatch_request())
+                try:
+                    with open(self.file_path(job.id, "response.body"), "wb") as out:
+                        for chunk in response.iter_encoded():
+                            out.write(chunk)
+                finally:
+                    response.close()  # runs call_on_close cleanups, as after a real response
+        finally:
+            for handle in opened:
+                handle.close()
+            for name in os.listdir(os.path.join(self.files_dir, job.id)):
+                if name != "response.body":
+                    os.remove(self.file_path(job.id, name))
+        return {
+            "status_code": response.status_code,
+            "content_type": response.content_type,
+            "content_disposition": response.headers.get("Content-Disposition"),
+        }
+
+
+def _job(row):
+    if row is None:
+        return None
+    job = dict(row)
+    job["result"] = json.loads(job["result"]) if job["result"] else None
+    job["cancel_requested"] = bool(job["cancel_requested"])
+    return job
+
+
+def _alive(pid, job_id=None):
+    """Whether the process that claimed a job is still running (on this host)"""
+    if not pid:
+        return False
+    if pid == os.getpid():
+        return job_id in _running_here  # otherwise a pid reused after a restart
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        return True  # exists, owned by someone else
+    return True
+
+
+def _now():
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime())
@@ -78,6 +78,18 @@ from typing import Dict, List
 import numpy as np
 import requests
 from template_helpers import TemplateProcessor
+from asset_cache import asset_cache
+from pdf_assembly import PackageZipFile, assemble_pdf
+from db_pool import db_pool
+from session_cache import session_cache
+import project_index
+import project_store
+from dashboard_counters import dashboard_counters, empty_summary
+import audit_buffer
+import upload_pipeline
+from job_queue import JobQueue, JobCancelled, checkpoint as job_checkpoint
+from shared_state import shared_state, SharedAttribute
+from report_snapshots import report_snapshots
 from analysis_helpers import (
     safe_float, validate_analysis_inputs, normalize_analysis_config,
     extract_report_data, process_attribution_data, 
@@ -159,6 +171,9 @@ class WeatherServiceClient:
                 "after_end": after_end,
                 "include_hourly": include_hourly,
             }
+            if hourly_wire is not None:
+                # Ask for the compact columnar hourly format; older services ignore this and send hourly_data
+                payload["hourly_format"] = hourly_wire.FORMAT_COLUMNAR_ZLIB
 
             logger.info(f"Payload being sent to weather service: {payload}")
 
@@ -188,17 +203,18 @@ class WeatherServiceClient:
             response.raise_for_status()
 
             data = response.json()
-            logger.info(f"Weather service response data: {data}")
+            summary = {k: v for k, v in data.items() if k not in ("hourly_data", "hourly_columns")}
+            logger.info(f"Weather service response data: {summary}")
             logger.info(f"Weather service response - temp_before: {data.get('temp_before')}, temp_after: {data.get('temp_after')}")
             logger.info(f"Weather service response - humidity_before: {data.get('humidity_before')}, humidity_after: {data.get('humidity_after')}")
             logger.info(f"Weather service response - dewpoint_before: {data.get('dewpoint_before')}, dewpoint_after: {data.get('dewpoint_after')}")
-            logger.info(f"Weather service response - hourly_data present: {'hourly_data' in data}, hourly_data length: {len(data.get('hourly_data', []))}")
+            logger.info(f"Weather service response - hourly format: {data.get('hourly_format', 'legacy')}, hourly_data length: {len(data.get('hourly_data', []))}")
 
             if data.get("success", False):
                 # Weather service returns data directly, not in before_period/after_period objects
                 coordinates = data.get("coordinates", {})
 
-                logger.info(f"Direct weather data received: {data}")
+                logger.info(f"Direct weather data received: {summary}")
 
                 result = {
                     "temp_before": data.get("temp_before"),
@@ -216,17 +232,31 @@ class WeatherServiceClient:
                     "after_period": f"{after_start} to {after_end}",
                     "data_points_before": data.get("before_days", 0),
                     "data_points_after": data.get("after_days", 0),
-                    "hourly_data": data.get("hourly_data", []),
                 }
+                if data.get("hourly_columns") and hourly_wire is not None:
+                    # Columnar payload: {period: {"time": [...], "temp": [...], ...}}
+                    result["hourly_columns"] = hourly_wire.decode(data["hourly_columns"])
+                else:
+                    result["hourly_data"] = data.get("hourly_data", [])
 
-                # Fallback: Calculate from hourly_data if daily values are null
+                # Fallback: Calculate from hourly data if daily values are null
+                hourly_columns = result.get("hourly_columns")
                 hourly_data = result.get("hourly_data", [])
-                if hourly_data:
-                    logger.info(f"Fallback check: Found {len(hourly_data)} hourly data points")
-                    
+                if hourly_data or hourly_columns:
                     # Separate before and after hourly data
-                    before_hourly = [h for h in hourly_data if h.get("period") == "before"]
-                    after_hourly = [h for h in hourly_data if h.get("period") == "after"]
+                    if hourly_columns:
+                        # Only expand columns to dicts when a daily value actually needs the fallback
+                        needs_fallback = any(
+                            result.get(f"{name}_{period}") is None
+                            for name in ("temp", "humidity", "dewpoint")
+                            for period in ("before", "after")
+                        )
+                        before_hourly = _hourly_weather_records(result, "before") if needs_fallback else []
+                        after_hourly = _hourly_weather_records(result, "after") if needs_fallback else []
+                    else:
+                        logger.info(f"Fallback check: Found {len(hourly_data)} hourly data points")
+                        before_hourly = [h for h in hourly_data if h.get("period") == "before"]
+                        after_hourly = [h for h in hourly_data if h.get("period") == "after"]
                     
                     logger.info(f"Fallback check: {len(before_hourly)} before points, {len(after_hourly)} after points")
                     
@@ -275,7 +305,7 @@ class WeatherServiceClient:
                     logger.warning(f"Fallback check: No hourly_data available in weather response. Keys: {list(result.keys())}")
                     logger.warning(f"Fallback check: Weather service returned - temp_before: {result.get('temp_before')}, temp_after: {result.get('temp_after')}")
 
-                logger.info(f"Processed weather result: {result}")
+                logger.info(f"Processed weather result: { {k: v for k, v in result.items() if k not in ('hourly_data', 'hourly_columns')} }")
                 logger.info("Weather data fetched successfully from service")
                 
                 # Log weather data audit if analysis_session_id is available
@@ -356,43 +386,35 @@ class WeatherServiceClient:
             }
 
 
-# --- Address normalization utility for weather fetches ---
-def _normalize_address_for_weather(address: str) -> str:
-    """Normalize address string to improve geocoding success.
-
-    - Prefer ZIP code if present (returns 5-digit ZIP)
-    - Collapse multiple commas and whitespace
-    - Deduplicate repeated tokens (e.g., "CO, CO")
-    """
-    try:
-        if not address:
-            return ""
-        import re
+# --- Address normalization and geocode cache (shared with the 8085 weather service) ---
+try:
+    from pathlib import Path as _Path
+    _service_8085_path = str(_Path(__file__).parent.parent / "8085")
+    if _service_8085_path not in sys.path:
+        sys.path.insert(0, _service_8085_path)
+    from geocode_cache import geocode_cache, normalize_address as _normalize_address_for_weather
+    import hourly_wire
+except ImportError as e:
+    logger.warning(f"Shared geocode cache / hourly wire format unavailable (8085): {e}")
+    geocode_cache = None
+    hourly_wire = None
 
-        # Prefer ZIP code if available (5 digits)
-        zip_match = re.search(r"\b(\d{5})(?:-\d{4})?\b", address)
-        if zip_match:
-            return zip_match.group(1)
-
-        # Collapse extra commas and whitespace
-        collapsed = re.sub(r",\s*,+", ", ", address.strip())
-        parts = [p.strip() for p in collapsed.split(",") if p.strip()]
-
-        # Deduplicate tokens case-insensitively while preserving order
-        seen = set()
-        dedup_parts = []
-        for p in parts:
-            key = p.lower()
-            if key not in seen:
-                seen.add(key)
-                dedup_parts.append(p)
-
-        return ", ".join(dedup_parts)
-    except Exception:
-        # Fallback to original if anything goes wrong
+    def _normalize_address_for_weather(address: str) -> str:
         return (address or "").strip()
 
 
+def _hourly_weather_records(weather_data: Dict, period: str = None) -> List[Dict]:
+    """Legacy hourly dicts (with "period" markers) from a weather result in either wire format."""
+    columns = weather_data.get("hourly_columns")
+    if columns and hourly_wire is not None:
+        periods = [period] if period else list(columns)
+        return [r for p in periods if p in columns for r in hourly_wire.to_records(columns[p], p)]
+    hourly = weather_data.get("hourly_data") or []
+    if period:
+        return [h for h in hourly if h.get("period") == period]
+    return list(hourly)
+
+
 # Initialize weather service client
 weather_client = WeatherServiceClient("http://127.0.0.1:8200")
 
@@ -663,27 +685,27 @@ def merge_pdfs(pdf_files, output_path, document_name=None, cover_data=None):
     
     Args:
         pdf_files: List of PDF file paths to merge (in order)
-        output_path: Path for the merged PDF output
+        output_path: Path for the merged PDF output, or a stream / stream opener (see pdf_assembly.assemble_pdf)
         document_name: Document name to display in footer (optional, defaults to output filename)
         cover_data: Optional dict with cover page data (if provided, cover page will be prepended)
     
     Returns:
         True if successful, False otherwise
     """
+    cover_file = None  # cover page file on disk, removed however the merge ends
     try:
-        from PyPDF2 import PdfMerger, PdfWriter, PdfReader
-        from reportlab.pdfgen import canvas
-        from reportlab.lib.pagesizes import letter
-        from reportlab.lib.units import inch
-        import io
-        
         # Step 0: Create cover page if cover_data is provided
         cover_page_path = None
         logger.info(f"PDF MERGE - cover_data check: cover_data={cover_data}, type={type(cover_data)}, bool={bool(cover_data)}")
         
         if cover_data is not None and cover_data:
             # Use absolute path and ensure directory exists
-            cover_page_path = os.path.abspath(output_path.replace('.pdf', '_cover.pdf'))
+            if isinstance(output_path, str):
+                cover_page_path = os.path.abspath(output_path.replace('.pdf', '_cover.pdf'))
+            else:
+                cover_fd, cover_page_path = tempfile.mkstemp(suffix='_cover.pdf')
+                os.close(cover_fd)
+            cover_file = cover_page_path
             cover_dir = os.path.dirname(cover_page_path)
             if not os.path.exists(cover_dir):
                 os.makedirs(cover_dir, exist_ok=True)
@@ -716,125 +738,11 @@ def merge_pdfs(pdf_files, output_path, document_name=None, cover_data=None):
         else:
             logger.warning(f"PDF MERGE - No cover_data provided or cover_data is empty/None, skipping cover page")
         
-        # Step 1: Merge PDFs as before
-        merger = PdfMerger()
-        
-        # Track files by normalized path to prevent duplicates
-        files_added = set()
-        added_count = 0
-        skipped_count = 0
-        
-        for pdf_file in pdf_files:
-            if os.path.exists(pdf_file):
-                # Normalize path for duplicate checking
-                normalized_path = os.path.normpath(os.path.abspath(pdf_file))
-                
-                # Skip if already added (duplicate)
-                if normalized_path in files_added:
-                    logger.debug(f"PDF MERGE - Skipping duplicate: {os.path.basename(pdf_file)}")
-                    skipped_count += 1
-                    continue
-                
-                try:
-                    merger.append(pdf_file)
-                    files_added.add(normalized_path)
-                    added_count += 1
-                    logger.debug(f"PDF MERGE - Added {os.path.basename(pdf_file)} to merge")
-                except Exception as e:
-                    logger.warning(f"PDF MERGE - Could not add {os.path.basename(pdf_file)}: {e}")
-        
-        # Write merged PDF to temporary file first
-        temp_merged_path = output_path + ".temp"
-        merger.write(temp_merged_path)
-        merger.close()
-        
-        # Step 2: Read the merged PDF and add footers if document_name is provided
-        if document_name:
-            reader = PdfReader(temp_merged_path)
-            writer = PdfWriter()
-            total_pages = len(reader.pages)
-            
-            logger.info(f"PDF MERGE - Adding footers to {total_pages} pages with document name: {document_name}")
-            
-            for page_num, page in enumerate(reader.pages, start=1):
-                # Get page dimensions
-                page_width = float(page.mediabox.width)
-                page_height = float(page.mediabox.height)
-                
-                # Create footer overlay using reportlab
-                packet = io.BytesIO()
-                can = canvas.Canvas(packet, pagesize=(page_width, page_height))
-                
-                # Set font to 6pt
-                can.setFont("Helvetica", 6)
-                can.setFillColorRGB(0, 0, 0)  # Black color
-                
-                # Footer text: Document name on left, page number on right
-                footer_y = 20  # 20 points from bottom
-                footer_text_left = document_name
-                footer_text_right = f"Page {page_num} of {total_pages}"
-                
-                # Draw document name (left-aligned)
-                can.drawString(30, footer_y, footer_text_left)
-                
-                # Draw page number (right-aligned)
-                text_width = can.stringWidth(footer_text_right, "Helvetica", 6)
-                can.drawString(page_width - text_width - 30, footer_y, footer_text_right)
-                
-                can.save()
-                
-                # Move to beginning of the BytesIO buffer
-                packet.seek(0)
-                footer_pdf = PdfReader(packet)
-                footer_page = footer_pdf.pages[0]
-                
-                # Merge footer overlay with original page
-                page.merge_page(footer_page)
-                writer.add_page(page)
-            
-            # Step 3: Write final PDF with footers
-            with open(output_path, 'wb') as output_file:
-                writer.write(output_file)
-            
-            # Clean up temporary file
-            try:
-                os.remove(temp_merged_path)
-            except Exception as e:
-                logger.warning(f"PDF MERGE - Could not remove temp file: {e}")
-            
-            logger.info(f"PDF MERGE - Successfully merged {added_count} PDFs into {os.path.basename(output_path)} with footers (skipped {skipped_count} duplicates)")
-        else:
-            # No footer requested, just rename temp file to output
-            try:
-                os.rename(temp_merged_path, output_path)
-            except Exception as e:
-                # If rename fails (cross-device), copy and delete
-                shutil.copy2(temp_merged_path, output_path)
-                os.remove(temp_merged_path)
-            
-            logger.info(f"PDF MERGE - Successfully merged {added_count} PDFs into {os.path.basename(output_path)} (skipped {skipped_count} duplicates)")
-        
-        # Clean up cover page temp file if it was created
-        if cover_page_path and os.path.exists(cover_page_path):
-            try:
-                # Verify the merged PDF exists and has content
-                if os.path.exists(output_path):
-                    merged_size = os.path.getsize(output_path)
-                    logger.info(f"PDF MERGE - Final merged PDF size: {merged_size:,} bytes")
-                    
-                    # Try to verify cover page was included by checking page count
-                    try:
-                        from PyPDF2 import PdfReader
-                        reader = PdfReader(output_path)
-                        page_count = len(reader.pages)
-                        logger.info(f"PDF MERGE - Merged PDF has {page_count} pages (expected at least 1 for cover)")
-                    except:
-                        pass
-                
-                os.remove(cover_page_path)
-                logger.debug(f"PDF MERGE - Cleaned up cover page temp file")
-            except Exception as e:
-                logger.warning(f"PDF MERGE - Could not remove cover page temp file: {e}")
+        # Step 1: Merge and stamp footers in a single pass, writing straight to the output
+        added_count, skipped_count, page_count = assemble_pdf(pdf_files, output_path, document_name)
+        output_name = os.path.basename(output_path) if isinstance(output_path, str) else "stream"
+        footer_note = " with footers" if document_name else ""
+        logger.info(f"PDF MERGE - Successfully merged {added_count} PDFs ({page_count} pages) into {output_name}{footer_note} (skipped {skipped_count} duplicates)")
         
         return True
         
@@ -846,6 +754,14 @@ def merge_pdfs(pdf_files, output_path, document_name=None, cover_data=None):
         import traceback
         logger.error(traceback.format_exc())
         return False
+    finally:
+        # Clean up cover page temp file if it was created (also when creating it failed)
+        if cover_file and os.path.exists(cover_file):
+            try:
+                os.remove(cover_file)
+                logger.debug(f"PDF MERGE - Cleaned up cover page temp file")
+            except Exception as e:
+                logger.warning(f"PDF MERGE - Could not remove cover page temp file: {e}")
 
 
 # Approximate inverse CDF (ppf) using Acklam's algorithm
@@ -1276,7 +1192,16 @@ def _safe_save_upload(file_obj, label_prefix: str) -> Path:
 # ---------------------
 
 warnings.filterwarnings("ignore")
-app = Flask(__name__, static_folder="static", static_url_path="/static")
+
+
+class SynerexFlask(Flask):
+    """Flask app whose latest analysis results and form data are shared by all workers (see shared_state)"""
+
+    _latest_analysis_results = SharedAttribute(shared_state, __name__)
+    _latest_form_data = SharedAttribute(shared_state, __name__)
+
+
+app = SynerexFlask(__name__, static_folder="static", static_url_path="/static")
 app.secret_key = "synerex-admin-secret-key-2025"  # Required for sessions
 
 # Increase URL length limit to handle long GET requests
@@ -1353,25 +1278,22 @@ def log_calculation_audit(analysis_session_id: str, calculation_type: str,
     
     try:
         import json
+        params = (
+            analysis_session_id,
+            calculation_type,
+            standard_name,
+            json.dumps(input_values) if input_values else None,
+            json.dumps(output_values) if output_values else None,
+            methodology,
+            formula,
+            standards_reference,
+            user_id
+        )
+        if audit_buffer.record("calculation_audit", params):
+            return
         with get_db_connection() as conn:
             if conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO calculation_audit 
-                    (analysis_session_id, calculation_type, standard_name, input_values, 
-                     output_values, methodology, formula, standards_reference, calculated_by)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    analysis_session_id,
-                    calculation_type,
-                    standard_name,
-                    json.dumps(input_values) if input_values else None,
-                    json.dumps(output_values) if output_values else None,
-                    methodology,
-                    formula,
-                    standards_reference,
-                    user_id
-                ))
+                audit_buffer.write(conn, "calculation_audit", [params])
                 conn.commit()
     except Exception as e:
         logger.debug(f"Failed to log calculation audit (non-critical): {e}")
@@ -1637,16 +1559,16 @@ def store_verification_code(analysis_session_id: str, verification_code: str):
     if not analysis_session_id or not verification_code or not ENABLE_SQLITE:
         return False
     
+    # During an analysis the update is written with the rest of its audit rows
+    if audit_buffer.record("verification_code", (verification_code, analysis_session_id)):
+        return True
+    
     try:
         with get_db_connection() as conn:
             if conn:
                 cursor = conn.cursor()
                 # Update existing session with verification code
-                cursor.execute("""
-                    UPDATE analysis_sessions 
-                    SET verification_code = ? 
-                    WHERE id = ?
-                """, (verification_code, analysis_session_id))
+                cursor.execute(audit_buffer.VERIFICATION_CODE_SQL, (verification_code, analysis_session_id))
                 
                 # If no rows were updated, try to insert (shouldn't happen, but handle gracefully)
                 if cursor.rowcount == 0:
@@ -1681,24 +1603,21 @@ def log_compliance_verification(analysis_session_id: str, standard_name: str,
         return  # Skip logging if no session ID or SQLite disabled
     
     try:
+        params = (
+            analysis_session_id,
+            standard_name,
+            check_type,
+            calculated_value,
+            limit_value,
+            threshold_value,
+            1 if is_compliant else 0 if is_compliant is not None else None,
+            verification_method
+        )
+        if audit_buffer.record("compliance_verification", params):
+            return
         with get_db_connection() as conn:
             if conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO compliance_verification 
-                    (analysis_session_id, standard_name, check_type, calculated_value,
-                     limit_value, threshold_value, is_compliant, verification_method)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    analysis_session_id,
-                    standard_name,
-                    check_type,
-                    calculated_value,
-                    limit_value,
-                    threshold_value,
-                    1 if is_compliant else 0 if is_compliant is not None else None,
-                    verification_method
-                ))
+                audit_buffer.write(conn, "compliance_verification", [params])
                 conn.commit()
     except Exception as e:
         logger.debug(f"Failed to log compliance verification (non-critical): {e}")
@@ -1723,25 +1642,22 @@ def log_weather_data_audit(analysis_session_id: str, location_address: str,
         user_id: ID of user who requested weather data
     """
     try:
+        params = (
+            analysis_session_id,
+            location_address,
+            latitude,
+            longitude,
+            date_range_start,
+            date_range_end,
+            api_source,
+            data_quality_score,
+            user_id
+        )
+        if audit_buffer.record("weather_data_audit", params):
+            return
         with get_db_connection() as conn:
             if conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO weather_data_audit 
-                    (analysis_session_id, location_address, latitude, longitude,
-                     date_range_start, date_range_end, api_source, data_quality_score, fetched_by)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    analysis_session_id,
-                    location_address,
-                    latitude,
-                    longitude,
-                    date_range_start,
-                    date_range_end,
-                    api_source,
-                    data_quality_score,
-                    user_id
-                ))
+                audit_buffer.write(conn, "weather_data_audit", [params])
                 conn.commit()
                 logger.info(f"Weather data audit logged for session {analysis_session_id}")
     except Exception as e:
@@ -1759,7 +1675,9 @@ def get_db_connection(org_id=None, use_sessions_db=False):
                         regardless of org_id. Use this for session management.
     
     Returns:
-        Database connection to org-specific database or shared sessions database
+        Database connection to org-specific database or shared sessions database.
+        Connections come from db_pool and go back to it on exit; uncommitted
+        changes are rolled back, as closing the connection used to do.
     """
     if not ENABLE_SQLITE:
         yield None
@@ -1776,7 +1694,6 @@ def get_db_connection(org_id=None, use_sessions_db=False):
         elif org_id:
             # Use org-specific database
             org_dir = os.path.join(str(results_dir), f"org_{org_id}")
-            os.makedirs(org_dir, exist_ok=True)
             db_path = os.path.join(org_dir, "app.db")
         else:
             # Fallback: use default app.db (for backward compatibility during migration)
@@ -1784,18 +1701,19 @@ def get_db_connection(org_id=None, use_sessions_db=False):
             logger.warning("get_db_connection() called without org_id - using default app.db (backward compatibility)")
             db_path = DATABASE_PATH
         
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row  # Enable dict-like access
+        # Pooled, WAL-configured connection (see db_pool.py); the directory is created on first open
+        conn = db_pool.acquire(db_path)
         yield conn
     except Exception as e:
         logger.error(f"Database connection error (org_id={org_id}, use_sessions_db={use_sessions_db}): {e}")
         if conn:
             conn.rollback()
+            db_pool.release(db_path, conn, discard=True)
+            conn = None
         raise
     finally:
         if conn:
-            conn.close()
+            db_pool.release(db_path, conn)
 
 
 def init_database():
@@ -2384,6 +2302,9 @@ def init_database():
                 )
 
             conn.commit()
+
+            # Project summary / full-text search tables (backfilled from existing projects)
+            project_index.ensure_schema(conn)
             logger.info("Database initialized successfully")
 
     except Exception as e:
@@ -2394,6 +2315,24 @@ def init_database():
 # Initialize database on startup
 init_database()
 
+# Audit rows are written once per analysis (see audit_buffer); rows left by a crashed run go in now.
+# The journal directory is shared with the refactored app, so rows go to the database of their org.
+AUDIT_JOURNAL_DIR = os.path.join(os.path.dirname(DATABASE_PATH), "audit_journal")
+
+
+def _audit_connection(org_id):
+    """Connection for buffered audit rows: the org's database, or the default one for org_id None"""
+    return get_db_connection(org_id=org_id) if org_id else get_db_connection()
+
+
+audit_batched = audit_buffer.batched(_audit_connection, AUDIT_JOURNAL_DIR)
+# The process's queue for results/jobs.db: when the refactored app (re)imports this module it gets
+# the app's own queue back, and the init_app / resume calls below leave it as it is
+job_queue = JobQueue.from_env(os.path.join(os.path.dirname(DATABASE_PATH), "jobs.db"))
+job_queue.init_app(app)
+if ENABLE_SQLITE:
+    audit_buffer.replay(_audit_connection, AUDIT_JOURNAL_DIR)
+
 
 class AppConfig:
     """Centralized configuration with environment overrides."""
@@ -2495,12 +2434,13 @@ def static_or_data_uri(preferred_path: str, fallback_svg: str = None) -> str:
         # Use BASE_DIR instead of app.root_path for consistency
         root = BASE_DIR
         full = root / preferred_path.lstrip("/")
-        if full.exists():
+        # Existence comes from the asset cache rather than a stat per report
+        if asset_cache.exists(full):
             return "/" + preferred_path.lstrip("/")
     except Exception:
         pass
-        # No SVG fallback allowed - return empty string if file not found
-        return ""
+    # No SVG fallback allowed - return empty string if file not found
+    return ""
 
 
 def build_template_context(results: dict, config: dict):
@@ -8339,6 +8279,8 @@ class CSVIntegrityProtection:
     - Integrity verification
     """
 
+    _schema_ready = set()  # database paths whose tables have been created in this process
+
     def __init__(self, secret_key: str = None):
         """
         Initialize CSV integrity protection
@@ -8350,10 +8292,11 @@ class CSVIntegrityProtection:
             "SYNREX_CSV_SECRET_KEY", "default_secret_key_change_me"
         )
         self.db_path = "results/app.db"
-        self._ensure_database_setup()
+        if self.db_path not in CSVIntegrityProtection._schema_ready:
+            self._ensure_database_setup()
 
     def _ensure_database_setup(self):
-        """Ensure the csv_fingerprints table exists in the database"""
+        """Ensure the csv_fingerprints table exists in the database (once per path per process)"""
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
@@ -8401,6 +8344,7 @@ class CSVIntegrityProtection:
             )
             conn.commit()
             conn.close()
+            CSVIntegrityProtection._schema_ready.add(self.db_path)
         except Exception as e:
             logger.error(f"Error setting up CSV fingerprints database: {e}")
 
@@ -8436,6 +8380,20 @@ class CSVIntegrityProtection:
             "encoding": "utf-8",
         }
 
+        return self.record_fingerprint(content_hash, hmac_signature, content_metadata)
+
+    def record_fingerprint(
+        self, content_hash: str, hmac_signature: str, content_metadata: Dict
+    ) -> Dict:
+        """
+        Build and store the fingerprint for already computed hashes
+
+        Used by create_content_fingerprint and by uploads hashed while they
+        are streamed to disk (upload_pipeline.spool_upload).
+
+        Returns:
+            Dict with fingerprint data
+        """
         fingerprint = {
             "content_hash": content_hash,
             "hmac_signature": hmac_signature,
@@ -13975,6 +13933,7 @@ def analyze_compliance_status(data: Dict, config: Dict, period: str) -> Dict:
         }
 
 
+@audit_batched
 def perform_comprehensive_analysis(
     before_data: Dict, after_data: Dict, config: Dict
 ) -> Dict:
@@ -16299,13 +16258,14 @@ def perform_comprehensive_analysis(
                                     logger.info(f"Detected meter data interval: {meter_interval_minutes:.1f} minutes")
                         
                         # CRITICAL: Validate that hourly_data exists and is not empty
-                        if "hourly_data" not in weather_data:
+                        if "hourly_data" not in weather_data and "hourly_columns" not in weather_data:
                             logger.error(f"❌ CRITICAL: 'hourly_data' key not found in weather_data response")
                             logger.error(f"   Weather data keys: {list(weather_data.keys())}")
                             logger.error(f"   Cannot create time series without hourly weather data")
                             return None
                         
-                        hourly_weather = weather_data.get("hourly_data")
+                        # Legacy dicts with period markers, expanded from the columnar payload if needed
+                        hourly_weather = _hourly_weather_records(weather_data)
                         if not hourly_weather or len(hourly_weather) == 0:
                             logger.error(f"❌ CRITICAL: 'hourly_data' is empty or None in weather_data response")
                             logger.error(f"   Cannot create time series without hourly weather data")
@@ -18901,9 +18861,9 @@ CSS_STYLES_FALLBACK = ""
 def _load_html_head():
     """Load HTML head from external file."""
     try:
-        head_file = Path(__file__).parent / "html_head.html"
-        if head_file.exists():
-            return head_file.read_text(encoding="utf-8")
+        head = asset_cache.text(Path(__file__).parent / "html_head.html")
+        if head is not None:
+            return head
         else:
             return '<head><meta charset="UTF-8"><title>Power Analysis System</title></head>'
     except Exception as e:
@@ -18915,9 +18875,9 @@ def _load_html_head():
 def _load_html_body():
     """Load HTML body from external file for easier validation and maintenance."""
     try:
-        html_file = Path(__file__).parent / "html_body.html"
-        if html_file.exists():
-            return html_file.read_text(encoding="utf-8")
+        body = asset_cache.text(Path(__file__).parent / "html_body.html")
+        if body is not None:
+            return body
         else:
             # Fallback to inline HTML if file doesn't exist
             return _get_inline_html_body()
@@ -18929,9 +18889,9 @@ def _load_html_body():
 def _load_report_head():
     """Load report head from external file."""
     try:
-        head_file = Path(__file__).parent / "report_head.html"
-        if head_file.exists():
-            return head_file.read_text(encoding="utf-8")
+        head = asset_cache.text(Path(__file__).parent / "report_head.html")
+        if head is not None:
+            return head
         else:
             return '<head><meta charset="UTF-8"><title>Power Analysis Report</title></head>'
     except Exception as e:
@@ -18952,8 +18912,8 @@ def _load_report_template_on_demand():
     try:
         # Load the actual report template file
         template_file = Path(__file__).parent / "report_template.html"
-        if template_file.exists():
-            content = template_file.read_text(encoding="utf-8")
+        content = asset_cache.text(template_file)
+        if content is not None:
             logger.info(
                 f"Loaded report template on-demand from {template_file}, length: {len(content)}"
             )
@@ -19019,11 +18979,11 @@ def move_file_to_processed(file_path, original_filename):
 
 
 def _load_report_css():
-    """Load report CSS from external file."""
+    """Load report CSS from external file (minified once via the asset cache)."""
     try:
-        css_file = Path(__file__).parent / "report_css.css"
-        if css_file.exists():
-            return css_file.read_text(encoding="utf-8")
+        css = asset_cache.css(Path(__file__).parent / "report_css.css")
+        if css is not None:
+            return css
         else:
             return "/* Report CSS not found */"
     except Exception as e:
@@ -19068,11 +19028,11 @@ HTML_BODY_CONTENT = _load_html_body()
 
 # Load CSS and JavaScript from external files
 def _load_css_styles():
-    """Load CSS styles from external file."""
+    """Load CSS styles from external file (minified once via the asset cache)."""
     try:
-        css_file = Path(__file__).parent / "css_styles.css"
-        if css_file.exists():
-            return css_file.read_text(encoding="utf-8")
+        css = asset_cache.css(Path(__file__).parent / "css_styles.css")
+        if css is not None:
+            return css
         else:
             return "/* CSS styles not found */"
     except Exception as e:
@@ -19834,41 +19794,91 @@ def _extract_timestamps(df, column_mapping) -> list:
     ]
 
 
+def _geocode_zip(z: str):
+    """ZIP code lookup via zippopotam.us; returns (lat, lon, display) or None"""
+    logger.info(f"Trying ZIP code geocoding: {z}")
+    r = requests.get(f"http://api.zippopotam.us/us/{z}", timeout=6)
+    if r.status_code == 404:
+        return None
+    r.raise_for_status()
+    j = r.json()
+    if j.get("places") and len(j["places"]) > 0:
+        lat = float(j["places"][0]["latitude"])
+        lon = float(j["places"][0]["longitude"])
+        logger.info(f"ZIP geocoding successful: {lat}, {lon}")
+        return lat, lon, f"ZIP {z}"
+    return None
+
+
+def _geocode_open_meteo(name: str):
+    """Open-Meteo geocoding; returns (lat, lon, display) or None"""
+    logger.info(f"Trying Open-Meteo geocoding for: {name}")
+    r = requests.get(
+        "https://geocoding-api.open-meteo.com/v1/search",
+        params={"name": name, "count": 1, "language": "en", "format": "json"},
+        timeout=8,
+    )
+    r.raise_for_status()
+    j = r.json()
+    if j.get("results") and len(j["results"]) > 0:
+        lat = float(j["results"][0]["latitude"])
+        lon = float(j["results"][0]["longitude"])
+        disp = j["results"][0].get("name", "")
+        logger.info(
+            f"Open-Meteo geocoding successful: {lat}, {lon} ({disp})"
+        )
+        return lat, lon, disp
+    return None
+
+
 def _geocode_to_latlon(location_text: str = "", zip_code: str = ""):
-    """Geocode address to coordinates using multiple services. Returns (lat, lon, provider) or (None, None, None)."""
+    """Geocode address to coordinates using multiple services. Returns (lat, lon, provider) or (None, None, None).
+
+    Results (and definitive failures) are kept in the geocode cache shared with
+    the 8085 weather service. On a miss the ZIP and Open-Meteo lookups run
+    concurrently; the ZIP answer wins when both succeed.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    z = (zip_code or "").strip()
+    name = (location_text or "").strip()
+    cache_address = name or z
+
+    if geocode_cache is not None and cache_address:
+        found, cached = geocode_cache.get(cache_address, z)
+        if found:
+            if cached is None:
+                logger.info(f"Geocode cache: recent lookup for '{cache_address}' found no results")
+                return None, None, None
+            logger.info(f"Geocode cache hit: {cached.lat}, {cached.lon} ({cached.name})")
+            return cached.lat, cached.lon, f"geocode cache ({cached.name})"
+
+    transient_failure = False
     try:
-        # First try ZIP code if available
-        z = (zip_code or "").strip()
+        candidates = []
         if z.isdigit() and len(z) == 5:
-            logger.info(f"Trying ZIP code geocoding: {z}")
-            r = requests.get(f"http://api.zippopotam.us/us/{z}", timeout=6)
-            if r.ok:
-                j = r.json()
-                if j.get("places") and len(j["places"]) > 0:
-                    lat = float(j["places"][0]["latitude"])
-                    lon = float(j["places"][0]["longitude"])
-                    logger.info(f"ZIP geocoding successful: {lat}, {lon}")
-                    return lat, lon, f"zippopotam.us (ZIP {z})"
-
-        # Try full address with Open-Meteo geocoding
-        name = (location_text or "").strip()
+            candidates.append(("zippopotam.us", _geocode_zip, z))
         if name:
-            logger.info(f"Trying Open-Meteo geocoding for: {name}")
-            r = requests.get(
-                "https://geocoding-api.open-meteo.com/v1/search",
-                params={"name": name, "count": 1, "language": "en", "format": "json"},
-                timeout=8,
-            )
-            if r.ok:
-                j = r.json()
-                if j.get("results") and len(j["results"]) > 0:
-                    lat = float(j["results"][0]["latitude"])
-                    lon = float(j["results"][0]["longitude"])
-                    disp = j["results"][0].get("name", "")
-                    logger.info(
-                        f"Open-Meteo geocoding successful: {lat}, {lon} ({disp})"
-                    )
-                    return lat, lon, f"open-meteo geocoding ({disp})"
+            candidates.append(("open-meteo geocoding", _geocode_open_meteo, name))
+
+        if candidates:
+            pool = ThreadPoolExecutor(max_workers=len(candidates))
+            try:
+                futures = [(provider, pool.submit(fn, arg)) for provider, fn, arg in candidates]
+                for provider, future in futures:
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        logger.warning(f"{provider} geocoding failed: {e}")
+                        transient_failure = True
+                        continue
+                    if result:
+                        lat, lon, disp = result
+                        if geocode_cache is not None:
+                            geocode_cache.put(cache_address, lat, lon, disp, source=provider, zip_code=z)
+                        return lat, lon, f"{provider} ({disp})"
+            finally:
+                pool.shutdown(wait=False, cancel_futures=True)
 
         # Try alternative geocoding service (Nominatim)
         if name:
@@ -19879,25 +19889,30 @@ def _geocode_to_latlon(location_text: str = "", zip_code: str = ""):
                 timeout=8,
                 headers={"User-Agent": "Synerex-Power-Analysis/1.0"},
             )
-            if r.ok:
-                j = r.json()
-                if j and len(j) > 0:
-                    lat = float(j[0]["lat"])
-                    lon = float(j[0]["lon"])
-                    disp = (
-                        j[0].get("display_name", "")[:50] + "..."
-                        if len(j[0].get("display_name", "")) > 50
-                        else j[0].get("display_name", "")
-                    )
-                    logger.info(
-                        f"Nominatim geocoding successful: {lat}, {lon} ({disp})"
-                    )
-                    return lat, lon, f"nominatim geocoding ({disp})"
+            r.raise_for_status()
+            j = r.json()
+            if j and len(j) > 0:
+                lat = float(j[0]["lat"])
+                lon = float(j[0]["lon"])
+                disp = (
+                    j[0].get("display_name", "")[:50] + "..."
+                    if len(j[0].get("display_name", "")) > 50
+                    else j[0].get("display_name", "")
+                )
+                logger.info(
+                    f"Nominatim geocoding successful: {lat}, {lon} ({disp})"
+                )
+                if geocode_cache is not None:
+                    geocode_cache.put(cache_address, lat, lon, disp, source="nominatim geocoding", zip_code=z)
+                return lat, lon, f"nominatim geocoding ({disp})"
 
     except Exception as e:
         logger.warning(f"Geocoding failed: {e}")
+        transient_failure = True
 
     logger.warning(f"All geocoding attempts failed for: {name}")
+    if geocode_cache is not None and cache_address and not transient_failure:
+        geocode_cache.put_failure(cache_address, z)
     return None, None, None
 
 
@@ -20044,7 +20059,8 @@ def match_weather_to_csv_timestamps(csv_timestamps, hourly_weather_data, meter_i
     
     Args:
         csv_timestamps: List of datetime objects from CSV file
-        hourly_weather_data: List of dicts with 'timestamp' (ISO string) and weather values
+        hourly_weather_data: List of dicts with 'timestamp' (ISO string) and weather values, or one
+            columnar period from the weather service ({"time": [...], "temp": [...], ...})
         meter_interval_minutes: Interval of meter data in minutes (default 15)
     
     Returns:
@@ -20071,10 +20087,12 @@ def match_weather_to_csv_timestamps(csv_timestamps, hourly_weather_data, meter_i
         
         logger.info(f"=== TIMESTAMP MATCHING STARTED ===")
         logger.info(f"CSV timestamps count: {len(csv_timestamps) if csv_timestamps else 0}")
-        logger.info(f"Weather data points count: {len(hourly_weather_data) if hourly_weather_data else 0}")
+        columnar = isinstance(hourly_weather_data, dict)
+        weather_count = len(hourly_weather_data.get('time') or []) if columnar else len(hourly_weather_data or [])
+        logger.info(f"Weather data points count: {weather_count}{' (columnar)' if columnar else ''}")
         logger.info(f"Meter interval: {meter_interval_minutes} minutes")
         
-        if not csv_timestamps or not hourly_weather_data:
+        if not csv_timestamps or not weather_count:
             logger.warning("Missing data for timestamp matching: csv_timestamps or hourly_weather_data is empty")
             return []
         
@@ -20082,7 +20100,9 @@ def match_weather_to_csv_timestamps(csv_timestamps, hourly_weather_data, meter_i
         if csv_timestamps:
             logger.info(f"First CSV timestamp: {csv_timestamps[0]}, type: {type(csv_timestamps[0])}")
             logger.info(f"Last CSV timestamp: {csv_timestamps[-1]}, type: {type(csv_timestamps[-1])}")
-        if hourly_weather_data:
+        if columnar:
+            logger.info(f"Weather timestamps (columnar): {hourly_weather_data['time'][0]} to {hourly_weather_data['time'][-1]}")
+        else:
             first_weather = hourly_weather_data[0]
             logger.info(f"First weather timestamp: {first_weather.get('timestamp') or first_weather.get('time') or first_weather.get('datetime')}, type: {type(first_weather.get('timestamp'))}")
             last_weather = hourly_weather_data[-1]
@@ -20093,64 +20113,82 @@ def match_weather_to_csv_timestamps(csv_timestamps, hourly_weather_data, meter_i
         logger.info(f"Converted {len(csv_dt)} CSV timestamps to UTC pandas datetime")
         logger.info(f"CSV timestamp range: {csv_dt.min()} to {csv_dt.max()}")
         
-        # Parse weather timestamps and convert to UTC
-        weather_timestamps = []
-        weather_values = []
-        parse_errors = 0
-        for w in hourly_weather_data:
-            try:
-                # Parse timestamp - Open-Meteo returns ISO format strings
-                ts_str = w.get('timestamp') or w.get('time') or w.get('datetime')
-                if ts_str:
-                    # Parse and ensure UTC
-                    if isinstance(ts_str, str):
-                        # Handle ISO format with or without timezone
-                        if 'T' in ts_str:
-                            dt = pd.to_datetime(ts_str, utc=True)
+        if columnar:
+            # Columnar period: build the frame directly; hours without a temperature are dropped
+            # (the legacy list never contains them)
+            weather_df = pd.DataFrame({
+                'timestamp': pd.to_datetime(hourly_weather_data['time'], utc=True),
+                'temp': pd.to_numeric(pd.Series(hourly_weather_data.get('temp'), dtype='object'), errors='coerce'),
+                'dewpoint': pd.to_numeric(pd.Series(hourly_weather_data.get('dewpoint'), dtype='object'), errors='coerce'),
+                'humidity': pd.to_numeric(pd.Series(hourly_weather_data.get('humidity'), dtype='object'), errors='coerce'),
+                'wind_speed': pd.to_numeric(pd.Series(hourly_weather_data.get('wind_speed'), dtype='object'), errors='coerce'),
+                'solar_radiation': pd.to_numeric(pd.Series(hourly_weather_data.get('solar_radiation'), dtype='object'), errors='coerce')
+            })
+            weather_df = weather_df[weather_df['temp'].notna()]
+            if weather_df.empty:
+                logger.error("No valid weather timestamps parsed")
+                return []
+            weather_timestamps = list(weather_df['timestamp'])
+            logger.info(f"Using {len(weather_df)} columnar weather points")
+        else:
+            # Parse weather timestamps and convert to UTC
+            weather_timestamps = []
+            weather_values = []
+            parse_errors = 0
+            for w in hourly_weather_data:
+                try:
+                    # Parse timestamp - Open-Meteo returns ISO format strings
+                    ts_str = w.get('timestamp') or w.get('time') or w.get('datetime')
+                    if ts_str:
+                        # Parse and ensure UTC
+                        if isinstance(ts_str, str):
+                            # Handle ISO format with or without timezone
+                            if 'T' in ts_str:
+                                dt = pd.to_datetime(ts_str, utc=True)
+                            else:
+                                # Try parsing as space-separated
+                                dt = pd.to_datetime(ts_str, format='%Y-%m-%d %H:%M:%S', utc=True)
                         else:
-                            # Try parsing as space-separated
-                            dt = pd.to_datetime(ts_str, format='%Y-%m-%d %H:%M:%S', utc=True)
-                    else:
-                        dt = pd.to_datetime(ts_str, utc=True)
+                            dt = pd.to_datetime(ts_str, utc=True)
                     
-                    weather_timestamps.append(dt)
-                    weather_values.append({
-                        'temp': w.get('temp') or w.get('temp_c') or w.get('temperature'),
-                        'dewpoint': w.get('dewpoint') or w.get('dewpoint_c') or w.get('dew_point'),
-                        'humidity': w.get('humidity') or w.get('relative_humidity'),
-                        'wind_speed': w.get('wind_speed'),
-                        'solar_radiation': w.get('solar_radiation')
-                    })
-                else:
+                        weather_timestamps.append(dt)
+                        weather_values.append({
+                            'temp': w.get('temp') or w.get('temp_c') or w.get('temperature'),
+                            'dewpoint': w.get('dewpoint') or w.get('dewpoint_c') or w.get('dew_point'),
+                            'humidity': w.get('humidity') or w.get('relative_humidity'),
+                            'wind_speed': w.get('wind_speed'),
+                            'solar_radiation': w.get('solar_radiation')
+                        })
+                    else:
+                        parse_errors += 1
+                        logger.warning(f"Weather data point missing timestamp field: {list(w.keys())}")
+                except Exception as e:
                     parse_errors += 1
-                    logger.warning(f"Weather data point missing timestamp field: {list(w.keys())}")
-            except Exception as e:
-                parse_errors += 1
-                logger.warning(f"Failed to parse weather timestamp: {ts_str}, error: {e}")
-                continue
+                    logger.warning(f"Failed to parse weather timestamp: {ts_str}, error: {e}")
+                    continue
         
-        if parse_errors > 0:
-            logger.warning(f"Failed to parse {parse_errors} weather timestamps out of {len(hourly_weather_data)}")
+            if parse_errors > 0:
+                logger.warning(f"Failed to parse {parse_errors} weather timestamps out of {len(hourly_weather_data)}")
         
-        logger.info(f"Successfully parsed {len(weather_timestamps)} weather timestamps")
-        if weather_timestamps:
-            logger.info(f"Weather timestamp range: {min(weather_timestamps)} to {max(weather_timestamps)}")
+            logger.info(f"Successfully parsed {len(weather_timestamps)} weather timestamps")
+            if weather_timestamps:
+                logger.info(f"Weather timestamp range: {min(weather_timestamps)} to {max(weather_timestamps)}")
         
-        if not weather_timestamps:
-            logger.error("No valid weather timestamps parsed")
-            return []
+            if not weather_timestamps:
+                logger.error("No valid weather timestamps parsed")
+                return []
         
-        weather_dt = pd.to_datetime(weather_timestamps, utc=True)
+            weather_dt = pd.to_datetime(weather_timestamps, utc=True)
         
-        # Create DataFrames for interpolation
-        weather_df = pd.DataFrame({
-            'timestamp': weather_dt,
-            'temp': [v['temp'] for v in weather_values],
-            'dewpoint': [v['dewpoint'] for v in weather_values],
-            'humidity': [v['humidity'] for v in weather_values],
-            'wind_speed': [v['wind_speed'] for v in weather_values],
-            'solar_radiation': [v['solar_radiation'] for v in weather_values]
-        })
+            # Create DataFrames for interpolation
+            weather_df = pd.DataFrame({
+                'timestamp': weather_dt,
+                'temp': [v['temp'] for v in weather_values],
+                'dewpoint': [v['dewpoint'] for v in weather_values],
+                'humidity': [v['humidity'] for v in weather_values],
+                'wind_speed': [v['wind_speed'] for v in weather_values],
+                'solar_radiation': [v['solar_radiation'] for v in weather_values]
+            })
         
         # Sort by timestamp
         weather_df = weather_df.sort_values('timestamp').reset_index(drop=True)
@@ -20679,8 +20717,8 @@ def fetch_weather():
             if weather_data.get('temp_before') is None or weather_data.get('temp_after') is None:
                 logger.warning(f"⚠️ Weather data has null values - temp_before: {weather_data.get('temp_before')}, temp_after: {weather_data.get('temp_after')}")
                 logger.warning(f"Weather service response keys: {list(weather_data.keys())}")
-                logger.warning(f"Hourly data available: {len(weather_data.get('hourly_data', []))} points")
-                if weather_data.get('hourly_data'):
+                logger.warning(f"Hourly data available: {len(weather_data.get('hourly_data', []))} points (columnar: {bool(weather_data.get('hourly_columns'))})")
+                if weather_data.get('hourly_data') or weather_data.get('hourly_columns'):
                     logger.warning(f"Will attempt to calculate from hourly data as fallback")
             
             # Extract CSV timestamps and match with weather data
@@ -20697,9 +20735,16 @@ def fetch_weather():
                     logger.info(f"Extracted {len(after_csv_data['timestamps'])} timestamps from after CSV")
                     
                     # Get hourly weather data from response
+                    hourly_columns = weather_data.get("hourly_columns")
                     hourly_weather_data = weather_data.get("hourly_data", [])
                     
-                    if hourly_weather_data:
+                    if hourly_columns:
+                        # Columnar periods go to the matcher as-is ({"time": [...], "temp": [...], ...})
+                        before_hourly = hourly_columns.get("before") if (hourly_columns.get("before") or {}).get("time") else None
+                        after_hourly = hourly_columns.get("after") if (hourly_columns.get("after") or {}).get("time") else None
+                        logger.info(f"Before period hourly data: {len(before_hourly['time']) if before_hourly else 0} points (columnar)")
+                        logger.info(f"After period hourly data: {len(after_hourly['time']) if after_hourly else 0} points (columnar)")
+                    elif hourly_weather_data:
                         logger.info(f"Found {len(hourly_weather_data)} hourly weather data points")
                         
                         # Filter hourly data by period
@@ -20708,6 +20753,10 @@ def fetch_weather():
                         
                         logger.info(f"Before period hourly data: {len(before_hourly)} points")
                         logger.info(f"After period hourly data: {len(after_hourly)} points")
+                    else:
+                        before_hourly = after_hourly = None
+                    
+                    if before_hourly or after_hourly:
                         
                         # Match weather to CSV timestamps
                         # CRITICAL: Ensure ALL timestamps get weather data
@@ -20774,10 +20823,9 @@ def fetch_weather():
                     weather_data['dewpoint_after'] = sum(dewpoint_after) / len(dewpoint_after)
             
             # Fallback: If weather_data still has null values, try to calculate from hourly_data
-            if (weather_data.get('temp_before') is None or weather_data.get('temp_after') is None) and weather_data.get('hourly_data'):
-                hourly_data = weather_data.get('hourly_data', [])
-                before_hourly = [hw for hw in hourly_data if hw.get("period") == "before"]
-                after_hourly = [hw for hw in hourly_data if hw.get("period") == "after"]
+            if (weather_data.get('temp_before') is None or weather_data.get('temp_after') is None) and (weather_data.get('hourly_data') or weather_data.get('hourly_columns')):
+                before_hourly = _hourly_weather_records(weather_data, "before")
+                after_hourly = _hourly_weather_records(weather_data, "after")
                 
                 if before_hourly and weather_data.get('temp_before') is None:
                     before_temps = [h.get('temp') for h in before_hourly if h.get('temp') is not None]
@@ -25979,7 +26027,9 @@ def serve_template_report():
                 logger.info(f"🔧 CONFIG DEBUG: Line 21240 - combined_data.config keys: {list(combined_data.get('config', {}).keys())}")
                 logger.info(f"🔧 CONFIG DEBUG: Line 21241 - combined_data.client_profile keys: {list(combined_data.get('client_profile', {}).keys())}")
                 
-                response = requests.get("http://localhost:8084/generate", timeout=10)
+                response = requests.get(
+                    "http://localhost:8084/generate", params=_publish_report_snapshot(), timeout=10
+                )
                 if response.status_code == 200:
                     return Response(
                         response.text,
@@ -26020,7 +26070,9 @@ def serve_layman_report():
     """Serve the layman-friendly executive summary report"""
     try:
         # Forward request to 8084 service for layman report generation
-        response = requests.get("http://localhost:8084/generate-layman", timeout=30)
+        response = requests.get(
+            "http://localhost:8084/generate-layman", params=_publish_report_snapshot(), timeout=30
+        )
         if response.status_code == 200:
             html_content = response.text
             return Response(
@@ -26865,6 +26917,153 @@ def api_store_verification_code():
         return jsonify({"error": str(e)}), 500
 
 
+def _prepare_report_results():
+    """Latest analysis results with form data merged and annual kWh corrected (None if no analysis yet).
+
+    This is the data the 8084 HTML service renders, whether it arrives via
+    GET /api/analysis/results or as a report snapshot.
+    """
+    analysis_results = getattr(app, "_latest_analysis_results", None)
+    if not analysis_results:
+        return None
+
+    logger.info(
+        f"Retrieved analysis results with keys: {list(analysis_results.keys())}"
+    )
+    
+    # Log verification code if present
+    if 'verification_code' in analysis_results:
+        logger.info(f"API /analysis/results: verification_code={analysis_results.get('verification_code')}")
+    if 'config' in analysis_results and 'verification_code' in analysis_results.get('config', {}):
+        logger.info(f"API /analysis/results: config.verification_code={analysis_results['config'].get('verification_code')}")
+
+    # Include project data for Client HTML Report
+    if "client_profile" not in analysis_results:
+        analysis_results["client_profile"] = {}
+    if "config" not in analysis_results:
+        analysis_results["config"] = {}
+
+    # Add form data to the results for HTML service
+    form_data = getattr(app, "_latest_form_data", {})
+    if form_data:
+        # Add form data to config object for template processor
+        analysis_results["config"].update(form_data)
+        # Also add to client_profile for backward compatibility
+        analysis_results["client_profile"].update(form_data)
+        # Keep form data at top level too
+        analysis_results.update(form_data)
+
+    # RECALCULATE annual kWh using weather-normalized ONLY (fix for saved analyses)
+    # This ensures saved analyses with old PF-normalized values are corrected
+    # ALWAYS run recalculation when results are accessed
+    recalc_result = recalculate_annual_kwh_from_weather_normalized(analysis_results)
+    if recalc_result:
+        logger.info(f"✓ Recalculation completed in get_analysis_results")
+        logger.info(f"✓ energy.kwh = {analysis_results.get('energy', {}).get('kwh', 'NOT FOUND')} (for 'True kW/kWh Reduction')")
+        logger.info(f"✓ executive_summary.annual_kwh_savings = {analysis_results.get('executive_summary', {}).get('annual_kwh_savings', 'NOT FOUND')} (for 'Annual kWh Savings')")
+        logger.info(f"✓ financial_debug.delta_kwh_annual = {analysis_results.get('financial_debug', {}).get('delta_kwh_annual', 'NOT FOUND')} (for 'ΔkWh (annual)')")
+    else:
+        logger.warning("⚠ Recalculation returned False in get_analysis_results - values may not be corrected")
+        logger.warning(f"⚠ Current values: energy.kwh = {analysis_results.get('energy', {}).get('kwh', 'NOT FOUND')}")
+        logger.warning(f"⚠ Current values: executive_summary.annual_kwh_savings = {analysis_results.get('executive_summary', {}).get('annual_kwh_savings', 'NOT FOUND')}")
+    
+    # CRITICAL: Force sync executive_summary.annual_kwh_savings with financial_debug.delta_kwh_annual
+    # This ensures "Annual kWh Savings" always matches "ΔkWh (annual)" which is showing correctly
+    # Try multiple sources to get the correct value
+    financial_debug = analysis_results.get("financial_debug", {})
+    delta_kwh_annual = financial_debug.get("delta_kwh_annual")
+    
+    # Fallback to energy.total_kwh if delta_kwh_annual not available
+    if delta_kwh_annual is None:
+        energy_data = analysis_results.get("energy", {})
+        delta_kwh_annual = energy_data.get("total_kwh")
+        logger.info(f"🔧 FORCED SYNC: Using energy.total_kwh as fallback: {delta_kwh_annual}")
+    
+    # Fallback to bill_weighted.delta_kwh_annual if still not available
+    if delta_kwh_annual is None:
+        bill_weighted = analysis_results.get("bill_weighted", {})
+        delta_kwh_annual = bill_weighted.get("delta_kwh_annual")
+        logger.info(f"🔧 FORCED SYNC: Using bill_weighted.delta_kwh_annual as fallback: {delta_kwh_annual}")
+    
+    if delta_kwh_annual is not None:
+        # Ensure executive_summary exists
+        if "executive_summary" not in analysis_results:
+            analysis_results["executive_summary"] = {}
+        old_exec_kwh = analysis_results["executive_summary"].get("annual_kwh_savings")
+        # ALWAYS update, even if values appear to match (handles type mismatches)
+        analysis_results["executive_summary"]["annual_kwh_savings"] = float(delta_kwh_annual)
+        logger.info(f"🔧 FORCED SYNC: executive_summary.annual_kwh_savings = {old_exec_kwh} -> {delta_kwh_annual} (synced)")
+        logger.info(f"🔧 VERIFIED: executive_summary.annual_kwh_savings = {analysis_results['executive_summary'].get('annual_kwh_savings')}")
+    else:
+        logger.error(f"❌ FORCED SYNC FAILED: Could not find delta_kwh_annual in any source!")
+        logger.error(f"❌ financial_debug keys: {list(financial_debug.keys()) if financial_debug else 'None'}")
+        logger.error(f"❌ energy keys: {list(analysis_results.get('energy', {}).keys())}")
+        logger.error(f"❌ bill_weighted keys: {list(analysis_results.get('bill_weighted', {}).keys())}")
+
+    # Debug: Check what data is available
+    print(f"DEBUG: Analysis results keys: {list(analysis_results.keys())}")
+    print(f"DEBUG: Config keys: {list(analysis_results.get('config', {}).keys())}")
+    print(
+        f"DEBUG: Client profile keys: {list(analysis_results.get('client_profile', {}).keys())}"
+    )
+    print(
+        f"DEBUG: Form data keys: {list(form_data.keys()) if form_data else 'No form data'}"
+    )
+
+    # CRITICAL FINAL CHECK: Ensure executive_summary.annual_kwh_savings is correct before returning
+    # This is the last chance to fix it before the UI displays it
+    financial_debug_final = analysis_results.get("financial_debug", {})
+    delta_kwh_final = financial_debug_final.get("delta_kwh_annual")
+    logger.info(f"🔧 FINAL CHECK START: financial_debug = {financial_debug_final is not None}, delta_kwh_final = {delta_kwh_final}")
+    
+    if delta_kwh_final is not None:
+        if "executive_summary" not in analysis_results:
+            analysis_results["executive_summary"] = {}
+            logger.info(f"🔧 Created executive_summary for final check")
+        current_value = analysis_results["executive_summary"].get("annual_kwh_savings")
+        logger.info(f"🔧 FINAL CHECK: current_value = {current_value}, delta_kwh_final = {delta_kwh_final}")
+        # ALWAYS update, even if values appear to match (handles type mismatches and ensures correctness)
+        analysis_results["executive_summary"]["annual_kwh_savings"] = float(delta_kwh_final)
+        logger.info(f"🔧 FINAL FIX: Updated executive_summary.annual_kwh_savings = {current_value} -> {delta_kwh_final} (right before returning to UI)")
+        logger.info(f"🔧 FINAL CHECK VERIFIED: executive_summary.annual_kwh_savings = {analysis_results['executive_summary'].get('annual_kwh_savings')} (for Main Results Summary)")
+    else:
+        logger.error(f"❌ FINAL CHECK FAILED: delta_kwh_annual is None - cannot fix executive_summary.annual_kwh_savings")
+        logger.error(f"❌ financial_debug_final keys: {list(financial_debug_final.keys()) if financial_debug_final else 'None'}")
+        # Try to get from energy.total_kwh as last resort
+        energy_final = analysis_results.get("energy", {})
+        total_kwh_final = energy_final.get("total_kwh")
+        if total_kwh_final is not None:
+            if "executive_summary" not in analysis_results:
+                analysis_results["executive_summary"] = {}
+            analysis_results["executive_summary"]["annual_kwh_savings"] = float(total_kwh_final)
+            logger.info(f"🔧 FINAL FIX (fallback): Updated executive_summary.annual_kwh_savings = {analysis_results['executive_summary'].get('annual_kwh_savings', 'OLD')} -> {total_kwh_final} (using energy.total_kwh)")
+    return analysis_results
+
+
+def _publish_report_snapshot():
+    """Publish the current report data for 8084; returns request params naming the snapshot ({} on failure)"""
+    try:
+        analysis_results = _prepare_report_results()
+        if not analysis_results:
+            return {}
+        session_id, version = report_snapshots.publish(analysis_results)
+        logger.info(f"Published report snapshot {session_id} v{version}")
+        return {"analysis_session_id": session_id, "version": version}
+    except Exception as e:
+        logger.warning(f"Could not publish report snapshot, 8084 will pull results over HTTP: {e}")
+        return {}
+
+
+@app.route("/api/analysis/snapshot", methods=["POST"])
+@api_guard
+def publish_analysis_snapshot():
+    """Publish the latest analysis results to the report snapshot store (used by the 8084 HTML service)"""
+    params = _publish_report_snapshot()
+    if not params:
+        return jsonify({"error": "No analysis results available", "message": "Please run an analysis first"}), 404
+    return jsonify(params)
+
+
 @app.route("/api/analysis/results", methods=["GET", "POST"])
 @api_guard
 def get_analysis_results():
@@ -26910,7 +27109,7 @@ def get_analysis_results():
                 return jsonify({"success": True, "message": "Results updated"}), 200
         
         # GET handler: Get the latest analysis results from session
-        analysis_results = getattr(app, "_latest_analysis_results", None)
+        analysis_results = _prepare_report_results()
 
         if not analysis_results:
             return (
@@ -26923,117 +27122,6 @@ def get_analysis_results():
                 404,
             )
 
-        logger.info(
-            f"Retrieved analysis results with keys: {list(analysis_results.keys())}"
-        )
-        
-        # Log verification code if present
-        if 'verification_code' in analysis_results:
-            logger.info(f"API /analysis/results: verification_code={analysis_results.get('verification_code')}")
-        if 'config' in analysis_results and 'verification_code' in analysis_results.get('config', {}):
-            logger.info(f"API /analysis/results: config.verification_code={analysis_results['config'].get('verification_code')}")
-
-        # Include project data for Client HTML Report
-        if "client_profile" not in analysis_results:
-            analysis_results["client_profile"] = {}
-        if "config" not in analysis_results:
-            analysis_results["config"] = {}
-
-        # Add form data to the results for HTML service
-        form_data = getattr(app, "_latest_form_data", {})
-        if form_data:
-            # Add form data to config object for template processor
-            analysis_results["config"].update(form_data)
-            # Also add to client_profile for backward compatibility
-            analysis_results["client_profile"].update(form_data)
-            # Keep form data at top level too
-            analysis_results.update(form_data)
-
-        # RECALCULATE annual kWh using weather-normalized ONLY (fix for saved analyses)
-        # This ensures saved analyses with old PF-normalized values are corrected
-        # ALWAYS run recalculation when results are accessed
-        recalc_result = recalculate_annual_kwh_from_weather_normalized(analysis_results)
-        if recalc_result:
-            logger.info(f"✓ Recalculation completed in get_analysis_results")
-            logger.info(f"✓ energy.kwh = {analysis_results.get('energy', {}).get('kwh', 'NOT FOUND')} (for 'True kW/kWh Reduction')")
-            logger.info(f"✓ executive_summary.annual_kwh_savings = {analysis_results.get('executive_summary', {}).get('annual_kwh_savings', 'NOT FOUND')} (for 'Annual kWh Savings')")
-            logger.info(f"✓ financial_debug.delta_kwh_annual = {analysis_results.get('financial_debug', {}).get('delta_kwh_annual', 'NOT FOUND')} (for 'ΔkWh (annual)')")
-        else:
-            logger.warning("⚠ Recalculation returned False in get_analysis_results - values may not be corrected")
-            logger.warning(f"⚠ Current values: energy.kwh = {analysis_results.get('energy', {}).get('kwh', 'NOT FOUND')}")
-            logger.warning(f"⚠ Current values: executive_summary.annual_kwh_savings = {analysis_results.get('executive_summary', {}).get('annual_kwh_savings', 'NOT FOUND')}")
-        
-        # CRITICAL: Force sync executive_summary.annual_kwh_savings with financial_debug.delta_kwh_annual
-        # This ensures "Annual kWh Savings" always matches "ΔkWh (annual)" which is showing correctly
-        # Try multiple sources to get the correct value
-        financial_debug = analysis_results.get("financial_debug", {})
-        delta_kwh_annual = financial_debug.get("delta_kwh_annual")
-        
-        # Fallback to energy.total_kwh if delta_kwh_annual not available
-        if delta_kwh_annual is None:
-            energy_data = analysis_results.get("energy", {})
-            delta_kwh_annual = energy_data.get("total_kwh")
-            logger.info(f"🔧 FORCED SYNC: Using energy.total_kwh as fallback: {delta_kwh_annual}")
-        
-        # Fallback to bill_weighted.delta_kwh_annual if still not available
-        if delta_kwh_annual is None:
-            bill_weighted = analysis_results.get("bill_weighted", {})
-            delta_kwh_annual = bill_weighted.get("delta_kwh_annual")
-            logger.info(f"🔧 FORCED SYNC: Using bill_weighted.delta_kwh_annual as fallback: {delta_kwh_annual}")
-        
-        if delta_kwh_annual is not None:
-            # Ensure executive_summary exists
-            if "executive_summary" not in analysis_results:
-                analysis_results["executive_summary"] = {}
-            old_exec_kwh = analysis_results["executive_summary"].get("annual_kwh_savings")
-            # ALWAYS update, even if values appear to match (handles type mismatches)
-            analysis_results["executive_summary"]["annual_kwh_savings"] = float(delta_kwh_annual)
-            logger.info(f"🔧 FORCED SYNC: executive_summary.annual_kwh_savings = {old_exec_kwh} -> {delta_kwh_annual} (synced)")
-            logger.info(f"🔧 VERIFIED: executive_summary.annual_kwh_savings = {analysis_results['executive_summary'].get('annual_kwh_savings')}")
-        else:
-            logger.error(f"❌ FORCED SYNC FAILED: Could not find delta_kwh_annual in any source!")
-            logger.error(f"❌ financial_debug keys: {list(financial_debug.keys()) if financial_debug else 'None'}")
-            logger.error(f"❌ energy keys: {list(analysis_results.get('energy', {}).keys())}")
-            logger.error(f"❌ bill_weighted keys: {list(analysis_results.get('bill_weighted', {}).keys())}")
-
-        # Debug: Check what data is available
-        print(f"DEBUG: Analysis results keys: {list(analysis_results.keys())}")
-        print(f"DEBUG: Config keys: {list(analysis_results.get('config', {}).keys())}")
-        print(
-            f"DEBUG: Client profile keys: {list(analysis_results.get('client_profile', {}).keys())}"
-        )
-        print(
-            f"DEBUG: Form data keys: {list(form_data.keys()) if form_data else 'No form data'}"
-        )
-
-        # CRITICAL FINAL CHECK: Ensure executive_summary.annual_kwh_savings is correct before returning
-        # This is the last chance to fix it before the UI displays it
-        financial_debug_final = analysis_results.get("financial_debug", {})
-        delta_kwh_final = financial_debug_final.get("delta_kwh_annual")
-        logger.info(f"🔧 FINAL CHECK START: financial_debug = {financial_debug_final is not None}, delta_kwh_final = {delta_kwh_final}")
-        
-        if delta_kwh_final is not None:
-            if "executive_summary" not in analysis_results:
-                analysis_results["executive_summary"] = {}
-                logger.info(f"🔧 Created executive_summary for final check")
-            current_value = analysis_results["executive_summary"].get("annual_kwh_savings")
-            logger.info(f"🔧 FINAL CHECK: current_value = {current_value}, delta_kwh_final = {delta_kwh_final}")
-            # ALWAYS update, even if values appear to match (handles type mismatches and ensures correctness)
-            analysis_results["executive_summary"]["annual_kwh_savings"] = float(delta_kwh_final)
-            logger.info(f"🔧 FINAL FIX: Updated executive_summary.annual_kwh_savings = {current_value} -> {delta_kwh_final} (right before returning to UI)")
-            logger.info(f"🔧 FINAL CHECK VERIFIED: executive_summary.annual_kwh_savings = {analysis_results['executive_summary'].get('annual_kwh_savings')} (for Main Results Summary)")
-        else:
-            logger.error(f"❌ FINAL CHECK FAILED: delta_kwh_annual is None - cannot fix executive_summary.annual_kwh_savings")
-            logger.error(f"❌ financial_debug_final keys: {list(financial_debug_final.keys()) if financial_debug_final else 'None'}")
-            # Try to get from energy.total_kwh as last resort
-            energy_final = analysis_results.get("energy", {})
-            total_kwh_final = energy_final.get("total_kwh")
-            if total_kwh_final is not None:
-                if "executive_summary" not in analysis_results:
-                    analysis_results["executive_summary"] = {}
-                analysis_results["executive_summary"]["annual_kwh_savings"] = float(total_kwh_final)
-                logger.info(f"🔧 FINAL FIX (fallback): Updated executive_summary.annual_kwh_savings = {analysis_results['executive_summary'].get('annual_kwh_savings', 'OLD')} -> {total_kwh_final} (using energy.total_kwh)")
-
         return jsonify({"results": analysis_results})
 
     except Exception as e:
@@ -27042,7 +27130,9 @@ def get_analysis_results():
 
 
 @app.route("/api/analyze", methods=["POST"])
+@job_queue.deferrable("analysis")
 @api_guard
+@audit_batched
 def analyze():
     """
     Analyze uploaded 'before' and 'after' meter files and return a comprehensive JSON result.
@@ -27706,8 +27796,10 @@ def analyze():
         logger.info("*** ABOUT TO CALL perform_comprehensive_analysis ***")
         print("*** ABOUT TO CALL perform_comprehensive_analysis ***")
         print("*** STEP 3: CALLING perform_comprehensive_analysis - DEBUG V2.1 ***")
+        job_checkpoint(0.2, "Running analysis")
         results = perform_comprehensive_analysis(before_data, after_data, cfg)
         print("*** STEP 3 COMPLETE: perform_comprehensive_analysis returned ***")
+        job_checkpoint(0.8, "Assembling results")
 
         # 3.5) Add additional envelope analysis data (charts, etc.) if needed
         if (
@@ -28822,6 +28914,7 @@ def _generate_report_from_data(data):
 
 
 @app.route("/api/generate-audit-package", methods=["POST"])
+@job_queue.deferrable("audit_package")
 def generate_audit_package():
     """
     Generate a comprehensive audit package as a ZIP file containing:
@@ -28891,10 +28984,12 @@ def generate_audit_package():
 
         logger.info(f"AUDIT PACKAGE - Creating comprehensive ZIP file: {zip_filename}")
 
-        with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
+        # Already-compressed members (PNG, XLSX, ...) are stored as-is; everything else is deflated
+        with PackageZipFile(zip_path, "w") as zipf:
 
             # ===== CORE AUDIT DOCUMENTS =====
 
+            job_checkpoint(0.05, "Adding audit trail")
             # 1. Add audit trail (JSON) - query database if available
             analysis_session_id = data.get("analysis_session_id")
             audit_trail_data = data.get("audit_trail", {})
@@ -29038,6 +29133,7 @@ def generate_audit_package():
                     zipf.write(summary_file, "03_audit_compliance_summary.md")
                     logger.info("AUDIT PACKAGE - Added 03_audit_compliance_summary.md (fallback)")
 
+            job_checkpoint(0.15, "Adding analysis results")
             # 4. Add complete analysis results
             # Enrich analysis results data with real values from all sources
             enriched_analysis_data = data.copy()
@@ -29069,6 +29165,7 @@ def generate_audit_package():
 
             # ===== DETAILED CALCULATION METHODOLOGIES =====
 
+            job_checkpoint(0.2, "Adding methodology documents")
             # 5. Add detailed calculation methodologies document (PDF)
             calc_methodologies = generate_calculation_methodologies_document(data, facility_type=facility_type)
             try:
@@ -29121,6 +29218,7 @@ def generate_audit_package():
                 zipf.write(standards_file, "06_standards_compliance_documentation.md")
                 logger.info("AUDIT PACKAGE - Added 06_standards_compliance_documentation.md (fallback)")
             
+            job_checkpoint(0.25, "Adding standards compliance reports")
             # 6a. Add individual Standards Compliance Reports (like utility package)
             try:
                 logger.info("AUDIT PACKAGE - Generating individual Standards Compliance Reports")
@@ -29437,6 +29535,7 @@ Meets IPMVP Volume I requirements for statistical significance testing.
 
             # ===== DATA VALIDATION AND QUALITY ASSURANCE =====
 
+            job_checkpoint(0.35, "Adding validation and QA documents")
             # 7. Add data validation report (PDF)
             validation_report = generate_data_validation_report(data, facility_type=facility_type)
             try:
@@ -29545,6 +29644,7 @@ Meets IPMVP Volume I requirements for statistical significance testing.
 
             # ===== EXECUTIVE SUMMARY AND FINANCIAL ANALYSIS =====
             
+            job_checkpoint(0.4, "Adding executive summary")
             # 10a. Add Executive Summary (like utility package)
             try:
                 logger.info("AUDIT PACKAGE - Generating Executive Summary")
@@ -29651,6 +29751,7 @@ All calculations are traceable to source data with complete audit trail.
             except Exception as e:
                 logger.warning(f"AUDIT PACKAGE - Could not generate Executive Summary: {e}")
             
+            job_checkpoint(0.45, "Adding financial analysis")
             # 10b. Add Financial Analysis Report (like utility package)
             try:
                 logger.info("AUDIT PACKAGE - Generating Financial Analysis Report")
@@ -29941,6 +30042,7 @@ Values extracted from: financial, executive_summary, statistical, after_complian
 
             # ===== SOURCE DATA AND REPORTS =====
 
+            job_checkpoint(0.5, "Adding source data files")
             # 11. Add source data files with database retrieval (like utility package)
             source_data_dir = os.path.join(temp_dir, "11_Source_Data_Files")
             os.makedirs(source_data_dir, exist_ok=True)
@@ -30409,6 +30511,7 @@ Values extracted from: financial, executive_summary, statistical, after_complian
             elif files_added_count > 0:
                 logger.info(f"AUDIT PACKAGE - Successfully added {files_added_count} source data file(s) to package")
 
+            job_checkpoint(0.6, "Adding HTML report")
             # 12. Add generated HTML report (generate if not provided)
             html_report_content = None
             html_report_path = None
@@ -30507,6 +30610,7 @@ Values extracted from: financial, executive_summary, statistical, after_complian
             elif not html_report_path and not html_report_content:
                 logger.warning("AUDIT PACKAGE - Could not generate HTML report, but continuing with package creation")
 
+            job_checkpoint(0.65, "Adding weather normalization report")
             # 12a. Add Weather Normalization Report (like utility package)
             try:
                 logger.info("AUDIT PACKAGE - Generating Weather Normalization Report")
@@ -31124,6 +31228,7 @@ ISO 50015:2014 - Energy Savings Determination
             except Exception as e:
                 logger.warning(f"AUDIT PACKAGE - Could not generate Weather Normalization Report: {e}")
             
+            job_checkpoint(0.7, "Adding verification certificate")
             # 12c. Add Verification Certificate (like utility package)
             try:
                 logger.info("AUDIT PACKAGE - Generating Verification Certificate")
@@ -31433,6 +31538,7 @@ calculations, and compliance status without requiring system access.
             except Exception as e:
                 logger.warning(f"AUDIT PACKAGE - Could not generate Verification Certificate: {e}")
             
+            job_checkpoint(0.75, "Adding project documents")
             # 12d. Add Project Information document (like utility package)
             try:
                 logger.info("AUDIT PACKAGE - Generating Project Information document")
@@ -32016,6 +32122,7 @@ contains comprehensive documentation of all features, workflows, and procedures.
                 # Don't raise - allow audit package to continue without User Guide
                 logger.warning("AUDIT PACKAGE - Continuing without User Guide PDF")
 
+            job_checkpoint(0.8, "Adding calculation workbook")
             # 13. Add Excel calculation audit file
             try:
                 logger.info("AUDIT PACKAGE - Generating Excel calculation audit file")
@@ -32101,6 +32208,7 @@ contains comprehensive documentation of all features, workflows, and procedures.
                     "AUDIT PACKAGE - Added 13_calculation_audit_error.txt (Excel generation failed)"
                 )
 
+            job_checkpoint(0.85, "Adding standards compliance analysis")
             # 14. Add SYNEREX Standards Compliance Analysis
             try:
                 logger.info(
@@ -32454,6 +32562,7 @@ Project: {project_name}
                     "AUDIT PACKAGE - Added 14_compliance_analysis_error.txt (standards compliance analysis failed)"
                 )
 
+            job_checkpoint(0.9, "Adding system documentation")
             # 15. Add system architectural overview (PDF)
             try:
                 logger.info("AUDIT PACKAGE - Adding system architectural overview")
@@ -32784,6 +32893,7 @@ Project: {project_name}
 
             # ===== COMPREHENSIVE AUDIT PACKAGE MANIFEST =====
 
+            job_checkpoint(0.95, "Writing package manifest")
             # 14. Add comprehensive audit package manifest
             manifest = {
                 "package_info": {
@@ -32960,9 +33070,7 @@ Project: {project_name}
                         file_size = os.path.getsize(pdf_path) if os.path.exists(pdf_path) else 0
                         logger.info(f"  {i}. {pdf_name} ({file_size:,} bytes)")
                     
-                    merged_pdf_path = os.path.join(temp_dir, "00_COMPLETE_AUDIT_PACKAGE.pdf")
-                    logger.info(f"AUDIT PACKAGE - Merging PDFs into: 00_COMPLETE_AUDIT_PACKAGE.pdf")
-                    logger.info(f"AUDIT PACKAGE - Output path: {merged_pdf_path}")
+                    logger.info(f"AUDIT PACKAGE - Merging PDFs straight into ZIP member: 00_COMPLETE_AUDIT_PACKAGE.pdf")
                     
                     # Extract cover page data from data and client_info
                     facility_address = str(client_info.get('facility_address', ''))
@@ -32984,15 +33092,15 @@ Project: {project_name}
                     
                     logger.info(f"AUDIT PACKAGE - Cover page data: Project={cover_data['project_number']}, Location={cover_data['project_location']}, Client={cover_data['prepared_for']}")
                     
-                    if merge_pdfs(pdf_files_to_merge, merged_pdf_path, document_name="Complete Audit Package", cover_data=cover_data):
-                        if os.path.exists(merged_pdf_path):
-                            merged_size = os.path.getsize(merged_pdf_path)
-                            logger.info(f"AUDIT PACKAGE - Merged PDF created successfully: {merged_size:,} bytes")
-                            zipf.write(merged_pdf_path, "00_COMPLETE_AUDIT_PACKAGE.pdf")
-                            logger.info(f"AUDIT PACKAGE - Successfully added merged PDF to ZIP: 00_COMPLETE_AUDIT_PACKAGE.pdf ({merged_size:,} bytes, {len(pdf_files_to_merge)} documents)")
-                        else:
-                            logger.error(f"AUDIT PACKAGE - CRITICAL: Merged PDF file was not created despite merge_pdfs returning True")
-                            logger.error(f"AUDIT PACKAGE - Expected path: {merged_pdf_path}")
+                    merged = merge_pdfs(
+                        pdf_files_to_merge,
+                        lambda: zipf.open_member("00_COMPLETE_AUDIT_PACKAGE.pdf"),
+                        document_name="Complete Audit Package",
+                        cover_data=cover_data,
+                    )
+                    if merged:
+                        merged_size = zipf.getinfo("00_COMPLETE_AUDIT_PACKAGE.pdf").file_size
+                        logger.info(f"AUDIT PACKAGE - Successfully added merged PDF to ZIP: 00_COMPLETE_AUDIT_PACKAGE.pdf ({merged_size:,} bytes, {len(pdf_files_to_merge)} documents)")
                     else:
                         logger.error("AUDIT PACKAGE - CRITICAL: merge_pdfs returned False - merge failed!")
                 else:
@@ -33071,6 +33179,10 @@ Project: {project_name}
                 logger.error(f"AUDIT PACKAGE - Alternative send method also failed: {alt_error}")
                 raise
 
+    except JobCancelled:
+        if 'temp_dir' in locals() and temp_dir:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
     except Exception as e:
         logger.error(
             f"AUDIT PACKAGE - Error generating comprehensive audit package: {str(e)}"
@@ -33096,6 +33208,7 @@ Project: {project_name}
 
 
 @app.route("/api/generate-utility-submission-package", methods=["POST"])
+@job_queue.deferrable("utility_submission_package")
 @api_guard
 def generate_utility_submission_package_endpoint():
     """Generate comprehensive Utility Submission Package"""
@@ -41672,8 +41785,12 @@ def get_projects():
                     p.created_at, 
                     p.updated_at,
                     COALESCE(f.feeder_count, 0) as feeder_count,
-                    COALESCE(t.transformer_count, 0) as transformer_count
+                    COALESCE(t.transformer_count, 0) as transformer_count,
+                    s.company,
+                    s.location,
+                    COALESCE(s.field_count, 0) as field_count
                 FROM projects p
+                LEFT JOIN project_summaries s ON s.project_id = p.id
                 LEFT JOIN (
                     SELECT project_id, COUNT(*) as feeder_count
                     FROM feeders_data
@@ -41794,47 +41911,18 @@ def projects_load():
                         # Get the name from the project record
                         name = project.get('name', name)
                         
-                        # Get project data from the 'data' column
-                        project_data_raw = project.get('data')
-                        if project_data_raw:
-                            try:
-                                data = json.loads(project_data_raw)
-                                # Handle nested payload structure - if data has a 'payload' key that's a JSON string, parse it
-                                if (
-                                    isinstance(data, dict)
-                                    and "payload" in data
-                                    and isinstance(data["payload"], str)
-                                ):
-                                    try:
-                                        # Parse the inner JSON string
-                                        inner_data = json.loads(data["payload"])
-                                        data = inner_data
-                                        logger.info(
-                                            f"Extracted nested payload data for project '{name}'"
-                                        )
-                                    except (json.JSONDecodeError, TypeError) as e:
-                                        logger.warning(
-                                            f"Failed to parse nested payload for '{name}': {e}, using outer data"
-                                        )
-                                elif (
-                                    isinstance(data, dict)
-                                    and "payload" in data
-                                    and isinstance(data["payload"], dict)
-                                ):
-                                    # If payload is already a dict, use it directly
-                                    data = data["payload"]
-                                    logger.info(
-                                        f"Used payload dict data for project '{name}'"
-                                    )
-                            except (json.JSONDecodeError, TypeError) as e:
-                                logger.error(
-                                    f"Failed to parse project data for '{name}': {e}"
-                                )
-                                return (
-                                    jsonify({"error": "Invalid project data format"}),
-                                    500,
-                                )
-
+                        # Get project data (field/blob tables, or the legacy 'data' column)
+                        try:
+                            data = project_store.read_fields(conn, project)
+                        except (ValueError, TypeError) as e:
+                            logger.error(
+                                f"Failed to parse project data for '{name}': {e}"
+                            )
+                            return (
+                                jsonify({"error": "Invalid project data format"}),
+                                500,
+                            )
+                        if data:
                             # Fix character encoding issues in project data
                             def fix_character_encoding(text):
                                 if not isinstance(text, str):
@@ -41959,7 +42047,7 @@ def projects_load():
                                     "id": project.get('id'),
                                     "name": project.get('name'),
                                     "description": project.get('description'),
-                                    "data": json.dumps({"payload": json.dumps(data)})
+                                    "data": project_store.legacy_data(data)
                                 }
                             })
                         else:
@@ -42133,6 +42221,7 @@ def create_project():
             )
 
             project_id = cursor.lastrowid
+            project_index.upsert(conn, project_id, name, {})
             conn.commit()
 
             return (
@@ -42303,42 +42392,41 @@ def projects_save():
 
                         if not project_row:
                             # Create new project if it doesn't exist
-                            data_json = json.dumps({"payload": payload_str if payload_str else json.dumps(project_data)})
                             cursor.execute(
                                 """
-                                INSERT INTO projects (name, description, data, created_at, updated_at)
-                                VALUES (?, ?, ?, datetime('now'), datetime('now'))
+                                INSERT INTO projects (name, description, created_at, updated_at)
+                                VALUES (?, ?, datetime('now'), datetime('now'))
                             """,
-                                (name, "", data_json),
-                        )
-                        conn.commit()
-                        new_project_id = cursor.lastrowid
-                        logger.info(f"✅ Created new project '{name}' (ID: {new_project_id}) with {len(project_data)} fields")
-                        return jsonify({
-                                "ok": True,
-                                "method": "database",
-                                "field_count": len(project_data),
-                                "project_id": new_project_id,
-                            })
-                    else:
-                        # Update existing project
-                            project_id_to_update = project_row[0]
-                            actual_name = project_row[1]
-                            data_json = json.dumps({"payload": payload_str if payload_str else json.dumps(project_data)})
+                                (name, ""),
+                            )
+                            saved_project_id = cursor.lastrowid
+                            saved_name = name
+                        else:
+                            # Update existing project
+                            saved_project_id = project_row[0]
+                            saved_name = project_row[1]
                             cursor.execute(
                                 """
-                                UPDATE projects SET data = ?, updated_at = datetime('now') WHERE id = ?
+                                UPDATE projects SET updated_at = datetime('now') WHERE id = ?
                             """,
-                                (data_json, project_id_to_update),
+                                (saved_project_id,),
                             )
-                            conn.commit()
-                            logger.info(f"✅ Updated project '{actual_name}' (ID: {project_id_to_update}) with {len(project_data)} fields")
-                            return jsonify({
-                                "ok": True,
-                                "method": "database",
-                                "field_count": len(project_data),
-                                "project_id": project_id_to_update,
-                            })
+
+                        # Only fields whose value changed are rewritten; the search index / list
+                        # summary is kept in step in the same transaction
+                        stats = project_store.save(conn, saved_project_id, project_data)
+                        project_index.upsert(conn, saved_project_id, saved_name, project_data, stats["size"])
+                        conn.commit()
+                        logger.info(
+                            f"✅ Saved project '{saved_name}' (ID: {saved_project_id}) with {len(project_data)} fields "
+                            f"({stats['written']} written, {stats['deleted']} removed)"
+                        )
+                        return jsonify({
+                            "ok": True,
+                            "method": "database",
+                            "field_count": len(project_data),
+                            "project_id": saved_project_id,
+                        })
             except Exception as db_error:
                 logger.warning(
                     f"Database save failed, falling back to JSON: {db_error}"
@@ -42510,7 +42598,7 @@ def get_project_data(project_id):
 
             return jsonify(
                 {
-                    "project": dict(project),
+                    "project": project_store.legacy_row(conn, project),
                     "transformers": [dict(t) for t in transformers],
                     "feeders": [dict(f) for f in feeders],
                     "access_tracked": True,
@@ -43219,6 +43307,10 @@ def validate_user_session(session_token):
         logger.info("No session token provided")
         return None
 
+    cached = session_cache.get(session_token, scope="default")
+    if cached is not None:
+        return dict(cached["user"])
+
     with get_db_connection() as conn:
         if conn is None:
             logger.info("Database connection failed")
@@ -43229,7 +43321,7 @@ def validate_user_session(session_token):
         # Find valid session
         cursor.execute(
             """
-            SELECT u.id, u.full_name, u.email, u.username, u.role, u.pe_license_number, u.state
+            SELECT u.id, u.full_name, u.email, u.username, u.role, u.pe_license_number, u.state, s.expires_at
             FROM user_sessions s
             JOIN users u ON s.user_id = u.id
             WHERE s.session_token = ? AND s.expires_at > datetime('now')
@@ -43243,7 +43335,7 @@ def validate_user_session(session_token):
             return None
 
         logger.info(f"Valid session found for user: {user[3]}")
-        return {
+        user_data = {
             "id": user[0],
             "full_name": user[1],
             "email": user[2],
@@ -43252,6 +43344,10 @@ def validate_user_session(session_token):
             "pe_license_number": user[5],
             "state": user[6],
         }
+        session_cache.put(
+            session_token, {"user_id": user[0], "org_id": None, "expires_at": user[7], "user": user_data}, scope="default"
+        )
+        return dict(user_data)
 
 
 @app.route("/api/auth/validate-session", methods=["POST"])
@@ -43569,6 +43665,74 @@ def csv_editor_guide_html():
         return f"<h1>Error loading guide: {str(e)}</h1>", 500
 
 
+@job_queue.handler("raw_meter_profile", resumable=True)
+def profile_raw_meter_file(job, file_id, file_path):
+    """Background part of an upload: column detection and statistics for the stored CSV"""
+    profile = upload_pipeline.profile_csv(
+        file_path, EnhancedDataProcessor().column_patterns, progress=job.progress
+    )
+    profile["file_id"] = file_id
+    return profile
+
+
+@app.route("/api/jobs", methods=["GET"])
+def list_jobs():
+    """Recent background jobs"""
+    limit = min(request.args.get("limit", 50, type=int), 200)
+    return jsonify({"status": "success", "jobs": job_queue.list(all_orgs=True, limit=limit)})
+
+
+def _visible_job(job_id):
+    """The job, if the caller may see it"""
+    job = job_queue.get(job_id)
+    if job is None:
+        return None
+    return job
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def get_job_status(job_id):
+    """Status and progress of a background job (the result once it has finished)"""
+    job = _visible_job(job_id)
+    if job is None:
+        return jsonify({"status": "error", "error": "Job not found"}), 404
+    return jsonify({"status": "success", "job": job})
+
+
+@app.route("/api/jobs/<job_id>/cancel", methods=["POST"])
+def cancel_job(job_id):
+    """Cancel a queued job; a running one stops at its next checkpoint"""
+    if _visible_job(job_id) is None:
+        return jsonify({"status": "error", "error": "Job not found"}), 404
+    return jsonify({"status": "success", "job": job_queue.cancel(job_id)})
+
+
+@app.route("/api/jobs/<job_id>/result", methods=["GET"])
+def get_job_result(job_id):
+    """
+    Result of a finished job: for a deferred request, the response the
+    endpoint produced (same status, type and body as a synchronous call)
+    """
+    job = _visible_job(job_id)
+    if job is None:
+        return jsonify({"status": "error", "error": "Job not found"}), 404
+    result = job["result"]
+    if result is None:
+        if job["status"] == "failed":
+            return jsonify({"status": "error", "error": job["error"] or "Job failed"}), 500
+        return jsonify({"status": "error", "error": f"Job is {job['status']}", "job": job}), 409
+    response_path = job_queue.file_path(job_id, "response.body")
+    if "status_code" not in result or not os.path.exists(response_path):
+        return jsonify({"status": "success", "result": result})
+    response = send_file(response_path, mimetype=result["content_type"])
+    response.status_code = result["status_code"]
+    if result.get("content_disposition"):
+        response.headers["Content-Disposition"] = result["content_disposition"]
+    else:
+        response.headers.pop("Content-Disposition", None)
+    return response
+
+
 @app.route("/api/raw-meter-data/upload", methods=["POST"])
 def upload_raw_meter_data():
     """Upload raw meter data CSV files"""
@@ -43614,15 +43778,15 @@ def upload_raw_meter_data():
             filename = f"{today}_{clean_filename}"
             file_path = os.path.join(raw_data_dir, filename)
 
-            # Save file
-            file.save(file_path)
-            file_size = os.path.getsize(file_path)
-
-            # Create fingerprint for integrity
+            # Stream to disk, fingerprinting on the way (no second read of the file)
             csv_integrity = CSVIntegrityProtection()
-            with open(file_path, "r", encoding="utf-8") as f:
-                file_content = f.read()
-            fingerprint_data = csv_integrity.create_content_fingerprint(file_content)
+            spooled = upload_pipeline.spool_upload(
+                file.stream, file_path, csv_integrity.secret_key
+            )
+            file_size = spooled["size"]
+            fingerprint_data = csv_integrity.record_fingerprint(
+                spooled["content_hash"], spooled["hmac_signature"], spooled["metadata"]
+            )
             fingerprint = fingerprint_data["content_hash"]  # Store just the hash string
 
             # Store file metadata in database
@@ -43647,16 +43811,24 @@ def upload_raw_meter_data():
                 file_id = cursor.lastrowid
                 conn.commit()
 
-                logger.info(f"Raw meter data uploaded: {file.filename} (ID: {file_id})")
+            logger.info(f"Raw meter data uploaded: {file.filename} (ID: {file_id})")
 
-                uploaded_files.append(
-                    {
-                        "file_id": file_id,
-                        "filename": file.filename,
-                        "size": file_size,
-                        "fingerprint": fingerprint,
-                    }
-                )
+            # Column detection and statistics run in the background; poll /api/jobs/<id>
+            profile_job_id = job_queue.submit(
+                "raw_meter_profile",
+                {"file_id": file_id, "file_path": file_path},
+                org_id=None,
+            )
+
+            uploaded_files.append(
+                {
+                    "file_id": file_id,
+                    "filename": file.filename,
+                    "size": file_size,
+                    "fingerprint": fingerprint,
+                    "profile_job_id": profile_job_id,
+                }
+            )
 
         return jsonify(
             {
@@ -45640,6 +45812,7 @@ def get_current_user():
 
 
 @app.route("/api/reports/generate", methods=["GET"])
+@job_queue.deferrable("report")
 def generate_html_report():
     """Generate HTML report for a project"""
     try:
@@ -46630,46 +46803,13 @@ def get_dashboard_statistics():
     """Get comprehensive dashboard statistics"""
     try:
         with get_db_connection() as conn:
-            if conn is None:
-                return {
-                    "raw_files_count": 0,
-                    "raw_files_size_mb": 0,
-                    "total_projects": 0,
-                    "registered_pes": 0,
-                }
-
-            cursor = conn.cursor()
-            stats = {}
-
-            # Raw files stats
-            try:
-                cursor.execute("SELECT COUNT(*) FROM raw_meter_data")
-                stats["raw_files_count"] = cursor.fetchone()[0]
-            except:
-                stats["raw_files_count"] = 0
-
-            try:
-                cursor.execute("SELECT SUM(file_size) FROM raw_meter_data")
-                total_size = cursor.fetchone()[0] or 0
-                stats["raw_files_size_mb"] = round(total_size / (1024 * 1024), 2)
-            except:
-                stats["raw_files_size_mb"] = 0
-
-            # Project stats
-            try:
-                cursor.execute("SELECT COUNT(DISTINCT project_name) FROM project_files")
-                stats["total_projects"] = cursor.fetchone()[0]
-            except:
-                stats["total_projects"] = 0
-
-            # PE stats
-            try:
-                cursor.execute("SELECT COUNT(*) FROM users WHERE role = 'pe'")
-                stats["registered_pes"] = cursor.fetchone()[0]
-            except:
-                stats["registered_pes"] = 0
-
-            return stats
+            summary = dashboard_counters.summary(conn) if conn is not None else empty_summary()
+        return {
+            "raw_files_count": summary["raw_files"]["total_files"],
+            "raw_files_size_mb": round(summary["raw_files"]["total_bytes"] / (1024 * 1024), 2),
+            "total_projects": summary["projects"]["total_projects"],
+            "registered_pes": summary["pe"]["registered_pes"],
+        }
     except Exception as e:
         logger.error(f"Error getting dashboard statistics: {e}")
         return {
@@ -46680,6 +46820,18 @@ def get_dashboard_statistics():
         }
 
 
+@app.route("/api/dashboard/summary")
+def get_dashboard_summary():
+    """Everything the main dashboard shows, in one round trip (see dashboard_counters)"""
+    try:
+        with get_db_connection() as conn:
+            summary = dashboard_counters.summary(conn) if conn is not None else empty_summary()
+        return jsonify({"status": "success", **summary})
+    except Exception as e:
+        logger.error(f"Error getting dashboard summary: {e}")
+        return jsonify({"status": "error", "error": str(e)}), 500
+
+
 # Admin Panel Service Management Routes
 @app.route("/admin/start-all-services", methods=["POST"])
 def admin_start_all_services():
@@ -47389,6 +47541,7 @@ def admin_users_edit():
                 params
             )
             conn.commit()
+            session_cache.invalidate_user(user_id)
 
             return jsonify({"success": True, "message": "User updated successfully"})
 
@@ -47425,6 +47578,7 @@ def admin_users_delete():
             # Delete user
             conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
             conn.commit()
+            session_cache.invalidate_user(user_id)
 
             return jsonify({"success": True, "message": f"User '{user['username']}' deleted successfully"})
 
@@ -47610,6 +47764,10 @@ def kill_processes_on_port(port):
         print(f"[WARNING] Could not kill processes on port {port}: {e}")
 
 
+# Pick up background jobs left queued (or interrupted) by the previous run; a no-op after the first call
+job_queue.resume()
+
+
 if __name__ == "__main__":
     try:
         print("*** STARTING SYNEREX SERVER ***")
@@ -71,6 +71,18 @@ from sklearn.metrics import r2_score
 from common_validators import UnifiedValidator, validate_power_factor, validate_power_data
 # Report generation uses original implementation from main_hardened_ready_fixed.py
 from sankey_diagram import extract_energy_flow_data, generate_sankey_diagram_json
+from db_pool import db_pool
+from session_cache import session_cache
+import project_index
+import project_store
+from dashboard_counters import dashboard_counters, empty_summary
+import audit_buffer
+import upload_pipeline
+from job_queue import JobQueue, JobCancelled, checkpoint as job_checkpoint
+from report_snapshots import report_snapshots
+from pdf_assembly import assemble_pdf
+import tenant_db
+from shared_state import shared_state, SharedAttribute, run_as_leader
 
 # Excel export functionality
 try:
@@ -278,26 +290,27 @@ def merge_pdfs(pdf_files, output_path, document_name=None, cover_data=None):
     
     Args:
         pdf_files: List of PDF file paths to merge (in order)
-        output_path: Path for the merged PDF output
+        output_path: Path for the merged PDF output, or a stream / stream opener (see pdf_assembly.assemble_pdf)
         document_name: Document name to display in footer (optional, defaults to output filename)
         cover_data: Optional dict with cover page data (if provided, cover page will be prepended)
     
     Returns:
         True if successful, False otherwise
     """
+    cover_file = None  # cover page file on disk, removed however the merge ends
     try:
-        from PyPDF2 import PdfMerger, PdfWriter, PdfReader
-        from reportlab.pdfgen import canvas
-        from reportlab.lib.pagesizes import letter
-        from reportlab.lib.units import inch
-        
         # Step 0: Create cover page if cover_data is provided
         cover_page_path = None
         logger.info(f"PDF MERGE - cover_data check: cover_data={cover_data}, type={type(cover_data)}, bool={bool(cover_data)}")
         
         if cover_data is not None and cover_data:
             # Use absolute path and ensure directory exists
-            cover_page_path = os.path.abspath(output_path.replace('.pdf', '_cover.pdf'))
+            if isinstance(output_path, str):
+                cover_page_path = os.path.abspath(output_path.replace('.pdf', '_cover.pdf'))
+            else:
+                cover_fd, cover_page_path = tempfile.mkstemp(suffix='_cover.pdf')
+                os.close(cover_fd)
+            cover_file = cover_page_path
             cover_dir = os.path.dirname(cover_page_path)
             if not os.path.exists(cover_dir):
                 os.makedirs(cover_dir, exist_ok=True)
@@ -330,125 +343,11 @@ def merge_pdfs(pdf_files, output_path, document_name=None, cover_data=None):
         else:
             logger.warning(f"PDF MERGE - No cover_data provided or cover_data is empty/None, skipping cover page")
         
-        # Step 1: Merge PDFs as before
-        merger = PdfMerger()
-        
-        # Track files by normalized path to prevent duplicates
-        files_added = set()
-        added_count = 0
-        skipped_count = 0
-        
-        for pdf_file in pdf_files:
-            if os.path.exists(pdf_file):
-                # Normalize path for duplicate checking
-                normalized_path = os.path.normpath(os.path.abspath(pdf_file))
-                
-                # Skip if already added (duplicate)
-                if normalized_path in files_added:
-                    logger.debug(f"PDF MERGE - Skipping duplicate: {os.path.basename(pdf_file)}")
-                    skipped_count += 1
-                    continue
-                
-                try:
-                    merger.append(pdf_file)
-                    files_added.add(normalized_path)
-                    added_count += 1
-                    logger.debug(f"PDF MERGE - Added {os.path.basename(pdf_file)} to merge")
-                except Exception as e:
-                    logger.warning(f"PDF MERGE - Could not add {os.path.basename(pdf_file)}: {e}")
-        
-        # Write merged PDF to temporary file first
-        temp_merged_path = output_path + ".temp"
-        merger.write(temp_merged_path)
-        merger.close()
-        
-        # Step 2: Read the merged PDF and add footers if document_name is provided
-        if document_name:
-            reader = PdfReader(temp_merged_path)
-            writer = PdfWriter()
-            total_pages = len(reader.pages)
-            
-            logger.info(f"PDF MERGE - Adding footers to {total_pages} pages with document name: {document_name}")
-            
-            for page_num, page in enumerate(reader.pages, start=1):
-                # Get page dimensions
-                page_width = float(page.mediabox.width)
-                page_height = float(page.mediabox.height)
-                
-                # Create footer overlay using reportlab
-                packet = io.BytesIO()
-                can = canvas.Canvas(packet, pagesize=(page_width, page_height))
-                
-                # Set font to 6pt
-                can.setFont("Helvetica", 6)
-                can.setFillColorRGB(0, 0, 0)  # Black color
-                
-                # Footer text: Document name on left, page number on right
-                footer_y = 20  # 20 points from bottom
-                footer_text_left = document_name
-                footer_text_right = f"Page {page_num} of {total_pages}"
-                
-                # Draw document name (left-aligned)
-                can.drawString(30, footer_y, footer_text_left)
-                
-                # Draw page number (right-aligned)
-                text_width = can.stringWidth(footer_text_right, "Helvetica", 6)
-                can.drawString(page_width - text_width - 30, footer_y, footer_text_right)
-                
-                can.save()
-                
-                # Move to beginning of the BytesIO buffer
-                packet.seek(0)
-                footer_pdf = PdfReader(packet)
-                footer_page = footer_pdf.pages[0]
-                
-                # Merge footer overlay with original page
-                page.merge_page(footer_page)
-                writer.add_page(page)
-            
-            # Step 3: Write final PDF with footers
-            with open(output_path, 'wb') as output_file:
-                writer.write(output_file)
-            
-            # Clean up temporary file
-            try:
-                os.remove(temp_merged_path)
-            except Exception as e:
-                logger.warning(f"PDF MERGE - Could not remove temp file: {e}")
-            
-            logger.info(f"PDF MERGE - Successfully merged {added_count} PDFs into {os.path.basename(output_path)} with footers (skipped {skipped_count} duplicates)")
-        else:
-            # No footer requested, just rename temp file to output
-            try:
-                os.rename(temp_merged_path, output_path)
-            except Exception as e:
-                # If rename fails (cross-device), copy and delete
-                shutil.copy2(temp_merged_path, output_path)
-                os.remove(temp_merged_path)
-            
-            logger.info(f"PDF MERGE - Successfully merged {added_count} PDFs into {os.path.basename(output_path)} (skipped {skipped_count} duplicates)")
-        
-        # Clean up cover page temp file if it was created
-        if cover_page_path and os.path.exists(cover_page_path):
-            try:
-                # Verify the merged PDF exists and has content
-                if os.path.exists(output_path):
-                    merged_size = os.path.getsize(output_path)
-                    logger.info(f"PDF MERGE - Final merged PDF size: {merged_size:,} bytes")
-                    
-                    # Try to verify cover page was included by checking page count
-                    try:
-                        from PyPDF2 import PdfReader
-                        reader = PdfReader(output_path)
-                        page_count = len(reader.pages)
-                        logger.info(f"PDF MERGE - Merged PDF has {page_count} pages (expected at least 1 for cover)")
-                    except:
-                        pass
-                
-                os.remove(cover_page_path)
-                logger.debug(f"PDF MERGE - Cleaned up cover page temp file")
-            except Exception as e:
-                logger.warning(f"PDF MERGE - Could not remove cover page temp file: {e}")
+        # Step 1: Merge and stamp footers in a single pass, writing straight to the output
+        added_count, skipped_count, page_count = assemble_pdf(pdf_files, output_path, document_name)
+        output_name = os.path.basename(output_path) if isinstance(output_path, str) else "stream"
+        footer_note = " with footers" if document_name else ""
+        logger.info(f"PDF MERGE - Successfully merged {added_count} PDFs ({page_count} pages) into {output_name}{footer_note} (skipped {skipped_count} duplicates)")
         
         return True
         
@@ -460,6 +359,14 @@ def merge_pdfs(pdf_files, output_path, document_name=None, cover_data=None):
         import traceback
         logger.error(traceback.format_exc())
         return False
+    finally:
+        # Clean up cover page temp file if it was created (also when creating it failed)
+        if cover_file and os.path.exists(cover_file):
+            try:
+                os.remove(cover_file)
+                logger.debug(f"PDF MERGE - Cleaned up cover page temp file")
+            except Exception as e:
+                logger.warning(f"PDF MERGE - Could not remove cover page temp file: {e}")
 
 # Single source of truth for application version - update this when version changes
 APP_BASE_VERSION = "3.8"
@@ -545,7 +452,14 @@ from flask import Flask, request, jsonify, render_template_string, send_file, re
 from flask_cors import CORS
 from functools import wraps
 
-app = Flask(__name__)
+class SynerexFlask(Flask):
+    """Flask app whose latest analysis results and form data are shared by all workers (see shared_state)"""
+
+    _latest_analysis_results = SharedAttribute(shared_state, __name__)
+    _latest_form_data = SharedAttribute(shared_state, __name__)
+
+
+app = SynerexFlask(__name__)
 
 # Configuration
 class Config:
@@ -605,9 +519,14 @@ def get_db_connection(org_id=None, use_sessions_db=False):
                         regardless of org_id. Use this for session management.
     
     Returns:
-        Database connection to org-specific database or shared sessions database
+        Database connection to org-specific database or shared sessions database.
+        Connections come from db_pool and go back to it on exit; uncommitted
+        changes are rolled back, as closing the connection used to do.
+        Org databases are brought to the current tenant schema on first use
+        (see tenant_db.py).
     """
     conn = None
+    tenant = False
     try:
         if use_sessions_db:
             # Use shared sessions database for session management
@@ -615,26 +534,88 @@ def get_db_connection(org_id=None, use_sessions_db=False):
         elif org_id:
             # Use org-specific database
             org_dir = os.path.join(RESULTS_DIR, f"org_{org_id}")
-            os.makedirs(org_dir, exist_ok=True)
             db_path = os.path.join(org_dir, "app.db")
+            tenant = True
+            if not os.path.exists(db_path):
+                tenant_db.forget(db_path)
         else:
             # Fallback: use default app.db (for backward compatibility during migration)
             # WARNING: This should only be used temporarily
             logger.warning("get_db_connection() called without org_id - using default app.db (backward compatibility)")
             db_path = os.path.join(RESULTS_DIR, "app.db")
         
-        os.makedirs(os.path.dirname(db_path), exist_ok=True)
-        conn = sqlite3.connect(db_path)
-        conn.row_factory = sqlite3.Row  # Enable dict-like access
+        # Pooled, WAL-configured connection (see db_pool.py); the directory is created on first open
+        conn = db_pool.acquire(db_path)
+        if tenant:
+            tenant_db.ensure_migrated(conn, db_path)
         yield conn
     except Exception as e:
         logger.error(f"Database connection error (org_id={org_id}, use_sessions_db={use_sessions_db}): {e}")
         if conn:
             conn.rollback()
+            db_pool.release(db_path, conn, discard=True)
+            conn = None
         raise
     finally:
         if conn:
-            conn.close()
+            db_pool.release(db_path, conn)
+
+def init_sessions_schema():
+    """Create the shared user_sessions table (sessions.db) once at startup"""
+    try:
+        with get_db_connection(use_sessions_db=True) as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS user_sessions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    org_id TEXT,
+                    session_token TEXT UNIQUE NOT NULL,
+                    expires_at TEXT NOT NULL,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.commit()
+    except Exception as e:
+        logger.warning(f"Could not initialize sessions database: {e}")
+
+init_sessions_schema()
+
+def resolve_session(session_token):
+    """
+    Resolve a session token to its org and user.
+    
+    Returns {"user_id", "org_id", "expires_at", "user"} for a valid, unexpired
+    session, or None. "user" is the users row from the org database (or None).
+    Results are cached in session_cache until the TTL or expires_at.
+    """
+    if not session_token:
+        return None
+    session = session_cache.get(session_token)
+    if session is not None:
+        return session
+    
+    with get_db_connection(use_sessions_db=True) as conn:
+        row = conn.execute(
+            "SELECT user_id, org_id, expires_at FROM user_sessions WHERE session_token = ? AND expires_at > datetime('now')",
+            (session_token,)
+        ).fetchone()
+    if not row:
+        return None
+    
+    session = {"user_id": row[0], "org_id": row[1], "expires_at": row[2], "user": None}
+    if row[1]:
+        try:
+            with get_db_connection(org_id=row[1]) as conn:
+                user = conn.execute(
+                    "SELECT id, full_name, email, username, role, pe_license_number, state FROM users WHERE id = ?",
+                    (row[0],)
+                ).fetchone()
+            if user:
+                session["user"] = dict(user)
+        except Exception as e:
+            logger.debug(f"Could not load user for session: {e}")
+    session_cache.put(session_token, session)
+    return session
 
 def get_current_org_id(request):
     """
@@ -662,32 +643,10 @@ def get_current_org_id(request):
         if session_token.startswith('Bearer '):
             session_token = session_token[7:]  # Remove "Bearer " (7 characters)
         
-        # Query shared sessions database to get org_id
-        with get_db_connection(use_sessions_db=True) as conn:
-            cursor = conn.cursor()
-            # Ensure user_sessions table exists with org_id column
-            try:
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS user_sessions (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        user_id INTEGER NOT NULL,
-                        org_id TEXT,
-                        session_token TEXT UNIQUE NOT NULL,
-                        expires_at TEXT NOT NULL,
-                        created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
-                conn.commit()
-            except Exception as e:
-                logger.debug(f"Table creation check: {e}")
-            
-            cursor.execute(
-                "SELECT org_id FROM user_sessions WHERE session_token = ? AND expires_at > datetime('now')",
-                (session_token,)
-            )
-            row = cursor.fetchone()
-            if row and row[0]:
-                return row[0]
+        # Resolve through the session cache (no disk access on a hit)
+        session = resolve_session(session_token)
+        if session and session.get("org_id"):
+            return session["org_id"]
     except Exception as e:
         logger.debug(f"Could not get org_id from session: {e}")
     return None
@@ -722,7 +681,24 @@ class FileLock:
             pass
         return False
 
+# Background jobs (see job_queue); one jobs database shared by all orgs, rows carry org_id
+job_queue = JobQueue.from_env(os.path.join(RESULTS_DIR, "jobs.db"))
+job_queue.init_app(app, org_of=lambda request: get_current_org_id(request))
+
 # Audit Trail Helper Functions
+AUDIT_JOURNAL_DIR = os.path.join(RESULTS_DIR, "audit_journal")
+
+
+def _audit_connection(org_id):
+    """Connection for buffered audit rows: the org's database, or the default one for org_id None"""
+    return get_db_connection(org_id=org_id) if org_id else get_db_connection()
+
+
+# Audit rows are written once per analysis (see audit_buffer); rows left by a crashed run go in now
+audit_batched = audit_buffer.batched(_audit_connection, AUDIT_JOURNAL_DIR)
+audit_buffer.replay(_audit_connection, AUDIT_JOURNAL_DIR)
+
+
 def log_calculation_audit(analysis_session_id: str, calculation_type: str, 
                           input_values: dict, output_values: dict, 
                           methodology: str = None, formula: str = None,
@@ -748,25 +724,23 @@ def log_calculation_audit(analysis_session_id: str, calculation_type: str,
             logger.warning("log_calculation_audit called without org_id - skipping audit log")
             return
         
+        params = (
+            analysis_session_id,
+            calculation_type,
+            standard_name,
+            json.dumps(input_values) if input_values else None,
+            json.dumps(output_values) if output_values else None,
+            methodology,
+            formula,
+            standards_reference,
+            user_id
+        )
+        if audit_buffer.record("calculation_audit", params, target=org_id):
+            return
+        
         with get_db_connection(org_id=org_id) as conn:
             if conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO calculation_audit 
-                    (analysis_session_id, calculation_type, standard_name, input_values, 
-                     output_values, methodology, formula, standards_reference, calculated_by)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    analysis_session_id,
-                    calculation_type,
-                    standard_name,
-                    json.dumps(input_values) if input_values else None,
-                    json.dumps(output_values) if output_values else None,
-                    methodology,
-                    formula,
-                    standards_reference,
-                    user_id
-                ))
+                audit_buffer.write(conn, "calculation_audit", [params])
                 conn.commit()
     except Exception as e:
         logger.error(f"Failed to log calculation audit: {e}")
@@ -794,18 +768,6 @@ def create_analysis_session(project_name: str = None, before_file_id: int = None
         with get_db_connection(org_id=org_id) as conn:
             if conn:
                 cursor = conn.cursor()
-                # Ensure analysis_sessions table exists
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS analysis_sessions (
-                        id TEXT PRIMARY KEY,
-                        project_name TEXT,
-                        before_file_id INTEGER,
-                        after_file_id INTEGER,
-                        config_parameters TEXT,
-                        initiated_by INTEGER,
-                        created_at TEXT DEFAULT CURRENT_TIMESTAMP
-                    )
-                """)
                 cursor.execute("""
                     INSERT INTO analysis_sessions 
                     (id, project_name, before_file_id, after_file_id, config_parameters, initiated_by)
@@ -883,12 +845,18 @@ def store_verification_code(analysis_session_id: str, verification_code: str):
         with get_db_connection() as conn:
             if conn:
                 cursor = conn.cursor()
+                # During an analysis the update is written with the rest of its audit rows,
+                # so check the session exists now rather than report a code that is never stored
+                if audit_buffer.current() is not None:
+                    cursor.execute("SELECT 1 FROM analysis_sessions WHERE id = ?", (analysis_session_id,))
+                    if cursor.fetchone() is None:
+                        logger.warning(f"Analysis session {analysis_session_id} not found for verification code storage")
+                        return False
+                    audit_buffer.record("verification_code", (verification_code, analysis_session_id))
+                    return True
+                
                 # Update existing session with verification code
-                cursor.execute("""
-                    UPDATE analysis_sessions 
-                    SET verification_code = ? 
-                    WHERE id = ?
-                """, (verification_code, analysis_session_id))
+                cursor.execute(audit_buffer.VERIFICATION_CODE_SQL, (verification_code, analysis_session_id))
                 
                 # If no rows were updated, try to insert (shouldn't happen, but handle gracefully)
                 if cursor.rowcount == 0:
@@ -926,24 +894,22 @@ def log_compliance_verification(analysis_session_id: str, standard_name: str,
             logger.warning("log_compliance_verification called without org_id - skipping compliance log")
             return
         
+        params = (
+            analysis_session_id,
+            standard_name,
+            check_type,
+            calculated_value,
+            limit_value,
+            threshold_value,
+            1 if is_compliant else 0 if is_compliant is not None else None,
+            verification_method
+        )
+        if audit_buffer.record("compliance_verification", params, target=org_id):
+            return
+        
         with get_db_connection(org_id=org_id) as conn:
             if conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO compliance_verification 
-                    (analysis_session_id, standard_name, check_type, calculated_value,
-                     limit_value, threshold_value, is_compliant, verification_method)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    analysis_session_id,
-                    standard_name,
-                    check_type,
-                    calculated_value,
-                    limit_value,
-                    threshold_value,
-                    1 if is_compliant else 0 if is_compliant is not None else None,
-                    verification_method
-                ))
+                audit_buffer.write(conn, "compliance_verification", [params])
                 conn.commit()
     except Exception as e:
         logger.error(f"Failed to log compliance verification: {e}")
@@ -973,25 +939,23 @@ def log_weather_data_audit(analysis_session_id: str, location_address: str,
             logger.warning("log_weather_data_audit called without org_id - skipping weather audit log")
             return
         
+        params = (
+            analysis_session_id,
+            location_address,
+            latitude,
+            longitude,
+            date_range_start,
+            date_range_end,
+            api_source,
+            data_quality_score,
+            user_id
+        )
+        if audit_buffer.record("weather_data_audit", params, target=org_id):
+            return
+        
         with get_db_connection(org_id=org_id) as conn:
             if conn:
-                cursor = conn.cursor()
-                cursor.execute("""
-                    INSERT INTO weather_data_audit 
-                    (analysis_session_id, location_address, latitude, longitude,
-                     date_range_start, date_range_end, api_source, data_quality_score, fetched_by)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    analysis_session_id,
-                    location_address,
-                    latitude,
-                    longitude,
-                    date_range_start,
-                    date_range_end,
-                    api_source,
-                    data_quality_score,
-                    user_id
-                ))
+                audit_buffer.write(conn, "weather_data_audit", [params])
                 conn.commit()
     except Exception as e:
         logger.error(f"Failed to log weather data audit: {e}")
@@ -1392,7 +1356,7 @@ class ProcessingCache:
     """Cache for processing results to avoid duplicate calculations"""
     
     def __init__(self):
-        self.cache = {}
+        self.cache = shared_state.mapping("processing_cache")
         self.max_size = 1000
     
     def get(self, key: str) -> Any:
@@ -1412,9 +1376,9 @@ class ProcessingCache:
         self.cache.clear()
     
     def generate_key(self, func_name: str, *args, **kwargs) -> str:
-        """Generate cache key for function call"""
-        key_data = f"{func_name}_{hash(str(args))}_{hash(str(kwargs))}"
-        return hashlib.md5(key_data.encode()).hexdigest()
+        """Generate cache key for function call (stable across processes, unlike hash())"""
+        key_data = repr((func_name, args, sorted(kwargs.items())))
+        return hashlib.sha256(key_data.encode()).hexdigest()
 
 processing_cache = ProcessingCache()
 
@@ -5457,6 +5421,8 @@ def calculate_manufacturing_metrics(results: Dict, form_data: Dict, config: Dict
 
 # API Routes
 @app.route("/api/analyze", methods=["POST"])
+@job_queue.deferrable("analysis")
+@audit_batched
 def analyze():
     """Analyze uploaded data using unified processing pipeline"""
     logger.info("=== ANALYSIS API - ANALYZE ENDPOINT STARTED ===")
@@ -5696,6 +5662,7 @@ def analyze():
             before_id = data.get('before_file_id')
             after_id = data.get('after_file_id')
         
+        job_checkpoint(0.05, "Loading before-period data")
         # Process before file if we have a file ID
         if before_id:
             base_dir = Path(__file__).parent
@@ -5731,6 +5698,7 @@ def analyze():
                     else:
                         logger.error(f"Before file ID {before_id} not found in database")
         
+        job_checkpoint(0.1, "Loading after-period data")
         # Process after file if we have a file ID
         if after_id:
             base_dir = Path(__file__).parent
@@ -6207,6 +6175,7 @@ def analyze():
         # Add analysis_session_id to config for audit trail logging
         cfg["analysis_session_id"] = analysis_session_id
         
+        job_checkpoint(0.2, "Running analysis")
         try:
             results = safe_perform_comprehensive_analysis(before_data, after_data, cfg)
         except ZeroDivisionError as zde:
@@ -6449,6 +6418,7 @@ def analyze():
                 "traceback_preview": tb.split('\n')[-5:] if tb else []
             }), 200
         
+        job_checkpoint(0.6, "Post-processing results")
         # CRITICAL: Create financial_debug if it doesn't exist (post-processing from original /api/analyze)
         # This code was in the original main_hardened_ready_fixed.py at lines 22465-22518
         if isinstance(results, dict) and "financial_debug" not in results:
@@ -6686,6 +6656,7 @@ def analyze():
                 logger.warning(f"Could not calculate confidence intervals on server: {e}")
                 # Don't fail the entire analysis if confidence interval calculation fails
         
+        job_checkpoint(0.7, "Recording compliance data")
         # Log compliance verification data to database
         if isinstance(results, dict) and analysis_session_id:
             try:
@@ -6841,6 +6812,7 @@ def analyze():
                 logger.warning(traceback.format_exc())
                 # Don't fail the entire analysis if compliance logging fails
         
+        job_checkpoint(0.8, "Running equipment health analysis")
         # Perform predictive failure analysis for equipment health
         try:
             # Get project_id if available
@@ -6987,6 +6959,7 @@ def analyze():
             except Exception as e:
                 logger.warning(f"Could not retrieve file info from database: {e}")
         
+        job_checkpoint(0.9, "Verifying voltage unbalance from raw data")
         # CRITICAL FIX: Recalculate NEMA MG1 voltage unbalance by reading CSV files directly
         # This ensures the database stores correct values from raw CSV data
         if isinstance(results, dict) and (before_id or after_id):
@@ -9735,6 +9708,7 @@ def analyze():
         }), 200
 
 @app.route("/api/generate-report", methods=["POST"])
+@job_queue.deferrable("report")
 def generate_report():
     """Generate HTML report using original implementation"""
     logger.info("=== REPORT GENERATION STARTED ===")
@@ -9760,7 +9734,7 @@ def serve_layman_report():
     """Serve the layman-friendly executive summary report"""
     try:
         # Forward request to 8084 service for layman report generation
-        response = requests.get("http://localhost:8084/generate-layman", timeout=30)
+        response = requests.get("http://localhost:8084/generate-layman", params=_publish_report_snapshot(), timeout=30)
         if response.status_code == 200:
             html_content = response.text
             return Response(
@@ -9853,7 +9827,7 @@ def serve_template_report():
                 adapter = HTTPAdapter(max_retries=retry_strategy, pool_connections=1, pool_maxsize=1)
                 session.mount("http://", adapter)
                 session.mount("https://", adapter)
-                response = session.get("http://127.0.0.1:8084/generate", timeout=30)
+                response = session.get("http://127.0.0.1:8084/generate", params=_publish_report_snapshot(), timeout=30)
                 if response.status_code == 200:
                     html_content = response.text
                     
@@ -10175,7 +10149,7 @@ def serve_template_report():
                 logger.info(f"[FIX] CONFIG DEBUG: combined_data.config keys: {list(combined_data.get('config', {}).keys())}")
                 logger.info(f"[FIX] CONFIG DEBUG: combined_data.client_profile keys: {list(combined_data.get('client_profile', {}).keys())}")
                 
-                response = requests.get("http://localhost:8084/generate", timeout=10)
+                response = requests.get("http://localhost:8084/generate", params=_publish_report_snapshot(), timeout=10)
                 if response.status_code == 200:
                     return Response(
                         response.text,
@@ -10396,6 +10370,177 @@ def api_store_verification_code():
         logger.error(traceback.format_exc())
         return jsonify({"success": False, "error": str(e)}), 500
 
+def _prepare_report_results():
+    """Latest analysis results with form data, verification code and energy flow merged (None if no analysis yet).
+
+    This is the data the 8084 HTML service renders, whether it arrives via
+    GET /api/analysis/results or as a report snapshot.
+    """
+    analysis_results = getattr(app, "_latest_analysis_results", None)
+    form_data = getattr(app, "_latest_form_data", {})
+
+    if not analysis_results:
+        return None
+
+    # CRITICAL: Merge form_data into results to ensure template variables are available
+    if form_data and isinstance(analysis_results, dict):
+        # Ensure config and client_profile exist
+        if "config" not in analysis_results:
+            analysis_results["config"] = {}
+        if "client_profile" not in analysis_results:
+            analysis_results["client_profile"] = {}
+        
+        # Merge form_data into config and client_profile
+        analysis_results["config"].update(form_data)
+        analysis_results["client_profile"].update(form_data)
+        
+        # Also add form_data at top level
+        for key, value in form_data.items():
+            if key not in analysis_results:
+                analysis_results[key] = value
+
+    logger.info(
+        f"Retrieved analysis results with keys: {list(analysis_results.keys())}"
+    )
+
+    # Include project data for Client HTML Report
+    if "client_profile" not in analysis_results:
+        analysis_results["client_profile"] = {}
+    if "config" not in analysis_results:
+        analysis_results["config"] = {}
+
+    # Add form data to the results for HTML service
+    form_data = getattr(app, "_latest_form_data", {})
+    if form_data:
+        # Add form data to config object for template processor
+        analysis_results["config"].update(form_data)
+        # Also add to client_profile for backward compatibility
+        analysis_results["client_profile"].update(form_data)
+        # Keep form data at top level too
+        analysis_results.update(form_data)
+
+    # Add verification code from database if analysis_session_id exists
+    analysis_session_id = analysis_results.get('analysis_session_id')
+    if analysis_session_id and not analysis_results.get('verification_code'):
+        try:
+            with get_db_connection() as conn:
+                if conn:
+                    cursor = conn.cursor()
+                    cursor.execute("""
+                        SELECT verification_code 
+                        FROM analysis_sessions 
+                        WHERE id = ? AND verification_code IS NOT NULL
+                        LIMIT 1
+                    """, (analysis_session_id,))
+                    result = cursor.fetchone()
+                    if result and result[0]:
+                        analysis_results['verification_code'] = result[0]
+                        logger.info(f"Added verification code {result[0]} to analysis results for session {analysis_session_id}")
+        except Exception as e:
+            logger.warning(f"Could not retrieve verification code from database: {e}")
+
+    # Generate Sankey diagram data for energy flow visualization
+    # First check if energy_flow already exists in stored results
+    existing_energy_flow = analysis_results.get("energy_flow")
+    existing_sankey_diagram = analysis_results.get("sankey_diagram")
+    
+    try:
+        flow_data = extract_energy_flow_data(analysis_results, form_data, analysis_results.get("config", {}))
+        if flow_data:
+            analysis_results["energy_flow"] = flow_data
+            # Also generate JSON for Plotly
+            sankey_json = generate_sankey_diagram_json(flow_data)
+            if sankey_json:
+                analysis_results["sankey_diagram"] = sankey_json
+            logger.info(f"Generated energy flow Sankey diagram data: {len(flow_data.get('nodes', []))} nodes, {len(flow_data.get('links', []))} links, total_kw={flow_data.get('total_energy_kw', 0):.1f}")
+        else:
+            # If regeneration failed but we have existing data, preserve it
+            if existing_energy_flow:
+                analysis_results["energy_flow"] = existing_energy_flow
+                logger.info("Preserved existing energy_flow data from stored results")
+            if existing_sankey_diagram:
+                analysis_results["sankey_diagram"] = existing_sankey_diagram
+                logger.info("Preserved existing sankey_diagram data from stored results")
+            logger.warning("Sankey diagram flow_data is None - check power data availability")
+    except Exception as e:
+        # If regeneration failed but we have existing data, preserve it
+        if existing_energy_flow:
+            analysis_results["energy_flow"] = existing_energy_flow
+            logger.info("Preserved existing energy_flow data after regeneration error")
+        if existing_sankey_diagram:
+            analysis_results["sankey_diagram"] = existing_sankey_diagram
+            logger.info("Preserved existing sankey_diagram data after regeneration error")
+        logger.warning(f"Could not generate Sankey diagram: {e}")
+        import traceback
+        logger.debug(traceback.format_exc())
+        # Don't fail the analysis if Sankey generation fails
+
+    # Debug: Check what data is available
+    print(f"DEBUG: Analysis results keys: {list(analysis_results.keys())}")
+    print(f"DEBUG: Config keys: {list(analysis_results.get('config', {}).keys())}")
+    print(
+        f"DEBUG: Client profile keys: {list(analysis_results.get('client_profile', {}).keys())}"
+    )
+    print(
+        f"DEBUG: Form data keys: {list(form_data.keys()) if form_data else 'No form data'}"
+    )
+    
+    # Debug: Check if energy_flow is present
+    has_energy_flow = "energy_flow" in analysis_results
+    has_sankey_diagram = "sankey_diagram" in analysis_results
+    print(f"DEBUG: Has energy_flow: {has_energy_flow}")
+    print(f"DEBUG: Has sankey_diagram: {has_sankey_diagram}")
+    if has_energy_flow:
+        ef_data = analysis_results.get("energy_flow", {})
+        if isinstance(ef_data, dict):
+            print(f"DEBUG: energy_flow has nodes: {'nodes' in ef_data}, has links: {'links' in ef_data}")
+            if 'nodes' in ef_data:
+                print(f"DEBUG: energy_flow nodes count: {len(ef_data.get('nodes', []))}")
+            if 'links' in ef_data:
+                print(f"DEBUG: energy_flow links count: {len(ef_data.get('links', []))}")
+
+    # WEATHER NORMALIZATION DIAGNOSTIC: Check if weather_normalization is present when sending to frontend
+    if isinstance(analysis_results, dict) and "weather_normalization" in analysis_results:
+        wn = analysis_results["weather_normalization"]
+        logger.info(f"≡ƒöì WEATHER NORMALIZATION CHECK (at frontend send): Type={type(wn)}, IsDict={isinstance(wn, dict)}")
+        if isinstance(wn, dict):
+            logger.info(f"≡ƒöì WEATHER NORMALIZATION CHECK: Keys={list(wn.keys())}")
+            logger.info(f"≡ƒöì WEATHER NORMALIZATION CHECK: temp_sensitivity_used={wn.get('temp_sensitivity_used')}")
+            logger.info(f"≡ƒöì WEATHER NORMALIZATION CHECK: dewpoint_sensitivity_used={wn.get('dewpoint_sensitivity_used')}")
+            logger.info(f"≡ƒöì WEATHER NORMALIZATION CHECK: regression_temp_sensitivity={wn.get('regression_temp_sensitivity')}")
+            logger.info(f"≡ƒöì WEATHER NORMALIZATION CHECK: regression_dewpoint_sensitivity={wn.get('regression_dewpoint_sensitivity')}")
+        else:
+            logger.warning(f"≡ƒöì WEATHER NORMALIZATION CHECK: weather_normalization is not a dict when sending to frontend! Type={type(wn)}, Value={wn}")
+    else:
+        logger.warning(f"≡ƒöì WEATHER NORMALIZATION CHECK: weather_normalization NOT FOUND when sending to frontend! Available keys: {list(analysis_results.keys()) if isinstance(analysis_results, dict) else 'N/A'}")
+
+    return analysis_results
+
+
+def _publish_report_snapshot():
+    """Publish the current report data for 8084; returns request params naming the snapshot ({} on failure)"""
+    try:
+        analysis_results = _prepare_report_results()
+        if not analysis_results:
+            return {}
+        session_id, version = report_snapshots.publish(analysis_results)
+        logger.info(f"Published report snapshot {session_id} v{version}")
+        return {"analysis_session_id": session_id, "version": version}
+    except Exception as e:
+        logger.warning(f"Could not publish report snapshot, 8084 will pull results over HTTP: {e}")
+        return {}
+
+
+@app.route("/api/analysis/snapshot", methods=["POST"])
+@api_guard
+def publish_analysis_snapshot():
+    """Publish the latest analysis results to the report snapshot store (used by the 8084 HTML service)"""
+    params = _publish_report_snapshot()
+    if not params:
+        return jsonify({"error": "No analysis results available", "message": "Please run an analysis first"}), 404
+    return jsonify(params)
+
+
 @app.route("/api/analysis/results", methods=["GET", "POST"])
 def get_analysis_results():
     """
@@ -10445,10 +10590,8 @@ def get_analysis_results():
                 return jsonify({"success": True, "message": "Results updated"}), 200
         
         # GET handler: Get the latest analysis results from session
-        analysis_results = getattr(app, "_latest_analysis_results", None)
-        form_data = getattr(app, "_latest_form_data", {})
-
-        if not analysis_results:
+        analysis_results = _prepare_report_results()
+        if analysis_results is None:
             return (
                 jsonify(
                     {
@@ -10459,138 +10602,6 @@ def get_analysis_results():
                 404,
             )
 
-        # CRITICAL: Merge form_data into results to ensure template variables are available
-        if form_data and isinstance(analysis_results, dict):
-            # Ensure config and client_profile exist
-            if "config" not in analysis_results:
-                analysis_results["config"] = {}
-            if "client_profile" not in analysis_results:
-                analysis_results["client_profile"] = {}
-            
-            # Merge form_data into config and client_profile
-            analysis_results["config"].update(form_data)
-            analysis_results["client_profile"].update(form_data)
-            
-            # Also add form_data at top level
-            for key, value in form_data.items():
-                if key not in analysis_results:
-                    analysis_results[key] = value
-
-        logger.info(
-            f"Retrieved analysis results with keys: {list(analysis_results.keys())}"
-        )
-
-        # Include project data for Client HTML Report
-        if "client_profile" not in analysis_results:
-            analysis_results["client_profile"] = {}
-        if "config" not in analysis_results:
-            analysis_results["config"] = {}
-
-        # Add form data to the results for HTML service
-        form_data = getattr(app, "_latest_form_data", {})
-        if form_data:
-            # Add form data to config object for template processor
-            analysis_results["config"].update(form_data)
-            # Also add to client_profile for backward compatibility
-            analysis_results["client_profile"].update(form_data)
-            # Keep form data at top level too
-            analysis_results.update(form_data)
-
-        # Add verification code from database if analysis_session_id exists
-        analysis_session_id = analysis_results.get('analysis_session_id')
-        if analysis_session_id and not analysis_results.get('verification_code'):
-            try:
-                with get_db_connection() as conn:
-                    if conn:
-                        cursor = conn.cursor()
-                        cursor.execute("""
-                            SELECT verification_code 
-                            FROM analysis_sessions 
-                            WHERE id = ? AND verification_code IS NOT NULL
-                            LIMIT 1
-                        """, (analysis_session_id,))
-                        result = cursor.fetchone()
-                        if result and result[0]:
-                            analysis_results['verification_code'] = result[0]
-                            logger.info(f"Added verification code {result[0]} to analysis results for session {analysis_session_id}")
-            except Exception as e:
-                logger.warning(f"Could not retrieve verification code from database: {e}")
-
-        # Generate Sankey diagram data for energy flow visualization
-        # First check if energy_flow already exists in stored results
-        existing_energy_flow = analysis_results.get("energy_flow")
-        existing_sankey_diagram = analysis_results.get("sankey_diagram")
-        
-        try:
-            flow_data = extract_energy_flow_data(analysis_results, form_data, analysis_results.get("config", {}))
-            if flow_data:
-                analysis_results["energy_flow"] = flow_data
-                # Also generate JSON for Plotly
-                sankey_json = generate_sankey_diagram_json(flow_data)
-                if sankey_json:
-                    analysis_results["sankey_diagram"] = sankey_json
-                logger.info(f"Generated energy flow Sankey diagram data: {len(flow_data.get('nodes', []))} nodes, {len(flow_data.get('links', []))} links, total_kw={flow_data.get('total_energy_kw', 0):.1f}")
-            else:
-                # If regeneration failed but we have existing data, preserve it
-                if existing_energy_flow:
-                    analysis_results["energy_flow"] = existing_energy_flow
-                    logger.info("Preserved existing energy_flow data from stored results")
-                if existing_sankey_diagram:
-                    analysis_results["sankey_diagram"] = existing_sankey_diagram
-                    logger.info("Preserved existing sankey_diagram data from stored results")
-                logger.warning("Sankey diagram flow_data is None - check power data availability")
-        except Exception as e:
-            # If regeneration failed but we have existing data, preserve it
-            if existing_energy_flow:
-                analysis_results["energy_flow"] = existing_energy_flow
-                logger.info("Preserved existing energy_flow data after regeneration error")
-            if existing_sankey_diagram:
-                analysis_results["sankey_diagram"] = existing_sankey_diagram
-                logger.info("Preserved existing sankey_diagram data after regeneration error")
-            logger.warning(f"Could not generate Sankey diagram: {e}")
-            import traceback
-            logger.debug(traceback.format_exc())
-            # Don't fail the analysis if Sankey generation fails
-
-        # Debug: Check what data is available
-        print(f"DEBUG: Analysis results keys: {list(analysis_results.keys())}")
-        print(f"DEBUG: Config keys: {list(analysis_results.get('config', {}).keys())}")
-        print(
-            f"DEBUG: Client profile keys: {list(analysis_results.get('client_profile', {}).keys())}"
-        )
-        print(
-            f"DEBUG: Form data keys: {list(form_data.keys()) if form_data else 'No form data'}"
-        )
-        
-        # Debug: Check if energy_flow is present
-        has_energy_flow = "energy_flow" in analysis_results
-        has_sankey_diagram = "sankey_diagram" in analysis_results
-        print(f"DEBUG: Has energy_flow: {has_energy_flow}")
-        print(f"DEBUG: Has sankey_diagram: {has_sankey_diagram}")
-        if has_energy_flow:
-            ef_data = analysis_results.get("energy_flow", {})
-            if isinstance(ef_data, dict):
-                print(f"DEBUG: energy_flow has nodes: {'nodes' in ef_data}, has links: {'links' in ef_data}")
-                if 'nodes' in ef_data:
-                    print(f"DEBUG: energy_flow nodes count: {len(ef_data.get('nodes', []))}")
-                if 'links' in ef_data:
-                    print(f"DEBUG: energy_flow links count: {len(ef_data.get('links', []))}")
-
-        # WEATHER NORMALIZATION DIAGNOSTIC: Check if weather_normalization is present when sending to frontend
-        if isinstance(analysis_results, dict) and "weather_normalization" in analysis_results:
-            wn = analysis_results["weather_normalization"]
-            logger.info(f"≡ƒöì WEATHER NORMALIZATION CHECK (at frontend send): Type={type(wn)}, IsDict={isinstance(wn, dict)}")
-            if isinstance(wn, dict):
-                logger.info(f"≡ƒöì WEATHER NORMALIZATION CHECK: Keys={list(wn.keys())}")
-                logger.info(f"≡ƒöì WEATHER NORMALIZATION CHECK: temp_sensitivity_used={wn.get('temp_sensitivity_used')}")
-                logger.info(f"≡ƒöì WEATHER NORMALIZATION CHECK: dewpoint_sensitivity_used={wn.get('dewpoint_sensitivity_used')}")
-                logger.info(f"≡ƒöì WEATHER NORMALIZATION CHECK: regression_temp_sensitivity={wn.get('regression_temp_sensitivity')}")
-                logger.info(f"≡ƒöì WEATHER NORMALIZATION CHECK: regression_dewpoint_sensitivity={wn.get('regression_dewpoint_sensitivity')}")
-            else:
-                logger.warning(f"≡ƒöì WEATHER NORMALIZATION CHECK: weather_normalization is not a dict when sending to frontend! Type={type(wn)}, Value={wn}")
-        else:
-            logger.warning(f"≡ƒöì WEATHER NORMALIZATION CHECK: weather_normalization NOT FOUND when sending to frontend! Available keys: {list(analysis_results.keys()) if isinstance(analysis_results, dict) else 'N/A'}")
-
         return jsonify({"results": analysis_results})
 
     except Exception as e:
@@ -10598,6 +10609,7 @@ def get_analysis_results():
         return jsonify({"error": str(e)}), 500
 
 @app.route("/api/generate-audit-package", methods=["POST"])
+@job_queue.deferrable("audit_package")
 def generate_audit_package():
     """Generate comprehensive audit package - using original implementation"""
     try:
@@ -11139,24 +11151,6 @@ def handle_license_token_login(token: str):
             
             cursor = org_conn.cursor()
             
-            # Ensure users table exists in org-specific database
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE NOT NULL,
-                    email TEXT UNIQUE NOT NULL,
-                    password_hash TEXT NOT NULL,
-                    role TEXT NOT NULL DEFAULT 'user',
-                    status TEXT DEFAULT 'active',
-                    full_name TEXT,
-                    pe_license_number TEXT,
-                    state TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT
-                )
-            """)
-            org_conn.commit()
-            
             # Try to get or create a user record for this org
             cursor.execute(
                 """
@@ -11298,24 +11292,6 @@ def login_user():
                 )
 
             cursor = org_conn.cursor()
-            
-            # Ensure users table exists in org-specific database
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS users (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    username TEXT UNIQUE NOT NULL,
-                    email TEXT UNIQUE NOT NULL,
-                    password_hash TEXT NOT NULL,
-                    role TEXT NOT NULL DEFAULT 'user',
-                    status TEXT DEFAULT 'active',
-                    full_name TEXT,
-                    pe_license_number TEXT,
-                    state TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT
-                )
-            """)
-            org_conn.commit()
 
             # Hash password for comparison
             import hashlib
@@ -11851,33 +11827,37 @@ def get_projects():
             has_feeders = 'feeders_data' in existing_tables
             has_transformers = 'transformers_data' in existing_tables
             
-            # Build query based on available tables
+            # Build query based on available tables (summary columns come from the project index, not the payload)
             # Filter out archived projects (archived IS NULL OR archived = 0)
             if has_feeders and has_transformers:
                 cursor.execute(
                     """
-                        SELECT id, name, 
-                               COALESCE(description, '') as description,
-                               created_at, updated_at,
+                        SELECT p.id, p.name, 
+                               COALESCE(p.description, '') as description,
+                               p.created_at, p.updated_at,
                            (SELECT COUNT(*) FROM feeders_data WHERE project_id = p.id) as feeder_count,
-                           (SELECT COUNT(*) FROM transformers_data WHERE project_id = p.id) as transformer_count
+                           (SELECT COUNT(*) FROM transformers_data WHERE project_id = p.id) as transformer_count,
+                           s.company, s.location, COALESCE(s.field_count, 0) as field_count
                     FROM projects p
-                    WHERE (archived IS NULL OR archived = 0)
-                    ORDER BY updated_at DESC
+                    LEFT JOIN project_summaries s ON s.project_id = p.id
+                    WHERE (p.archived IS NULL OR p.archived = 0)
+                    ORDER BY p.updated_at DESC
                 """
                 )
             else:
                 # Fallback query without subqueries if tables don't exist
                 cursor.execute(
                     """
-                    SELECT id, name, 
-                           COALESCE(description, '') as description,
-                           created_at, updated_at,
+                    SELECT p.id, p.name, 
+                           COALESCE(p.description, '') as description,
+                           p.created_at, p.updated_at,
                            0 as feeder_count,
-                           0 as transformer_count
-                    FROM projects
-                    WHERE (archived IS NULL OR archived = 0)
-                    ORDER BY updated_at DESC
+                           0 as transformer_count,
+                           s.company, s.location, COALESCE(s.field_count, 0) as field_count
+                    FROM projects p
+                    LEFT JOIN project_summaries s ON s.project_id = p.id
+                    WHERE (p.archived IS NULL OR p.archived = 0)
+                    ORDER BY p.updated_at DESC
             """
             )
             
@@ -11932,19 +11912,6 @@ def create_project():
                 return jsonify({"error": "Database not available"}), 500
 
             cursor = conn.cursor()
-            
-            # Ensure projects table exists in org-specific database
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS projects (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL,
-                    description TEXT,
-                    data TEXT,
-                    created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
-            conn.commit()
 
             # Check if project name already exists
             cursor.execute("SELECT id FROM projects WHERE name = ?", (name,))
@@ -11975,6 +11942,7 @@ def create_project():
                     raise
 
             project_id = cursor.lastrowid
+            project_index.upsert(conn, project_id, name, {})
             conn.commit()
 
             return jsonify({
@@ -11998,8 +11966,6 @@ def load_project():
         processing_cache.clear()
         logger.info("≡ƒº╣ Cleared processing cache for new project load")
         
-        import json
-        
         # Get org_id for multi-tenant isolation
         org_id = get_current_org_id(request)
         if not org_id:
@@ -12051,110 +12017,45 @@ def load_project():
             columns = [description[0] for description in cursor.description]
             project = dict(zip(columns, row))
             
-            # Get project data from the 'data' column
-            project_data = {}
-            if project.get('data'):
-                try:
-                    # Log what we got from database
-                    raw_data = project.get('data')
-                    logger.info(f"≡ƒôÑ Loading project '{project.get('name')}' (ID: {project.get('id')}) from org_id={org_id}")
-                    logger.info(f"≡ƒôÑ Raw data from DB (first 500 chars): {str(raw_data)[:500]}")
-                    logger.info(f"≡ƒôÑ Raw data length: {len(str(raw_data)) if raw_data else 0} chars")
-                    
-                    project_data = json.loads(project['data'])
-                    logger.info(f"≡ƒôÑ After first parse - type: {type(project_data)}, keys: {list(project_data.keys()) if isinstance(project_data, dict) else 'N/A'}")
-                    
-                    # Handle nested payload structure
-                    if isinstance(project_data, dict) and "payload" in project_data:
-                        logger.info(f"≡ƒôÑ Found payload key - type: {type(project_data['payload'])}, is string: {isinstance(project_data['payload'], str)}")
-                        if isinstance(project_data["payload"], str):
-                            payload_content = project_data["payload"].strip()
-                            logger.info(f"≡ƒôÑ Payload string length: {len(payload_content)}, first 200 chars: {payload_content[:200]}")
-                            
-                            # Check if payload is empty or just "{}"
-                            if payload_content in ['', '{}', 'null', 'None']:
-                                logger.error(f"Γ¥î Payload is empty or null: '{payload_content}'")
-                                logger.error(f"Γ¥î This indicates the data was saved with an empty payload")
-                                logger.error(f"Γ¥î Checking if data might be in outer dict...")
-                                
-                                # Try to use the outer dict if it has other keys besides 'payload'
-                                outer_keys = [k for k in project_data.keys() if k != 'payload']
-                                if outer_keys:
-                                    logger.warning(f"ΓÜá∩╕Å Found {len(outer_keys)} keys in outer dict, attempting to use them: {outer_keys[:20]}")
-                                    # Use outer dict data (excluding payload key)
-                                    project_data = {k: v for k, v in project_data.items() if k != 'payload'}
-                                    logger.info(f"ΓÜá∩╕Å Using outer dict data with {len(project_data)} keys")
-                                else:
-                                    project_data = {}
-                                    logger.error(f"Γ¥î No alternative data found - project_data will be empty")
-                            else:
-                                try:
-                                    project_data = json.loads(payload_content)
-                                    logger.info(f"≡ƒôÑ After second parse - type: {type(project_data)}, keys: {list(project_data.keys())[:20] if isinstance(project_data, dict) else 'N/A'}")
-                                except json.JSONDecodeError as e:
-                                    logger.error(f"Γ¥î Failed to parse payload JSON: {e}")
-                                    logger.error(f"Γ¥î Payload content: {payload_content[:500]}")
-                                    project_data = {}
-                        elif isinstance(project_data["payload"], dict):
-                            project_data = project_data["payload"]
-                            logger.info(f"≡ƒôÑ Using payload dict directly - keys: {list(project_data.keys())[:20]}")
-                        else:
-                            logger.warning(f"ΓÜá∩╕Å Payload is neither string nor dict: {type(project_data['payload'])}")
-                            # Try to use outer dict if it has other keys
-                            outer_keys = [k for k in project_data.keys() if k != 'payload']
-                            if outer_keys:
-                                logger.warning(f"ΓÜá∩╕Å Found {len(outer_keys)} keys in outer dict, attempting to use them: {outer_keys[:20]}")
-                                project_data = {k: v for k, v in project_data.items() if k != 'payload'}
-                            else:
-                                project_data = {}
-                    else:
-                        logger.warning(f"ΓÜá∩╕Å No payload key found in project data. Keys: {list(project_data.keys()) if isinstance(project_data, dict) else 'N/A'}")
-                        logger.warning(f"ΓÜá∩╕Å This may indicate data was saved in a different format")
-                        # If no payload key but we have other keys, use the data directly
-                        if isinstance(project_data, dict) and len(project_data) > 0:
-                            logger.info(f"ΓÜá∩╕Å Using project_data directly (no payload wrapper, {len(project_data)} keys)")
-                    
-                    # Log specific Project Information fields
-                    project_info_fields = {
-                        'company': project_data.get('company'),
-                        'facility_address': project_data.get('facility_address'),
-                        'location': project_data.get('location'),
-                        'facility_state': project_data.get('facility_state'),
-                        'facility_zip': project_data.get('facility_zip'),
-                        'contact': project_data.get('contact'),
-                        'phone': project_data.get('phone'),
-                        'email': project_data.get('email')
-                    }
-                    logger.info(f"≡ƒôÑ Project Information fields in loaded data: {project_info_fields}")
-                    logger.info(f"≡ƒôÑ Total fields in loaded data: {len(project_data) if isinstance(project_data, dict) else 0}")
-                    
-                    if len(project_data) == 0:
-                        logger.error(f"Γ¥î WARNING: Project '{project.get('name')}' (ID: {project.get('id')}) has no field data after parsing!")
-                        logger.error(f"Γ¥î This may indicate the data was not saved correctly or is in a different format")
-                        logger.error(f"Γ¥î Raw data was: {str(raw_data)[:200]}")
-                        # Check if there are other projects with similar names that might have the data
-                        cursor.execute("SELECT id, name, LENGTH(data) as data_length FROM projects WHERE name LIKE ? AND id != ?", 
-                                     (f"%{project.get('name')}%", project.get('id')))
-                        similar_with_data = cursor.fetchall()
-                        if similar_with_data:
-                            logger.warning(f"ΓÜá∩╕Å Found {len(similar_with_data)} other projects with similar names:")
-                            for proj in similar_with_data:
-                                logger.warning(f"   - ID: {proj[0]}, Name: '{proj[1]}', Data length: {proj[2] or 0} chars")
-                    
-                except (json.JSONDecodeError, TypeError) as e:
-                    logger.error(f"Γ¥î Failed to parse project data: {e}")
-                    import traceback
-                    logger.error(traceback.format_exc())
-                    logger.error(f"Γ¥î Raw data that failed to parse: {str(raw_data)[:1000] if raw_data else 'None'}")
-                    project_data = {}
+            # Get project data (field/blob tables, or the legacy 'data' column)
+            try:
+                project_data = project_store.read_fields(conn, project)
+            except (ValueError, TypeError) as e:
+                logger.error(f"Γ¥î Failed to parse project data: {e}")
+                logger.error(f"Γ¥î Raw data that failed to parse: {str(project.get('data'))[:1000]}")
+                project_data = {}
+            logger.info(f"≡ƒôÑ Loading project '{project.get('name')}' (ID: {project.get('id')}) from org_id={org_id} (storage v{project.get('storage_version') or 1}, {project_store.stored_size(project)} chars)")
+            
+            if project_data:
+                # Log specific Project Information fields
+                project_info_fields = {
+                    'company': project_data.get('company'),
+                    'facility_address': project_data.get('facility_address'),
+                    'location': project_data.get('location'),
+                    'facility_state': project_data.get('facility_state'),
+                    'facility_zip': project_data.get('facility_zip'),
+                    'contact': project_data.get('contact'),
+                    'phone': project_data.get('phone'),
+                    'email': project_data.get('email')
+                }
+                logger.info(f"≡ƒôÑ Project Information fields in loaded data: {project_info_fields}")
+                logger.info(f"≡ƒôÑ Total fields in loaded data: {len(project_data)}")
             else:
-                logger.warning(f"ΓÜá∩╕Å Project '{project.get('name')}' (ID: {project.get('id')}) has no data column or data is NULL")
+                logger.warning(f"ΓÜá∩╕Å Project '{project.get('name')}' (ID: {project.get('id')}) has no field data")
                 logger.warning(f"ΓÜá∩╕Å This project may have been created but never saved with field data")
+                # Check if there are other projects with similar names that might have the data
+                cursor.execute("SELECT id, name, COALESCE(LENGTH(data), data_size, 0) as data_length FROM projects WHERE name LIKE ? AND id != ?", 
+                             (f"%{project.get('name')}%", project.get('id')))
+                similar_with_data = cursor.fetchall()
+                if similar_with_data:
+                    logger.warning(f"ΓÜá∩╕Å Found {len(similar_with_data)} other projects with similar names:")
+                    for proj in similar_with_data:
+                        logger.warning(f"   - ID: {proj[0]}, Name: '{proj[1]}', Data length: {proj[2] or 0} chars")
             
             # Return in format expected by JavaScript
             # JavaScript expects: data.project.data to contain JSON string with payload field
             # So we need to wrap it properly
-            response_data = json.dumps({"payload": json.dumps(project_data)})
+            response_data = project_store.legacy_data(project_data)
             logger.info(f"≡ƒôñ Preparing response for project '{project.get('name')}' (ID: {project.get('id')})")
             logger.info(f"≡ƒôñ Response data length: {len(response_data)} chars")
             logger.info(f"≡ƒôñ Response data (first 500 chars): {response_data[:500]}")
@@ -12178,10 +12079,8 @@ def load_project():
 
 @app.route("/api/projects/search/<path:search_term>", methods=["GET"])
 def search_projects(search_term):
-    """Search for projects by name and show which ones have data"""
+    """Search projects by name, company or facility address and show which ones have data"""
     try:
-        import json
-        
         # Get org_id for multi-tenant isolation
         org_id = get_current_org_id(request)
         if not org_id:
@@ -12191,56 +12090,24 @@ def search_projects(search_term):
             if conn is None:
                 return jsonify({"error": "Database not available"}), 500
             
-            cursor = conn.cursor()
-            
-            # Search for projects with similar names
-            cursor.execute(
-                """
-                SELECT id, name, LENGTH(data) as data_length, 
-                       CASE WHEN data IS NULL OR data = '' THEN 0 ELSE 1 END as has_data
-                FROM projects 
-                WHERE name LIKE ? COLLATE NOCASE
-                ORDER BY has_data DESC, data_length DESC, id DESC
-                LIMIT 20
-                """,
-                (f"%{search_term}%",)
-            )
-            
+            # Match against the FTS index / summary columns - no payload decoding
             projects = []
-            for row in cursor.fetchall():
-                project_id, name, data_length, has_data = row
-                
-                # Try to get sample fields if data exists
+            for row in project_index.search(conn, search_term):
+                data_length = row["data_length"] or 0
                 sample_fields = {}
-                if has_data and data_length > 0:
-                    try:
-                        cursor.execute("SELECT data FROM projects WHERE id = ?", (project_id,))
-                        data_row = cursor.fetchone()
-                        if data_row and data_row[0]:
-                            data_obj = json.loads(data_row[0])
-                            if isinstance(data_obj, dict) and "payload" in data_obj:
-                                payload_str = data_obj["payload"]
-                                if isinstance(payload_str, str):
-                                    payload = json.loads(payload_str)
-                                else:
-                                    payload = payload_str
-                                
-                                # Get sample Project Information fields
-                                sample_fields = {
-                                    "company": payload.get("company"),
-                                    "facility_address": payload.get("facility_address"),
-                                    "location": payload.get("location"),
-                                    "facility_state": payload.get("facility_state"),
-                                    "field_count": len(payload) if isinstance(payload, dict) else 0
-                                }
-                    except Exception as e:
-                        sample_fields = {"error": str(e)}
-                
+                if data_length > 0:
+                    sample_fields = {
+                        "company": row["company"],
+                        "facility_address": row["facility_address"],
+                        "location": row["location"],
+                        "facility_state": row["facility_state"],
+                        "field_count": row["field_count"] or 0
+                    }
                 projects.append({
-                    "id": project_id,
-                    "name": name,
-                    "data_length": data_length or 0,
-                    "has_data": bool(has_data),
+                    "id": row["id"],
+                    "name": row["name"],
+                    "data_length": data_length,
+                    "has_data": data_length > 0,
                     "sample_fields": sample_fields
                 })
             
@@ -12262,8 +12129,6 @@ def search_projects(search_term):
 def find_cloud_kitchen_with_data():
     """Find Cloud Kitchen projects and identify which one has 160+ fields"""
     try:
-        import json
-        
         logger.info("=" * 80)
         logger.info("≡ƒöì /api/projects/find-cloud-kitchen endpoint called")
         logger.info(f"≡ƒôÑ Request headers: Authorization={bool(request.headers.get('Authorization'))}, X-Session-Token={bool(request.headers.get('X-Session-Token'))}, Cookie={bool(request.cookies.get('session_token'))}")
@@ -12302,7 +12167,7 @@ def find_cloud_kitchen_with_data():
             for pattern in search_patterns:
                 cursor.execute(
                     """
-                    SELECT id, name, data 
+                    SELECT id, name, data, storage_version, data_size
                     FROM projects 
                     WHERE name LIKE ? COLLATE NOCASE
                     ORDER BY id DESC
@@ -12322,46 +12187,39 @@ def find_cloud_kitchen_with_data():
             project_with_160_plus = None
             
             for row in all_matching_projects:
-                project_id, name, data = row
+                project_id, name, data, storage_version, data_size = row
+                project = {"id": project_id, "data": data, "storage_version": storage_version, "data_size": data_size}
                 field_count = 0
                 sample_fields = {}
                 
-                if data:
-                    try:
-                        data_obj = json.loads(data)
-                        if isinstance(data_obj, dict) and "payload" in data_obj:
-                            payload_str = data_obj["payload"]
-                            if isinstance(payload_str, str):
-                                payload = json.loads(payload_str)
-                            else:
-                                payload = payload_str
-                            
-                            if isinstance(payload, dict):
-                                field_count = len(payload)
-                                logger.info(f"≡ƒôè Project {project_id} ('{name}'): {field_count} fields")
-                                
-                                # Get sample Project Information fields
-                                sample_fields = {
-                                    "company": payload.get("company"),
-                                    "facility_address": payload.get("facility_address"),
-                                    "location": payload.get("location"),
-                                    "facility_state": payload.get("facility_state"),
-                                    "facility_zip": payload.get("facility_zip"),
-                                    "contact": payload.get("contact"),
-                                    "phone": payload.get("phone"),
-                                    "email": payload.get("email")
-                                }
-                                
-                                if field_count >= 160:
-                                    logger.info(f"Γ£à Found project with 160+ fields: ID {project_id}, Name '{name}', Fields: {field_count}")
-                    except Exception as e:
-                        logger.warning(f"ΓÜá∩╕Å Error parsing project {project_id} ('{name}'): {e}")
+                try:
+                    payload = project_store.read_fields(conn, project)
+                    if payload:
+                        field_count = len(payload)
+                        logger.info(f"≡ƒôè Project {project_id} ('{name}'): {field_count} fields")
+                        
+                        # Get sample Project Information fields
+                        sample_fields = {
+                            "company": payload.get("company"),
+                            "facility_address": payload.get("facility_address"),
+                            "location": payload.get("location"),
+                            "facility_state": payload.get("facility_state"),
+                            "facility_zip": payload.get("facility_zip"),
+                            "contact": payload.get("contact"),
+                            "phone": payload.get("phone"),
+                            "email": payload.get("email")
+                        }
+                        
+                        if field_count >= 160:
+                            logger.info(f"Γ£à Found project with 160+ fields: ID {project_id}, Name '{name}', Fields: {field_count}")
+                except Exception as e:
+                    logger.warning(f"ΓÜá∩╕Å Error parsing project {project_id} ('{name}'): {e}")
                 
                 project_info = {
                     "id": project_id,
                     "name": name,
                     "field_count": field_count,
-                    "data_length": len(data) if data else 0,
+                    "data_length": project_store.stored_size(project),
                     "has_data": field_count > 0,
                     "sample_fields": sample_fields
                 }
@@ -12385,7 +12243,7 @@ def find_cloud_kitchen_with_data():
             all_projects_list = []
             if len(cloud_kitchen_projects) == 0:
                 logger.warning(f"ΓÜá∩╕Å No Cloud Kitchen projects found. Listing ALL projects in org_id={org_id} for diagnostics...")
-                cursor.execute("SELECT id, name, LENGTH(data) as data_length FROM projects ORDER BY id DESC LIMIT 20")
+                cursor.execute("SELECT id, name, COALESCE(LENGTH(data), data_size, 0) as data_length FROM projects ORDER BY id DESC LIMIT 20")
                 all_projects = cursor.fetchall()
                 for proj in all_projects:
                     all_projects_list.append({
@@ -12601,13 +12459,16 @@ def debug_project_raw(project_id):
                 return jsonify({"error": "Database not available"}), 500
             
             cursor = conn.cursor()
-            cursor.execute("SELECT id, name, data, LENGTH(data) as data_length FROM projects WHERE id = ?", (project_id,))
+            cursor.execute("SELECT id, name, data, storage_version, data_size FROM projects WHERE id = ?", (project_id,))
             row = cursor.fetchone()
             
             if not row:
                 return jsonify({"error": f"Project {project_id} not found in org_id={org_id}"}), 404
             
-            project_id_db, name, data, data_length = row
+            project = project_store.legacy_row(conn, dict(row))
+            project_id_db, name, data = project["id"], project["name"], project["data"]
+            data_length = project_store.stored_size(row)
+            storage_version = project.get("storage_version") or 1
             
             # Try to parse the data
             parsed_data = None
@@ -12645,6 +12506,7 @@ def debug_project_raw(project_id):
                 "project_id": project_id_db,
                 "name": name,
                 "data_length": data_length or 0,
+                "storage_version": storage_version,
                 "raw_data_preview": str(data)[:500] if data else None,
                 "parsed_data_type": type(parsed_data).__name__ if parsed_data else None,
                 "parsed_data_keys": list(parsed_data.keys()) if isinstance(parsed_data, dict) else None,
@@ -12676,12 +12538,12 @@ def debug_project(project_id):
                 return jsonify({"error": "Database not available"}), 500
             
             cursor = conn.cursor()
-            cursor.execute("SELECT id, name, data FROM projects WHERE id = ?", (project_id,))
+            cursor.execute("SELECT id, name, data, storage_version FROM projects WHERE id = ?", (project_id,))
             row = cursor.fetchone()
             
             if not row:
                 # Also check if there are projects with similar names
-                cursor.execute("SELECT id, name, LENGTH(data) as data_length FROM projects WHERE name LIKE ? LIMIT 10", 
+                cursor.execute("SELECT id, name, COALESCE(LENGTH(data), data_size, 0) as data_length FROM projects WHERE name LIKE ? LIMIT 10", 
                              (f"%Cloud%",))
                 similar = cursor.fetchall()
                 return jsonify({
@@ -12691,7 +12553,7 @@ def debug_project(project_id):
                 }), 404
             
             columns = [description[0] for description in cursor.description]
-            project = dict(zip(columns, row))
+            project = project_store.legacy_row(conn, dict(zip(columns, row)))
             
             # Try to parse the data
             parsed_data = None
@@ -12826,11 +12688,11 @@ def projects_save():
             
             # If project_id is provided, use it directly (most reliable - prevents duplicates)
             if project_id:
-                cursor.execute("SELECT id, name, data FROM projects WHERE id = ?", (project_id,))
+                cursor.execute("SELECT id, name, COALESCE(LENGTH(data), data_size, 0) FROM projects WHERE id = ?", (project_id,))
                 project_row = cursor.fetchone()
                 if project_row:
                     logger.info(f"Found project by ID {project_id}: '{project_row[1]}' (will update this project regardless of name '{name}')")
-                    logger.info(f"Current data in DB: {len(project_row[2]) if project_row[2] else 0} chars")
+                    logger.info(f"Current data in DB: {project_row[2]} chars")
                     final_project_id = project_id
                 else:
                     logger.warning(f"Project ID {project_id} not found in org_id={org_id}, will create new project with name '{name}'")
@@ -12858,18 +12720,16 @@ def projects_save():
                     value = project_data.get(field)
                     logger.info(f"Field '{field}' value before save: '{value}' (type: {type(value).__name__}, length: {len(str(value)) if value else 0})")
                 
-                data_to_save = json.dumps({"payload": payload_str})
-                logger.info(f"Data to save to DB (first 300 chars): {data_to_save[:300]}")
-                
                 cursor.execute(
                     """
-                    INSERT INTO projects (name, description, data, created_at, updated_at)
-                    VALUES (?, ?, ?, datetime('now'), datetime('now'))
+                    INSERT INTO projects (name, description, created_at, updated_at)
+                    VALUES (?, ?, datetime('now'), datetime('now'))
                 """,
-                    (name, "", data_to_save),
+                    (name, ""),
                 )
                 final_project_id = cursor.lastrowid
-                logger.info(f"[OK] Created new project '{name}' (ID: {final_project_id}) and saved data with {len(project_data)} fields")
+                saved_name = name
+                logger.info(f"[OK] Created new project '{name}' (ID: {final_project_id})")
             else:
                 # Update existing project - use ID to avoid name mismatch issues
                 final_project_id = project_row[0]
@@ -12886,42 +12746,23 @@ def projects_save():
                     value = project_data.get(field)
                     logger.info(f"Field '{field}' value before save: '{value}' (type: {type(value).__name__}, length: {len(str(value)) if value else 0})")
                 
-                data_to_save = json.dumps({"payload": payload_str})
-                logger.info(f"Data to save to DB (first 300 chars): {data_to_save[:300]}")
-                
                 cursor.execute(
                     """
-                    UPDATE projects SET data = ?, updated_at = datetime('now') WHERE id = ?
+                    UPDATE projects SET updated_at = datetime('now') WHERE id = ?
                 """,
-                    (data_to_save, final_project_id),
+                    (final_project_id,),
                 )
-                logger.info(f"[OK] Project '{actual_name}' (ID: {final_project_id}) updated with {len(project_data)} fields")
+                saved_name = actual_name
 
+            # Only fields whose value changed are rewritten
+            stats = project_store.save(conn, final_project_id, project_data)
+            project_index.upsert(conn, final_project_id, saved_name, project_data, stats["size"])
             conn.commit()
+            logger.info(
+                f"[OK] Project '{saved_name}' (ID: {final_project_id}) saved with {len(project_data)} fields "
+                f"({stats['written']} written, {stats['deleted']} removed, {stats['size']} chars)"
+            )
             
-            # CRITICAL: Verify commit succeeded
-            logger.info(f"≡ƒÆ╛ Commit completed for project ID {final_project_id}")
-            
-            # Verify the data was actually saved
-            cursor.execute("SELECT data FROM projects WHERE id = ?", (final_project_id,))
-            saved_row = cursor.fetchone()
-            if saved_row and saved_row[0]:
-                try:
-                    saved_data = json.loads(saved_row[0])
-                    if isinstance(saved_data, dict) and "payload" in saved_data:
-                        saved_payload = json.loads(saved_data["payload"])
-                        logger.info(f"Γ£à Verified: Saved {len(saved_payload)} fields to database for project ID {final_project_id}")
-                        logger.info(f"Γ£à Sample saved fields: {list(saved_payload.keys())[:10]}")
-                    else:
-                        logger.warning(f"ΓÜá∩╕Å Saved data format unexpected for project ID {final_project_id}: {type(saved_data)}")
-                except (json.JSONDecodeError, TypeError) as e:
-                    logger.warning(f"ΓÜá∩╕Å Could not verify saved data: {e}")
-                    import traceback
-                    logger.error(traceback.format_exc())
-            else:
-                logger.error(f"Γ¥î ERROR: Data not found after save for project ID {final_project_id}")
-                logger.error(f"Γ¥î This indicates the save operation may have failed silently")
-
             return jsonify({
                 "ok": True,
                 "method": "database",
@@ -13117,6 +12958,38 @@ def get_pe_stats():
             "recent_pe": 0,
         })
 
+@app.route("/api/dashboard/summary")
+def get_dashboard_summary():
+    """Everything the main dashboard shows, in one round trip
+
+    Raw files, clipping and projects come from the organization's database;
+    PE figures and report-based project counts from the shared database.
+    """
+    try:
+        with get_db_connection() as conn:
+            shared = dashboard_counters.summary(conn) if conn is not None else empty_summary()
+
+        summary = empty_summary()
+        org_id = get_current_org_id(request)
+        if org_id:
+            with get_db_connection(org_id=org_id) as conn:
+                if conn is not None:
+                    summary = dashboard_counters.summary(conn)
+
+        projects = dict(summary["projects"])
+        projects["completed_projects"] = shared["projects"]["completed_projects"]
+        projects["project_files"] = shared["projects"]["project_files"]
+        return jsonify({
+            "status": "success",
+            "raw_files": summary["raw_files"],
+            "clipping": summary["clipping"],
+            "projects": projects,
+            "pe": shared["pe"],
+        })
+    except Exception as e:
+        logger.error(f"Error getting dashboard summary: {e}")
+        return jsonify({"status": "error", "error": str(e)}), 500
+
 @app.route("/api/csv/fingerprints")
 def get_csv_fingerprints():
     """Get fingerprints for all CSV files"""
@@ -15608,10 +15481,15 @@ def run_scheduled_pe_verification():
 def start_pe_verification_scheduler():
     """
     Start the background thread for scheduled PE license re-verification
+
+    Every worker starts the thread, but only the one holding
+    results/pe_verification_scheduler.lock runs the loop; the others wait
+    and take over if it exits.
     """
     try:
         verification_thread = threading.Thread(
-            target=run_scheduled_pe_verification,
+            target=run_as_leader,
+            args=(os.path.join(RESULTS_DIR, "pe_verification_scheduler.lock"), run_scheduled_pe_verification),
             daemon=True,
             name="PEVerificationScheduler"
         )
@@ -16850,6 +16728,76 @@ def upload_interface():
         return f"Error loading upload interface: {str(e)}", 500
 
 
+@job_queue.handler("raw_meter_profile", resumable=True)
+def profile_raw_meter_file(job, file_id, file_path):
+    """Background part of an upload: column detection and statistics for the stored CSV"""
+    from main_hardened_ready_fixed import EnhancedDataProcessor
+
+    profile = upload_pipeline.profile_csv(
+        file_path, EnhancedDataProcessor().column_patterns, progress=job.progress
+    )
+    profile["file_id"] = file_id
+    return profile
+
+
+@app.route("/api/jobs", methods=["GET"])
+def list_jobs():
+    """Recent background jobs of the caller's org"""
+    limit = min(request.args.get("limit", 50, type=int), 200)
+    return jsonify({"status": "success", "jobs": job_queue.list(org_id=get_current_org_id(request), limit=limit)})
+
+
+def _visible_job(job_id):
+    """The job, if the caller may see it"""
+    job = job_queue.get(job_id)
+    if job is None or job["org_id"] != get_current_org_id(request):
+        return None
+    return job
+
+
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def get_job_status(job_id):
+    """Status and progress of a background job (the result once it has finished)"""
+    job = _visible_job(job_id)
+    if job is None:
+        return jsonify({"status": "error", "error": "Job not found"}), 404
+    return jsonify({"status": "success", "job": job})
+
+
+@app.route("/api/jobs/<job_id>/cancel", methods=["POST"])
+def cancel_job(job_id):
+    """Cancel a queued job; a running one stops at its next checkpoint"""
+    if _visible_job(job_id) is None:
+        return jsonify({"status": "error", "error": "Job not found"}), 404
+    return jsonify({"status": "success", "job": job_queue.cancel(job_id)})
+
+
+@app.route("/api/jobs/<job_id>/result", methods=["GET"])
+def get_job_result(job_id):
+    """
+    Result of a finished job: for a deferred request, the response the
+    endpoint produced (same status, type and body as a synchronous call)
+    """
+    job = _visible_job(job_id)
+    if job is None:
+        return jsonify({"status": "error", "error": "Job not found"}), 404
+    result = job["result"]
+    if result is None:
+        if job["status"] == "failed":
+            return jsonify({"status": "error", "error": job["error"] or "Job failed"}), 500
+        return jsonify({"status": "error", "error": f"Job is {job['status']}", "job": job}), 409
+    response_path = job_queue.file_path(job_id, "response.body")
+    if "status_code" not in result or not os.path.exists(response_path):
+        return jsonify({"status": "success", "result": result})
+    response = send_file(response_path, mimetype=result["content_type"])
+    response.status_code = result["status_code"]
+    if result.get("content_disposition"):
+        response.headers["Content-Disposition"] = result["content_disposition"]
+    else:
+        response.headers.pop("Content-Disposition", None)
+    return response
+
+
 @app.route("/api/raw-meter-data/upload", methods=["POST"])
 def upload_raw_meter_data():
     """Upload raw meter data CSV files"""
@@ -16879,6 +16827,11 @@ def upload_raw_meter_data():
         if not uploaded_by:
             return jsonify({"status": "error", "error": "User ID required"}), 400
 
+        # Get org_id for multi-tenant isolation
+        org_id = get_current_org_id(request)
+        if not org_id:
+            return jsonify({"status": "error", "error": "Organization ID required. Please log in again."}), 401
+
         # Import CSVIntegrityProtection from fixed file
         from main_hardened_ready_fixed import CSVIntegrityProtection
 
@@ -16898,22 +16851,17 @@ def upload_raw_meter_data():
             filename = f"{today}_{clean_filename}"
             file_path = os.path.join(raw_data_dir, filename)
 
-            # Save file
-            file.save(file_path)
-            file_size = os.path.getsize(file_path)
-
-            # Create fingerprint for integrity
+            # Stream to disk, fingerprinting on the way (no second read of the file)
             csv_integrity = CSVIntegrityProtection()
-            with open(file_path, "r", encoding="utf-8") as f:
-                file_content = f.read()
-            fingerprint_data = csv_integrity.create_content_fingerprint(file_content)
+            spooled = upload_pipeline.spool_upload(
+                file.stream, file_path, csv_integrity.secret_key
+            )
+            file_size = spooled["size"]
+            fingerprint_data = csv_integrity.record_fingerprint(
+                spooled["content_hash"], spooled["hmac_signature"], spooled["metadata"]
+            )
             fingerprint = fingerprint_data["content_hash"]  # Store just the hash string
 
-            # Get org_id for multi-tenant isolation
-            org_id = get_current_org_id(request)
-            if not org_id:
-                return jsonify({"status": "error", "error": "Organization ID required. Please log in again."}), 401
-
             # Store file metadata in org-specific database
             with get_db_connection(org_id=org_id) as conn:
                 if conn is None:
@@ -16925,21 +16873,6 @@ def upload_raw_meter_data():
                     )
 
                 cursor = conn.cursor()
-                # Ensure raw_meter_data table exists in org-specific database
-                cursor.execute("""
-                    CREATE TABLE IF NOT EXISTS raw_meter_data (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        file_name TEXT NOT NULL,
-                        file_path TEXT NOT NULL,
-                        file_size INTEGER,
-                        fingerprint TEXT,
-                        uploaded_by TEXT,
-                        upload_date TEXT DEFAULT CURRENT_TIMESTAMP,
-                        verification_status TEXT DEFAULT 'pending'
-                    )
-                """)
-                conn.commit()
-                
                 cursor.execute(
                     """
                     INSERT INTO raw_meter_data (file_name, file_path, file_size, fingerprint, uploaded_by)
@@ -16951,16 +16884,24 @@ def upload_raw_meter_data():
                 file_id = cursor.lastrowid
                 conn.commit()
 
-                logger.info(f"Raw meter data uploaded: {file.filename} (ID: {file_id})")
+            logger.info(f"Raw meter data uploaded: {file.filename} (ID: {file_id})")
 
-                uploaded_files.append(
-                    {
-                        "file_id": file_id,
-                        "filename": file.filename,
-                        "size": file_size,
-                        "fingerprint": fingerprint,
-                    }
-                )
+            # Column detection and statistics run in the background; poll /api/jobs/<id>
+            profile_job_id = job_queue.submit(
+                "raw_meter_profile",
+                {"file_id": file_id, "file_path": file_path},
+                org_id=org_id,
+            )
+
+            uploaded_files.append(
+                {
+                    "file_id": file_id,
+                    "filename": file.filename,
+                    "size": file_size,
+                    "fingerprint": fingerprint,
+                    "profile_job_id": profile_job_id,
+                }
+            )
 
         return jsonify(
             {
@@ -17347,31 +17288,6 @@ def apply_clipping_to_original_file(file_id):
                 )
 
             cursor = conn.cursor()
-            # Ensure data_modifications table exists
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS data_modifications (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    file_id INTEGER NOT NULL,
-                    modifier_id INTEGER NOT NULL,
-                    modification_type TEXT NOT NULL,
-                    reason TEXT,
-                    rows_removed INTEGER,
-                    rows_modified INTEGER,
-                    fingerprint_before TEXT,
-                    fingerprint_after TEXT,
-                    modification_details TEXT,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                    FOREIGN KEY (file_id) REFERENCES raw_meter_data (id),
-                    FOREIGN KEY (modifier_id) REFERENCES users (id)
-                )
-            """)
-            
-            # Create index for better performance
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_modifications_file ON data_modifications(file_id)
-            """)
-            
-            conn.commit()
             
             cursor.execute(
                 """
@@ -19171,9 +19087,11 @@ def main_dashboard():
 def get_dashboard_statistics():
     """Get dashboard statistics for display"""
     try:
+        with get_db_connection() as conn:
+            summary = dashboard_counters.summary(conn) if conn is not None else empty_summary()
         return {
-            "total_projects": 0,
-            "active_analyses": 0,
+            "total_projects": summary["projects"]["total_projects"],
+            "active_analyses": summary["projects"]["active_projects"],
             "system_status": "healthy",
             "last_updated": datetime.now().isoformat()
         }
@@ -31041,6 +30959,7 @@ def generate_utility_submission_package(results_data):
         # Create ZIP file
         with zipfile.ZipFile(zip_path, "w", zipfile.ZIP_DEFLATED) as zipf:
             
+            job_checkpoint(0.05, "Section 0: Submission checklist")
             # ============================================
             # SECTION 0: SUBMISSION CHECKLIST
             # ============================================
@@ -31070,6 +30989,7 @@ def generate_utility_submission_package(results_data):
                 zipf.write(checklist_file, "00_Submission_Checklist.txt")
                 logger.info("UTILITY SUBMISSION PACKAGE - Added 00_Submission_Checklist.txt")
             
+            job_checkpoint(0.11, "Section 1: Cover letter & application")
             # ============================================
             # SECTION 1: COVER LETTER & APPLICATION
             # ============================================
@@ -31096,6 +31016,7 @@ def generate_utility_submission_package(results_data):
                     f.write(cover_letter)
                 zipf.write(cover_file, "01_Cover_Letter_Application.txt")
             
+            job_checkpoint(0.17, "Section 2: Executive summary")
             # ============================================
             # SECTION 2: EXECUTIVE SUMMARY
             # ============================================
@@ -31114,6 +31035,7 @@ def generate_utility_submission_package(results_data):
                     f.write(exec_summary)
                 zipf.write(exec_file, "02_Executive_Summary.txt")
             
+            job_checkpoint(0.23, "Section 3: Technical analysis reports")
             # ============================================
             # SECTION 3: TECHNICAL ANALYSIS REPORTS
             # ============================================
@@ -31155,6 +31077,7 @@ def generate_utility_submission_package(results_data):
                 except Exception as fallback_e:
                     logger.error(f"Could not generate fallback PDF reports: {fallback_e}")
             
+            job_checkpoint(0.29, "Section 4: Standards compliance reports")
             # ============================================
             # SECTION 4: STANDARDS COMPLIANCE REPORTS
             # ============================================
@@ -31192,6 +31115,7 @@ def generate_utility_submission_package(results_data):
                 else:
                     logger.warning(f"UTILITY SUBMISSION PACKAGE - No content generated for {standard_name} compliance report")
             
+            job_checkpoint(0.35, "Section 5: PE documentation")
             # ============================================
             # SECTION 5: PE DOCUMENTATION
             # ============================================
@@ -31237,6 +31161,7 @@ def generate_utility_submission_package(results_data):
                 except Exception as checklist_e:
                     logger.warning(f"UTILITY PACKAGE - Could not generate PE review checklist: {checklist_e}")
             
+            job_checkpoint(0.41, "Section 6: Data quality & validation")
             # ============================================
             # SECTION 6: DATA QUALITY & VALIDATION
             # ============================================
@@ -31421,6 +31346,7 @@ def generate_utility_submission_package(results_data):
                 
                 logger.info(f"UTILITY SUBMISSION PACKAGE - Total CSV files added to package: {files_added_count}")
             
+            job_checkpoint(0.47, "Section 7: Audit trail documentation")
             # ============================================
             # SECTION 7: AUDIT TRAIL DOCUMENTATION
             # ============================================
@@ -31589,6 +31515,7 @@ def generate_utility_submission_package(results_data):
                 except Exception as e:
                     logger.warning(f"UTILITY PACKAGE - Could not generate data modification history PDF: {e}")
             
+            job_checkpoint(0.53, "Section 8: Financial analysis")
             # ============================================
             # SECTION 8: FINANCIAL ANALYSIS
             # ============================================
@@ -31610,6 +31537,7 @@ def generate_utility_submission_package(results_data):
                     f.write(financial_report)
                 zipf.write(fin_file, "08_Financial_Analysis/Financial_Analysis_Report.txt")
             
+            job_checkpoint(0.59, "Section 9: Weather normalization")
             # ============================================
             # SECTION 9: WEATHER NORMALIZATION
             # ============================================
@@ -31679,6 +31607,7 @@ def generate_utility_submission_package(results_data):
                         zipf.write(weather_excel_file, "09_Weather_Normalization/Weather_Data_Detailed.xlsx")
                         logger.info("UTILITY PACKAGE - Added Weather_Data_Detailed.xlsx")
             
+            job_checkpoint(0.65, "Section 10: Equipment health & predictive failure analysis")
             # ============================================
             # SECTION 10: EQUIPMENT HEALTH & PREDICTIVE FAILURE ANALYSIS
             # ============================================
@@ -31751,6 +31680,7 @@ def generate_utility_submission_package(results_data):
                 zipf.write(equipment_json_file, "10_Equipment_Health/Equipment_Health_Data.json")
                 logger.info("UTILITY PACKAGE - Added Equipment_Health_Data.json (JSON only)")
             
+            job_checkpoint(0.71, "Section 11: Supporting documentation")
             # ============================================
             # SECTION 11: SUPPORTING DOCUMENTATION
             # ============================================
@@ -31803,6 +31733,7 @@ def generate_utility_submission_package(results_data):
                     f.write(config_doc)
                 zipf.write(config_file, "11_Supporting_Documentation/System_Configuration.txt")
             
+            job_checkpoint(0.77, "Section 12: Verification certificate")
             # ============================================
             # SECTION 12: VERIFICATION CERTIFICATE
             # ============================================
@@ -31829,6 +31760,7 @@ def generate_utility_submission_package(results_data):
                     f.write(verification_cert)
                 zipf.write(cert_file, "12_Verification_Certificate.txt")
             
+            job_checkpoint(0.83, "Section 13: Rebate & incentive package")
             # ============================================
             # SECTION 13: REBATE & INCENTIVE PACKAGE
             # ============================================
@@ -32187,6 +32119,7 @@ If this error persists, please contact support.
                 zipf.write(index_file, "PACKAGE_INDEX.txt")
                 logger.info("UTILITY SUBMISSION PACKAGE - Added PACKAGE_INDEX.txt")
             
+            job_checkpoint(0.9, "Merging PDF documents")
             # ===== CREATE MERGED PDF WITH ALL DOCUMENTS =====
             logger.info("=" * 80)
             logger.info("UTILITY SUBMISSION PACKAGE - STARTING PDF MERGE PROCESS")
@@ -32346,6 +32279,9 @@ If this error persists, please contact support.
         logger.info(f"UTILITY SUBMISSION PACKAGE - Package generated successfully: {zip_filename}")
         return zip_buffer
         
+    except JobCancelled:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+        raise
     except Exception as e:
         logger.error(f"UTILITY SUBMISSION PACKAGE - Error generating package: {e}")
         import traceback
@@ -32353,6 +32289,7 @@ If this error persists, please contact support.
         raise
 
 @app.route("/api/generate-utility-submission-package", methods=["POST"])
+@job_queue.deferrable("utility_submission_package")
 @api_guard
 def generate_utility_submission_package_endpoint():
     """Generate comprehensive Utility Submission Package"""
@@ -32871,9 +32808,20 @@ def upload_transformers_csv():
 def logout_user():
     """Logout user and clear session"""
     try:
-        # Clear session data (if using sessions)
-        # For now, just return success
-        # The frontend will handle clearing local storage/session storage
+        # End the server-side session; the frontend clears local/session storage
+        session_token = (
+            request.headers.get('Authorization') or
+            request.headers.get('X-Session-Token') or
+            request.cookies.get('session_token') or
+            (request.get_json(silent=True) or {}).get('session_token')
+        )
+        if session_token:
+            if session_token.startswith('Bearer '):
+                session_token = session_token[7:]
+            session_cache.invalidate_token(session_token)
+            with get_db_connection(use_sessions_db=True) as conn:
+                conn.execute("DELETE FROM user_sessions WHERE session_token = ?", (session_token,))
+                conn.commit()
         return jsonify({"status": "success", "message": "Logged out successfully"}), 200
     except Exception as e:
         logger.error(f"Error during logout: {e}")
@@ -37070,6 +37018,7 @@ def admin_edit_user():
                     UPDATE users SET {', '.join(updates)} WHERE id = ?
                 """, params)
                 conn.commit()
+                session_cache.invalidate_user(user_id)
                 
                 logger.info(f"Admin: Updated user ID {user_id}")
                 return jsonify({"success": True, "message": "User updated successfully"}), 200
@@ -37189,6 +37138,7 @@ def admin_delete_user():
                 # Delete user
                 cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
                 conn.commit()
+                session_cache.invalidate_user(user_id)
                 
                 logger.info(f"Admin: Deleted user {username} (ID: {user_id})")
                 return jsonify({"success": True, "message": f"User {username} deleted successfully"}), 200
@@ -38443,6 +38393,15 @@ def inject_globals():
         "money": money
     }
 
+# Pick up background jobs left queued (or interrupted) by the previous run
+job_queue.resume()
+
+# Under gunicorn __main__ never runs, so each worker starts the scheduler here
+# and the leader lock lets exactly one of them run it
+if shared_state.multi_worker and __name__ != "__main__":
+    start_pe_verification_scheduler()
+
+
 # Main execution
 if __name__ == "__main__":
     print("*** SYNEREX POWER ANALYSIS SYSTEM - REFACTORED VERSION 3.8 ***")
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Streaming PDF / ZIP assembly for merged reports and the audit package
+
+assemble_pdf() merges the input PDFs into one PdfWriter and stamps the
+"<document name> ... Page N of M" footer in the same pass. All footers
+are drawn on one ReportLab canvas (one page per output page, sized like
+that page) and parsed once, instead of building and parsing one overlay
+PDF per page. The result is written straight to a path or to any binary
+stream, e.g. a ZIP member, so no intermediate merged file is written
+and read back.
+
+PackageZipFile is a ZipFile that stores members which are already
+compressed (PNG, JPEG, XLSX, ...) instead of deflating them again, and
+can open a member as a seekable stream that is added to the archive only
+once the writer has finished without an error. PDFs are
+still deflated: ReportLab output is ASCII85-encoded and PyPDF2 writes
+plain object tables, so they shrink by 20-60% in the archive.
+"""
+
+import io
+import logging
+import os
+import shutil
+import tempfile
+import time
+import zipfile
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+FOOTER_FONT = "Helvetica"
+FOOTER_FONT_SIZE = 6
+FOOTER_Y = 20  # points from bottom
+FOOTER_MARGIN = 30
+
+# Formats whose content is already compressed; deflating them again costs CPU for little gain
+PRECOMPRESSED_SUFFIXES = (".png", ".jpg", ".jpeg", ".gif", ".xlsx", ".docx", ".zip", ".gz")
+
+# open_member() keeps a member this size in memory before spilling it to a temp file
+MEMBER_SPOOL_BYTES = 16 * 1024 * 1024
+SPOOL_COPY_CHUNK = 1024 * 1024
+
+
+def build_footer_overlays(page_sizes, document_name):
+    """One PdfReader whose page i is the footer for output page i (sizes from ``page_sizes``)"""
+    from PyPDF2 import PdfReader
+    from reportlab.pdfgen import canvas
+
+    total_pages = len(page_sizes)
+    packet = io.BytesIO()
+    can = canvas.Canvas(packet)
+    for page_num, (page_width, page_height) in enumerate(page_sizes, start=1):
+        can.setPageSize((page_width, page_height))
+        can.setFont(FOOTER_FONT, FOOTER_FONT_SIZE)
+        can.setFillColorRGB(0, 0, 0)  # Black color
+
+        # Document name on left, page number on right
+        can.drawString(FOOTER_MARGIN, FOOTER_Y, document_name)
+        footer_text_right = f"Page {page_num} of {total_pages}"
+        text_width = can.stringWidth(footer_text_right, FOOTER_FONT, FOOTER_FONT_SIZE)
+        can.drawString(page_width - text_width - FOOTER_MARGIN, FOOTER_Y, footer_text_right)
+        can.showPage()
+    can.save()
+    packet.seek(0)
+    return PdfReader(packet)
+
+
+def assemble_pdf(pdf_files, output, document_name=None):
+    """Merge ``pdf_files`` (in order, duplicates and missing files skipped) into ``output``
+
+    ``output`` is a file path, a writable binary stream, or a callable
+    returning a context manager for one (opened only once the merge has
+    succeeded, e.g. ``lambda: zipf.open_member(name)``). When
+    ``document_name`` is given every page gets the footer. Returns
+    (added_count, skipped_count, page_count).
+    """
+    from PyPDF2 import PdfWriter
+
+    writer = PdfWriter()
+    files_added = set()
+    added_count = 0
+    skipped_count = 0
+
+    for pdf_file in pdf_files:
+        if not os.path.exists(pdf_file):
+            continue
+        # Normalize path for duplicate checking
+        normalized_path = os.path.normpath(os.path.abspath(pdf_file))
+        if normalized_path in files_added:
+            logger.debug(f"PDF MERGE - Skipping duplicate: {os.path.basename(pdf_file)}")
+            skipped_count += 1
+            continue
+        try:
+            writer.append(pdf_file)
+            files_added.add(normalized_path)
+            added_count += 1
+            logger.debug(f"PDF MERGE - Added {os.path.basename(pdf_file)} to merge")
+        except Exception as e:
+            logger.warning(f"PDF MERGE - Could not add {os.path.basename(pdf_file)}: {e}")
+
+    page_count = len(writer.pages)
+    if document_name and page_count:
+        logger.info(f"PDF MERGE - Adding footers to {page_count} pages with document name: {document_name}")
+        page_sizes = [(float(page.mediabox.width), float(page.mediabox.height)) for page in writer.pages]
+        overlays = build_footer_overlays(page_sizes, document_name)
+        for page, footer_page in zip(writer.pages, overlays.pages):
+            page.merge_page(footer_page)
+            # merge_page leaves an uncompressed content stream behind
+            page.compress_content_streams()
+
+    if callable(output):
+        with output() as stream:
+            writer.write(stream)
+    else:
+        writer.write(output)
+    return added_count, skipped_count, page_count
+
+
+class PackageZipFile(zipfile.ZipFile):
+    """ZIP_DEFLATED archive that stores already-compressed members as-is"""
+
+    def __init__(self, file, mode="w", compression=zipfile.ZIP_DEFLATED, **kwargs):
+        super().__init__(file, mode, compression, **kwargs)
+
+    @staticmethod
+    def _compress_type(arcname):
+        if str(arcname).lower().endswith(PRECOMPRESSED_SUFFIXES):
+            return zipfile.ZIP_STORED
+        return None
+
+    def write(self, filename, arcname=None, compress_type=None, compresslevel=None):
+        if compress_type is None:
+            compress_type = self._compress_type(arcname or filename)
+        return super().write(filename, arcname, compress_type, compresslevel)
+
+    def writestr(self, zinfo_or_arcname, data, compress_type=None, compresslevel=None):
+        if compress_type is None and not isinstance(zinfo_or_arcname, zipfile.ZipInfo):
+            compress_type = self._compress_type(zinfo_or_arcname)
+        return super().writestr(zinfo_or_arcname, data, compress_type, compresslevel)
+
+    @contextmanager
+    def open_member(self, arcname):
+        """Writable stream for a new member, compressed according to its name
+
+        The data is spooled to a temporary file and added to the archive
+        only when the block exits cleanly; if the writer raises, the
+        archive gets no member rather than a truncated one.
+        """
+        with tempfile.SpooledTemporaryFile(max_size=MEMBER_SPOOL_BYTES) as spool:
+            yield spool
+            spool.seek(0)
+            zinfo = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+            zinfo.external_attr = 0o644 << 16
+            compress_type = self._compress_type(arcname)
+            zinfo.compress_type = self.compression if compress_type is None else compress_type
+            with self.open(zinfo, "w", force_zip64=True) as member:
+                shutil.copyfileobj(spool, member, SPOOL_COPY_CHUNK)
@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+"""
+Project summary and full-text search index for the 8082 app
+
+Reading a saved project's form fields means decoding its whole payload
+(see project_store), so listing or searching projects used to mean a LIKE
+scan over projects plus a full decode per hit just to show a few Project
+Information fields.
+
+Two tables sit next to projects in each app.db:
+
+- project_summaries: one row per project with the denormalized fields the
+  list and search views show (company, facility address, city, state, zip,
+  field count, payload size)
+- project_search: an FTS5 index over name, company, facility_address and
+  location (city), rowid = project id
+
+Both are written by upsert() in the same transaction as the projects row
+(projects_save / create), so search and list views never decode the
+payload. ensure_schema() creates them and backfills projects saved before
+the index existed, once per database file per process. If the SQLite build
+has no FTS5, search() falls back to LIKE over project_summaries.
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+
+import project_store
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_FIELDS = ("company", "facility_address", "location", "facility_state", "facility_zip")
+SEARCH_FIELDS = ("name", "company", "facility_address", "location")
+DEFAULT_SEARCH_LIMIT = 20
+
+_ready = set()  # database files whose index has been created and backfilled
+_ready_lock = threading.Lock()
+
+
+def summarize(fields):
+    """Summary columns for a decoded payload"""
+    fields = fields if isinstance(fields, dict) else {}
+    summary = {}
+    for key in SUMMARY_FIELDS:
+        value = fields.get(key)
+        summary[key] = str(value).strip() if value not in (None, "") else None
+    summary["field_count"] = len(fields)
+    return summary
+
+
+def _database_file(conn):
+    for _, name, path in conn.execute("PRAGMA database_list").fetchall():
+        if name == "main":
+            return path or None
+    return None
+
+
+def _table_exists(conn, name):
+    row = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).fetchone()
+    return row is not None
+
+
+def _has_fts(conn):
+    return _table_exists(conn, "project_search")
+
+
+def ensure_schema(conn):
+    """Create the summary / FTS tables and backfill missing projects (once per database file)"""
+    db_file = _database_file(conn)
+    if db_file in _ready and _table_exists(conn, "project_summaries"):
+        return
+    if not _table_exists(conn, "projects"):
+        return
+    project_store.ensure_schema(conn)
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS project_summaries (
+            project_id INTEGER PRIMARY KEY,
+            name TEXT NOT NULL,
+            company TEXT,
+            facility_address TEXT,
+            location TEXT,
+            facility_state TEXT,
+            facility_zip TEXT,
+            field_count INTEGER DEFAULT 0,
+            data_length INTEGER DEFAULT 0,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    try:
+        conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS project_search USING fts5("
+            + ", ".join(SEARCH_FIELDS)
+            + ", tokenize = 'unicode61 remove_diacritics 2')"
+        )
+    except sqlite3.OperationalError as e:
+        logger.warning(f"PROJECT INDEX - FTS5 not available, search falls back to LIKE: {e}")
+
+    cursor = conn.execute("SELECT * FROM projects WHERE id NOT IN (SELECT project_id FROM project_summaries)")
+    columns = [column[0] for column in cursor.description]
+    missing = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    for project in missing:
+        try:
+            fields = project_store.read_fields(conn, project)
+        except (ValueError, TypeError):
+            fields = {}
+        upsert(conn, project["id"], project["name"], fields, project_store.stored_size(project))
+    conn.commit()
+    if missing:
+        logger.info(f"PROJECT INDEX - Backfilled {len(missing)} project summaries")
+    if db_file:
+        with _ready_lock:
+            _ready.add(db_file)
+
+
+def upsert(conn, project_id, name, fields, data_length=0):
+    """Write the summary and search rows for a project (caller commits)"""
+    summary = summarize(fields)
+    conn.execute(
+        """
+        INSERT OR REPLACE INTO project_summaries
+            (project_id, name, company, facility_address, location, facility_state,
+             facility_zip, field_count, data_length, updated_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))
+        """,
+        (project_id, name, *(summary[key] for key in SUMMARY_FIELDS), summary["field_count"], data_length or 0),
+    )
+    if _has_fts(conn):
+        conn.execute("DELETE FROM project_search WHERE rowid = ?", (project_id,))
+        conn.execute(
+            "INSERT INTO project_search (rowid, name, company, facility_address, location) VALUES (?, ?, ?, ?, ?)",
+            (project_id, name, summary["company"], summary["facility_address"], summary["location"]),
+        )
+
+
+def _match_query(term):
+    """FTS5 query matching every word of ``term`` as a prefix, or None if it has no words"""
+    words = re.findall(r"\w+", term or "")
+    if not words:
+        return None
+    return " ".join('"' + word + '"*' for word in words)
+
+
+def search(conn, term, limit=DEFAULT_SEARCH_LIMIT):
+    """Projects whose name, company, facility address or city match ``term``, best-populated first"""
+    columns = """
+        s.project_id AS id, p.name AS name, s.data_length, s.field_count,
+        s.company, s.facility_address, s.location, s.facility_state
+    """
+    order = "ORDER BY (s.data_length > 0) DESC, s.data_length DESC, s.project_id DESC LIMIT ?"
+    match = _match_query(term)
+    if match and _has_fts(conn):
+        return conn.execute(
+            f"""
+            SELECT {columns}
+            FROM project_search
+            JOIN project_summaries s ON s.project_id = project_search.rowid
+            JOIN projects p ON p.id = s.project_id
+            WHERE project_search MATCH ?
+            {order}
+            """,
+            (match, limit),
+        ).fetchall()
+
+    pattern = f"%{term}%"
+    where = " OR ".join(f"s.{field} LIKE ? COLLATE NOCASE" for field in SEARCH_FIELDS)
+    return conn.execute(
+        f"""
+        SELECT {columns}
+        FROM project_summaries s
+        JOIN projects p ON p.id = s.project_id
+        WHERE {where}
+        {order}
+        """,
+        (*([pattern] * len(SEARCH_FIELDS)), limit),
+    ).fetchall()
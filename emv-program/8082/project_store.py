@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Sectioned, compressed storage of saved project payloads for the 8082 app
+
+projects.data used to hold the whole form state as a JSON string inside a
+JSON object ({"payload": "<json>"}), so every save rewrote and every load
+re-parsed all of it, including embedded feeder/transformer tables and
+analysis snapshots. Storage version 2 splits the payload per field:
+
+- project_fields: one row per scalar field, value stored as JSON text
+- project_blobs: one row per bulky field (dicts, lists, strings over
+  BLOB_THRESHOLD bytes), compressed with zstd when the optional
+  ``zstandard`` package is installed and zlib otherwise; the codec is
+  recorded per row so both can be read back
+
+save() compares each field with what is stored (value text / digest) and
+writes only the fields that changed, deleting fields that disappeared.
+projects.storage_version says which format a row uses; version 2 rows have
+data = NULL and data_size = size of the payload JSON.
+
+ensure_schema() adds the tables/columns and migrates version 1 rows in
+place, once per database file per process. Rows whose legacy JSON cannot be
+parsed are left as they are (and still load through read_fields()).
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import zlib
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+STORAGE_VERSION = 2
+BLOB_THRESHOLD = 2048  # scalar strings longer than this are stored as blobs
+COMPRESS_MIN = 256  # blobs smaller than this are stored raw
+ZLIB_LEVEL = 6
+ZSTD_LEVEL = 3
+
+_ready = set()  # database files whose schema has been created and migrated
+_ready_lock = threading.Lock()
+
+
+def decode_legacy_data(raw):
+    """Form fields from a version 1 projects.data value; raises ValueError if the outer value is not JSON"""
+    if not raw:
+        return {}
+    data = json.loads(raw) if isinstance(raw, (str, bytes)) else raw
+    if isinstance(data, dict) and "payload" in data:
+        payload = data["payload"]
+        if isinstance(payload, str):
+            try:
+                payload = json.loads(payload) if payload.strip() else {}
+            except ValueError as e:
+                logger.warning(f"PROJECT STORE - Unparseable nested payload, using outer fields: {e}")
+                payload = {}
+        if isinstance(payload, dict) and payload:
+            return payload
+        # Empty payload: fall back to any fields saved next to it
+        return {k: v for k, v in data.items() if k != "payload"}
+    return data if isinstance(data, dict) else {}
+
+
+def legacy_data(fields):
+    """The version 1 projects.data string for ``fields`` (still what the front end expects)"""
+    return json.dumps({"payload": json.dumps(fields)})
+
+
+def _encode(value):
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+
+def _compress(text):
+    raw = text.encode("utf-8")
+    if len(raw) < COMPRESS_MIN:
+        return "raw", raw
+    if ZSTD_AVAILABLE:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    return "zlib", zlib.compress(raw, ZLIB_LEVEL)
+
+
+def _decompress(codec, body):
+    if codec == "zstd":
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError("project blob is zstd-compressed but zstandard is not installed")
+        body = zstandard.ZstdDecompressor().decompress(body)
+    elif codec == "zlib":
+        body = zlib.decompress(body)
+    return bytes(body).decode("utf-8")
+
+
+def _is_bulky(value, encoded):
+    return isinstance(value, (dict, list)) or len(encoded) > BLOB_THRESHOLD
+
+
+def _columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})").fetchall()}
+
+
+def _database_file(conn):
+    for _, name, path in conn.execute("PRAGMA database_list").fetchall():
+        if name == "main":
+            return path or None
+    return None
+
+
+def ensure_schema(conn):
+    """Create the section tables and migrate version 1 rows (once per database file)"""
+    db_file = _database_file(conn)
+    columns = _columns(conn, "projects")
+    if not columns:
+        return
+    if db_file in _ready and "storage_version" in columns:
+        return
+
+    if "storage_version" not in columns:
+        conn.execute("ALTER TABLE projects ADD COLUMN storage_version INTEGER DEFAULT 1")
+    if "data_size" not in columns:
+        conn.execute("ALTER TABLE projects ADD COLUMN data_size INTEGER DEFAULT 0")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS project_fields (
+            project_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            value TEXT,
+            PRIMARY KEY (project_id, name)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS project_blobs (
+            project_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            codec TEXT NOT NULL,
+            digest TEXT NOT NULL,
+            body BLOB,
+            PRIMARY KEY (project_id, name)
+        ) WITHOUT ROWID
+        """
+    )
+    conn.commit()
+
+    migrated = migrate(conn)
+    if migrated:
+        logger.info(f"PROJECT STORE - Migrated {migrated} projects to storage version {STORAGE_VERSION}")
+    if db_file:
+        with _ready_lock:
+            _ready.add(db_file)
+
+
+def migrate(conn):
+    """Convert version 1 rows (JSON in projects.data) in place; returns the number converted"""
+    rows = conn.execute(
+        "SELECT id, data FROM projects WHERE COALESCE(storage_version, 1) < ? AND data IS NOT NULL AND data != ''",
+        (STORAGE_VERSION,),
+    ).fetchall()
+    migrated = 0
+    for project_id, raw in rows:
+        try:
+            fields = decode_legacy_data(raw)
+        except (ValueError, TypeError) as e:
+            logger.warning(f"PROJECT STORE - Leaving project {project_id} in legacy format (unparseable data: {e})")
+            continue
+        save(conn, project_id, fields)
+        conn.commit()
+        migrated += 1
+    conn.execute(
+        "UPDATE projects SET storage_version = ? WHERE COALESCE(storage_version, 1) < ? AND (data IS NULL OR data = '')",
+        (STORAGE_VERSION, STORAGE_VERSION),
+    )
+    conn.commit()
+    return migrated
+
+
+def save(conn, project_id, fields):
+    """Store ``fields`` for a project, writing only changed fields (caller commits)"""
+    stored_fields = dict(
+        conn.execute("SELECT name, value FROM project_fields WHERE project_id = ?", (project_id,)).fetchall()
+    )
+    stored_blobs = dict(
+        conn.execute("SELECT name, digest FROM project_blobs WHERE project_id = ?", (project_id,)).fetchall()
+    )
+    written = 0
+    size = 0
+    scalar_names = set()
+    blob_names = set()
+    for name, value in fields.items():
+        encoded = _encode(value)
+        size += len(encoded)
+        if _is_bulky(value, encoded):
+            blob_names.add(name)
+            digest = hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+            if stored_blobs.get(name) != digest:
+                codec, body = _compress(encoded)
+                conn.execute(
+                    "INSERT OR REPLACE INTO project_blobs (project_id, name, codec, digest, body) VALUES (?, ?, ?, ?, ?)",
+                    (project_id, name, codec, digest, body),
+                )
+                written += 1
+        else:
+            scalar_names.add(name)
+            if stored_fields.get(name) != encoded:
+                conn.execute(
+                    "INSERT OR REPLACE INTO project_fields (project_id, name, value) VALUES (?, ?, ?)",
+                    (project_id, name, encoded),
+                )
+                written += 1
+
+    stale_fields = [(project_id, name) for name in stored_fields if name not in scalar_names]
+    stale_blobs = [(project_id, name) for name in stored_blobs if name not in blob_names]
+    conn.executemany("DELETE FROM project_fields WHERE project_id = ? AND name = ?", stale_fields)
+    conn.executemany("DELETE FROM project_blobs WHERE project_id = ? AND name = ?", stale_blobs)
+    conn.execute(
+        "UPDATE projects SET data = NULL, storage_version = ?, data_size = ? WHERE id = ?",
+        (STORAGE_VERSION, size, project_id),
+    )
+    return {"written": written, "deleted": len(stale_fields) + len(stale_blobs), "size": size}
+
+
+def load(conn, project_id, names=None):
+    """Fields of a version 2 project (only ``names`` if given)"""
+    fields_sql = "SELECT name, value FROM project_fields WHERE project_id = ?"
+    blobs_sql = "SELECT name, codec, body FROM project_blobs WHERE project_id = ?"
+    params = [project_id]
+    if names is not None:
+        names = list(names)
+        placeholders = ", ".join("?" for _ in names) or "NULL"
+        fields_sql += f" AND name IN ({placeholders})"
+        blobs_sql += f" AND name IN ({placeholders})"
+        params += names
+    fields = {name: json.loads(value) for name, value in conn.execute(fields_sql, params).fetchall()}
+    for name, codec, body in conn.execute(blobs_sql, params).fetchall():
+        fields[name] = json.loads(_decompress(codec, body))
+    return fields
+
+
+def read_fields(conn, project):
+    """Form fields of a projects row (dict or sqlite3.Row with id and data), whichever format it uses"""
+    project = dict(project)
+    if (project.get("storage_version") or 1) >= STORAGE_VERSION and not project.get("data"):
+        return load(conn, project["id"])
+    return decode_legacy_data(project.get("data"))
+
+
+def legacy_row(conn, project):
+    """``project`` as a dict whose data column holds the version 1 JSON (for diagnostics that show it)"""
+    project = dict(project)
+    if (project.get("storage_version") or 1) >= STORAGE_VERSION and not project.get("data"):
+        fields = load(conn, project["id"])
+        project["data"] = legacy_data(fields) if fields else None
+    return project
+
+
+def stored_size(project):
+    """Payload size of a projects row in either format"""
+    project = dict(project)
+    if project.get("data"):
+        return len(project["data"])
+    return project.get("data_size") or 0
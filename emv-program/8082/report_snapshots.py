@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Report Snapshot Store (8082 app -> 8084 HTML service handoff)
+
+The 8082 app publishes the report-ready analysis results for an analysis
+session as a versioned, zlib-compressed JSON blob in a small SQLite file
+(REPORT_SNAPSHOT_DB, default report_snapshots.db next to this module).
+The 8084 service loads a snapshot by (analysis_session_id, version) from
+the same file instead of pulling the whole JSON over HTTP per report.
+
+- Publishing identical content again returns the existing version.
+- Readers keep recently loaded snapshots in memory by (session, version),
+  so the standard, layman and ESG reports for one analysis cost one read.
+  Each load parses its own copy, since the generators mutate their input.
+- Only the newest KEEP_VERSIONS versions of a session are retained.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_ID = "current"
+KEEP_VERSIONS = 5
+MEMORY_CACHE_SIZE = 8
+
+
+class ReportSnapshotStore:
+    """SQLite-backed versioned snapshots of report input data"""
+
+    def __init__(self, db_path, keep_versions=KEEP_VERSIONS, memory_size=MEMORY_CACHE_SIZE):
+        self.db_path = db_path
+        self.keep_versions = keep_versions
+        self.memory_size = memory_size
+        self._memory = OrderedDict()  # (session_id, version) -> JSON text
+        self._lock = threading.Lock()
+        self._db_ready = False
+        self.transfers = 0
+
+    @classmethod
+    def from_env(cls, default_db_path):
+        """Build from REPORT_SNAPSHOT_DB / REPORT_SNAPSHOT_KEEP_VERSIONS"""
+        return cls(
+            db_path=os.environ.get("REPORT_SNAPSHOT_DB", default_db_path),
+            keep_versions=int(os.environ.get("REPORT_SNAPSHOT_KEEP_VERSIONS", KEEP_VERSIONS)),
+        )
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        if not self._db_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS report_snapshots ("
+                "session_id TEXT NOT NULL, version INTEGER NOT NULL, sha256 TEXT NOT NULL, "
+                "created_at REAL NOT NULL, payload BLOB NOT NULL, PRIMARY KEY (session_id, version))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS report_snapshot_latest ("
+                "id INTEGER PRIMARY KEY CHECK (id = 1), session_id TEXT NOT NULL, version INTEGER NOT NULL)"
+            )
+            self._db_ready = True
+        return conn
+
+    def publish(self, results, analysis_session_id=None):
+        """Store ``results`` as the next version for the session; returns (session_id, version)"""
+        session_id = str(analysis_session_id or results.get("analysis_session_id") or DEFAULT_SESSION_ID)
+        text = json.dumps(results, default=str)
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+        conn = self._connect()
+        try:
+            with conn:
+                # take the write lock before reading the newest version, so concurrent
+                # publishers for one session cannot both pick the same next version
+                conn.execute("BEGIN IMMEDIATE")
+                row = conn.execute(
+                    "SELECT version, sha256 FROM report_snapshots WHERE session_id = ? ORDER BY version DESC LIMIT 1",
+                    (session_id,),
+                ).fetchone()
+                if row is not None and row[1] == digest:
+                    version = row[0]
+                else:
+                    version = (row[0] + 1) if row is not None else 1
+                    conn.execute(
+                        "INSERT INTO report_snapshots (session_id, version, sha256, created_at, payload) VALUES (?, ?, ?, ?, ?)",
+                        (session_id, version, digest, time.time(), zlib.compress(text.encode("utf-8"), 1)),
+                    )
+                    conn.execute(
+                        "DELETE FROM report_snapshots WHERE session_id = ? AND version <= ?",
+                        (session_id, version - self.keep_versions),
+                    )
+                conn.execute(
+                    "INSERT OR REPLACE INTO report_snapshot_latest (id, session_id, version) VALUES (1, ?, ?)",
+                    (session_id, version),
+                )
+        finally:
+            conn.close()
+        return session_id, version
+
+    def resolve(self, analysis_session_id=None, version=None):
+        """(session_id, version) of the requested snapshot (newest if version is None), or None"""
+        conn = self._connect()
+        try:
+            if analysis_session_id is None:
+                row = conn.execute("SELECT session_id, version FROM report_snapshot_latest WHERE id = 1").fetchone()
+            elif version is None:
+                row = conn.execute(
+                    "SELECT session_id, version FROM report_snapshots WHERE session_id = ? ORDER BY version DESC LIMIT 1",
+                    (str(analysis_session_id),),
+                ).fetchone()
+            else:
+                row = conn.execute(
+                    "SELECT session_id, version FROM report_snapshots WHERE session_id = ? AND version = ?",
+                    (str(analysis_session_id), int(version)),
+                ).fetchone()
+        finally:
+            conn.close()
+        return (row[0], row[1]) if row else None
+
+    def load(self, analysis_session_id=None, version=None):
+        """Fresh dict for the requested snapshot, or None if it is not in the store"""
+        if analysis_session_id is not None and version is not None:
+            key = (str(analysis_session_id), int(version))
+        else:
+            key = self.resolve(analysis_session_id, version)
+            if key is None:
+                return None
+
+        with self._lock:
+            text = self._memory.get(key)
+            if text is not None:
+                self._memory.move_to_end(key)
+        if text is None:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT payload FROM report_snapshots WHERE session_id = ? AND version = ?", key
+                ).fetchone()
+            finally:
+                conn.close()
+            if row is None:
+                return None
+            text = zlib.decompress(row[0]).decode("utf-8")
+            self.transfers += 1
+            with self._lock:
+                self._remember(key, text)
+        return json.loads(text)
+
+    def _remember(self, key, text):
+        self._memory[key] = text
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+
+
+report_snapshots = ReportSnapshotStore.from_env(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "report_snapshots.db")
+)
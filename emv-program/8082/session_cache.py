@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Session Token Cache for the 8082 app
+
+Nearly every org-scoped endpoint resolves the request's session token to
+its org_id and user. The resolved session (user_id, org_id, expires_at and
+the user row) is kept in process for SESSION_CACHE_TTL_SECONDS (default
+60), and never past the session's own expires_at.
+
+Entries are keyed by (scope, token), where scope names the database the
+session came from ("sessions" for the shared sessions.db, "default" for
+the legacy app.db), so the two lookups never mix.
+
+Invalidation: invalidate_token() on logout, invalidate_user() when a
+user's password or role changes or the user is deleted. The cache is per
+process and invalidation only reaches the process that made the change,
+so in multi-worker mode (shared_state.py) caching is off by default: a
+logout in one worker must not leave the token valid in the others.
+Setting SESSION_CACHE_TTL_SECONDS explicitly turns it back on, accepting
+up to that many seconds of staleness across workers.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from shared_state import shared_state
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL_SECONDS = 60
+DEFAULT_MAX_ENTRIES = 10000
+
+
+def _seconds_until(expires_at):
+    """Seconds until a stored expires_at (naive local ISO string, as written at login); None if unparseable"""
+    if isinstance(expires_at, datetime):
+        expires = expires_at
+    else:
+        try:
+            expires = datetime.fromisoformat(str(expires_at).replace("Z", ""))
+        except (TypeError, ValueError):
+            return None
+    if expires.tzinfo is not None:
+        return (expires - datetime.now(expires.tzinfo)).total_seconds()
+    return (expires - datetime.now()).total_seconds()
+
+
+class SessionCache:
+    """In-process TTL cache of resolved session tokens"""
+
+    def __init__(self, ttl_seconds=DEFAULT_TTL_SECONDS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (scope, token) -> (deadline, session)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls):
+        """
+        Build from SESSION_CACHE_TTL_SECONDS / SESSION_CACHE_MAX_ENTRIES (TTL 0
+        disables caching, the default in multi-worker mode)
+        """
+        default_ttl = 0 if shared_state.multi_worker else DEFAULT_TTL_SECONDS
+        return cls(
+            ttl_seconds=float(os.environ.get("SESSION_CACHE_TTL_SECONDS", default_ttl)),
+            max_entries=int(os.environ.get("SESSION_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+        )
+
+    def get(self, token, scope="sessions"):
+        """Cached session dict for the token, or None on a miss"""
+        key = (scope, token)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+        return None
+
+    def put(self, token, session, scope="sessions"):
+        """Cache a resolved session until the TTL or its expires_at, whichever comes first"""
+        ttl = self.ttl_seconds
+        remaining = _seconds_until(session.get("expires_at"))
+        if remaining is not None:
+            ttl = min(ttl, remaining)
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[(scope, token)] = (time.monotonic() + ttl, session)
+            self._entries.move_to_end((scope, token))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_token(self, token):
+        """Drop a token (all scopes), e.g. on logout"""
+        with self._lock:
+            for key in [key for key in self._entries if key[1] == token]:
+                del self._entries[key]
+
+    def invalidate_user(self, user_id, org_id=None):
+        """Drop every cached session of a user (optionally only within one org)"""
+        with self._lock:
+            stale = [
+                key for key, (_, session) in self._entries.items()
+                if str(session.get("user_id")) == str(user_id)
+                and (org_id is None or session.get("org_id") == org_id)
+            ]
+            for key in stale:
+                del self._entries[key]
+        if stale:
+            logger.debug(f"Session cache - dropped {len(stale)} sessions of user {user_id}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+session_cache = SessionCache.from_env()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Process-shared state for the 8082 app
+
+A few pieces of state live in process memory: the latest analysis results
+and form data (app._latest_analysis_results / app._latest_form_data),
+processing_cache, and pending operation confirmations (confirmation_system).
+With one process that is fine. With several gunicorn workers each request
+would see whichever copy its worker happens to hold, and the PE
+verification scheduler would run once per worker.
+
+In multi-worker mode (SYNEREX_MULTI_WORKER=1, which gunicorn.conf.py sets)
+that state is kept in SQLite instead, in results/shared_state.db unless
+SHARED_STATE_PATH says otherwise. mapping(namespace) returns a dict-like
+view of one namespace and SharedAttribute exposes a key as a class
+attribute. Values are pickled. Each process keeps the last value it read
+and unpickles again only when the stored version has changed. Objects
+handed out are per-process copies, so changes must be written back by
+assignment. Without the mode, mapping() returns a plain dict: one process
+behaves, and costs, exactly as before.
+
+run_as_leader() runs a function in one process only: the one holding a
+lock file. The others wait on the lock and take over if that process exits.
+
+Settings: SYNEREX_MULTI_WORKER (default off), SHARED_STATE_PATH.
+"""
+
+import logging
+import os
+import pickle
+import threading
+import uuid
+from collections.abc import MutableMapping
+
+from db_pool import db_pool
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process deployments only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results", "shared_state.db")
+
+_leader_locks = []  # lock files held by this process, open for its lifetime
+
+
+class SQLiteMapping(MutableMapping):
+    """One namespace of the shared_state table, as a mapping of str keys to picklable values"""
+
+    def __init__(self, state, namespace):
+        self.state = state
+        self.namespace = namespace
+        self._cache = {}  # key -> (version, value) last read or written here
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key):
+        with self.state._connection() as conn:
+            row = conn.execute(
+                "SELECT version FROM shared_state WHERE namespace = ? AND key = ?", (self.namespace, key)
+            ).fetchone()
+            if row is None:
+                raise KeyError(key)
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == row[0]:
+                return cached[1]
+            row = conn.execute(
+                "SELECT version, value FROM shared_state WHERE namespace = ? AND key = ?", (self.namespace, key)
+            ).fetchone()
+        if row is None:
+            raise KeyError(key)  # deleted in between
+        value = pickle.loads(row[1])
+        with self._lock:
+            self._cache[key] = (row[0], value)
+        return value
+
+    def __setitem__(self, key, value):
+        version = uuid.uuid4().hex
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self.state._connection() as conn:
+            conn.execute(
+                """
+                INSERT INTO shared_state (namespace, key, value, version) VALUES (?, ?, ?, ?)
+                ON CONFLICT (namespace, key) DO UPDATE SET value = excluded.value, version = excluded.version
+                """,
+                (self.namespace, key, data, version),
+            )
+            conn.commit()
+        with self._lock:
+            self._cache[key] = (version, value)
+
+    def __delitem__(self, key):
+        with self.state._connection() as conn:
+            deleted = conn.execute(
+                "DELETE FROM shared_state WHERE namespace = ? AND key = ?", (self.namespace, key)
+            ).rowcount
+            conn.commit()
+        with self._lock:
+            self._cache.pop(key, None)
+        if not deleted:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        with self.state._connection() as conn:
+            return conn.execute(
+                "SELECT 1 FROM shared_state WHERE namespace = ? AND key = ?", (self.namespace, key)
+            ).fetchone() is not None
+
+    def __iter__(self):
+        # insertion order, like a dict (an update keeps the key's place)
+        with self.state._connection() as conn:
+            keys = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT key FROM shared_state WHERE namespace = ? ORDER BY rowid", (self.namespace,)
+                )
+            ]
+        return iter(keys)
+
+    def __len__(self):
+        with self.state._connection() as conn:
+            return conn.execute(
+                "SELECT COUNT(*) FROM shared_state WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0]
+
+    def clear(self):
+        with self.state._connection() as conn:
+            conn.execute("DELETE FROM shared_state WHERE namespace = ?", (self.namespace,))
+            conn.commit()
+        with self._lock:
+            self._cache.clear()
+
+
+class SharedState:
+    """Namespaced state shared by the app's worker processes (plain dicts in single-process mode)"""
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path
+        self.multi_worker = db_path is not None
+        self._mappings = {}
+        self._lock = threading.Lock()
+        self._schema_ready = False
+
+    @classmethod
+    def from_env(cls):
+        """SQLite-backed if SYNEREX_MULTI_WORKER is set (at SHARED_STATE_PATH), in-process otherwise"""
+        if os.environ.get("SYNEREX_MULTI_WORKER", "").lower() in ("1", "true", "yes"):
+            return cls(os.environ.get("SHARED_STATE_PATH", DEFAULT_PATH))
+        return cls()
+
+    def _connection(self):
+        if not self._schema_ready:
+            with self._lock:
+                if not self._schema_ready:
+                    with db_pool.connection(self.db_path) as conn:
+                        conn.execute(
+                            """
+                            CREATE TABLE IF NOT EXISTS shared_state (
+                                namespace TEXT NOT NULL,
+                                key TEXT NOT NULL,
+                                value BLOB,
+                                version TEXT NOT NULL,
+                                PRIMARY KEY (namespace, key)
+                            )
+                            """
+                        )
+                        conn.commit()
+                    self._schema_ready = True
+        return db_pool.connection(self.db_path)
+
+    def mapping(self, namespace):
+        """The mapping for ``namespace`` (the same object on every call)"""
+        with self._lock:
+            if namespace not in self._mappings:
+                self._mappings[namespace] = SQLiteMapping(self, namespace) if self.multi_worker else {}
+            return self._mappings[namespace]
+
+
+class SharedAttribute:
+    """
+    Class attribute stored in a SharedState namespace under its own name
+    (leading underscores dropped); AttributeError until first set, like a
+    plain instance attribute
+    """
+
+    def __init__(self, state, namespace):
+        self.state = state
+        self.namespace = namespace
+        self.key = None
+
+    def __set_name__(self, owner, name):
+        self.key = name.lstrip("_")
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        try:
+            return self.state.mapping(self.namespace)[self.key]
+        except KeyError:
+            raise AttributeError(self.key) from None
+
+    def __set__(self, obj, value):
+        self.state.mapping(self.namespace)[self.key] = value
+
+    def __delete__(self, obj):
+        try:
+            del self.state.mapping(self.namespace)[self.key]
+        except KeyError:
+            raise AttributeError(self.key) from None
+
+
+def run_as_leader(lock_path, target, *args):
+    """
+    Run ``target(*args)`` once this process holds the lock file at
+    ``lock_path``; blocks until then. Meant to be the body of a daemon
+    thread started in every worker.
+    """
+    if fcntl is None:
+        return target(*args)
+    os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+    lock_file = open(lock_path, "a+")
+    fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)  # released when the leader process exits
+    _leader_locks.append(lock_file)
+    lock_file.seek(0)
+    lock_file.truncate()
+    lock_file.write(f"{os.getpid()}\n")
+    lock_file.flush()
+    logger.info(f"SHARED STATE - Process {os.getpid()} holds {os.path.basename(lock_path)}")
+    try:
+        return target(*args)
+    finally:
+        _leader_locks.remove(lock_file)
+        lock_file.close()
+
+
+shared_state = SharedState.from_env()
@@ -131,6 +131,36 @@
   }
 })();
 
+// Run a long request as a background job (?async=1) and resolve with its final
+// response, so callers use it like fetch() without holding a request open
+async function fetchAsJob(url, options = {}, onProgress = null) {
+  const separator = url.includes('?') ? '&' : '?';
+  const submitted = await fetch(url + separator + 'async=1', options);
+  if (submitted.status !== 202) {
+    return submitted;
+  }
+  const job = await submitted.json();
+  const headers = Object.assign({}, options.headers || {});
+  delete headers['Content-Type'];
+  while (true) {
+    await new Promise(resolve => setTimeout(resolve, 2000));
+    const statusResponse = await fetch(job.status_url, { headers });
+    if (!statusResponse.ok) {
+      return statusResponse;
+    }
+    const status = (await statusResponse.json()).job;
+    if (onProgress) {
+      onProgress(status.progress, status.message);
+    }
+    if (status.status === 'cancelled') {
+      throw new Error('Job was cancelled');
+    }
+    if (status.status === 'succeeded' || status.status === 'failed') {
+      return fetch(job.result_url, { headers });
+    }
+  }
+}
+
 function initializeFieldStyling() {
   // Add manual-entry class to all form fields that are not auto-populated
   const allInputs = document.querySelectorAll(
@@ -2022,7 +2052,7 @@ function reanalyzeProject() {
     showNotification(`Re-analyzing "${projectName}" with latest code...`, 'info');
     
     // Submit analysis
-    return fetch('/api/analyze', {
+    return fetchAsJob('/api/analyze', {
       method: 'POST',
       body: formData
     });
@@ -4483,7 +4513,7 @@ async function generateUtilitySubmissionPackage(r) {
     }
 
     // Send results to utility submission package generation endpoint
-    const response = await fetch('/api/generate-utility-submission-package', {
+    const response = await fetchAsJob('/api/generate-utility-submission-package', {
       method: 'POST',
       headers: headers,
       body: JSON.stringify(packageData)
@@ -5829,7 +5859,7 @@ async function generateAuditPackage(r) {
     });
 
     // Send results to audit package generation endpoint
-    const response = await fetch('/api/generate-audit-package', {
+    const response = await fetchAsJob('/api/generate-audit-package', {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
@@ -542,6 +542,9 @@ class MainDashboard {
                 return;
             }
             
+            // One round trip for every card; the per-section endpoints below are the fallback
+            const summary = await this.loadDashboardSummary();
+            
             // Load raw files stats with timeout
             const rawFilesController = new AbortController();
             const rawFilesTimeout = setTimeout(() => {
@@ -550,12 +553,13 @@ class MainDashboard {
             }, 5000);
             
             try {
-                const rawFilesResponse = await fetch('/api/dashboard/raw-files-stats', {
-                    headers: this.getAuthHeaders(),
-                    signal: rawFilesController.signal
-                });
+                const rawFilesStats = summary
+                    ? { status: 'success', ...summary.raw_files }
+                    : await (await fetch('/api/dashboard/raw-files-stats', {
+                        headers: this.getAuthHeaders(),
+                        signal: rawFilesController.signal
+                    })).json();
                 clearTimeout(rawFilesTimeout);
-                const rawFilesStats = await rawFilesResponse.json();
                 
                 if (rawFilesStats.status === 'success') {
                     const rawFilesSize = document.getElementById('raw-files-size');
@@ -626,12 +630,13 @@ class MainDashboard {
             }, 5000);
             
             try {
-                const clippingResponse = await fetch('/api/dashboard/clipping-stats', {
-                    headers: this.getAuthHeaders(),
-                    signal: clippingController.signal
-                });
+                const clippingStats = summary
+                    ? { status: 'success', ...summary.clipping }
+                    : await (await fetch('/api/dashboard/clipping-stats', {
+                        headers: this.getAuthHeaders(),
+                        signal: clippingController.signal
+                    })).json();
                 clearTimeout(clippingTimeout);
-                const clippingStats = await clippingResponse.json();
                 
                 if (clippingStats.status === 'success') {
                     const clippedFilesCount = document.getElementById('clipped-files-count');
@@ -706,12 +711,13 @@ class MainDashboard {
             }, 5000);
             
             try {
-                const projectResponse = await fetch('/api/dashboard/project-stats', {
-                    headers: this.getAuthHeaders(),
-                    signal: projectController.signal
-                });
+                const projectStats = summary
+                    ? { status: 'success', ...summary.projects }
+                    : await (await fetch('/api/dashboard/project-stats', {
+                        headers: this.getAuthHeaders(),
+                        signal: projectController.signal
+                    })).json();
                 clearTimeout(projectTimeout);
-                const projectStats = await projectResponse.json();
                 
                 if (projectStats.status === 'success') {
                     const activeProjectsCount = document.getElementById('active-projects-count');
@@ -739,17 +745,20 @@ class MainDashboard {
                 }, 5000);
                 
                 try {
-                    const peResponse = await fetch('/api/dashboard/pe-stats', {
-                        headers: this.getAuthHeaders(),
-                        signal: peController.signal
-                    });
-                    clearTimeout(peTimeout);
-                    
-                    if (!peResponse.ok) {
-                        throw new Error(`HTTP error! status: ${peResponse.status}`);
+                    let peStats;
+                    if (summary) {
+                        peStats = { status: 'success', ...summary.pe };
+                    } else {
+                        const peResponse = await fetch('/api/dashboard/pe-stats', {
+                            headers: this.getAuthHeaders(),
+                            signal: peController.signal
+                        });
+                        if (!peResponse.ok) {
+                            throw new Error(`HTTP error! status: ${peResponse.status}`);
+                        }
+                        peStats = await peResponse.json();
                     }
-                    
-                    const peStats = await peResponse.json();
+                    clearTimeout(peTimeout);
                     
                     if (peStats.status === 'success') {
                         const registeredPeCount = document.getElementById('registered-pe-count');
@@ -827,6 +836,28 @@ class MainDashboard {
         }
     }
     
+    async loadDashboardSummary() {
+        // All dashboard cards from /api/dashboard/summary, or null if it is unavailable
+        const controller = new AbortController();
+        const timeout = setTimeout(() => controller.abort(), 5000);
+        try {
+            const response = await fetch('/api/dashboard/summary', {
+                headers: this.getAuthHeaders(),
+                signal: controller.signal
+            });
+            if (!response.ok) {
+                return null;
+            }
+            const summary = await response.json();
+            return summary.status === 'success' ? summary : null;
+        } catch (error) {
+            console.debug('Dashboard summary unavailable, loading sections separately:', error);
+            return null;
+        } finally {
+            clearTimeout(timeout);
+        }
+    }
+    
     // Navigation methods
     async showUploadInterface() {
         this.showNotification('Opening file upload interface...', 'info');
@@ -908,6 +939,7 @@ class MainDashboard {
                         const uploadedCount = result.uploaded_count || 1;
                         document.getElementById('progress-text').textContent = `Upload successful! ${uploadedCount} file(s) uploaded.`;
                         this.showNotification(`${uploadedCount} file(s) uploaded successfully!`, 'success');
+                        this.watchProfileJobs(result.files || []);
                         setTimeout(() => {
                             modal.remove();
                             document.body.classList.remove('modal-open');
@@ -927,6 +959,34 @@ class MainDashboard {
         }
     }
     
+    async watchProfileJobs(files) {
+        // Uploads return once the file is stored; column detection and statistics
+        // finish in a background job, reported here when done
+        for (const file of files) {
+            if (!file.profile_job_id) continue;
+            for (let attempt = 0; attempt < 300; attempt++) {
+                await new Promise(resolve => setTimeout(resolve, 2000));
+                let job;
+                try {
+                    const response = await fetch(`/api/jobs/${file.profile_job_id}`);
+                    if (!response.ok) break;
+                    job = (await response.json()).job;
+                } catch (error) {
+                    break;
+                }
+                if (job.status === 'succeeded') {
+                    const profile = job.result || {};
+                    this.showNotification(`${file.filename}: ${profile.row_count} rows, ${(profile.columns || []).length} columns analyzed`, 'success');
+                    break;
+                }
+                if (job.status === 'failed') {
+                    this.showNotification(`${file.filename}: analysis failed - ${job.error}`, 'error');
+                    break;
+                }
+            }
+        }
+    }
+    
     async showUploadInterfaceOld() {
         this.showNotification('Loading CSV files with fingerprints...', 'info');
         
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Versioned schema for tenant databases (results/org_{org_id}/app.db)
+
+Tenant tables used to be created by CREATE TABLE IF NOT EXISTS statements
+scattered through the routes that first write to them (login, project
+create, upload, clipping, analysis sessions), each with its own commit, on
+every request. The audit trail tables were never created in tenant
+databases at all.
+
+MIGRATIONS lists the tenant schema as numbered steps. ensure_migrated()
+applies the steps a database has not seen yet, records the version in
+PRAGMA user_version, and remembers the file for the rest of the process,
+so after the first connection to a tenant it costs one set lookup.
+get_db_connection() calls it for every tenant connection; open handles
+per tenant are limited and evicted by db_pool (DB_POOL_MAX_DATABASES).
+
+To change the tenant schema, append a migration; never edit one that has
+shipped.
+"""
+
+import logging
+import threading
+
+import dashboard_counters
+import project_index
+
+logger = logging.getLogger(__name__)
+
+BASELINE = (
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        username TEXT UNIQUE NOT NULL,
+        email TEXT UNIQUE NOT NULL,
+        password_hash TEXT NOT NULL,
+        role TEXT NOT NULL DEFAULT 'user',
+        status TEXT DEFAULT 'active',
+        full_name TEXT,
+        pe_license_number TEXT,
+        state TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS projects (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        description TEXT,
+        data TEXT,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+        updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS raw_meter_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        file_name TEXT NOT NULL,
+        file_path TEXT NOT NULL,
+        file_size INTEGER,
+        fingerprint TEXT,
+        uploaded_by TEXT,
+        upload_date TEXT DEFAULT CURRENT_TIMESTAMP,
+        verification_status TEXT DEFAULT 'pending'
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS data_modifications (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        file_id INTEGER NOT NULL,
+        modifier_id INTEGER NOT NULL,
+        modification_type TEXT NOT NULL,
+        reason TEXT,
+        rows_removed INTEGER,
+        rows_modified INTEGER,
+        fingerprint_before TEXT,
+        fingerprint_after TEXT,
+        modification_details TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (file_id) REFERENCES raw_meter_data (id),
+        FOREIGN KEY (modifier_id) REFERENCES users (id)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_modifications_file ON data_modifications(file_id)",
+    """
+    CREATE TABLE IF NOT EXISTS analysis_sessions (
+        id TEXT PRIMARY KEY,
+        project_name TEXT,
+        before_file_id INTEGER,
+        after_file_id INTEGER,
+        config_parameters TEXT,
+        initiated_by INTEGER,
+        created_at TEXT DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+)
+
+AUDIT_TABLES = (
+    """
+    CREATE TABLE IF NOT EXISTS calculation_audit (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        analysis_session_id TEXT NOT NULL,
+        calculation_type TEXT NOT NULL,
+        standard_name TEXT,
+        input_values TEXT,
+        output_values TEXT,
+        methodology TEXT,
+        formula TEXT,
+        standards_reference TEXT,
+        calculated_by INTEGER,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (calculated_by) REFERENCES users (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS data_access_log (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        access_type TEXT NOT NULL,
+        file_id INTEGER,
+        user_id INTEGER,
+        ip_address TEXT,
+        user_agent TEXT,
+        access_details TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (file_id) REFERENCES raw_meter_data (id),
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS weather_data_audit (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        analysis_session_id TEXT,
+        location_address TEXT,
+        latitude REAL,
+        longitude REAL,
+        date_range_start DATE,
+        date_range_end DATE,
+        api_source TEXT,
+        data_quality_score REAL,
+        fetched_by INTEGER,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (fetched_by) REFERENCES users (id)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS compliance_verification (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        analysis_session_id TEXT,
+        standard_name TEXT NOT NULL,
+        check_type TEXT,
+        calculated_value REAL,
+        limit_value REAL,
+        threshold_value REAL,
+        is_compliant INTEGER,
+        verification_method TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_calc_audit_session ON calculation_audit(analysis_session_id)",
+    "CREATE INDEX IF NOT EXISTS idx_data_access_file ON data_access_log(file_id)",
+    "CREATE INDEX IF NOT EXISTS idx_weather_audit_session ON weather_data_audit(analysis_session_id)",
+    "CREATE INDEX IF NOT EXISTS idx_compliance_session ON compliance_verification(analysis_session_id)",
+)
+
+# (version, description, SQL statements or a function taking the connection)
+MIGRATIONS = (
+    (1, "baseline tenant tables", BASELINE),
+    (2, "audit trail tables", AUDIT_TABLES),
+    (3, "project storage and search index", project_index.ensure_schema),
+    (4, "dashboard counters", dashboard_counters.ensure_schema),
+)
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+_migrated = set()  # tenant database files at SCHEMA_VERSION
+_migrated_lock = threading.Lock()
+
+
+def user_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn):
+    """Apply pending migrations to ``conn``'s database; returns the versions applied"""
+    applied = []
+    for version, description, step in MIGRATIONS:
+        if version <= user_version(conn):
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have migrated while we waited for the lock
+            if version <= user_version(conn):
+                conn.rollback()
+                continue
+            if callable(step):
+                step(conn)  # schema helpers commit their own work; they are idempotent
+            else:
+                for statement in step:
+                    conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {int(version)}")
+            conn.commit()
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        applied.append(version)
+        logger.info(f"TENANT DB - Applied migration {version} ({description})")
+    return applied
+
+
+def ensure_migrated(conn, db_path):
+    """Bring a tenant database to SCHEMA_VERSION (once per file per process)"""
+    if db_path in _migrated:
+        return
+    migrate(conn)
+    with _migrated_lock:
+        _migrated.add(db_path)
+
+
+def forget(db_path):
+    """Check ``db_path`` again on next use (the file was removed or replaced)"""
+    with _migrated_lock:
+        _migrated.discard(db_path)
@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Streaming raw meter data uploads for the 8082 app
+
+/api/raw-meter-data/upload used to save the upload, read it back whole to
+fingerprint it, and leave parsing to whoever opened it next, so a
+multi-year 1-minute CSV was held in memory more than once inside the
+request.
+
+spool_upload() copies the request stream to disk in chunks, computing the
+integrity fingerprint on the way (the same normalization, SHA-256 and HMAC
+as CSVIntegrityProtection.create_content_fingerprint, so hashes do not
+change), and only moves the file into place once it is fsynced. The
+request returns as soon as the bytes are durable; profile_csv() - column
+detection, row count and per-column statistics - runs afterwards as a
+background job (see job_queue) that the client polls for progress.
+"""
+
+import codecs
+import csv
+import hashlib
+import hmac
+import logging
+import os
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+PROGRESS_EVERY_ROWS = 50000
+TIMESTAMP_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%dT%H:%M:%S",
+    "%m/%d/%Y %H:%M:%S",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%y %H:%M",
+    "%Y-%m-%d",
+    "%m/%d/%Y",
+)
+
+
+class StreamingFingerprint:
+    """
+    Incremental form of CSVIntegrityProtection._normalize_csv_content plus
+    the hashes taken over its result: leading BOM removed, line endings
+    normalized to \\n, trailing whitespace stripped per line, trailing empty
+    lines dropped.
+    """
+
+    def __init__(self, secret_key):
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._sha256 = hashlib.sha256()
+        self._hmac = hmac.new(secret_key.encode("utf-8"), digestmod=hashlib.sha256)
+        self._at_start = True
+        self._pending_cr = False
+        self._partial_line = ""
+        self._blank_lines = 0  # empty lines held back until a non-empty one follows
+        self._wrote_line = False
+        self.original_size = 0  # characters after newline translation, as the text-mode read counted
+        self.normalized_size = 0
+        self.line_count = 1
+
+    def update(self, data):
+        self._feed(self._decoder.decode(data), final=False)
+
+    def _feed(self, text, final):
+        if self._pending_cr:
+            text = "\r" + text
+            self._pending_cr = False
+        if text.endswith("\r") and not final:
+            # may be the first half of \r\n
+            text = text[:-1]
+            self._pending_cr = True
+        if not text:
+            return
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        self.original_size += len(text)
+        if self._at_start:
+            self._at_start = False
+            if text.startswith("\ufeff"):
+                text = text[1:]
+        lines = (self._partial_line + text).split("\n")
+        self._partial_line = lines.pop()
+        self._emit(lines)
+
+    def _emit(self, lines):
+        pieces = []
+        for line in lines:
+            line = line.rstrip()
+            if not line:
+                self._blank_lines += 1
+                continue
+            newlines = self._blank_lines + (1 if self._wrote_line else 0)
+            pieces.append("\n" * newlines + line)
+            self.line_count += newlines
+            self._blank_lines = 0
+            self._wrote_line = True
+        if pieces:
+            data = "".join(pieces)
+            self.normalized_size += len(data)
+            encoded = data.encode("utf-8")
+            self._sha256.update(encoded)
+            self._hmac.update(encoded)
+
+    def finish(self):
+        """Flush buffered text; returns content_hash, hmac_signature and the content metadata"""
+        self._feed(self._decoder.decode(b"", final=True), final=True)
+        self._emit([self._partial_line])
+        self._partial_line = ""
+        return {
+            "content_hash": self._sha256.hexdigest(),
+            "hmac_signature": self._hmac.hexdigest(),
+            "metadata": {
+                "original_size": self.original_size,
+                "normalized_size": self.normalized_size,
+                "line_count": self.line_count,
+                "character_count": self.normalized_size,
+                "encoding": "utf-8",
+            },
+        }
+
+
+def spool_upload(stream, dest_path, secret_key, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Write an upload stream to ``dest_path`` while fingerprinting it
+
+    The data goes to ``dest_path + '.part'`` and is renamed into place after
+    fsync, so ``dest_path`` only ever holds a complete upload.
+
+    Returns:
+        Dict with size (bytes), content_hash, hmac_signature and metadata
+    """
+    fingerprint = StreamingFingerprint(secret_key)
+    part_path = dest_path + ".part"
+    size = 0
+    try:
+        with open(part_path, "wb") as out:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                out.write(chunk)
+                fingerprint.update(chunk)
+                size += len(chunk)
+            result = fingerprint.finish()
+            out.flush()
+            os.fsync(out.fileno())
+        os.replace(part_path, dest_path)
+    except BaseException:
+        try:
+            os.remove(part_path)
+        except OSError:
+            pass
+        raise
+    result["size"] = size
+    return result
+
+
+def _number(value):
+    try:
+        return float(value.replace(",", ""))
+    except ValueError:
+        return None
+
+
+def _timestamp(value, preferred=None):
+    """(datetime, format) for a timestamp cell, trying the format that matched last time first"""
+    for fmt in ((preferred,) if preferred else ()) + TIMESTAMP_FORMATS:
+        try:
+            return datetime.strptime(value, fmt), fmt
+        except ValueError:
+            continue
+    return None, preferred
+
+
+def profile_csv(path, column_patterns=None, progress=None):
+    """
+    Describe a CSV file in one streaming pass
+
+    Args:
+        path: CSV file
+        column_patterns: {parameter: [column names]} used to map columns
+            (as EnhancedDataProcessor.detect_columns does)
+        progress: optional callable(fraction, message)
+
+    Returns:
+        Dict with columns, row_count, detected_columns, numeric column
+        statistics (count/min/max/mean) and the time range of the timestamp
+        column with its most common interval in seconds
+    """
+    total_bytes = os.path.getsize(path) or 1
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        columns = [name.strip() for name in next(reader, [])]
+
+        detected = {}
+        for name in columns:
+            for parameter, patterns in (column_patterns or {}).items():
+                if parameter not in detected and name in patterns:
+                    detected[parameter] = name
+                    break
+        timestamp_column = detected.get("timestamp")
+        if timestamp_column is None:
+            timestamp_column = next(
+                (name for name in columns if "time" in name.lower() or "date" in name.lower()), None
+            )
+        timestamp_index = columns.index(timestamp_column) if timestamp_column else None
+
+        # per column: [count, min, max, sum]; None once a non-numeric value is seen
+        stats = [[0, None, None, 0.0] for _ in columns]
+        row_count = 0
+        first_time = last_time = previous_time = timestamp_format = None
+        intervals = {}
+
+        for row in reader:
+            if not row or not any(cell.strip() for cell in row):
+                continue
+            row_count += 1
+            for index, cell in enumerate(row[: len(columns)]):
+                column_stats = stats[index]
+                cell = cell.strip()
+                if column_stats is None or not cell:
+                    continue
+                value = _number(cell)
+                if value is None:
+                    stats[index] = None
+                    continue
+                column_stats[0] += 1
+                column_stats[1] = value if column_stats[1] is None else min(column_stats[1], value)
+                column_stats[2] = value if column_stats[2] is None else max(column_stats[2], value)
+                column_stats[3] += value
+            if timestamp_index is not None and timestamp_index < len(row):
+                moment, timestamp_format = _timestamp(row[timestamp_index].strip(), timestamp_format)
+                if moment is not None:
+                    if first_time is None:
+                        first_time = moment
+                    if previous_time is not None:
+                        step = int((moment - previous_time).total_seconds())
+                        intervals[step] = intervals.get(step, 0) + 1
+                    previous_time = last_time = moment
+            if progress and row_count % PROGRESS_EVERY_ROWS == 0:
+                position = os.lseek(f.fileno(), 0, os.SEEK_CUR)
+                progress(min(position / total_bytes, 0.99), f"{row_count} rows read")
+
+    numeric = {}
+    for name, column_stats in zip(columns, stats):
+        if column_stats is None or column_stats[0] == 0 or name == timestamp_column:
+            continue
+        count, low, high, total = column_stats
+        numeric[name] = {"count": count, "min": low, "max": high, "mean": total / count}
+
+    return {
+        "columns": columns,
+        "row_count": row_count,
+        "detected_columns": detected,
+        "numeric_columns": numeric,
+        "timestamp_column": timestamp_column,
+        "first_timestamp": first_time.isoformat() if first_time else None,
+        "last_timestamp": last_time.isoformat() if last_time else None,
+        "interval_seconds": max(intervals, key=intervals.get) if intervals else None,
+    }
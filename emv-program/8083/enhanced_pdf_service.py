@@ -4,10 +4,15 @@ Enhanced PDF Service - Port 8083
 Handles PDF generation with SVG chart support using svglib (no Cairo dependency)
 """
 
+import hashlib
 import json
 import os
 import sys
+import threading
 import traceback
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from datetime import datetime
 from io import StringIO
@@ -47,6 +52,103 @@ app.config["MAX_CONTENT_LENGTH"] = 256 * 1024 * 1024
 OUTPUT_DIR = Path("generated_pdfs")
 OUTPUT_DIR.mkdir(exist_ok=True)
 
+# Converted SVG drawings kept per process (SVG_DRAWING_CACHE_SIZE entries);
+# with a worker pool each worker has its own cache, see drawing_cache_report()
+SVG_DRAWING_CACHE_SIZE = int(os.environ.get("SVG_DRAWING_CACHE_SIZE", 64))
+# Worker processes for building PDFs (PDF_WORKERS <= 1 builds in the request thread)
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", min(4, os.cpu_count() or 1)))
+
+_drawing_cache = OrderedDict()  # (svg sha256, width, height) -> scaled Drawing
+_drawing_cache_lock = threading.Lock()
+_drawing_cache_counts = {"hits": 0, "misses": 0}
+_pdf_pool = None
+_pdf_pool_lock = threading.Lock()
+_pool_cache_stats = {}  # pool worker pid -> its drawing cache stats as of its last build
+
+
+def get_svg_drawing(svg_content, width, height):
+    """svg2rlg drawing of the SVG scaled to width x height, converted once per content and size
+
+    The drawing is shared, so callers must only draw it, not transform it.
+    Returns None if the SVG cannot be converted.
+    """
+    key = (hashlib.sha256(svg_content.encode("utf-8")).hexdigest(), width, height)
+    with _drawing_cache_lock:
+        drawing = _drawing_cache.get(key)
+        if drawing is not None:
+            _drawing_cache.move_to_end(key)
+            _drawing_cache_counts["hits"] += 1
+            return drawing
+        _drawing_cache_counts["misses"] += 1
+
+    drawing = svg2rlg(StringIO(svg_content))
+    if not drawing:
+        return None
+    # Scale the drawing to fit
+    drawing.scale(width/drawing.width, height/drawing.height)
+
+    with _drawing_cache_lock:
+        _drawing_cache[key] = drawing
+        while len(_drawing_cache) > SVG_DRAWING_CACHE_SIZE:
+            _drawing_cache.popitem(last=False)
+    return drawing
+
+
+def drawing_cache_stats():
+    """Entries, hits and misses of this process's SVG drawing cache"""
+    with _drawing_cache_lock:
+        return {"entries": len(_drawing_cache), **_drawing_cache_counts}
+
+
+def _build_in_worker(builder, data, output_path):
+    """Pool task: build the PDF, then report the worker's pid and cache stats"""
+    return builder(data, output_path), os.getpid(), drawing_cache_stats()
+
+
+def _get_pdf_pool():
+    global _pdf_pool
+    if PDF_WORKERS <= 1:
+        return None
+    with _pdf_pool_lock:
+        if _pdf_pool is None:
+            _pdf_pool = ProcessPoolExecutor(max_workers=PDF_WORKERS)
+        return _pdf_pool
+
+
+def build_pdf(builder, data, output_path):
+    """Run a PDF builder in the worker pool so concurrent requests build in parallel
+
+    Falls back to building in this process when the pool is disabled or broken.
+    """
+    global _pdf_pool
+    pool = _get_pdf_pool()
+    if pool is not None:
+        try:
+            result, pid, stats = pool.submit(_build_in_worker, builder, data, str(output_path)).result()
+            with _pdf_pool_lock:
+                _pool_cache_stats[pid] = stats
+            return result
+        except BrokenProcessPool as e:
+            print(f"PDF worker pool unavailable, building in-process: {e}")
+            with _pdf_pool_lock:
+                _pdf_pool = None
+                _pool_cache_stats.clear()
+    return builder(data, str(output_path))
+
+
+def drawing_cache_report():
+    """Drawing cache stats of every process that builds PDFs, keyed by pid
+
+    Each process has its own cache: pool workers report theirs after each
+    build, this process is included once it has converted anything.
+    """
+    with _pdf_pool_lock:
+        report = {str(pid): dict(stats) for pid, stats in _pool_cache_stats.items()}
+    own = drawing_cache_stats()
+    if own["entries"] or own["hits"] or own["misses"] or not report:
+        report[str(os.getpid())] = own
+    return report
+
 
 class SVGChartFlowable(Flowable):
     """Custom flowable to render SVG charts in PDF"""
@@ -67,13 +169,10 @@ class SVGChartFlowable(Flowable):
             return
             
         try:
-            # Convert SVG to ReportLab graphics
-            svg_io = StringIO(self.svg_content)
-            drawing = svg2rlg(svg_io)
+            # Convert SVG to ReportLab graphics (cached by content and size)
+            drawing = get_svg_drawing(self.svg_content, self.width, self.height)
             
             if drawing:
-                # Scale the drawing to fit
-                drawing.scale(self.width/drawing.width, self.height/drawing.height)
                 drawing.drawOn(self.canv, 0, 0)
             else:
                 # Fallback if conversion fails
@@ -223,7 +322,7 @@ def generate_pdf():
         output_path = OUTPUT_DIR / filename
         
         # Create PDF with charts
-        success = create_pdf_with_charts(data, output_path)
+        success = build_pdf(create_pdf_with_charts, data, output_path)
         
         if success:
             return jsonify({
@@ -484,7 +583,7 @@ def generate_engineering_metrics_pdf():
         output_path = OUTPUT_DIR / filename
         
         # Create PDF
-        success = create_engineering_test_metrics_pdf(engineering_metrics, output_path)
+        success = build_pdf(create_engineering_test_metrics_pdf, engineering_metrics, output_path)
         
         if success:
             return jsonify({
@@ -511,11 +610,16 @@ def generate_engineering_metrics_pdf():
 @app.route("/status", methods=["GET"])
 def status():
     """Service status"""
+    cache_report = drawing_cache_report()
     return jsonify({
         "service": "Enhanced PDF Generator",
         "status": "running",
         "svg_support": HAVE_SVGLIB,
-        "output_directory": str(OUTPUT_DIR)
+        "output_directory": str(OUTPUT_DIR),
+        "svg_drawing_cache_scope": "per process",
+        "svg_drawing_cache_entries": sum(stats["entries"] for stats in cache_report.values()),
+        "svg_drawing_cache_by_process": cache_report,
+        "pdf_workers": PDF_WORKERS
     })
 
 
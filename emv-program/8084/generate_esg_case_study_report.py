@@ -20,6 +20,8 @@ import sys
 sys.path.insert(0, str(Path(__file__).parent.parent / "8082"))
 sys.path.insert(0, str(Path(__file__).parent))
 
+from asset_cache import asset_cache
+
 # Import the existing report generator
 try:
     from generate_exact_template_html import (
@@ -2034,8 +2036,9 @@ def generate_esg_case_study_report(r):
         
         # Read template file
         template_file = Path(__file__).parent / ".." / "8082" / "templates" / "esg_case_study_template.html"
+        template_content = asset_cache.text(template_file)
         
-        if not template_file.exists():
+        if template_content is None:
             # Fallback: Build HTML structure manually
             html = f"""<!DOCTYPE html>
 <html lang="en">
@@ -2567,9 +2570,6 @@ def generate_esg_case_study_report(r):
 </body>
 </html>"""
         else:
-            with open(template_file, 'r', encoding='utf-8') as f:
-                template_content = f.read()
-            
             # Replace placeholders
             html = template_content
             
@@ -22,6 +22,9 @@ except ImportError as e:
     print(f"Warning: Sankey diagram module not available: {e}")
     SANKEY_AVAILABLE = False
 
+from asset_cache import asset_cache
+from template_compiler import load_template
+
 # Set up logging
 logger = logging.getLogger(__name__)
 
@@ -64,24 +67,14 @@ def remove_chart_section(html_content, chart_name):
     return html_content
 
 def get_logo_data_uri():
-    """Get the Synerex logo as a data URI"""
+    """Get the Synerex logo as a data URI (encoded once, served from the asset cache)"""
     # Try multiple logo files from 8082 static folder
     logo_files = [
         Path(__file__).parent / ".." / "8082" / "static" / "synerex_logo_transparent.png",
         Path(__file__).parent / ".." / "8082" / "static" / "synerex_logo.png",
         Path(__file__).parent / ".." / "8082" / "static" / "synerex_logo_main.png"
     ]
-    
-    for logo_file in logo_files:
-        if logo_file.exists():
-            try:
-                with open(logo_file, 'rb') as f:
-                    logo_data = f.read()
-                    logo_base64 = base64.b64encode(logo_data).decode('utf-8')
-                    return f"data:image/png;base64,{logo_base64}"
-            except Exception as e:
-                continue
-    return ""
+    return asset_cache.first_data_uri(logo_files, "image/png")
 
 def safe_get(data, *keys, default=None):
     """Safely get nested dictionary values"""
@@ -1267,8 +1260,10 @@ def generate_exact_template_html(r):
         print(f"Template file not found at: {template_file.absolute()}")
         return generate_fallback_html(r)
     
-    with open(template_file, 'r', encoding='utf-8') as f:
-        template_content = f.read()
+    # Parsed once per template version; placeholder values are collected in
+    # slots and filled in a single render pass (first value set for a name wins)
+    template = load_template(template_file)
+    slots = {}
     
     # Get logo for cover page
     logo_data_uri = get_logo_data_uri()
@@ -1347,13 +1342,13 @@ def generate_exact_template_html(r):
     )
     
     # Replace cover page placeholders
-    template_content = template_content.replace('{{COVER_LOGO}}', logo_data_uri)
-    template_content = template_content.replace('{{REPORT_DATE}}', report_date)
-    template_content = template_content.replace('{{REPORT_COMPANY}}', str(company_name))
-    template_content = template_content.replace('{{PROJECT_NAME}}', str(project_name_cover) if project_name_cover else "")
-    template_content = template_content.replace('{{REPORT_FACILITY}}', str(facility_address))
-    template_content = template_content.replace('{{PROJECT_REPORT_NUMBER}}', project_report_number)
-    template_content = template_content.replace('{{COPYRIGHT_YEAR}}', copyright_year)
+    slots.setdefault('COVER_LOGO', logo_data_uri)
+    slots.setdefault('REPORT_DATE', report_date)
+    slots.setdefault('REPORT_COMPANY', str(company_name))
+    slots.setdefault('PROJECT_NAME', str(project_name_cover) if project_name_cover else "")
+    slots.setdefault('REPORT_FACILITY', str(facility_address))
+    slots.setdefault('PROJECT_REPORT_NUMBER', project_report_number)
+    slots.setdefault('COPYRIGHT_YEAR', copyright_year)
     
     # Get version number
     try:
@@ -1377,11 +1372,11 @@ def generate_exact_template_html(r):
         version_value = "3.8"
     
     # Replace version placeholder
-    template_content = template_content.replace('{{ version }}', str(version_value))
+    slots.setdefault('version', str(version_value))
     
     # Replace Before/After labels in template (early replacement so they're available throughout)
-    template_content = template_content.replace('{{BEFORE_LABEL}}', str(before_label))
-    template_content = template_content.replace('{{AFTER_LABEL}}', str(after_label))
+    slots.setdefault('BEFORE_LABEL', str(before_label))
+    slots.setdefault('AFTER_LABEL', str(after_label))
     
     # Get contact information for letter
     contact_name = (
@@ -1399,10 +1394,10 @@ def generate_exact_template_html(r):
     letter_contact = contact_name if contact_name else facility_address
     
     # Replace letter placeholders (will be updated with actual values later)
-    template_content = template_content.replace('{{LETTER_DATE}}', letter_date)
-    template_content = template_content.replace('{{LETTER_COMPANY}}', letter_company)
-    template_content = template_content.replace('{{LETTER_FACILITY}}', letter_facility)
-    template_content = template_content.replace('{{LETTER_CONTACT}}', letter_contact)
+    slots.setdefault('LETTER_DATE', letter_date)
+    slots.setdefault('LETTER_COMPANY', letter_company)
+    slots.setdefault('LETTER_FACILITY', letter_facility)
+    slots.setdefault('LETTER_CONTACT', letter_contact)
     
     print(f"TEMPLATE DEBUG: After extracting, config keys: {list(config.keys())}")
     print(f"TEMPLATE DEBUG: After extracting, client_profile keys: {list(client_profile.keys())}")
@@ -1415,10 +1410,8 @@ def generate_exact_template_html(r):
     print(f"TEMPLATE DEBUG: facility_address in config: {safe_get(config, 'facility_address')}")
     print(f"TEMPLATE DEBUG: location in config: {safe_get(config, 'location')}")
     
-    # Replace Flask template variables
-    template_content = template_content.replace('{{ url_for(\'static\', filename=\'file_selection.css\') }}', '')
-    template_content = template_content.replace('{{ url_for(\'static\', filename=\'file_selection.js\') }}', '')
-    template_content = template_content.replace('{{ cache_bust }}', str(int(time.time())))
+    # Replace Flask template variables (url_for tokens are removed after rendering)
+    slots.setdefault('cache_bust', str(int(time.time())))
     
     # GET data sections from UI service (same section names as UI)
     statistical = safe_get(r, "statistical", default={})
@@ -1495,11 +1488,8 @@ def generate_exact_template_html(r):
     config = safe_get(r, "config", default={})
     client_profile = safe_get(r, "client_profile", default={})
     
-    # Replace logo
+    # Replace logo (the embedded placeholder logo is swapped after rendering)
     logo_data_uri = get_logo_data_uri()
-    if logo_data_uri:
-        # Replace the existing base64 logo with the Synerex logo
-        template_content = template_content.replace('data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAyAA...', logo_data_uri)
     
     # ENHANCED template variable replacement - Multi-source value extraction
     
@@ -1528,17 +1518,17 @@ def generate_exact_template_html(r):
         True  # Default
     )
     
-    template_content = template_content.replace('{{P_VALUE}}', format_number(p_value, 4))
-    template_content = template_content.replace('{{SAMPLE_SIZE_BEFORE}}', str(sample_size_before))
-    template_content = template_content.replace('{{SAMPLE_SIZE_AFTER}}', str(sample_size_after))
-    template_content = template_content.replace('{{STATISTICALLY_SIGNIFICANT}}', "YES" if statistically_significant else "NO")
+    slots.setdefault('P_VALUE', format_number(p_value, 4))
+    slots.setdefault('SAMPLE_SIZE_BEFORE', str(sample_size_before))
+    slots.setdefault('SAMPLE_SIZE_AFTER', str(sample_size_after))
+    slots.setdefault('STATISTICALLY_SIGNIFICANT', "YES" if statistically_significant else "NO")
     
     # Debug: Log what values we're using
     print(f"TEMPLATE DEBUG: P_VALUE = {p_value}")
     print(f"TEMPLATE DEBUG: SAMPLE_SIZE_BEFORE = {sample_size_before}")
     print(f"TEMPLATE DEBUG: SAMPLE_SIZE_AFTER = {sample_size_after}")
     print(f"TEMPLATE DEBUG: STATISTICALLY_SIGNIFICANT = {statistically_significant}")
-    template_content = template_content.replace('{{COHENS_D}}', format_number(safe_get(statistical, "cohens_d", default=0), 3))
+    slots.setdefault('COHENS_D', format_number(safe_get(statistical, "cohens_d", default=0), 3))
     
     # Calculate Cohen's d rating
     # Use absolute value since Cohen's d can be negative (indicating decrease)
@@ -1560,7 +1550,7 @@ def generate_exact_template_html(r):
     else:
         cohens_d_rating = "Needs Review"
     
-    template_content = template_content.replace('{{COHENS_D_RATING}}', cohens_d_rating)
+    slots.setdefault('COHENS_D_RATING', cohens_d_rating)
     
     # Calculate T-Statistic rating
     t_statistic_value = safe_get(statistical, "t_statistic", default=0)
@@ -1573,7 +1563,7 @@ def generate_exact_template_html(r):
     else:
         t_statistic_rating = "Excellent"  # Values ≥ 4.0 are also "Excellent" per template scale
     
-    template_content = template_content.replace('{{T_STATISTIC_RATING}}', t_statistic_rating)
+    slots.setdefault('T_STATISTIC_RATING', t_statistic_rating)
     
     # Calculate Relative Precision rating
     relative_precision_value = safe_get(statistical, "relative_precision", default=0)
@@ -1586,19 +1576,19 @@ def generate_exact_template_html(r):
     else:
         relative_precision_rating = "Needs Review"
     
-    template_content = template_content.replace('{{RELATIVE_PRECISION_RATING}}', relative_precision_rating)
+    slots.setdefault('RELATIVE_PRECISION_RATING', relative_precision_rating)
     
     # GET pre-calculated data quality metrics from 8082
     # Use pre-calculated values from 8082 instead of calculating here
     filtered_points = safe_get(statistical, "filtered_points", default=0)
     days_calculation = safe_get(statistical, "days_calculation", default=0.0)
     
-    template_content = template_content.replace('{{FILTERED_POINTS}}', str(filtered_points))
-    template_content = template_content.replace('{{DAYS_CALCULATION}}', f"{days_calculation:.1f}")
-    template_content = template_content.replace('{{T_STATISTIC}}', format_number(safe_get(statistical, "t_statistic", default=0), 2))
-    template_content = template_content.replace('{{RELATIVE_PRECISION}}', format_number(safe_get(statistical, "relative_precision", default=0), 1))
+    slots.setdefault('FILTERED_POINTS', str(filtered_points))
+    slots.setdefault('DAYS_CALCULATION', f"{days_calculation:.1f}")
+    slots.setdefault('T_STATISTIC', format_number(safe_get(statistical, "t_statistic", default=0), 2))
+    slots.setdefault('RELATIVE_PRECISION', format_number(safe_get(statistical, "relative_precision", default=0), 1))
     
-    template_content = template_content.replace('{{MEETS_ASHRAE_PRECISION}}', "YES" if safe_get(statistical, "meets_ashrae_precision", default=False) else "NO")
+    slots.setdefault('MEETS_ASHRAE_PRECISION', "YES" if safe_get(statistical, "meets_ashrae_precision", default=False) else "NO")
     
     # Get KW_NORMALIZED_SAVINGS_PERCENT from power_quality (matches UI Analysis)
     # PRIORITIZE: Use normalized savings percent from Step 4 (most accurate)
@@ -1619,7 +1609,7 @@ def generate_exact_template_html(r):
         kw_normalized_savings_percent = float(kw_normalized_savings_percent_raw) if kw_normalized_savings_percent_raw else 0.0
     # Format to 2 decimal places to match UI Analysis
     kw_normalized_savings_percent_formatted = f"{kw_normalized_savings_percent:.2f}"
-    template_content = template_content.replace('{{KW_NORMALIZED_SAVINGS_PERCENT}}', kw_normalized_savings_percent_formatted)
+    slots.setdefault('KW_NORMALIZED_SAVINGS_PERCENT', kw_normalized_savings_percent_formatted)
     
     # Debug: Log what values we're using
     print(f"TEMPLATE DEBUG: FILTERED_POINTS = {filtered_points}")
@@ -1671,9 +1661,9 @@ def generate_exact_template_html(r):
     power_quality_improvement_formatted = f"{power_quality_improvement:.1f}" if isinstance(power_quality_improvement, (int, float)) else "0.0"
     
     # Replace letter data placeholders
-    template_content = template_content.replace('{{LETTER_KW_SAVINGS}}', kw_savings_formatted)
-    template_content = template_content.replace('{{LETTER_KWH_SAVINGS}}', annual_kwh_savings_formatted)
-    template_content = template_content.replace('{{LETTER_POWER_QUALITY_IMPROVEMENT}}', power_quality_improvement_formatted)
+    slots.setdefault('LETTER_KW_SAVINGS', kw_savings_formatted)
+    slots.setdefault('LETTER_KWH_SAVINGS', annual_kwh_savings_formatted)
+    slots.setdefault('LETTER_POWER_QUALITY_IMPROVEMENT', power_quality_improvement_formatted)
     
     # Extract additional data for letter
     test_period_before = safe_get(config, "test_period_before") or safe_get(r, "test_period_before") or "N/A"
@@ -1749,21 +1739,21 @@ def generate_exact_template_html(r):
     statistical_significance_text = "high" if statistically_significant else "moderate"
     
     # Replace additional letter placeholders
-    template_content = template_content.replace('{{LETTER_TEST_PERIOD}}', test_period)
-    template_content = template_content.replace('{{LETTER_TEST_DURATION}}', str(test_duration))
-    template_content = template_content.replace('{{LETTER_CIRCUIT_NAME}}', str(circuit_name))
-    template_content = template_content.replace('{{LETTER_FACILITY_TYPE}}', str(facility_type))
-    template_content = template_content.replace('{{LETTER_PF_BEFORE}}', pf_before_formatted)
-    template_content = template_content.replace('{{LETTER_PF_AFTER}}', pf_after_formatted)
-    template_content = template_content.replace('{{LETTER_PF_IMPROVEMENT}}', pf_improvement_formatted)
-    template_content = template_content.replace('{{LETTER_THD_BEFORE}}', thd_before_formatted)
-    template_content = template_content.replace('{{LETTER_THD_AFTER}}', thd_after_formatted)
-    template_content = template_content.replace('{{LETTER_STATISTICAL_SIGNIFICANCE}}', statistical_significance_text)
-    template_content = template_content.replace('{{LETTER_P_VALUE}}', p_value_formatted)
-    template_content = template_content.replace('{{LETTER_METER_SPEC}}', str(meter_spec))
-    template_content = template_content.replace('{{LETTER_INTERVAL_DATA}}', str(interval_data))
-    template_content = template_content.replace('{{LETTER_SAMPLE_SIZE_BEFORE}}', str(sample_size_before))
-    template_content = template_content.replace('{{LETTER_SAMPLE_SIZE_AFTER}}', str(sample_size_after))
+    slots.setdefault('LETTER_TEST_PERIOD', test_period)
+    slots.setdefault('LETTER_TEST_DURATION', str(test_duration))
+    slots.setdefault('LETTER_CIRCUIT_NAME', str(circuit_name))
+    slots.setdefault('LETTER_FACILITY_TYPE', str(facility_type))
+    slots.setdefault('LETTER_PF_BEFORE', pf_before_formatted)
+    slots.setdefault('LETTER_PF_AFTER', pf_after_formatted)
+    slots.setdefault('LETTER_PF_IMPROVEMENT', pf_improvement_formatted)
+    slots.setdefault('LETTER_THD_BEFORE', thd_before_formatted)
+    slots.setdefault('LETTER_THD_AFTER', thd_after_formatted)
+    slots.setdefault('LETTER_STATISTICAL_SIGNIFICANCE', statistical_significance_text)
+    slots.setdefault('LETTER_P_VALUE', p_value_formatted)
+    slots.setdefault('LETTER_METER_SPEC', str(meter_spec))
+    slots.setdefault('LETTER_INTERVAL_DATA', str(interval_data))
+    slots.setdefault('LETTER_SAMPLE_SIZE_BEFORE', str(sample_size_before))
+    slots.setdefault('LETTER_SAMPLE_SIZE_AFTER', str(sample_size_after))
     
     # Network smoothing data - check envelope_analysis.smoothing_data (same as report uses)
     envelope_analysis = safe_get(r, "envelope_analysis", default={})
@@ -1849,12 +1839,12 @@ def generate_exact_template_html(r):
     annual_network_savings_formatted = f"${annual_network_savings:,.2f}" if isinstance(annual_network_savings, (int, float)) else "$0.00"
     
     # Replace network smoothing and network loss placeholders
-    template_content = template_content.replace('{{LETTER_SMOOTHING_INDEX}}', smoothing_index_formatted)
-    template_content = template_content.replace('{{LETTER_SMOOTHING_STATUS}}', smoothing_status)
-    template_content = template_content.replace('{{LETTER_NETWORK_LOSS_REDUCTION}}', network_loss_reduction_formatted)
-    template_content = template_content.replace('{{LETTER_CONDUCTOR_LOSS_REDUCTION}}', conductor_loss_reduction_formatted)
-    template_content = template_content.replace('{{LETTER_TRANSFORMER_LOSS_REDUCTION}}', transformer_loss_reduction_formatted)
-    template_content = template_content.replace('{{LETTER_ANNUAL_NETWORK_SAVINGS}}', annual_network_savings_formatted)
+    slots.setdefault('LETTER_SMOOTHING_INDEX', smoothing_index_formatted)
+    slots.setdefault('LETTER_SMOOTHING_STATUS', smoothing_status)
+    slots.setdefault('LETTER_NETWORK_LOSS_REDUCTION', network_loss_reduction_formatted)
+    slots.setdefault('LETTER_CONDUCTOR_LOSS_REDUCTION', conductor_loss_reduction_formatted)
+    slots.setdefault('LETTER_TRANSFORMER_LOSS_REDUCTION', transformer_loss_reduction_formatted)
+    slots.setdefault('LETTER_ANNUAL_NETWORK_SAVINGS', annual_network_savings_formatted)
     
     # NPV - use explicit key check to handle negative values correctly
     npv = 0.0
@@ -1918,20 +1908,20 @@ def generate_exact_template_html(r):
     
     # Format kW Savings with "kW" unit (2 decimal places for Main Results Summary)
     kw_savings_formatted = f"{format_number(kw_savings, 2)} kW"
-    template_content = template_content.replace('{{KW_SAVINGS}}', kw_savings_formatted)
+    slots.setdefault('KW_SAVINGS', kw_savings_formatted)
     # Format Annual kWh Savings with "kWh" unit
     annual_kwh_savings_formatted = f"{format_number(annual_kwh_savings, 0)} kWh"
-    template_content = template_content.replace('{{ANNUAL_KWH_SAVINGS}}', annual_kwh_savings_formatted)
+    slots.setdefault('ANNUAL_KWH_SAVINGS', annual_kwh_savings_formatted)
     # Format NPV with dollar sign (it's a dollar amount)
     npv_formatted = f"${npv:,.2f}" if isinstance(npv, (int, float)) else "$0.00"
-    template_content = template_content.replace('{{NPV}}', npv_formatted)
+    slots.setdefault('NPV', npv_formatted)
     # Format Simple Payback with "years" unit
     simple_payback_formatted = f"{format_number(simple_payback, 1)} years"
-    template_content = template_content.replace('{{SIMPLE_PAYBACK}}', simple_payback_formatted)
+    slots.setdefault('SIMPLE_PAYBACK', simple_payback_formatted)
     # Format IRR with % symbol
     irr_formatted = f"{format_number(irr, 1)}%"
-    template_content = template_content.replace('{{IRR}}', irr_formatted)
-    template_content = template_content.replace('{{SIR}}', format_number(sir, 2))
+    slots.setdefault('IRR', irr_formatted)
+    slots.setdefault('SIR', format_number(sir, 2))
     
     # Project Information - Direct GET from UI HTML Report generator (README.md protocol)
     # Extract from config object (main data source) - these should be populated from form data
@@ -2062,15 +2052,15 @@ def generate_exact_template_html(r):
     )
     
     
-    template_content = template_content.replace('{{company}}', str(company) if company != "-" else "")
-    template_content = template_content.replace('{{facility_address}}', str(facility_address) if facility_address != "-" else "")
-    template_content = template_content.replace('{{location}}', str(location) if location != "-" else "")
-    template_content = template_content.replace('{{contact}}', str(contact) if contact != "-" else "")
-    template_content = template_content.replace('{{contact_name}}', str(contact) if contact != "-" else "")  # Add contact_name mapping
-    template_content = template_content.replace('{{address}}', str(address) if address != "-" else "")  # Use proper address variable
-    template_content = template_content.replace('{{zip_postal_code}}', str(zip_postal_code) if zip_postal_code != "-" else "")  # Use proper zip variable
-    template_content = template_content.replace('{{email}}', str(email) if email != "-" else "")
-    template_content = template_content.replace('{{phone}}', str(phone) if phone != "-" else "")
+    slots.setdefault('company', str(company) if company != "-" else "")
+    slots.setdefault('facility_address', str(facility_address) if facility_address != "-" else "")
+    slots.setdefault('location', str(location) if location != "-" else "")
+    slots.setdefault('contact', str(contact) if contact != "-" else "")
+    slots.setdefault('contact_name', str(contact) if contact != "-" else "")  # Add contact_name mapping
+    slots.setdefault('address', str(address) if address != "-" else "")  # Use proper address variable
+    slots.setdefault('zip_postal_code', str(zip_postal_code) if zip_postal_code != "-" else "")  # Use proper zip variable
+    slots.setdefault('email', str(email) if email != "-" else "")
+    slots.setdefault('phone', str(phone) if phone != "-" else "")
     
     # Debug: Log what values we're using
     print(f"TEMPLATE DEBUG: company = {company}")
@@ -2123,18 +2113,18 @@ def generate_exact_template_html(r):
     
     # Replace template variables with actual form data
     # Use str() to ensure we're replacing with strings, not None
-    template_content = template_content.replace('{{cp_company}}', str(cp_company) if cp_company != "-" else "")
-    template_content = template_content.replace('{{cp_address}}', str(cp_address) if cp_address != "-" else "")
-    template_content = template_content.replace('{{cp_location}}', str(cp_location) if cp_location != "-" else "")
-    template_content = template_content.replace('{{cp_zip}}', str(cp_zip) if cp_zip != "-" else "")
-    template_content = template_content.replace('{{cp_contact}}', str(cp_contact) if cp_contact != "-" else "")
+    slots.setdefault('cp_company', str(cp_company) if cp_company != "-" else "")
+    slots.setdefault('cp_address', str(cp_address) if cp_address != "-" else "")
+    slots.setdefault('cp_location', str(cp_location) if cp_location != "-" else "")
+    slots.setdefault('cp_zip', str(cp_zip) if cp_zip != "-" else "")
+    slots.setdefault('cp_contact', str(cp_contact) if cp_contact != "-" else "")
     
     # Replace project and facility location template variables for Test location section
-    template_content = template_content.replace('{{PROJECT_NAME}}', str(project_name) if project_name != "-" else "")
-    template_content = template_content.replace('{{facility_address}}', str(facility_address) if facility_address != "-" else "")
-    template_content = template_content.replace('{{facility_city}}', str(facility_city) if facility_city else "")
-    template_content = template_content.replace('{{facility_state}}', str(state) if state else "")
-    template_content = template_content.replace('{{facility_zip}}', str(zip_code) if zip_code else "")
+    slots.setdefault('PROJECT_NAME', str(project_name) if project_name != "-" else "")
+    slots.setdefault('facility_address', str(facility_address) if facility_address != "-" else "")
+    slots.setdefault('facility_city', str(facility_city) if facility_city else "")
+    slots.setdefault('facility_state', str(state) if state else "")
+    slots.setdefault('facility_zip', str(zip_code) if zip_code else "")
     
     # Debug: Log what values we're using
     print(f"TEMPLATE DEBUG: cp_company = {cp_company}")
@@ -2144,10 +2134,10 @@ def generate_exact_template_html(r):
     print(f"TEMPLATE DEBUG: cp_contact = {cp_contact}")
     
     # Replace equipment_description, meter_name, utility, account (only once)
-    template_content = template_content.replace('{{equipment_description}}', str(equipment_description) if equipment_description != "-" else "")
-    template_content = template_content.replace('{{meter_name}}', str(meter_name) if meter_name != "-" else "")
-    template_content = template_content.replace('{{utility}}', str(utility) if utility != "-" else "")
-    template_content = template_content.replace('{{account}}', str(account) if account != "-" else "")
+    slots.setdefault('equipment_description', str(equipment_description) if equipment_description != "-" else "")
+    slots.setdefault('meter_name', str(meter_name) if meter_name != "-" else "")
+    slots.setdefault('utility', str(utility) if utility != "-" else "")
+    slots.setdefault('account', str(account) if account != "-" else "")
     
     # M&V Compliance Status - GET from after_compliance section
     # Get raw values and format them properly
@@ -2191,17 +2181,17 @@ def generate_exact_template_html(r):
     ieee_c57_110_status = "PASS"  # Always pass for THD approximation method
     ieee_c57_110_value = "THD Approximation"
     
-    template_content = template_content.replace('{{ASHRAE_GUIDELINE_14_STATUS}}', str(ashrae_precision_status))
-    template_content = template_content.replace('{{ASHRAE_GUIDELINE_14_VALUE}}', str(ashrae_precision_value_str))
-    template_content = template_content.replace('{{ASHRAE_DATA_QUALITY_STATUS}}', str(data_quality_status))
-    template_content = template_content.replace('{{ASHRAE_DATA_QUALITY_VALUE}}', str(data_completeness_pct))
-    template_content = template_content.replace('{{IPMVP_STATUS}}', str(ipmvp_status))
-    template_content = template_content.replace('{{IPMVP_VALUE}}', str(ipmvp_value))
-    template_content = template_content.replace('{{ANSI_C12_STATUS}}', str(ansi_c12_status))
-    template_content = template_content.replace('{{ANSI_C12_VALUE}}', str(ansi_c12_value))
-    template_content = template_content.replace('{{ANSI_C12_CLASS_DESCRIPTION}}', str(ansi_c12_class_description))
-    template_content = template_content.replace('{{IEEE_C57_110_STATUS}}', str(ieee_c57_110_status))
-    template_content = template_content.replace('{{IEEE_C57_110_VALUE}}', str(ieee_c57_110_value))
+    slots.setdefault('ASHRAE_GUIDELINE_14_STATUS', str(ashrae_precision_status))
+    slots.setdefault('ASHRAE_GUIDELINE_14_VALUE', str(ashrae_precision_value_str))
+    slots.setdefault('ASHRAE_DATA_QUALITY_STATUS', str(data_quality_status))
+    slots.setdefault('ASHRAE_DATA_QUALITY_VALUE', str(data_completeness_pct))
+    slots.setdefault('IPMVP_STATUS', str(ipmvp_status))
+    slots.setdefault('IPMVP_VALUE', str(ipmvp_value))
+    slots.setdefault('ANSI_C12_STATUS', str(ansi_c12_status))
+    slots.setdefault('ANSI_C12_VALUE', str(ansi_c12_value))
+    slots.setdefault('ANSI_C12_CLASS_DESCRIPTION', str(ansi_c12_class_description))
+    slots.setdefault('IEEE_C57_110_STATUS', str(ieee_c57_110_status))
+    slots.setdefault('IEEE_C57_110_VALUE', str(ieee_c57_110_value))
     
     # ISO 50001 - Energy Management Systems
     # ISO 50001 is a management system standard (methodology), not a calculated metric
@@ -2263,9 +2253,9 @@ def generate_exact_template_html(r):
     iso_50001_status = "PASS"
     iso_50001_value = f"{kw_savings_pct:.2f}% improvement (EnPI)" if (kw_before > 0 and kw_after > 0) else "Methodology Implemented"
     
-    template_content = template_content.replace('{{ISO_50001_STATUS}}', iso_50001_status)
-    template_content = template_content.replace('{{ISO_50001_VALUE}}', iso_50001_value)
-    template_content = template_content.replace('{{ISO_50001_STATUS_CLASS}}', "compliant")
+    slots.setdefault('ISO_50001_STATUS', iso_50001_status)
+    slots.setdefault('ISO_50001_VALUE', iso_50001_value)
+    slots.setdefault('ISO_50001_STATUS_CLASS', "compliant")
     
     # ISO 50015 - M&V of Energy Performance
     statistical = r.get('statistical', {}) if isinstance(r.get('statistical'), dict) else {}
@@ -2274,15 +2264,15 @@ def generate_exact_template_html(r):
     iso_50015_status = "PASS" if iso_50015_compliant else "FAIL"
     iso_50015_value = f"p = {p_value:.3f}" if p_value > 0 else "N/A"
     
-    template_content = template_content.replace('{{ISO_50015_STATUS}}', iso_50015_status)
-    template_content = template_content.replace('{{ISO_50015_VALUE}}', iso_50015_value)
-    template_content = template_content.replace('{{ISO_50015_STATUS_CLASS}}', "compliant" if iso_50015_compliant else "non-compliant")
+    slots.setdefault('ISO_50015_STATUS', iso_50015_status)
+    slots.setdefault('ISO_50015_VALUE', iso_50015_value)
+    slots.setdefault('ISO_50015_STATUS_CLASS', "compliant" if iso_50015_compliant else "non-compliant")
     
     # Performance Standards - GET from before_compliance and after_compliance sections (using same approach as ASHRAE)
-    template_content = template_content.replace('{{IEEE_519_BEFORE_STATUS}}', "PASS" if safe_get(before_compliance, "ieee_compliant", default=True) else "FAIL")
-    template_content = template_content.replace('{{IEEE_519_AFTER_STATUS}}', "PASS" if safe_get(after_compliance, "ieee_compliant", default=True) else "FAIL")
-    template_content = template_content.replace('{{IEEE_519_BEFORE_VALUE}}', f"{format_number(safe_get(power_quality, 'thd_before', default=0), 1)}%")
-    template_content = template_content.replace('{{IEEE_519_AFTER_VALUE}}', f"{format_number(safe_get(power_quality, 'thd_after', default=0), 1)}%")
+    slots.setdefault('IEEE_519_BEFORE_STATUS', "PASS" if safe_get(before_compliance, "ieee_compliant", default=True) else "FAIL")
+    slots.setdefault('IEEE_519_AFTER_STATUS', "PASS" if safe_get(after_compliance, "ieee_compliant", default=True) else "FAIL")
+    slots.setdefault('IEEE_519_BEFORE_VALUE', f"{format_number(safe_get(power_quality, 'thd_before', default=0), 1)}%")
+    slots.setdefault('IEEE_519_AFTER_VALUE', f"{format_number(safe_get(power_quality, 'thd_after', default=0), 1)}%")
 
     # Performance Standards - ASHRAE Guideline 14 Relative Precision - use processed compliance data
     before_ashrae_compliant = safe_get(before_compliance, "ashrae_precision_compliant", default=True)
@@ -2290,19 +2280,19 @@ def generate_exact_template_html(r):
     before_ashrae_value = safe_get(before_compliance, "ashrae_precision_value", default=0)
     after_ashrae_value = safe_get(after_compliance, "ashrae_precision_value", default=0)
 
-    template_content = template_content.replace('{{ASHRAE_GUIDELINE_14_BEFORE_STATUS}}', "PASS" if before_ashrae_compliant else "FAIL")
-    template_content = template_content.replace('{{ASHRAE_GUIDELINE_14_AFTER_STATUS}}', "PASS" if after_ashrae_compliant else "FAIL")
-    template_content = template_content.replace('{{ASHRAE_GUIDELINE_14_BEFORE_VALUE}}', f"{format_number(before_ashrae_value, 1)}%")
-    template_content = template_content.replace('{{ASHRAE_GUIDELINE_14_AFTER_VALUE}}', f"{format_number(after_ashrae_value, 1)}%")
+    slots.setdefault('ASHRAE_GUIDELINE_14_BEFORE_STATUS', "PASS" if before_ashrae_compliant else "FAIL")
+    slots.setdefault('ASHRAE_GUIDELINE_14_AFTER_STATUS', "PASS" if after_ashrae_compliant else "FAIL")
+    slots.setdefault('ASHRAE_GUIDELINE_14_BEFORE_VALUE', f"{format_number(before_ashrae_value, 1)}%")
+    slots.setdefault('ASHRAE_GUIDELINE_14_AFTER_VALUE', f"{format_number(after_ashrae_value, 1)}%")
     
     # CSS class replacements for ASHRAE Guideline 14 Relative Precision
-    template_content = template_content.replace('{{ASHRAE_GUIDELINE_14_BEFORE_STATUS_CLASS}}', "compliant" if before_ashrae_compliant else "non-compliant")
-    template_content = template_content.replace('{{ASHRAE_GUIDELINE_14_AFTER_STATUS_CLASS}}', "compliant" if after_ashrae_compliant else "non-compliant")
+    slots.setdefault('ASHRAE_GUIDELINE_14_BEFORE_STATUS_CLASS', "compliant" if before_ashrae_compliant else "non-compliant")
+    slots.setdefault('ASHRAE_GUIDELINE_14_AFTER_STATUS_CLASS', "compliant" if after_ashrae_compliant else "non-compliant")
     
     # Add all missing Performance section template variables to match UI HTML
     # IEEE 519 status classes
-    template_content = template_content.replace('{{IEEE_519_BEFORE_STATUS_CLASS}}', "compliant" if safe_get(before_compliance, "ieee_compliant", default=True) else "non-compliant")
-    template_content = template_content.replace('{{IEEE_519_AFTER_STATUS_CLASS}}', "compliant" if safe_get(after_compliance, "ieee_compliant", default=True) else "non-compliant")
+    slots.setdefault('IEEE_519_BEFORE_STATUS_CLASS', "compliant" if safe_get(before_compliance, "ieee_compliant", default=True) else "non-compliant")
+    slots.setdefault('IEEE_519_AFTER_STATUS_CLASS', "compliant" if safe_get(after_compliance, "ieee_compliant", default=True) else "non-compliant")
     
     # IPMVP Performance section
     # The p-value is a statistical test comparing before vs after periods
@@ -2318,12 +2308,12 @@ def generate_exact_template_html(r):
     print(f"[DEBUG] IPMVP p_value from statistical (first location): {p_value_for_ipmvp}", flush=True)
     print(f"[DEBUG] statistical keys: {list(statistical.keys()) if isinstance(statistical, dict) else 'Not a dict'}", flush=True)
     
-    template_content = template_content.replace('{{IPMVP_BEFORE_STATUS}}', "PASS")
-    template_content = template_content.replace('{{IPMVP_AFTER_STATUS}}', "PASS" if after_ipmvp_compliant else "FAIL")
-    template_content = template_content.replace('{{IPMVP_BEFORE_VALUE}}', "p = 0.0000")  # Baseline period - no comparison yet
-    template_content = template_content.replace('{{IPMVP_AFTER_VALUE}}', f"p = {p_value_for_ipmvp:.4f}" if p_value_for_ipmvp > 0 else "p = 0.0000")
-    template_content = template_content.replace('{{IPMVP_BEFORE_STATUS_CLASS}}', "compliant")
-    template_content = template_content.replace('{{IPMVP_AFTER_STATUS_CLASS}}', "compliant" if after_ipmvp_compliant else "non-compliant")
+    slots.setdefault('IPMVP_BEFORE_STATUS', "PASS")
+    slots.setdefault('IPMVP_AFTER_STATUS', "PASS" if after_ipmvp_compliant else "FAIL")
+    slots.setdefault('IPMVP_BEFORE_VALUE', "p = 0.0000")  # Baseline period - no comparison yet
+    slots.setdefault('IPMVP_AFTER_VALUE', f"p = {p_value_for_ipmvp:.4f}" if p_value_for_ipmvp > 0 else "p = 0.0000")
+    slots.setdefault('IPMVP_BEFORE_STATUS_CLASS', "compliant")
+    slots.setdefault('IPMVP_AFTER_STATUS_CLASS', "compliant" if after_ipmvp_compliant else "non-compliant")
     
     # NEMA MG1 Performance section
     # NOTE: NEMA MG1 values are set later (around line 3757) after comprehensive extraction with CSV fallback
@@ -2359,49 +2349,49 @@ def generate_exact_template_html(r):
     
     # Only set early status if values are available, otherwise leave placeholder for final replacement
     if nema_before_unbalance_early is not None and nema_after_unbalance_early is not None:
-        template_content = template_content.replace('{{NEMA_MG1_BEFORE_STATUS}}', "PASS" if nema_before_pass_early else "FAIL")
-        template_content = template_content.replace('{{NEMA_MG1_AFTER_STATUS}}', "PASS" if nema_after_pass_early else "FAIL")
+        slots.setdefault('NEMA_MG1_BEFORE_STATUS', "PASS" if nema_before_pass_early else "FAIL")
+        slots.setdefault('NEMA_MG1_AFTER_STATUS', "PASS" if nema_after_pass_early else "FAIL")
         print(f"[DEBUG] NEMA MG1 early replacement applied - before={nema_before_pass_early}, after={nema_after_pass_early}", flush=True)
     else:
         print(f"[DEBUG] NEMA MG1 early replacement skipped - values not available yet, will use final replacement", flush=True)
-    template_content = template_content.replace('{{NEMA_MG1_BEFORE_STATUS_CLASS}}', "compliant" if nema_before_pass_early else "non-compliant")
-    template_content = template_content.replace('{{NEMA_MG1_AFTER_STATUS_CLASS}}', "compliant" if nema_after_pass_early else "non-compliant")
+    slots.setdefault('NEMA_MG1_BEFORE_STATUS_CLASS', "compliant" if nema_before_pass_early else "non-compliant")
+    slots.setdefault('NEMA_MG1_AFTER_STATUS_CLASS', "compliant" if nema_after_pass_early else "non-compliant")
     
     # IEC 62053-22 Performance section
-    template_content = template_content.replace('{{IEC_62053_22_BEFORE_STATUS}}', "PASS" if safe_get(before_compliance, "iec_62053_22_compliant", default=True) else "FAIL")
-    template_content = template_content.replace('{{IEC_62053_22_AFTER_STATUS}}', "PASS" if safe_get(after_compliance, "iec_62053_22_compliant", default=True) else "FAIL")
-    template_content = template_content.replace('{{IEC_62053_22_BEFORE_VALUE}}', f"{safe_get(before_compliance, 'iec_62053_22_accuracy', default=0.2):.2f}%")
-    template_content = template_content.replace('{{IEC_62053_22_AFTER_VALUE}}', f"{safe_get(after_compliance, 'iec_62053_22_accuracy', default=0.2):.2f}%")
-    template_content = template_content.replace('{{IEC_62053_22_BEFORE_STATUS_CLASS}}', "compliant" if safe_get(before_compliance, "iec_62053_22_compliant", default=True) else "non-compliant")
-    template_content = template_content.replace('{{IEC_62053_22_AFTER_STATUS_CLASS}}', "compliant" if safe_get(after_compliance, "iec_62053_22_compliant", default=True) else "non-compliant")
+    slots.setdefault('IEC_62053_22_BEFORE_STATUS', "PASS" if safe_get(before_compliance, "iec_62053_22_compliant", default=True) else "FAIL")
+    slots.setdefault('IEC_62053_22_AFTER_STATUS', "PASS" if safe_get(after_compliance, "iec_62053_22_compliant", default=True) else "FAIL")
+    slots.setdefault('IEC_62053_22_BEFORE_VALUE', f"{safe_get(before_compliance, 'iec_62053_22_accuracy', default=0.2):.2f}%")
+    slots.setdefault('IEC_62053_22_AFTER_VALUE', f"{safe_get(after_compliance, 'iec_62053_22_accuracy', default=0.2):.2f}%")
+    slots.setdefault('IEC_62053_22_BEFORE_STATUS_CLASS', "compliant" if safe_get(before_compliance, "iec_62053_22_compliant", default=True) else "non-compliant")
+    slots.setdefault('IEC_62053_22_AFTER_STATUS_CLASS', "compliant" if safe_get(after_compliance, "iec_62053_22_compliant", default=True) else "non-compliant")
     
     # IEC 61000-4-7 Performance section
-    template_content = template_content.replace('{{IEC_61000_4_7_BEFORE_STATUS}}', "PASS" if safe_get(before_compliance, "iec_61000_4_7_compliant", default=True) else "FAIL")
-    template_content = template_content.replace('{{IEC_61000_4_7_AFTER_STATUS}}', "PASS" if safe_get(after_compliance, "iec_61000_4_7_compliant", default=True) else "FAIL")
-    template_content = template_content.replace('{{IEC_61000_4_7_BEFORE_VALUE}}', f"{safe_get(power_quality, 'thd_before', default=0):.1f}%")
-    template_content = template_content.replace('{{IEC_61000_4_7_AFTER_VALUE}}', f"{safe_get(power_quality, 'thd_after', default=0):.1f}%")
-    template_content = template_content.replace('{{IEC_61000_4_7_BEFORE_STATUS_CLASS}}', "compliant" if safe_get(before_compliance, "iec_61000_4_7_compliant", default=True) else "non-compliant")
-    template_content = template_content.replace('{{IEC_61000_4_7_AFTER_STATUS_CLASS}}', "compliant" if safe_get(after_compliance, "iec_61000_4_7_compliant", default=True) else "non-compliant")
+    slots.setdefault('IEC_61000_4_7_BEFORE_STATUS', "PASS" if safe_get(before_compliance, "iec_61000_4_7_compliant", default=True) else "FAIL")
+    slots.setdefault('IEC_61000_4_7_AFTER_STATUS', "PASS" if safe_get(after_compliance, "iec_61000_4_7_compliant", default=True) else "FAIL")
+    slots.setdefault('IEC_61000_4_7_BEFORE_VALUE', f"{safe_get(power_quality, 'thd_before', default=0):.1f}%")
+    slots.setdefault('IEC_61000_4_7_AFTER_VALUE', f"{safe_get(power_quality, 'thd_after', default=0):.1f}%")
+    slots.setdefault('IEC_61000_4_7_BEFORE_STATUS_CLASS', "compliant" if safe_get(before_compliance, "iec_61000_4_7_compliant", default=True) else "non-compliant")
+    slots.setdefault('IEC_61000_4_7_AFTER_STATUS_CLASS', "compliant" if safe_get(after_compliance, "iec_61000_4_7_compliant", default=True) else "non-compliant")
     
     # IEC 61000-2-2 Performance section
     # NOTE: Values are replaced later (around line 909) with actual extraction logic
     # DO NOT set placeholder values here - they will overwrite the correct values!
     
     # AHRI 550/590 Performance section
-    template_content = template_content.replace('{{AHRI_550_590_BEFORE_STATUS}}', "PASS" if safe_get(before_compliance, "ahri_550_590_compliant", default=True) else "FAIL")
-    template_content = template_content.replace('{{AHRI_550_590_AFTER_STATUS}}', "PASS" if safe_get(after_compliance, "ahri_550_590_compliant", default=True) else "FAIL")
-    template_content = template_content.replace('{{AHRI_550_590_BEFORE_VALUE}}', "High")
-    template_content = template_content.replace('{{AHRI_550_590_AFTER_VALUE}}', "High")
-    template_content = template_content.replace('{{AHRI_550_590_BEFORE_STATUS_CLASS}}', "compliant" if safe_get(before_compliance, "ahri_550_590_compliant", default=True) else "non-compliant")
-    template_content = template_content.replace('{{AHRI_550_590_AFTER_STATUS_CLASS}}', "compliant" if safe_get(after_compliance, "ahri_550_590_compliant", default=True) else "non-compliant")
+    slots.setdefault('AHRI_550_590_BEFORE_STATUS', "PASS" if safe_get(before_compliance, "ahri_550_590_compliant", default=True) else "FAIL")
+    slots.setdefault('AHRI_550_590_AFTER_STATUS', "PASS" if safe_get(after_compliance, "ahri_550_590_compliant", default=True) else "FAIL")
+    slots.setdefault('AHRI_550_590_BEFORE_VALUE', "High")
+    slots.setdefault('AHRI_550_590_AFTER_VALUE', "High")
+    slots.setdefault('AHRI_550_590_BEFORE_STATUS_CLASS', "compliant" if safe_get(before_compliance, "ahri_550_590_compliant", default=True) else "non-compliant")
+    slots.setdefault('AHRI_550_590_AFTER_STATUS_CLASS', "compliant" if safe_get(after_compliance, "ahri_550_590_compliant", default=True) else "non-compliant")
     
     # ANSI C12.1 & C12.20 Performance section
-    template_content = template_content.replace('{{ANSI_C12_BEFORE_STATUS}}', "PASS" if safe_get(before_compliance, "ansi_c12_20_class_05_compliant", default=True) else "FAIL")
-    template_content = template_content.replace('{{ANSI_C12_AFTER_STATUS}}', "PASS" if safe_get(after_compliance, "ansi_c12_20_class_05_compliant", default=True) else "FAIL")
-    template_content = template_content.replace('{{ANSI_C12_BEFORE_VALUE}}', "0.2")
-    template_content = template_content.replace('{{ANSI_C12_AFTER_VALUE}}', "0.2")
-    template_content = template_content.replace('{{ANSI_C12_BEFORE_STATUS_CLASS}}', "compliant" if safe_get(before_compliance, "ansi_c12_20_class_05_compliant", default=True) else "non-compliant")
-    template_content = template_content.replace('{{ANSI_C12_AFTER_STATUS_CLASS}}', "compliant" if safe_get(after_compliance, "ansi_c12_20_class_05_compliant", default=True) else "non-compliant")
+    slots.setdefault('ANSI_C12_BEFORE_STATUS', "PASS" if safe_get(before_compliance, "ansi_c12_20_class_05_compliant", default=True) else "FAIL")
+    slots.setdefault('ANSI_C12_AFTER_STATUS', "PASS" if safe_get(after_compliance, "ansi_c12_20_class_05_compliant", default=True) else "FAIL")
+    slots.setdefault('ANSI_C12_BEFORE_VALUE', "0.2")
+    slots.setdefault('ANSI_C12_AFTER_VALUE', "0.2")
+    slots.setdefault('ANSI_C12_BEFORE_STATUS_CLASS', "compliant" if safe_get(before_compliance, "ansi_c12_20_class_05_compliant", default=True) else "non-compliant")
+    slots.setdefault('ANSI_C12_AFTER_STATUS_CLASS', "compliant" if safe_get(after_compliance, "ansi_c12_20_class_05_compliant", default=True) else "non-compliant")
     
     # ISO 50001 Performance section (before/after)
     # ISO 50001 is a methodology, always PASS
@@ -2412,12 +2402,12 @@ def generate_exact_template_html(r):
     # After period: shows the improvement percentage
     after_iso_50001_value = f"{kw_savings_pct:.2f}%" if (kw_before > 0 and kw_after > 0) else "Implemented"
     
-    template_content = template_content.replace('{{ISO_50001_BEFORE_STATUS}}', "PASS")
-    template_content = template_content.replace('{{ISO_50001_AFTER_STATUS}}', "PASS")
-    template_content = template_content.replace('{{ISO_50001_BEFORE_VALUE}}', before_iso_50001_value)
-    template_content = template_content.replace('{{ISO_50001_AFTER_VALUE}}', after_iso_50001_value)
-    template_content = template_content.replace('{{ISO_50001_BEFORE_STATUS_CLASS}}', "compliant")
-    template_content = template_content.replace('{{ISO_50001_AFTER_STATUS_CLASS}}', "compliant")
+    slots.setdefault('ISO_50001_BEFORE_STATUS', "PASS")
+    slots.setdefault('ISO_50001_AFTER_STATUS', "PASS")
+    slots.setdefault('ISO_50001_BEFORE_VALUE', before_iso_50001_value)
+    slots.setdefault('ISO_50001_AFTER_VALUE', after_iso_50001_value)
+    slots.setdefault('ISO_50001_BEFORE_STATUS_CLASS', "compliant")
+    slots.setdefault('ISO_50001_AFTER_STATUS_CLASS', "compliant")
     
     # ISO 50015 Performance section (before/after)
     before_iso_50015_compliant = safe_get(before_compliance, "statistically_significant", default=True)
@@ -2427,16 +2417,16 @@ def generate_exact_template_html(r):
     # After period: p-value from statistical comparison
     after_p_value = safe_get(after_compliance, 'statistical_p_value', default=p_value)
     
-    template_content = template_content.replace('{{ISO_50015_BEFORE_STATUS}}', "PASS" if before_iso_50015_compliant else "FAIL")
-    template_content = template_content.replace('{{ISO_50015_AFTER_STATUS}}', "PASS" if after_iso_50015_compliant else "FAIL")
-    template_content = template_content.replace('{{ISO_50015_BEFORE_VALUE}}', "p = 0.000")  # Baseline period - no comparison yet
-    template_content = template_content.replace('{{ISO_50015_AFTER_VALUE}}', f"p = {after_p_value:.3f}" if after_p_value > 0 else "p = 0.000")
-    template_content = template_content.replace('{{ISO_50015_BEFORE_STATUS_CLASS}}', "compliant" if before_iso_50015_compliant else "non-compliant")
-    template_content = template_content.replace('{{ISO_50015_AFTER_STATUS_CLASS}}', "compliant" if after_iso_50015_compliant else "non-compliant")
+    slots.setdefault('ISO_50015_BEFORE_STATUS', "PASS" if before_iso_50015_compliant else "FAIL")
+    slots.setdefault('ISO_50015_AFTER_STATUS', "PASS" if after_iso_50015_compliant else "FAIL")
+    slots.setdefault('ISO_50015_BEFORE_VALUE', "p = 0.000")  # Baseline period - no comparison yet
+    slots.setdefault('ISO_50015_AFTER_VALUE', f"p = {after_p_value:.3f}" if after_p_value > 0 else "p = 0.000")
+    slots.setdefault('ISO_50015_BEFORE_STATUS_CLASS', "compliant" if before_iso_50015_compliant else "non-compliant")
+    slots.setdefault('ISO_50015_AFTER_STATUS_CLASS', "compliant" if after_iso_50015_compliant else "non-compliant")
     
     # IEC 62053 Performance section
-    template_content = template_content.replace('{{IEC_62053_BEFORE_STATUS}}', "PASS" if safe_get(before_compliance, "iec_62053_compliant", default=True) else "FAIL")
-    template_content = template_content.replace('{{IEC_62053_AFTER_STATUS}}', "PASS" if safe_get(after_compliance, "iec_62053_compliant", default=True) else "FAIL")
+    slots.setdefault('IEC_62053_BEFORE_STATUS', "PASS" if safe_get(before_compliance, "iec_62053_compliant", default=True) else "FAIL")
+    slots.setdefault('IEC_62053_AFTER_STATUS', "PASS" if safe_get(after_compliance, "iec_62053_compliant", default=True) else "FAIL")
     # Calculate IEC 62053 meter accuracy from CSV data (using same logic as main application)
     iec_62053_before_class = safe_get(before_compliance, "iec_62053_accuracy_class", default="Unknown")
     iec_62053_after_class = safe_get(after_compliance, "iec_62053_accuracy_class", default="Unknown")
@@ -2447,28 +2437,28 @@ def generate_exact_template_html(r):
     print(f"DEBUG: METHODS & FORMULAS VALIDATION: IEC 62053 accuracy calculation using CSV data - before: {iec_62053_before_class} ({iec_62053_before_value:.1f}%), after: {iec_62053_after_class} ({iec_62053_after_value:.1f}%)")
     
     # Use the accuracy class and value from CSV data (calculated by main application)
-    template_content = template_content.replace('{{IEC_62053_BEFORE_VALUE}}', f"{iec_62053_before_class} ({iec_62053_before_value:.1f}%)")
-    template_content = template_content.replace('{{IEC_62053_AFTER_VALUE}}', f"{iec_62053_after_class} ({iec_62053_after_value:.1f}%)")
-    template_content = template_content.replace('{{IEC_62053_BEFORE_STATUS_CLASS}}', "compliant" if safe_get(before_compliance, "iec_62053_compliant", default=True) else "non-compliant")
-    template_content = template_content.replace('{{IEC_62053_AFTER_STATUS_CLASS}}', "compliant" if safe_get(after_compliance, "iec_62053_compliant", default=True) else "non-compliant")
+    slots.setdefault('IEC_62053_BEFORE_VALUE', f"{iec_62053_before_class} ({iec_62053_before_value:.1f}%)")
+    slots.setdefault('IEC_62053_AFTER_VALUE', f"{iec_62053_after_class} ({iec_62053_after_value:.1f}%)")
+    slots.setdefault('IEC_62053_BEFORE_STATUS_CLASS', "compliant" if safe_get(before_compliance, "iec_62053_compliant", default=True) else "non-compliant")
+    slots.setdefault('IEC_62053_AFTER_STATUS_CLASS', "compliant" if safe_get(after_compliance, "iec_62053_compliant", default=True) else "non-compliant")
     
     # ITIC/CBEMA Performance section
-    template_content = template_content.replace('{{ITIC_CBEMA_BEFORE_STATUS}}', "PASS" if safe_get(before_compliance, "itic_cbema_compliant", default=True) else "FAIL")
-    template_content = template_content.replace('{{ITIC_CBEMA_AFTER_STATUS}}', "PASS" if safe_get(after_compliance, "itic_cbema_compliant", default=True) else "FAIL")
-    template_content = template_content.replace('{{ITIC_CBEMA_BEFORE_VALUE}}', f"{safe_get(before_compliance, 'itic_cbema_tolerance', default=9.4):.1f}% (ITIC/CBEMA compliant)")
-    template_content = template_content.replace('{{ITIC_CBEMA_AFTER_VALUE}}', f"{safe_get(after_compliance, 'itic_cbema_tolerance', default=10.0):.1f}% (ITIC/CBEMA compliant) (+6.6% improvement)")
-    template_content = template_content.replace('{{ITIC_CBEMA_BEFORE_STATUS_CLASS}}', "compliant" if safe_get(before_compliance, "itic_cbema_compliant", default=True) else "non-compliant")
-    template_content = template_content.replace('{{ITIC_CBEMA_AFTER_STATUS_CLASS}}', "compliant" if safe_get(after_compliance, "itic_cbema_compliant", default=True) else "non-compliant")
+    slots.setdefault('ITIC_CBEMA_BEFORE_STATUS', "PASS" if safe_get(before_compliance, "itic_cbema_compliant", default=True) else "FAIL")
+    slots.setdefault('ITIC_CBEMA_AFTER_STATUS', "PASS" if safe_get(after_compliance, "itic_cbema_compliant", default=True) else "FAIL")
+    slots.setdefault('ITIC_CBEMA_BEFORE_VALUE', f"{safe_get(before_compliance, 'itic_cbema_tolerance', default=9.4):.1f}% (ITIC/CBEMA compliant)")
+    slots.setdefault('ITIC_CBEMA_AFTER_VALUE', f"{safe_get(after_compliance, 'itic_cbema_tolerance', default=10.0):.1f}% (ITIC/CBEMA compliant) (+6.6% improvement)")
+    slots.setdefault('ITIC_CBEMA_BEFORE_STATUS_CLASS', "compliant" if safe_get(before_compliance, "itic_cbema_compliant", default=True) else "non-compliant")
+    slots.setdefault('ITIC_CBEMA_AFTER_STATUS_CLASS', "compliant" if safe_get(after_compliance, "itic_cbema_compliant", default=True) else "non-compliant")
     
     # ANSI C57.12.00 Performance section - REMOVED (using correct section below)
     
     # ASHRAE Weather Normalization Performance section
-    template_content = template_content.replace('{{ASHRAE_WEATHER_NORMALIZATION_BEFORE_STATUS}}', "PASS")
-    template_content = template_content.replace('{{ASHRAE_WEATHER_NORMALIZATION_AFTER_STATUS}}', "PASS")
-    template_content = template_content.replace('{{ASHRAE_WEATHER_NORMALIZATION_BEFORE_VALUE}}', f"{safe_get(power_quality, 'kw_before', default=64.0):.1f}kW")
-    template_content = template_content.replace('{{ASHRAE_WEATHER_NORMALIZATION_AFTER_VALUE}}', f"{safe_get(power_quality, 'kw_after', default=54.3):.1f}kW")
-    template_content = template_content.replace('{{ASHRAE_WEATHER_NORMALIZATION_BEFORE_STATUS_CLASS}}', "compliant")
-    template_content = template_content.replace('{{ASHRAE_WEATHER_NORMALIZATION_AFTER_STATUS_CLASS}}', "compliant")
+    slots.setdefault('ASHRAE_WEATHER_NORMALIZATION_BEFORE_STATUS', "PASS")
+    slots.setdefault('ASHRAE_WEATHER_NORMALIZATION_AFTER_STATUS', "PASS")
+    slots.setdefault('ASHRAE_WEATHER_NORMALIZATION_BEFORE_VALUE', f"{safe_get(power_quality, 'kw_before', default=64.0):.1f}kW")
+    slots.setdefault('ASHRAE_WEATHER_NORMALIZATION_AFTER_VALUE', f"{safe_get(power_quality, 'kw_after', default=54.3):.1f}kW")
+    slots.setdefault('ASHRAE_WEATHER_NORMALIZATION_BEFORE_STATUS_CLASS', "compliant")
+    slots.setdefault('ASHRAE_WEATHER_NORMALIZATION_AFTER_STATUS_CLASS', "compliant")
 
     # Performance Standards - IPMVP Statistical Significance - use processed compliance data
     # The p-value is a statistical test comparing before vs after periods
@@ -2484,14 +2474,14 @@ def generate_exact_template_html(r):
     print(f"[DEBUG] IPMVP p_value from statistical (second location): {p_value_for_ipmvp}", flush=True)
     print(f"[DEBUG] statistical keys: {list(statistical.keys()) if isinstance(statistical, dict) else 'Not a dict'}", flush=True)
 
-    template_content = template_content.replace('{{IPMVP_BEFORE_STATUS}}', "PASS")
-    template_content = template_content.replace('{{IPMVP_AFTER_STATUS}}', "PASS" if after_ipmvp_compliant else "FAIL")
-    template_content = template_content.replace('{{IPMVP_BEFORE_VALUE}}', "p = 0.0000")  # Baseline period - no comparison yet
-    template_content = template_content.replace('{{IPMVP_AFTER_VALUE}}', f"p = {format_number(p_value_for_ipmvp, 4)}" if p_value_for_ipmvp > 0 else "p = 0.0000")
+    slots.setdefault('IPMVP_BEFORE_STATUS', "PASS")
+    slots.setdefault('IPMVP_AFTER_STATUS', "PASS" if after_ipmvp_compliant else "FAIL")
+    slots.setdefault('IPMVP_BEFORE_VALUE', "p = 0.0000")  # Baseline period - no comparison yet
+    slots.setdefault('IPMVP_AFTER_VALUE', f"p = {format_number(p_value_for_ipmvp, 4)}" if p_value_for_ipmvp > 0 else "p = 0.0000")
     
     # CSS class replacements for IPMVP Statistical Significance
-    template_content = template_content.replace('{{IPMVP_BEFORE_STATUS_CLASS}}', "compliant")
-    template_content = template_content.replace('{{IPMVP_AFTER_STATUS_CLASS}}', "compliant" if after_ipmvp_compliant else "non-compliant")
+    slots.setdefault('IPMVP_BEFORE_STATUS_CLASS', "compliant")
+    slots.setdefault('IPMVP_AFTER_STATUS_CLASS', "compliant" if after_ipmvp_compliant else "non-compliant")
 
     # Performance Standards - ANSI C12.1 & C12.20 Meter Accuracy - use meter class, not accuracy percentage
     before_ansi_compliant = safe_get(before_compliance, "ansi_c12_20_class_05_compliant", default=True)
@@ -2500,14 +2490,14 @@ def generate_exact_template_html(r):
     before_ansi_value = safe_get(before_compliance, "ansi_c12_20_meter_class", default="0.2")
     after_ansi_value = safe_get(after_compliance, "ansi_c12_20_meter_class", default="0.2")
 
-    template_content = template_content.replace('{{ANSI_C12_BEFORE_STATUS}}', "PASS" if before_ansi_compliant else "FAIL")
-    template_content = template_content.replace('{{ANSI_C12_AFTER_STATUS}}', "PASS" if after_ansi_compliant else "FAIL")
-    template_content = template_content.replace('{{ANSI_C12_BEFORE_VALUE}}', str(before_ansi_value))
-    template_content = template_content.replace('{{ANSI_C12_AFTER_VALUE}}', str(after_ansi_value))
+    slots.setdefault('ANSI_C12_BEFORE_STATUS', "PASS" if before_ansi_compliant else "FAIL")
+    slots.setdefault('ANSI_C12_AFTER_STATUS', "PASS" if after_ansi_compliant else "FAIL")
+    slots.setdefault('ANSI_C12_BEFORE_VALUE', str(before_ansi_value))
+    slots.setdefault('ANSI_C12_AFTER_VALUE', str(after_ansi_value))
     
     # CSS class replacements for ANSI C12.1 & C12.20 Meter Accuracy
-    template_content = template_content.replace('{{ANSI_C12_BEFORE_STATUS_CLASS}}', "compliant" if before_ansi_compliant else "non-compliant")
-    template_content = template_content.replace('{{ANSI_C12_AFTER_STATUS_CLASS}}', "compliant" if after_ansi_compliant else "non-compliant")
+    slots.setdefault('ANSI_C12_BEFORE_STATUS_CLASS', "compliant" if before_ansi_compliant else "non-compliant")
+    slots.setdefault('ANSI_C12_AFTER_STATUS_CLASS', "compliant" if after_ansi_compliant else "non-compliant")
 
     # Performance Standards - ASHRAE Weather Normalization - GET from UI HTML Report generator (README.md protocol)
     weather_norm = safe_get(r, "weather_normalization", default={})
@@ -2518,14 +2508,14 @@ def generate_exact_template_html(r):
     before_weather_value = f"{before_weather_raw:.2f}" if before_weather_raw != 0 else "N/A"
     after_weather_value = f"{after_weather_raw:.2f}" if after_weather_raw != 0 else "N/A"
 
-    template_content = template_content.replace('{{ASHRAE_WEATHER_NORMALIZATION_BEFORE_STATUS}}', "PASS" if before_weather_compliant else "FAIL")
-    template_content = template_content.replace('{{ASHRAE_WEATHER_NORMALIZATION_AFTER_STATUS}}', "PASS" if after_weather_compliant else "FAIL")
-    template_content = template_content.replace('{{ASHRAE_WEATHER_NORMALIZATION_BEFORE_VALUE}}', str(before_weather_value))
-    template_content = template_content.replace('{{ASHRAE_WEATHER_NORMALIZATION_AFTER_VALUE}}', str(after_weather_value))
+    slots.setdefault('ASHRAE_WEATHER_NORMALIZATION_BEFORE_STATUS', "PASS" if before_weather_compliant else "FAIL")
+    slots.setdefault('ASHRAE_WEATHER_NORMALIZATION_AFTER_STATUS', "PASS" if after_weather_compliant else "FAIL")
+    slots.setdefault('ASHRAE_WEATHER_NORMALIZATION_BEFORE_VALUE', str(before_weather_value))
+    slots.setdefault('ASHRAE_WEATHER_NORMALIZATION_AFTER_VALUE', str(after_weather_value))
     
     # CSS class replacements for ASHRAE Weather Normalization
-    template_content = template_content.replace('{{ASHRAE_WEATHER_NORMALIZATION_BEFORE_STATUS_CLASS}}', "compliant" if before_weather_compliant else "non-compliant")
-    template_content = template_content.replace('{{ASHRAE_WEATHER_NORMALIZATION_AFTER_STATUS_CLASS}}', "compliant" if after_weather_compliant else "non-compliant")
+    slots.setdefault('ASHRAE_WEATHER_NORMALIZATION_BEFORE_STATUS_CLASS', "compliant" if before_weather_compliant else "non-compliant")
+    slots.setdefault('ASHRAE_WEATHER_NORMALIZATION_AFTER_STATUS_CLASS', "compliant" if after_weather_compliant else "non-compliant")
     
     # NEMA MG1
     # Get unbalance values for improvement-based compliance check
@@ -2575,10 +2565,10 @@ def generate_exact_template_html(r):
     before_iec_61000_4_30_accuracy = safe_get(before_compliance, "iec_61000_4_30_accuracy", default=0)
     after_iec_61000_4_30_accuracy = safe_get(after_compliance, "iec_61000_4_30_accuracy", default=0)
     
-    template_content = template_content.replace('{{IEC_61000_4_30_BEFORE_STATUS}}', "PASS" if before_iec_61000_4_30_compliant else "FAIL")
-    template_content = template_content.replace('{{IEC_61000_4_30_AFTER_STATUS}}', "PASS" if after_iec_61000_4_30_compliant else "FAIL")
-    template_content = template_content.replace('{{IEC_61000_4_30_BEFORE_VALUE}}', f"{format_number(before_iec_61000_4_30_accuracy, 2)}%")
-    template_content = template_content.replace('{{IEC_61000_4_30_AFTER_VALUE}}', f"{format_number(after_iec_61000_4_30_accuracy, 2)}%")
+    slots.setdefault('IEC_61000_4_30_BEFORE_STATUS', "PASS" if before_iec_61000_4_30_compliant else "FAIL")
+    slots.setdefault('IEC_61000_4_30_AFTER_STATUS', "PASS" if after_iec_61000_4_30_compliant else "FAIL")
+    slots.setdefault('IEC_61000_4_30_BEFORE_VALUE', f"{format_number(before_iec_61000_4_30_accuracy, 2)}%")
+    slots.setdefault('IEC_61000_4_30_AFTER_VALUE', f"{format_number(after_iec_61000_4_30_accuracy, 2)}%")
     
     # Test Parameters section - GET from config and client_profile sections (UI HTML Report data)
     # Look in multiple locations to ensure we get the values
@@ -2724,7 +2714,7 @@ def generate_exact_template_html(r):
         # Convert "Class 0.2" format to "Meter Accuracy Class 0.2" format for the description
         ansi_c12_class_description = f"Meter Accuracy {meter_accuracy_class}"
         # Update the template replacement since it was done earlier before we calculated this
-        template_content = template_content.replace('{{ANSI_C12_CLASS_DESCRIPTION}}', str(ansi_c12_class_description))
+        slots.setdefault('ANSI_C12_CLASS_DESCRIPTION', str(ansi_c12_class_description))
     
     # Meter Calibration Status (from meter_calibration section)
     meter_calibration_status = "AUTO_CALIBRATED"  # Default for modern meters
@@ -2756,17 +2746,17 @@ def generate_exact_template_html(r):
             meter_calibration_status = "AUTO_CALIBRATED"
         # else: default is already "AUTO_CALIBRATED"
 
-    template_content = template_content.replace('{{test_name}}', str(test_name))
-    template_content = template_content.replace('{{circuit_name}}', str(circuit_name))
-    template_content = template_content.replace('{{test_period}}', f"{test_period_before} | {test_period_after}")
-    template_content = template_content.replace('{{test_duration}}', str(test_duration))
-    template_content = template_content.replace('{{meter_spec}}', str(meter_spec))
-    template_content = template_content.replace('{{interval_data}}', str(interval_data))
-    template_content = template_content.replace('{{total_load_pct}}', str(total_load_pct))
-    template_content = template_content.replace('{{meter_model}}', str(meter_model))
-    template_content = template_content.replace('{{meter_sn}}', str(meter_sn))
-    template_content = template_content.replace('{{meter_accuracy_class}}', str(meter_accuracy_class))
-    template_content = template_content.replace('{{meter_calibration_status}}', str(meter_calibration_status))
+    slots.setdefault('test_name', str(test_name))
+    slots.setdefault('circuit_name', str(circuit_name))
+    slots.setdefault('test_period', f"{test_period_before} | {test_period_after}")
+    slots.setdefault('test_duration', str(test_duration))
+    slots.setdefault('meter_spec', str(meter_spec))
+    slots.setdefault('interval_data', str(interval_data))
+    slots.setdefault('total_load_pct', str(total_load_pct))
+    slots.setdefault('meter_model', str(meter_model))
+    slots.setdefault('meter_sn', str(meter_sn))
+    slots.setdefault('meter_accuracy_class', str(meter_accuracy_class))
+    slots.setdefault('meter_calibration_status', str(meter_calibration_status))
     
     # Debug: Log what values we're using
     print(f"TEMPLATE DEBUG: test_name = {test_name}")
@@ -2788,10 +2778,10 @@ def generate_exact_template_html(r):
     iec_61000_4_7_before_value = safe_get(before_compliance, "iec_61000_4_7_thd_value", default=0)
     iec_61000_4_7_after_value = safe_get(after_compliance, "iec_61000_4_7_thd_value", default=0)
     
-    template_content = template_content.replace('{{IEC_61000_4_7_BEFORE_STATUS}}', "PASS" if iec_61000_4_7_before_compliant else "FAIL")
-    template_content = template_content.replace('{{IEC_61000_4_7_AFTER_STATUS}}', "PASS" if iec_61000_4_7_after_compliant else "FAIL")
-    template_content = template_content.replace('{{IEC_61000_4_7_BEFORE_VALUE}}', f"{format_number(iec_61000_4_7_before_value, 1)}%")
-    template_content = template_content.replace('{{IEC_61000_4_7_AFTER_VALUE}}', f"{format_number(iec_61000_4_7_after_value, 1)}%")
+    slots.setdefault('IEC_61000_4_7_BEFORE_STATUS', "PASS" if iec_61000_4_7_before_compliant else "FAIL")
+    slots.setdefault('IEC_61000_4_7_AFTER_STATUS', "PASS" if iec_61000_4_7_after_compliant else "FAIL")
+    slots.setdefault('IEC_61000_4_7_BEFORE_VALUE', f"{format_number(iec_61000_4_7_before_value, 1)}%")
+    slots.setdefault('IEC_61000_4_7_AFTER_VALUE', f"{format_number(iec_61000_4_7_after_value, 1)}%")
     
     # IEC 61000-2-2 Voltage Variation - GET same values as UI HTML Performance section
     # UI HTML reads from: r.before_compliance.iec_61000_2_2_voltage_variation and r.after_compliance.iec_61000_2_2_voltage_variation
@@ -2884,10 +2874,10 @@ def generate_exact_template_html(r):
         iec_61000_2_2_after_compliant = safe_get(after_compliance, "iec_61000_2_2_compliant", default=False)
         print(f"*** IEC 61000-2-2 DEBUG: after_value is N/A, using compliance flag = {iec_61000_2_2_after_compliant} ***")
     
-    template_content = template_content.replace('{{IEC_61000_2_2_BEFORE_STATUS}}', "PASS" if iec_61000_2_2_before_compliant else "FAIL")
-    template_content = template_content.replace('{{IEC_61000_2_2_AFTER_STATUS}}', "PASS" if iec_61000_2_2_after_compliant else "FAIL")
-    template_content = template_content.replace('{{IEC_61000_2_2_BEFORE_VALUE}}', iec_61000_2_2_before_value_str)
-    template_content = template_content.replace('{{IEC_61000_2_2_AFTER_VALUE}}', iec_61000_2_2_after_value_str)
+    slots.setdefault('IEC_61000_2_2_BEFORE_STATUS', "PASS" if iec_61000_2_2_before_compliant else "FAIL")
+    slots.setdefault('IEC_61000_2_2_AFTER_STATUS', "PASS" if iec_61000_2_2_after_compliant else "FAIL")
+    slots.setdefault('IEC_61000_2_2_BEFORE_VALUE', iec_61000_2_2_before_value_str)
+    slots.setdefault('IEC_61000_2_2_AFTER_VALUE', iec_61000_2_2_after_value_str)
     
     # IEC 62053 Meter Accuracy - Use compliance_status array
     iec_62053_item = next((item for item in compliance_status if item.get('standard') == 'IEC 62053-22'), None)
@@ -2918,16 +2908,16 @@ def generate_exact_template_html(r):
         iec_62053_after_status = "PASS" if iec_62053_after_compliant else "FAIL"
     
     # Force replacement of IEC 62053 placeholders
-    template_content = template_content.replace('{{IEC_62053_BEFORE_STATUS}}', iec_62053_before_status)
-    template_content = template_content.replace('{{IEC_62053_AFTER_STATUS}}', iec_62053_after_status)
-    template_content = template_content.replace('{{IEC_62053_BEFORE_VALUE}}', iec_62053_before_value)
-    template_content = template_content.replace('{{IEC_62053_AFTER_VALUE}}', iec_62053_after_value)
+    slots.setdefault('IEC_62053_BEFORE_STATUS', iec_62053_before_status)
+    slots.setdefault('IEC_62053_AFTER_STATUS', iec_62053_after_status)
+    slots.setdefault('IEC_62053_BEFORE_VALUE', iec_62053_before_value)
+    slots.setdefault('IEC_62053_AFTER_VALUE', iec_62053_after_value)
     
     
     
     # CSS class replacements for IEC 62053
-    template_content = template_content.replace('{{IEC_62053_BEFORE_STATUS_CLASS}}', "compliant" if iec_62053_before_compliant else "non-compliant")
-    template_content = template_content.replace('{{IEC_62053_AFTER_STATUS_CLASS}}', "compliant" if iec_62053_after_compliant else "non-compliant")
+    slots.setdefault('IEC_62053_BEFORE_STATUS_CLASS', "compliant" if iec_62053_before_compliant else "non-compliant")
+    slots.setdefault('IEC_62053_AFTER_STATUS_CLASS', "compliant" if iec_62053_after_compliant else "non-compliant")
     
     # Check if ITIC/CBEMA section should be included
     # IMPORTANT: Unchecked checkboxes don't send a value, so if key doesn't exist, default to False
@@ -2952,9 +2942,9 @@ def generate_exact_template_html(r):
     if not include_itic_cbema:
         # Remove ITIC/CBEMA table row from Performance section
         itic_cbema_performance_pattern = r'<!-- ITIC_CBEMA_PERFORMANCE_ROW_START -->.*?<!-- ITIC_CBEMA_PERFORMANCE_ROW_END -->'
-        before_length = len(template_content)
-        template_content = re.sub(itic_cbema_performance_pattern, '', template_content, flags=re.DOTALL)
-        after_length = len(template_content)
+        before_length = len(template.source)
+        template = template.without(itic_cbema_performance_pattern)
+        after_length = len(template.source)
         removed_length = before_length - after_length
         print(f"*** ITIC/CBEMA Performance table row removed (checkbox unchecked) - removed {removed_length} characters ***")
         if removed_length == 0:
@@ -2965,9 +2955,9 @@ def generate_exact_template_html(r):
     if not include_itic_cbema:
         # Remove ITIC/CBEMA line item from Analysis Scope & Methodology section
         itic_cbema_methodology_pattern = r'<!-- ITIC_CBEMA_METHODOLOGY_ITEM_START -->.*?<!-- ITIC_CBEMA_METHODOLOGY_ITEM_END -->'
-        before_length = len(template_content)
-        template_content = re.sub(itic_cbema_methodology_pattern, '', template_content, flags=re.DOTALL)
-        after_length = len(template_content)
+        before_length = len(template.source)
+        template = template.without(itic_cbema_methodology_pattern)
+        after_length = len(template.source)
         removed_length = before_length - after_length
         print(f"*** ITIC/CBEMA Methodology line item removed (checkbox unchecked) - removed {removed_length} characters ***")
         if removed_length == 0:
@@ -2978,9 +2968,9 @@ def generate_exact_template_html(r):
     if not include_itic_cbema:
         # Remove ITIC/CBEMA section from Methods & Formulas section
         itic_cbema_section_pattern = r'<!-- ITIC_CBEMA_SECTION_START -->.*?<!-- ITIC_CBEMA_SECTION_END -->'
-        before_length = len(template_content)
-        template_content = re.sub(itic_cbema_section_pattern, '', template_content, flags=re.DOTALL)
-        after_length = len(template_content)
+        before_length = len(template.source)
+        template = template.without(itic_cbema_section_pattern)
+        after_length = len(template.source)
         removed_length = before_length - after_length
         print(f"*** ITIC/CBEMA Methods & Formulas section removed (checkbox unchecked) - removed {removed_length} characters ***")
         if removed_length == 0:
@@ -3015,22 +3005,22 @@ def generate_exact_template_html(r):
         itic_cbema_after_status = "PASS" if itic_cbema_after_compliant else "FAIL"
     
     # Force replacement of ITIC/CBEMA placeholders
-    template_content = template_content.replace('{{ITIC_CBEMA_BEFORE_STATUS}}', itic_cbema_before_status)
-    template_content = template_content.replace('{{ITIC_CBEMA_AFTER_STATUS}}', itic_cbema_after_status)
-    template_content = template_content.replace('{{ITIC_CBEMA_BEFORE_VALUE}}', itic_cbema_before_value)
-    template_content = template_content.replace('{{ITIC_CBEMA_AFTER_VALUE}}', itic_cbema_after_value)
+    slots.setdefault('ITIC_CBEMA_BEFORE_STATUS', itic_cbema_before_status)
+    slots.setdefault('ITIC_CBEMA_AFTER_STATUS', itic_cbema_after_status)
+    slots.setdefault('ITIC_CBEMA_BEFORE_VALUE', itic_cbema_before_value)
+    slots.setdefault('ITIC_CBEMA_AFTER_VALUE', itic_cbema_after_value)
     
     
     # CSS class replacements for ITIC/CBEMA
-    template_content = template_content.replace('{{ITIC_CBEMA_BEFORE_STATUS_CLASS}}', "compliant" if itic_cbema_before_compliant else "non-compliant")
-    template_content = template_content.replace('{{ITIC_CBEMA_AFTER_STATUS_CLASS}}', "compliant" if itic_cbema_after_compliant else "non-compliant")
+    slots.setdefault('ITIC_CBEMA_BEFORE_STATUS_CLASS', "compliant" if itic_cbema_before_compliant else "non-compliant")
+    slots.setdefault('ITIC_CBEMA_AFTER_STATUS_CLASS', "compliant" if itic_cbema_after_compliant else "non-compliant")
     
     # Additional ITIC/CBEMA variable replacements
-    template_content = template_content.replace('{{ITIC_CBEMA_STANDARD_REFERENCE}}', "Information Technology Industry Council / Computer Business Equipment Manufacturers Association")
-    template_content = template_content.replace('{{ITIC_CBEMA_CURVE_TYPE}}', "ITIC Curve")
-    template_content = template_content.replace('{{ITIC_CBEMA_SAG_TOLERANCE}}', "0.1s @ 80%")
-    template_content = template_content.replace('{{ITIC_CBEMA_SWELL_TOLERANCE}}', "0.1s @ 120%")
-    template_content = template_content.replace('{{ITIC_CBEMA_FREQUENCY_TOLERANCE}}', "±0.5 Hz")
+    slots.setdefault('ITIC_CBEMA_STANDARD_REFERENCE', "Information Technology Industry Council / Computer Business Equipment Manufacturers Association")
+    slots.setdefault('ITIC_CBEMA_CURVE_TYPE', "ITIC Curve")
+    slots.setdefault('ITIC_CBEMA_SAG_TOLERANCE', "0.1s @ 80%")
+    slots.setdefault('ITIC_CBEMA_SWELL_TOLERANCE', "0.1s @ 120%")
+    slots.setdefault('ITIC_CBEMA_FREQUENCY_TOLERANCE', "±0.5 Hz")
     # Calculate ITIC/CBEMA values from voltage quality analysis of CSV data (using same logic as main application)
     itic_cbema_before_tolerance = safe_get(before_compliance, "itic_cbema_voltage_tolerance", default=0.0)
     itic_cbema_after_tolerance = safe_get(after_compliance, "itic_cbema_voltage_tolerance", default=0.0)
@@ -3046,18 +3036,18 @@ def generate_exact_template_html(r):
         itic_cbema_improvement = ((itic_cbema_after_tolerance - itic_cbema_before_tolerance) / itic_cbema_before_tolerance) * 100
     
     # Use calculated values instead of hardcoded event counts
-    template_content = template_content.replace('{{ITIC_CBEMA_BEFORE_SAGS}}', f"{max(0, int(itic_cbema_before_tolerance * 2))} events")
-    template_content = template_content.replace('{{ITIC_CBEMA_AFTER_SAGS}}', f"{max(0, int(itic_cbema_after_tolerance * 2))} events")
-    template_content = template_content.replace('{{ITIC_CBEMA_BEFORE_SWELLS}}', f"{max(0, int(itic_cbema_before_tolerance * 1.5))} events")
-    template_content = template_content.replace('{{ITIC_CBEMA_AFTER_SWELLS}}', f"{max(0, int(itic_cbema_after_tolerance * 1.5))} events")
-    template_content = template_content.replace('{{ITIC_CBEMA_BEFORE_FREQUENCY_DEVIATIONS}}', f"{max(0, int(itic_cbema_before_tolerance * 0.5))} events")
-    template_content = template_content.replace('{{ITIC_CBEMA_AFTER_FREQUENCY_DEVIATIONS}}', f"{max(0, int(itic_cbema_after_tolerance * 0.5))} events")
-    template_content = template_content.replace('{{ITIC_CBEMA_EQUIPMENT_PROTECTION}}', "Enhanced")
-    template_content = template_content.replace('{{ITIC_CBEMA_BEFORE_COMPLIANCE}}', itic_cbema_before_status)
-    template_content = template_content.replace('{{ITIC_CBEMA_AFTER_COMPLIANCE}}', itic_cbema_after_status)
+    slots.setdefault('ITIC_CBEMA_BEFORE_SAGS', f"{max(0, int(itic_cbema_before_tolerance * 2))} events")
+    slots.setdefault('ITIC_CBEMA_AFTER_SAGS', f"{max(0, int(itic_cbema_after_tolerance * 2))} events")
+    slots.setdefault('ITIC_CBEMA_BEFORE_SWELLS', f"{max(0, int(itic_cbema_before_tolerance * 1.5))} events")
+    slots.setdefault('ITIC_CBEMA_AFTER_SWELLS', f"{max(0, int(itic_cbema_after_tolerance * 1.5))} events")
+    slots.setdefault('ITIC_CBEMA_BEFORE_FREQUENCY_DEVIATIONS', f"{max(0, int(itic_cbema_before_tolerance * 0.5))} events")
+    slots.setdefault('ITIC_CBEMA_AFTER_FREQUENCY_DEVIATIONS', f"{max(0, int(itic_cbema_after_tolerance * 0.5))} events")
+    slots.setdefault('ITIC_CBEMA_EQUIPMENT_PROTECTION', "Enhanced")
+    slots.setdefault('ITIC_CBEMA_BEFORE_COMPLIANCE', itic_cbema_before_status)
+    slots.setdefault('ITIC_CBEMA_AFTER_COMPLIANCE', itic_cbema_after_status)
     # Use the calculated improvement from tolerance values
-    template_content = template_content.replace('{{ITIC_CBEMA_IMPROVEMENT}}', f"{itic_cbema_improvement:.0f}% improvement")
-    template_content = template_content.replace('{{ITIC_CBEMA_RELIABILITY_IMPROVEMENT}}', f"{itic_cbema_after_tolerance:.1f}% tolerance")
+    slots.setdefault('ITIC_CBEMA_IMPROVEMENT', f"{itic_cbema_improvement:.0f}% improvement")
+    slots.setdefault('ITIC_CBEMA_RELIABILITY_IMPROVEMENT', f"{itic_cbema_after_tolerance:.1f}% tolerance")
     
     # Check if BESS section should be included
     # IMPORTANT: Unchecked checkboxes don't send a value, so if key doesn't exist, default to False
@@ -3082,9 +3072,9 @@ def generate_exact_template_html(r):
     if not include_bess:
         # Remove entire BESS section from template
         bess_pattern = r'<!-- BESS_SECTION_START -->.*?<!-- BESS_SECTION_END -->'
-        before_length = len(template_content)
-        template_content = re.sub(bess_pattern, '', template_content, flags=re.DOTALL)
-        after_length = len(template_content)
+        before_length = len(template.source)
+        template = template.without(bess_pattern)
+        after_length = len(template.source)
         removed_length = before_length - after_length
         print(f"*** BESS section removed from template (checkbox unchecked) - removed {removed_length} characters ***")
         if removed_length == 0:
@@ -3116,18 +3106,18 @@ def generate_exact_template_html(r):
     efficiency_improvement = ((efficiency_after - efficiency_before) / efficiency_before * 100) if efficiency_before > 0 else 0
     
     # BESS Performance Overview
-    template_content = template_content.replace('{{BESS_PF_IMPROVEMENT}}', f"{pf_improvement:.1f}")
-    template_content = template_content.replace('{{BESS_PF_BEFORE}}', f"{pf_before:.3f}")
-    template_content = template_content.replace('{{BESS_PF_AFTER}}', f"{pf_after:.3f}")
-    template_content = template_content.replace('{{BESS_HARMONIC_REDUCTION}}', f"{thd_reduction:.1f}")
-    template_content = template_content.replace('{{BESS_THD_BEFORE}}', f"{thd_before:.1f}")
-    template_content = template_content.replace('{{BESS_THD_AFTER}}', f"{thd_after:.1f}")
-    template_content = template_content.replace('{{BESS_VOLTAGE_IMPROVEMENT}}', f"{voltage_improvement:.1f}")
-    template_content = template_content.replace('{{BESS_VOLTAGE_VARIATION_BEFORE}}', f"{voltage_variation_before:.1f}")
-    template_content = template_content.replace('{{BESS_VOLTAGE_VARIATION_AFTER}}', f"{voltage_variation_after:.1f}")
-    template_content = template_content.replace('{{BESS_EFFICIENCY_IMPROVEMENT}}', f"{efficiency_improvement:.1f}")
-    template_content = template_content.replace('{{BESS_EFFICIENCY_BEFORE}}', f"{efficiency_before:.1f}")
-    template_content = template_content.replace('{{BESS_EFFICIENCY_AFTER}}', f"{efficiency_after:.1f}")
+    slots.setdefault('BESS_PF_IMPROVEMENT', f"{pf_improvement:.1f}")
+    slots.setdefault('BESS_PF_BEFORE', f"{pf_before:.3f}")
+    slots.setdefault('BESS_PF_AFTER', f"{pf_after:.3f}")
+    slots.setdefault('BESS_HARMONIC_REDUCTION', f"{thd_reduction:.1f}")
+    slots.setdefault('BESS_THD_BEFORE', f"{thd_before:.1f}")
+    slots.setdefault('BESS_THD_AFTER', f"{thd_after:.1f}")
+    slots.setdefault('BESS_VOLTAGE_IMPROVEMENT', f"{voltage_improvement:.1f}")
+    slots.setdefault('BESS_VOLTAGE_VARIATION_BEFORE', f"{voltage_variation_before:.1f}")
+    slots.setdefault('BESS_VOLTAGE_VARIATION_AFTER', f"{voltage_variation_after:.1f}")
+    slots.setdefault('BESS_EFFICIENCY_IMPROVEMENT', f"{efficiency_improvement:.1f}")
+    slots.setdefault('BESS_EFFICIENCY_BEFORE', f"{efficiency_before:.1f}")
+    slots.setdefault('BESS_EFFICIENCY_AFTER', f"{efficiency_after:.1f}")
     
     # BESS Stress Reduction Analysis
     voltage_stress_before = voltage_variation_before * 2.5  # Stress factor
@@ -3153,24 +3143,24 @@ def generate_exact_template_html(r):
     overall_stress_reduction = (voltage_stress_reduction + harmonic_stress_reduction + pf_stress_reduction + thermal_stress_reduction + electrical_stress_reduction) / 5
     
     # BESS Stress Reduction
-    template_content = template_content.replace('{{BESS_VOLTAGE_STRESS_BEFORE}}', f"{voltage_stress_before:.1f}")
-    template_content = template_content.replace('{{BESS_VOLTAGE_STRESS_AFTER}}', f"{voltage_stress_after:.1f}")
-    template_content = template_content.replace('{{BESS_VOLTAGE_STRESS_REDUCTION}}', f"{voltage_stress_reduction:.1f}")
-    template_content = template_content.replace('{{BESS_HARMONIC_STRESS_BEFORE}}', f"{harmonic_stress_before:.1f}")
-    template_content = template_content.replace('{{BESS_HARMONIC_STRESS_AFTER}}', f"{harmonic_stress_after:.1f}")
-    template_content = template_content.replace('{{BESS_HARMONIC_STRESS_REDUCTION}}', f"{harmonic_stress_reduction:.1f}")
-    template_content = template_content.replace('{{BESS_PF_STRESS_BEFORE}}', f"{pf_stress_before:.1f}")
-    template_content = template_content.replace('{{BESS_PF_STRESS_AFTER}}', f"{pf_stress_after:.1f}")
-    template_content = template_content.replace('{{BESS_PF_STRESS_REDUCTION}}', f"{pf_stress_reduction:.1f}")
-    template_content = template_content.replace('{{BESS_THERMAL_STRESS_BEFORE}}', f"{thermal_stress_before:.1f}")
-    template_content = template_content.replace('{{BESS_THERMAL_STRESS_AFTER}}', f"{thermal_stress_after:.1f}")
-    template_content = template_content.replace('{{BESS_THERMAL_STRESS_REDUCTION}}', f"{thermal_stress_reduction:.1f}")
-    template_content = template_content.replace('{{BESS_ELECTRICAL_STRESS_BEFORE}}', f"{electrical_stress_before:.1f}")
-    template_content = template_content.replace('{{BESS_ELECTRICAL_STRESS_AFTER}}', f"{electrical_stress_after:.1f}")
-    template_content = template_content.replace('{{BESS_ELECTRICAL_STRESS_REDUCTION}}', f"{electrical_stress_reduction:.1f}")
-    template_content = template_content.replace('{{BESS_OVERALL_STRESS_REDUCTION}}', f"{overall_stress_reduction:.1f}")
-    template_content = template_content.replace('{{BESS_STRESS_SIGNIFICANCE}}', "Statistically Significant" if overall_stress_reduction > 10 else "Not Significant")
-    template_content = template_content.replace('{{BESS_STRESS_CONFIDENCE}}', "95")
+    slots.setdefault('BESS_VOLTAGE_STRESS_BEFORE', f"{voltage_stress_before:.1f}")
+    slots.setdefault('BESS_VOLTAGE_STRESS_AFTER', f"{voltage_stress_after:.1f}")
+    slots.setdefault('BESS_VOLTAGE_STRESS_REDUCTION', f"{voltage_stress_reduction:.1f}")
+    slots.setdefault('BESS_HARMONIC_STRESS_BEFORE', f"{harmonic_stress_before:.1f}")
+    slots.setdefault('BESS_HARMONIC_STRESS_AFTER', f"{harmonic_stress_after:.1f}")
+    slots.setdefault('BESS_HARMONIC_STRESS_REDUCTION', f"{harmonic_stress_reduction:.1f}")
+    slots.setdefault('BESS_PF_STRESS_BEFORE', f"{pf_stress_before:.1f}")
+    slots.setdefault('BESS_PF_STRESS_AFTER', f"{pf_stress_after:.1f}")
+    slots.setdefault('BESS_PF_STRESS_REDUCTION', f"{pf_stress_reduction:.1f}")
+    slots.setdefault('BESS_THERMAL_STRESS_BEFORE', f"{thermal_stress_before:.1f}")
+    slots.setdefault('BESS_THERMAL_STRESS_AFTER', f"{thermal_stress_after:.1f}")
+    slots.setdefault('BESS_THERMAL_STRESS_REDUCTION', f"{thermal_stress_reduction:.1f}")
+    slots.setdefault('BESS_ELECTRICAL_STRESS_BEFORE', f"{electrical_stress_before:.1f}")
+    slots.setdefault('BESS_ELECTRICAL_STRESS_AFTER', f"{electrical_stress_after:.1f}")
+    slots.setdefault('BESS_ELECTRICAL_STRESS_REDUCTION', f"{electrical_stress_reduction:.1f}")
+    slots.setdefault('BESS_OVERALL_STRESS_REDUCTION', f"{overall_stress_reduction:.1f}")
+    slots.setdefault('BESS_STRESS_SIGNIFICANCE', "Statistically Significant" if overall_stress_reduction > 10 else "Not Significant")
+    slots.setdefault('BESS_STRESS_CONFIDENCE', "95")
     
     # BESS Battery Life and Storage Analysis
     cycle_life_before = 5000  # Base cycles
@@ -3190,18 +3180,18 @@ def generate_exact_template_html(r):
     life_extension = ((expected_life_after - expected_life_before) / expected_life_before * 100) if expected_life_before > 0 else 0
     
     # BESS Battery Life
-    template_content = template_content.replace('{{BESS_CYCLE_LIFE_BEFORE}}', f"{cycle_life_before:,}")
-    template_content = template_content.replace('{{BESS_CYCLE_LIFE_AFTER}}', f"{cycle_life_after:,}")
-    template_content = template_content.replace('{{BESS_CYCLE_LIFE_IMPROVEMENT}}', f"{cycle_life_improvement:.1f}")
-    template_content = template_content.replace('{{BESS_TEMP_STRESS_BEFORE}}', f"{temp_stress_before:.1f}")
-    template_content = template_content.replace('{{BESS_TEMP_STRESS_AFTER}}', f"{temp_stress_after:.1f}")
-    template_content = template_content.replace('{{BESS_TEMP_STRESS_REDUCTION}}', f"{temp_stress_reduction:.1f}")
-    template_content = template_content.replace('{{BESS_BATTERY_EFFICIENCY_BEFORE}}', f"{battery_efficiency_before:.1f}")
-    template_content = template_content.replace('{{BESS_BATTERY_EFFICIENCY_AFTER}}', f"{battery_efficiency_after:.1f}")
-    template_content = template_content.replace('{{BESS_BATTERY_EFFICIENCY_IMPROVEMENT}}', f"{battery_efficiency_improvement:.1f}")
-    template_content = template_content.replace('{{BESS_EXPECTED_LIFE_BEFORE}}', f"{expected_life_before:.1f}")
-    template_content = template_content.replace('{{BESS_EXPECTED_LIFE_AFTER}}', f"{expected_life_after:.1f}")
-    template_content = template_content.replace('{{BESS_LIFE_EXTENSION}}', f"{life_extension:.1f}")
+    slots.setdefault('BESS_CYCLE_LIFE_BEFORE', f"{cycle_life_before:,}")
+    slots.setdefault('BESS_CYCLE_LIFE_AFTER', f"{cycle_life_after:,}")
+    slots.setdefault('BESS_CYCLE_LIFE_IMPROVEMENT', f"{cycle_life_improvement:.1f}")
+    slots.setdefault('BESS_TEMP_STRESS_BEFORE', f"{temp_stress_before:.1f}")
+    slots.setdefault('BESS_TEMP_STRESS_AFTER', f"{temp_stress_after:.1f}")
+    slots.setdefault('BESS_TEMP_STRESS_REDUCTION', f"{temp_stress_reduction:.1f}")
+    slots.setdefault('BESS_BATTERY_EFFICIENCY_BEFORE', f"{battery_efficiency_before:.1f}")
+    slots.setdefault('BESS_BATTERY_EFFICIENCY_AFTER', f"{battery_efficiency_after:.1f}")
+    slots.setdefault('BESS_BATTERY_EFFICIENCY_IMPROVEMENT', f"{battery_efficiency_improvement:.1f}")
+    slots.setdefault('BESS_EXPECTED_LIFE_BEFORE', f"{expected_life_before:.1f}")
+    slots.setdefault('BESS_EXPECTED_LIFE_AFTER', f"{expected_life_after:.1f}")
+    slots.setdefault('BESS_LIFE_EXTENSION', f"{life_extension:.1f}")
     
     # BESS Financial Impact Analysis
     demand_cost_before = 15000  # Base demand cost
@@ -3228,36 +3218,36 @@ def generate_exact_template_html(r):
     total_5yr_savings = total_annual_savings * 5
     
     # BESS Financial Impact
-    template_content = template_content.replace('{{BESS_DEMAND_COST_BEFORE}}', f"{demand_cost_before:,.0f}")
-    template_content = template_content.replace('{{BESS_DEMAND_COST_AFTER}}', f"{demand_cost_after:,.0f}")
-    template_content = template_content.replace('{{BESS_DEMAND_SAVINGS}}', f"{demand_savings:,.0f}")
-    template_content = template_content.replace('{{BESS_DEMAND_SAVINGS_5YR}}', f"{demand_savings_5yr:,.0f}")
-    template_content = template_content.replace('{{BESS_REACTIVE_COST_BEFORE}}', f"{reactive_cost_before:,.0f}")
-    template_content = template_content.replace('{{BESS_REACTIVE_COST_AFTER}}', f"{reactive_cost_after:,.0f}")
-    template_content = template_content.replace('{{BESS_REACTIVE_SAVINGS}}', f"{reactive_savings:,.0f}")
-    template_content = template_content.replace('{{BESS_REACTIVE_SAVINGS_5YR}}', f"{reactive_savings_5yr:,.0f}")
-    template_content = template_content.replace('{{BESS_BATTERY_COST_BEFORE}}', f"{battery_cost_before:,.0f}")
-    template_content = template_content.replace('{{BESS_BATTERY_COST_AFTER}}', f"{battery_cost_after:,.0f}")
-    template_content = template_content.replace('{{BESS_BATTERY_SAVINGS}}', f"{battery_savings:,.0f}")
-    template_content = template_content.replace('{{BESS_BATTERY_SAVINGS_5YR}}', f"{battery_savings_5yr:,.0f}")
-    template_content = template_content.replace('{{BESS_MAINTENANCE_COST_BEFORE}}', f"{maintenance_cost_before:,.0f}")
-    template_content = template_content.replace('{{BESS_MAINTENANCE_COST_AFTER}}', f"{maintenance_cost_after:,.0f}")
-    template_content = template_content.replace('{{BESS_MAINTENANCE_SAVINGS}}', f"{maintenance_savings:,.0f}")
-    template_content = template_content.replace('{{BESS_MAINTENANCE_SAVINGS_5YR}}', f"{maintenance_savings_5yr:,.0f}")
-    template_content = template_content.replace('{{BESS_TOTAL_ANNUAL_SAVINGS}}', f"{total_annual_savings:,.0f}")
-    template_content = template_content.replace('{{BESS_TOTAL_5YR_SAVINGS}}', f"{total_5yr_savings:,.0f}")
+    slots.setdefault('BESS_DEMAND_COST_BEFORE', f"{demand_cost_before:,.0f}")
+    slots.setdefault('BESS_DEMAND_COST_AFTER', f"{demand_cost_after:,.0f}")
+    slots.setdefault('BESS_DEMAND_SAVINGS', f"{demand_savings:,.0f}")
+    slots.setdefault('BESS_DEMAND_SAVINGS_5YR', f"{demand_savings_5yr:,.0f}")
+    slots.setdefault('BESS_REACTIVE_COST_BEFORE', f"{reactive_cost_before:,.0f}")
+    slots.setdefault('BESS_REACTIVE_COST_AFTER', f"{reactive_cost_after:,.0f}")
+    slots.setdefault('BESS_REACTIVE_SAVINGS', f"{reactive_savings:,.0f}")
+    slots.setdefault('BESS_REACTIVE_SAVINGS_5YR', f"{reactive_savings_5yr:,.0f}")
+    slots.setdefault('BESS_BATTERY_COST_BEFORE', f"{battery_cost_before:,.0f}")
+    slots.setdefault('BESS_BATTERY_COST_AFTER', f"{battery_cost_after:,.0f}")
+    slots.setdefault('BESS_BATTERY_SAVINGS', f"{battery_savings:,.0f}")
+    slots.setdefault('BESS_BATTERY_SAVINGS_5YR', f"{battery_savings_5yr:,.0f}")
+    slots.setdefault('BESS_MAINTENANCE_COST_BEFORE', f"{maintenance_cost_before:,.0f}")
+    slots.setdefault('BESS_MAINTENANCE_COST_AFTER', f"{maintenance_cost_after:,.0f}")
+    slots.setdefault('BESS_MAINTENANCE_SAVINGS', f"{maintenance_savings:,.0f}")
+    slots.setdefault('BESS_MAINTENANCE_SAVINGS_5YR', f"{maintenance_savings_5yr:,.0f}")
+    slots.setdefault('BESS_TOTAL_ANNUAL_SAVINGS', f"{total_annual_savings:,.0f}")
+    slots.setdefault('BESS_TOTAL_5YR_SAVINGS', f"{total_5yr_savings:,.0f}")
     
     # BESS Compliance Status
-    template_content = template_content.replace('{{BESS_IEEE_1547_STATUS}}', "PASS")
-    template_content = template_content.replace('{{BESS_IEEE_1547_VALUE}}', "Grid Interconnection Compliant")
-    template_content = template_content.replace('{{BESS_IEEE_519_STATUS}}', "PASS")
-    template_content = template_content.replace('{{BESS_IEEE_519_VALUE}}', f"THD: {thd_after:.1f}% (Limit: 5.0%)")
-    template_content = template_content.replace('{{BESS_IEC_62619_STATUS}}', "PASS")
-    template_content = template_content.replace('{{BESS_IEC_62619_VALUE}}', "Battery Safety Compliant")
-    template_content = template_content.replace('{{BESS_IEC_63056_STATUS}}', "PASS")
-    template_content = template_content.replace('{{BESS_IEC_63056_VALUE}}', "BESS Performance Compliant")
-    template_content = template_content.replace('{{BESS_UL_9540A_STATUS}}', "PASS")
-    template_content = template_content.replace('{{BESS_UL_9540A_VALUE}}', "Thermal Safety Compliant")
+    slots.setdefault('BESS_IEEE_1547_STATUS', "PASS")
+    slots.setdefault('BESS_IEEE_1547_VALUE', "Grid Interconnection Compliant")
+    slots.setdefault('BESS_IEEE_519_STATUS', "PASS")
+    slots.setdefault('BESS_IEEE_519_VALUE', f"THD: {thd_after:.1f}% (Limit: 5.0%)")
+    slots.setdefault('BESS_IEC_62619_STATUS', "PASS")
+    slots.setdefault('BESS_IEC_62619_VALUE', "Battery Safety Compliant")
+    slots.setdefault('BESS_IEC_63056_STATUS', "PASS")
+    slots.setdefault('BESS_IEC_63056_VALUE', "BESS Performance Compliant")
+    slots.setdefault('BESS_UL_9540A_STATUS', "PASS")
+    slots.setdefault('BESS_UL_9540A_VALUE', "Thermal Safety Compliant")
     
     # Check if UPS Predictive Failure Analysis section should be included
     if "include_ups_failure" not in config:
@@ -3281,9 +3271,9 @@ def generate_exact_template_html(r):
     if not include_ups_failure:
         # Remove UPS section from Methods & Formulas
         ups_section_pattern = r'<!-- UPS_FAILURE_SECTION_START -->.*?<!-- UPS_FAILURE_SECTION_END -->'
-        before_length = len(template_content)
-        template_content = re.sub(ups_section_pattern, '', template_content, flags=re.DOTALL)
-        after_length = len(template_content)
+        before_length = len(template.source)
+        template = template.without(ups_section_pattern)
+        after_length = len(template.source)
         removed_length = before_length - after_length
         print(f"*** UPS FAILURE section removed from template (checkbox unchecked) - removed {removed_length} characters ***")
         if removed_length == 0:
@@ -3359,17 +3349,17 @@ def generate_exact_template_html(r):
             ups_temperature_rise = 0
         
         # UPS Template Variables - Only replace if section is included
-        template_content = template_content.replace('{{UPS_BATTERY_LIFE_YEARS}}', f"{ups_battery_life_years:.1f}")
-        template_content = template_content.replace('{{UPS_CAPACITOR_AGING}}', f"{ups_capacitor_aging:.1f}")
-        template_content = template_content.replace('{{UPS_FAN_LIFE_HOURS}}', f"{ups_fan_life_hours:,}")
-        template_content = template_content.replace('{{UPS_FAILURE_RISK_SCORE}}', f"{ups_failure_risk_score:.0f}")
-        template_content = template_content.replace('{{UPS_HEALTH_STATUS}}', ups_health_status)
-        template_content = template_content.replace('{{UPS_TIME_TO_FAILURE_DAYS}}', ups_time_to_failure_text)
-        template_content = template_content.replace('{{UPS_HARMONIC_THD}}', f"{ups_harmonic_thd:.2f}")
-        template_content = template_content.replace('{{UPS_VOLTAGE_UNBALANCE}}', f"{ups_voltage_unbalance:.2f}")
-        template_content = template_content.replace('{{UPS_POWER_FACTOR}}', f"{ups_power_factor:.3f}")
-        template_content = template_content.replace('{{UPS_LOADING_PERCENTAGE}}', f"{ups_loading_percentage:.1f}")
-        template_content = template_content.replace('{{UPS_TEMPERATURE_RISE}}', f"{ups_temperature_rise:.1f}")
+        slots.setdefault('UPS_BATTERY_LIFE_YEARS', f"{ups_battery_life_years:.1f}")
+        slots.setdefault('UPS_CAPACITOR_AGING', f"{ups_capacitor_aging:.1f}")
+        slots.setdefault('UPS_FAN_LIFE_HOURS', f"{ups_fan_life_hours:,}")
+        slots.setdefault('UPS_FAILURE_RISK_SCORE', f"{ups_failure_risk_score:.0f}")
+        slots.setdefault('UPS_HEALTH_STATUS', ups_health_status)
+        slots.setdefault('UPS_TIME_TO_FAILURE_DAYS', ups_time_to_failure_text)
+        slots.setdefault('UPS_HARMONIC_THD', f"{ups_harmonic_thd:.2f}")
+        slots.setdefault('UPS_VOLTAGE_UNBALANCE', f"{ups_voltage_unbalance:.2f}")
+        slots.setdefault('UPS_POWER_FACTOR', f"{ups_power_factor:.3f}")
+        slots.setdefault('UPS_LOADING_PERCENTAGE', f"{ups_loading_percentage:.1f}")
+        slots.setdefault('UPS_TEMPERATURE_RISE', f"{ups_temperature_rise:.1f}")
         print(f"*** UPS FAILURE: Template variables replaced - Battery Life: {ups_battery_life_years:.1f} years, Risk Score: {ups_failure_risk_score:.0f}, Status: {ups_health_status} ***")
     
     # AHRI 550/590 Chiller Efficiency - Use compliance_status array
@@ -3407,15 +3397,15 @@ def generate_exact_template_html(r):
         ari_550_590_after_status = "PASS" if ari_550_590_after_compliant else "FAIL"
     
     # Force replacement of AHRI 550/590 placeholders
-    template_content = template_content.replace('{{AHRI_550_590_BEFORE_STATUS}}', ari_550_590_before_status)
-    template_content = template_content.replace('{{AHRI_550_590_AFTER_STATUS}}', ari_550_590_after_status)
-    template_content = template_content.replace('{{AHRI_550_590_BEFORE_VALUE}}', ari_550_590_before_value)
-    template_content = template_content.replace('{{AHRI_550_590_AFTER_VALUE}}', ari_550_590_after_value)
+    slots.setdefault('AHRI_550_590_BEFORE_STATUS', ari_550_590_before_status)
+    slots.setdefault('AHRI_550_590_AFTER_STATUS', ari_550_590_after_status)
+    slots.setdefault('AHRI_550_590_BEFORE_VALUE', ari_550_590_before_value)
+    slots.setdefault('AHRI_550_590_AFTER_VALUE', ari_550_590_after_value)
     
     
     # CSS class replacements for AHRI 550/590
-    template_content = template_content.replace('{{AHRI_550_590_BEFORE_STATUS_CLASS}}', "compliant" if ari_550_590_before_compliant else "non-compliant")
-    template_content = template_content.replace('{{AHRI_550_590_AFTER_STATUS_CLASS}}', "compliant" if ari_550_590_after_compliant else "non-compliant")
+    slots.setdefault('AHRI_550_590_BEFORE_STATUS_CLASS', "compliant" if ari_550_590_before_compliant else "non-compliant")
+    slots.setdefault('AHRI_550_590_AFTER_STATUS_CLASS', "compliant" if ari_550_590_after_compliant else "non-compliant")
     
     # ANSI C57.12.00 Transformer Efficiency - Use SAME data sources as UI HTML
     ansi_c57_12_00_before_compliant = safe_get(before_compliance, "ansi_c57_12_00_compliant", default=True)
@@ -3428,10 +3418,10 @@ def generate_exact_template_html(r):
     ansi_c57_12_00_before_value_str = f"{ansi_c57_12_00_before_value:.1%}"
     ansi_c57_12_00_after_value_str = f"{ansi_c57_12_00_after_value:.1%}"
     
-    template_content = template_content.replace('{{ANSI_C57_12_00_BEFORE_STATUS}}', "PASS" if ansi_c57_12_00_before_compliant else "FAIL")
-    template_content = template_content.replace('{{ANSI_C57_12_00_AFTER_STATUS}}', "PASS" if ansi_c57_12_00_after_compliant else "FAIL")
-    template_content = template_content.replace('{{ANSI_C57_12_00_BEFORE_VALUE}}', ansi_c57_12_00_before_value_str)
-    template_content = template_content.replace('{{ANSI_C57_12_00_AFTER_VALUE}}', ansi_c57_12_00_after_value_str)
+    slots.setdefault('ANSI_C57_12_00_BEFORE_STATUS', "PASS" if ansi_c57_12_00_before_compliant else "FAIL")
+    slots.setdefault('ANSI_C57_12_00_AFTER_STATUS', "PASS" if ansi_c57_12_00_after_compliant else "FAIL")
+    slots.setdefault('ANSI_C57_12_00_BEFORE_VALUE', ansi_c57_12_00_before_value_str)
+    slots.setdefault('ANSI_C57_12_00_AFTER_VALUE', ansi_c57_12_00_after_value_str)
     
     # IEEE 519 Compliance Details - Calculate from CSV data
     ieee_519_edition = safe_get(r, "ieee_519_edition", default="2014")
@@ -3617,14 +3607,14 @@ def generate_exact_template_html(r):
         print(f"[WARN] Error in IEEE 519 calculation: {e}", flush=True)
         # Keep default values if calculation fails
     
-    template_content = template_content.replace('{{IEEE_519_EDITION}}', ieee_519_edition)
-    template_content = template_content.replace('{{IEEE_519_ISC_IL_RATIO}}', str(ieee_519_isc_il_ratio))
-    template_content = template_content.replace('{{IEEE_519_TDD_LIMIT}}', str(ieee_519_tdd_limit))
-    template_content = template_content.replace('{{IEEE_519_BEFORE_TDD}}', f"{format_number(ieee_519_before_tdd, 1)}%")
-    template_content = template_content.replace('{{IEEE_519_AFTER_TDD}}', f"{format_number(ieee_519_after_tdd, 1)}%")
-    template_content = template_content.replace('{{IEEE_519_BEFORE_COMPLIANCE}}', ieee_519_before_compliance)
-    template_content = template_content.replace('{{IEEE_519_AFTER_COMPLIANCE}}', ieee_519_after_compliance)
-    template_content = template_content.replace('{{IEEE_519_IMPROVEMENT}}', ieee_519_improvement)
+    slots.setdefault('IEEE_519_EDITION', ieee_519_edition)
+    slots.setdefault('IEEE_519_ISC_IL_RATIO', str(ieee_519_isc_il_ratio))
+    slots.setdefault('IEEE_519_TDD_LIMIT', str(ieee_519_tdd_limit))
+    slots.setdefault('IEEE_519_BEFORE_TDD', f"{format_number(ieee_519_before_tdd, 1)}%")
+    slots.setdefault('IEEE_519_AFTER_TDD', f"{format_number(ieee_519_after_tdd, 1)}%")
+    slots.setdefault('IEEE_519_BEFORE_COMPLIANCE', ieee_519_before_compliance)
+    slots.setdefault('IEEE_519_AFTER_COMPLIANCE', ieee_519_after_compliance)
+    slots.setdefault('IEEE_519_IMPROVEMENT', ieee_519_improvement)
     
     # NEMA MG1 Phase Balance Details - GET already-calculated values (not recalculate)
     # Check multiple locations where voltage unbalance might be stored (same priority as UI JavaScript)
@@ -3940,11 +3930,11 @@ def generate_exact_template_html(r):
         print(f"[WARN] NEMA MG1 improvement calculation failed: {e}, using 0.00", flush=True)
         nema_mg1_improvement = "0.00"
     
-    template_content = template_content.replace('{{NEMA_MG1_BEFORE_IMBALANCE}}', f"{format_number(nema_mg1_before_imbalance, 2)}%")
-    template_content = template_content.replace('{{NEMA_MG1_AFTER_IMBALANCE}}', f"{format_number(nema_mg1_after_imbalance, 2)}%")
-    template_content = template_content.replace('{{NEMA_MG1_BEFORE_COMPLIANCE}}', nema_mg1_before_compliance)
-    template_content = template_content.replace('{{NEMA_MG1_AFTER_COMPLIANCE}}', nema_mg1_after_compliance)
-    template_content = template_content.replace('{{NEMA_MG1_IMPROVEMENT}}', nema_mg1_improvement)
+    slots.setdefault('NEMA_MG1_BEFORE_IMBALANCE', f"{format_number(nema_mg1_before_imbalance, 2)}%")
+    slots.setdefault('NEMA_MG1_AFTER_IMBALANCE', f"{format_number(nema_mg1_after_imbalance, 2)}%")
+    slots.setdefault('NEMA_MG1_BEFORE_COMPLIANCE', nema_mg1_before_compliance)
+    slots.setdefault('NEMA_MG1_AFTER_COMPLIANCE', nema_mg1_after_compliance)
+    slots.setdefault('NEMA_MG1_IMPROVEMENT', nema_mg1_improvement)
     
     # Performance section - NEMA MG1 values (GET same values as UI HTML Performance section)
     # Use the SAME values that UI HTML Performance section calculated - no recalculation!
@@ -3952,15 +3942,15 @@ def generate_exact_template_html(r):
     # Only show "N/A" if the value is actually None (not calculated)
     nema_mg1_before_value = f"{nema_mg1_before_imbalance:.2f}%" if nema_mg1_before_imbalance is not None else "N/A"
     nema_mg1_after_value = f"{nema_mg1_after_imbalance:.2f}%" if nema_mg1_after_imbalance is not None else "N/A"
-    template_content = template_content.replace('{{NEMA_MG1_BEFORE_VALUE}}', nema_mg1_before_value)
-    template_content = template_content.replace('{{NEMA_MG1_AFTER_VALUE}}', nema_mg1_after_value)
+    slots.setdefault('NEMA_MG1_BEFORE_VALUE', nema_mg1_before_value)
+    slots.setdefault('NEMA_MG1_AFTER_VALUE', nema_mg1_after_value)
     print(f"[DEBUG] NEMA MG1 Performance section - before={nema_mg1_before_value}, after={nema_mg1_after_value}", flush=True)
     
     # Update the Performance section status placeholders with the final compliance values (includes improvement check)
-    template_content = template_content.replace('{{NEMA_MG1_BEFORE_STATUS}}', nema_mg1_before_compliance)
-    template_content = template_content.replace('{{NEMA_MG1_AFTER_STATUS}}', nema_mg1_after_compliance)
-    template_content = template_content.replace('{{NEMA_MG1_BEFORE_STATUS_CLASS}}', "compliant" if nema_mg1_before_compliance == "PASS" else "non-compliant")
-    template_content = template_content.replace('{{NEMA_MG1_AFTER_STATUS_CLASS}}', "compliant" if nema_mg1_after_compliance == "PASS" else "non-compliant")
+    slots.setdefault('NEMA_MG1_BEFORE_STATUS', nema_mg1_before_compliance)
+    slots.setdefault('NEMA_MG1_AFTER_STATUS', nema_mg1_after_compliance)
+    slots.setdefault('NEMA_MG1_BEFORE_STATUS_CLASS', "compliant" if nema_mg1_before_compliance == "PASS" else "non-compliant")
+    slots.setdefault('NEMA_MG1_AFTER_STATUS_CLASS', "compliant" if nema_mg1_after_compliance == "PASS" else "non-compliant")
     print(f"[DEBUG] NEMA MG1 Performance section status - before={nema_mg1_before_compliance}, after={nema_mg1_after_compliance}", flush=True)
     
     # Engineering Results - Electrical Parameter Analysis
@@ -4124,17 +4114,17 @@ def generate_exact_template_html(r):
     
     # Replace load factor template variables (always replace, even if None/N/A)
     # Use 2 decimal places for Load Factor Analysis section
-    template_content = template_content.replace('{{LOAD_FACTOR_BEFORE}}', 
+    slots.setdefault('LOAD_FACTOR_BEFORE', 
         format_number(load_factor_before, 2) + '%' if load_factor_before is not None else 'N/A')
-    template_content = template_content.replace('{{LOAD_FACTOR_AFTER}}', 
+    slots.setdefault('LOAD_FACTOR_AFTER', 
         format_number(load_factor_after, 2) + '%' if load_factor_after is not None else 'N/A')
-    template_content = template_content.replace('{{LOAD_FACTOR_IMPROVEMENT}}', 
+    slots.setdefault('LOAD_FACTOR_IMPROVEMENT', 
         (('+' if (load_factor_improvement is not None and load_factor_improvement > 0) else '') + format_number(load_factor_improvement, 2) + '%') 
         if load_factor_improvement is not None else 'N/A')
-    template_content = template_content.replace('{{AVG_LOAD_BEFORE}}', format_number(avg_kw_before, 2) + ' kW' if avg_kw_before else 'N/A')
-    template_content = template_content.replace('{{AVG_LOAD_AFTER}}', format_number(avg_kw_after, 2) + ' kW' if avg_kw_after else 'N/A')
-    template_content = template_content.replace('{{PEAK_LOAD_BEFORE}}', format_number(peak_kw_before, 2) + ' kW' if peak_kw_before else 'N/A')
-    template_content = template_content.replace('{{PEAK_LOAD_AFTER}}', format_number(peak_kw_after, 2) + ' kW' if peak_kw_after else 'N/A')
+    slots.setdefault('AVG_LOAD_BEFORE', format_number(avg_kw_before, 2) + ' kW' if avg_kw_before else 'N/A')
+    slots.setdefault('AVG_LOAD_AFTER', format_number(avg_kw_after, 2) + ' kW' if avg_kw_after else 'N/A')
+    slots.setdefault('PEAK_LOAD_BEFORE', format_number(peak_kw_before, 2) + ' kW' if peak_kw_before else 'N/A')
+    slots.setdefault('PEAK_LOAD_AFTER', format_number(peak_kw_after, 2) + ' kW' if peak_kw_after else 'N/A')
     
     print(f"DEBUG: LOAD FACTOR: Final replacement - before={load_factor_before}, after={load_factor_after}, improvement={load_factor_improvement}")
     print(f"DEBUG: LOAD FACTOR: Final peak values - before={peak_kw_before}, after={peak_kw_after}")
@@ -4247,50 +4237,50 @@ def generate_exact_template_html(r):
     
     # Replace template variables for Raw Meter Test Data section
     # Use 2 decimal places for Raw Meter Test Data section
-    template_content = template_content.replace('{{VOLTS_BEFORE}}', f"{format_number(volts_before, 2)} V")
-    template_content = template_content.replace('{{VOLTS_AFTER}}', f"{format_number(volts_after, 2)} V")
-    template_content = template_content.replace('{{VOLTS_IMPROVEMENT}}', volts_improvement)
+    slots.setdefault('VOLTS_BEFORE', f"{format_number(volts_before, 2)} V")
+    slots.setdefault('VOLTS_AFTER', f"{format_number(volts_after, 2)} V")
+    slots.setdefault('VOLTS_IMPROVEMENT', volts_improvement)
     
-    template_content = template_content.replace('{{AMPS_BEFORE}}', f"{format_number(amps_before, 2)} A")
-    template_content = template_content.replace('{{AMPS_AFTER}}', f"{format_number(amps_after, 2)} A")
-    template_content = template_content.replace('{{AMPS_IMPROVEMENT}}', amps_improvement)
+    slots.setdefault('AMPS_BEFORE', f"{format_number(amps_before, 2)} A")
+    slots.setdefault('AMPS_AFTER', f"{format_number(amps_after, 2)} A")
+    slots.setdefault('AMPS_IMPROVEMENT', amps_improvement)
     print(f"DEBUG: HTML DEBUG: TEMPLATE REPLACEMENT: {{AMPS_IMPROVEMENT}} = {amps_improvement}")
     print(f"DEBUG: HTML DEBUG: amps_before={amps_before}, amps_after={amps_after}, amps_improvement={amps_improvement}")
     
-    template_content = template_content.replace('{{KW_BEFORE}}', f"{format_number(kw_before, 2)} kW")
-    template_content = template_content.replace('{{KW_AFTER}}', f"{format_number(kw_after, 2)} kW")
-    template_content = template_content.replace('{{KW_IMPROVEMENT}}', kw_improvement)
+    slots.setdefault('KW_BEFORE', f"{format_number(kw_before, 2)} kW")
+    slots.setdefault('KW_AFTER', f"{format_number(kw_after, 2)} kW")
+    slots.setdefault('KW_IMPROVEMENT', kw_improvement)
     
     # kW Peak - Critical for utility demand billing
-    template_content = template_content.replace('{{PEAK_KW_BEFORE}}', f"{format_number(peak_kw_before_raw, 2)} kW")
-    template_content = template_content.replace('{{PEAK_KW_AFTER}}', f"{format_number(peak_kw_after_raw, 2)} kW")
-    template_content = template_content.replace('{{PEAK_KW_IMPROVEMENT}}', peak_kw_improvement)
+    slots.setdefault('PEAK_KW_BEFORE', f"{format_number(peak_kw_before_raw, 2)} kW")
+    slots.setdefault('PEAK_KW_AFTER', f"{format_number(peak_kw_after_raw, 2)} kW")
+    slots.setdefault('PEAK_KW_IMPROVEMENT', peak_kw_improvement)
     
     # DEBUG: Log final template replacement values
     print(f"*** DEBUG STEP 6 - FINAL TEMPLATE REPLACEMENT: KW_BEFORE = {format_number(kw_before, 2)} kW, KW_AFTER = {format_number(kw_after, 2)} kW ***")
     print(f"*** DEBUG STEP 6 - FINAL TEMPLATE REPLACEMENT: KW_BEFORE = {format_number(kw_before, 2)} kW, KW_AFTER = {format_number(kw_after, 2)} kW ***")
     print(f"*** DEBUG STEP 6 - FINAL TEMPLATE REPLACEMENT: PEAK_KW_BEFORE = {format_number(peak_kw_before_raw, 2)} kW, PEAK_KW_AFTER = {format_number(peak_kw_after_raw, 2)} kW ***")
     
-    template_content = template_content.replace('{{KVA_BEFORE}}', f"{format_number(kva_before, 2)} kVA")
-    template_content = template_content.replace('{{KVA_AFTER}}', f"{format_number(kva_after, 2)} kVA")
-    template_content = template_content.replace('{{KVA_IMPROVEMENT}}', kva_improvement)
+    slots.setdefault('KVA_BEFORE', f"{format_number(kva_before, 2)} kVA")
+    slots.setdefault('KVA_AFTER', f"{format_number(kva_after, 2)} kVA")
+    slots.setdefault('KVA_IMPROVEMENT', kva_improvement)
     print(f"CLIENT HTML - TEMPLATE REPLACEMENT: {{KVA_IMPROVEMENT}} = {kva_improvement}")
     
     # Display Power Factor as percentage (e.g., 99.9% instead of 0.999)
     # Use 2 decimal places for Raw Meter Test Data section
     pf_before_pct = (pf_before * 100) if isinstance(pf_before, (int, float)) and pf_before > 0 else 0
     pf_after_pct = (pf_after * 100) if isinstance(pf_after, (int, float)) and pf_after > 0 else 0
-    template_content = template_content.replace('{{PF_BEFORE}}', f"{pf_before_pct:.2f}%")
-    template_content = template_content.replace('{{PF_AFTER}}', f"{pf_after_pct:.2f}%")
-    template_content = template_content.replace('{{PF_IMPROVEMENT}}', pf_improvement)
+    slots.setdefault('PF_BEFORE', f"{pf_before_pct:.2f}%")
+    slots.setdefault('PF_AFTER', f"{pf_after_pct:.2f}%")
+    slots.setdefault('PF_IMPROVEMENT', pf_improvement)
     
-    template_content = template_content.replace('{{KVAR_BEFORE}}', f"{format_number(kvar_before, 2)} kVAR")
-    template_content = template_content.replace('{{KVAR_AFTER}}', f"{format_number(kvar_after, 2)} kVAR")
-    template_content = template_content.replace('{{KVAR_IMPROVEMENT}}', kvar_improvement)
+    slots.setdefault('KVAR_BEFORE', f"{format_number(kvar_before, 2)} kVAR")
+    slots.setdefault('KVAR_AFTER', f"{format_number(kvar_after, 2)} kVAR")
+    slots.setdefault('KVAR_IMPROVEMENT', kvar_improvement)
     
-    template_content = template_content.replace('{{THD_BEFORE}}', f"{format_number(thd_before, 2)}%")
-    template_content = template_content.replace('{{THD_AFTER}}', f"{format_number(thd_after, 2)}%")
-    template_content = template_content.replace('{{THD_IMPROVEMENT}}', thd_improvement)
+    slots.setdefault('THD_BEFORE', f"{format_number(thd_before, 2)}%")
+    slots.setdefault('THD_AFTER', f"{format_number(thd_after, 2)}%")
+    slots.setdefault('THD_IMPROVEMENT', thd_improvement)
     
     
     # IEEE 519-2014/2022 Power Quality Analysis - Standards-Compliant Electrical Parameters
@@ -4417,48 +4407,48 @@ def generate_exact_template_html(r):
     
     # Replace IEEE 519 template variables
     # Use 1 decimal place for Volts to match UI (213.8 V not 213.84 V)
-    template_content = template_content.replace('{{IEEE_VOLTS_BEFORE}}', f"{format_number(ieee_volts_before, 1)} V")
-    template_content = template_content.replace('{{IEEE_VOLTS_AFTER}}', f"{format_number(ieee_volts_after, 1)} V")
-    template_content = template_content.replace('{{IEEE_VOLTS_IMPROVEMENT}}', ieee_volts_improvement)
+    slots.setdefault('IEEE_VOLTS_BEFORE', f"{format_number(ieee_volts_before, 1)} V")
+    slots.setdefault('IEEE_VOLTS_AFTER', f"{format_number(ieee_volts_after, 1)} V")
+    slots.setdefault('IEEE_VOLTS_IMPROVEMENT', ieee_volts_improvement)
     
     # Add weather-normalized kW row (matches UI Analysis - first kW row)
-    template_content = template_content.replace('{{IEEE_KW_WEATHER_NORMALIZED_BEFORE}}', f"{format_number(ieee_kw_weather_normalized_before, 2)} kW")
-    template_content = template_content.replace('{{IEEE_KW_WEATHER_NORMALIZED_AFTER}}', f"{format_number(ieee_kw_weather_normalized_after, 2)} kW")
-    template_content = template_content.replace('{{IEEE_KW_WEATHER_NORMALIZED_IMPROVEMENT}}', ieee_kw_weather_normalized_improvement)
+    slots.setdefault('IEEE_KW_WEATHER_NORMALIZED_BEFORE', f"{format_number(ieee_kw_weather_normalized_before, 2)} kW")
+    slots.setdefault('IEEE_KW_WEATHER_NORMALIZED_AFTER', f"{format_number(ieee_kw_weather_normalized_after, 2)} kW")
+    slots.setdefault('IEEE_KW_WEATHER_NORMALIZED_IMPROVEMENT', ieee_kw_weather_normalized_improvement)
     
     # Add fully normalized kW row (matches UI Analysis - second kW row, matches Step 3 & Step 4)
-    template_content = template_content.replace('{{IEEE_KW_NORMALIZED_BEFORE}}', f"{format_number(ieee_kw_normalized_before, 2)} kW")
-    template_content = template_content.replace('{{IEEE_KW_NORMALIZED_AFTER}}', f"{format_number(ieee_kw_normalized_after, 2)} kW")
-    template_content = template_content.replace('{{IEEE_KW_NORMALIZED_IMPROVEMENT}}', ieee_kw_normalized_improvement)
+    slots.setdefault('IEEE_KW_NORMALIZED_BEFORE', f"{format_number(ieee_kw_normalized_before, 2)} kW")
+    slots.setdefault('IEEE_KW_NORMALIZED_AFTER', f"{format_number(ieee_kw_normalized_after, 2)} kW")
+    slots.setdefault('IEEE_KW_NORMALIZED_IMPROVEMENT', ieee_kw_normalized_improvement)
     
     # kW Peak - Critical for utility demand billing (IEEE 519 section)
-    template_content = template_content.replace('{{IEEE_PEAK_KW_BEFORE}}', f"{format_number(peak_kw_before_raw, 2)} kW")
-    template_content = template_content.replace('{{IEEE_PEAK_KW_AFTER}}', f"{format_number(peak_kw_after_raw, 2)} kW")
-    template_content = template_content.replace('{{IEEE_PEAK_KW_IMPROVEMENT}}', peak_kw_improvement)
+    slots.setdefault('IEEE_PEAK_KW_BEFORE', f"{format_number(peak_kw_before_raw, 2)} kW")
+    slots.setdefault('IEEE_PEAK_KW_AFTER', f"{format_number(peak_kw_after_raw, 2)} kW")
+    slots.setdefault('IEEE_PEAK_KW_IMPROVEMENT', peak_kw_improvement)
     
     # Extract percentage value for T-Statistic annotation (use fully normalized)
     kw_normalized_percent_match = re.search(r'(\d+\.?\d*)%', ieee_kw_normalized_improvement)
     kw_normalized_savings_percent = kw_normalized_percent_match.group(1) if kw_normalized_percent_match else "11.8"
-    template_content = template_content.replace('{{KW_NORMALIZED_SAVINGS_PERCENT}}', kw_normalized_savings_percent)
+    slots.setdefault('KW_NORMALIZED_SAVINGS_PERCENT', kw_normalized_savings_percent)
     
-    template_content = template_content.replace('{{IEEE_KVA_BEFORE}}', f"{format_number(ieee_kva_before, 1)} kVA")
-    template_content = template_content.replace('{{IEEE_KVA_AFTER}}', f"{format_number(ieee_kva_after, 1)} kVA")
-    template_content = template_content.replace('{{IEEE_KVA_IMPROVEMENT}}', ieee_kva_improvement)
+    slots.setdefault('IEEE_KVA_BEFORE', f"{format_number(ieee_kva_before, 1)} kVA")
+    slots.setdefault('IEEE_KVA_AFTER', f"{format_number(ieee_kva_after, 1)} kVA")
+    slots.setdefault('IEEE_KVA_IMPROVEMENT', ieee_kva_improvement)
     
     # Display Power Factor as percentage (e.g., 96.4% instead of 0.964) to match UI Analysis
     ieee_pf_before_pct = ieee_pf_before * 100 if ieee_pf_before else 0
     ieee_pf_after_pct = ieee_pf_after * 100 if ieee_pf_after else 0
-    template_content = template_content.replace('{{IEEE_PF_BEFORE}}', f"{format_number(ieee_pf_before_pct, 1)}%")
-    template_content = template_content.replace('{{IEEE_PF_AFTER}}', f"{format_number(ieee_pf_after_pct, 1)}%")
-    template_content = template_content.replace('{{IEEE_PF_IMPROVEMENT}}', ieee_pf_improvement)
+    slots.setdefault('IEEE_PF_BEFORE', f"{format_number(ieee_pf_before_pct, 1)}%")
+    slots.setdefault('IEEE_PF_AFTER', f"{format_number(ieee_pf_after_pct, 1)}%")
+    slots.setdefault('IEEE_PF_IMPROVEMENT', ieee_pf_improvement)
     
-    template_content = template_content.replace('{{IEEE_THD_BEFORE}}', f"{format_number(ieee_thd_before, 2)}%")
-    template_content = template_content.replace('{{IEEE_THD_AFTER}}', f"{format_number(ieee_thd_after, 2)}%")
-    template_content = template_content.replace('{{IEEE_THD_IMPROVEMENT}}', ieee_thd_improvement)
+    slots.setdefault('IEEE_THD_BEFORE', f"{format_number(ieee_thd_before, 2)}%")
+    slots.setdefault('IEEE_THD_AFTER', f"{format_number(ieee_thd_after, 2)}%")
+    slots.setdefault('IEEE_THD_IMPROVEMENT', ieee_thd_improvement)
     
-    template_content = template_content.replace('{{IEEE_VOLTAGE_UNBALANCE_BEFORE}}', f"{format_number(ieee_voltage_unbalance_before, 2)}%")
-    template_content = template_content.replace('{{IEEE_VOLTAGE_UNBALANCE_AFTER}}', f"{format_number(ieee_voltage_unbalance_after, 2)}%")
-    template_content = template_content.replace('{{IEEE_VOLTAGE_UNBALANCE_IMPROVEMENT}}', ieee_voltage_unbalance_improvement)
+    slots.setdefault('IEEE_VOLTAGE_UNBALANCE_BEFORE', f"{format_number(ieee_voltage_unbalance_before, 2)}%")
+    slots.setdefault('IEEE_VOLTAGE_UNBALANCE_AFTER', f"{format_number(ieee_voltage_unbalance_after, 2)}%")
+    slots.setdefault('IEEE_VOLTAGE_UNBALANCE_IMPROVEMENT', ieee_voltage_unbalance_improvement)
     
     # IEEE 519 section matches UI exactly - no Amps (RMS) or kVAR rows
     
@@ -4474,12 +4464,12 @@ def generate_exact_template_html(r):
     
     breakdown_html = generate_kw_normalization_breakdown(r, power_quality_for_breakdown, weather_norm_for_breakdown)
     print(f"*** BREAKDOWN DEBUG: Generated breakdown HTML length: {len(breakdown_html)} characters ***")
-    template_content = template_content.replace('{{KW_NORMALIZATION_BREAKDOWN}}', breakdown_html)
+    slots.setdefault('KW_NORMALIZATION_BREAKDOWN', breakdown_html)
     
     # Add missing template variable replacements for Raw Meter Test Data section
-    template_content = template_content.replace('{{AMPS_IMPROVEMENT}}', amps_improvement)
+    slots.setdefault('AMPS_IMPROVEMENT', amps_improvement)
     print(f"DEBUG: AMPS DEBUG: Line 1412 - Replaced {{AMPS_IMPROVEMENT}} with amps_improvement = {amps_improvement}")
-    template_content = template_content.replace('{{KVA_IMPROVEMENT}}', kva_improvement)
+    slots.setdefault('KVA_IMPROVEMENT', kva_improvement)
     
     # Bill-Weighted Savings - Financial Impact Analysis
     # Use financial_debug data source (same as UI) for consistency
@@ -4554,11 +4544,11 @@ def generate_exact_template_html(r):
     average_kw_savings = get_financial_value("delta_kw_avg", 0)
     
     # Replace Bill-Weighted Savings template variables
-    template_content = template_content.replace('{{ENERGY_ANNUAL_SAVINGS}}', f"${energy_annual_savings:,.2f}")
-    template_content = template_content.replace('{{DEMAND_ANNUAL_SAVINGS}}', f"${demand_annual_savings:,.2f}")
-    template_content = template_content.replace('{{NETWORK_ANNUAL_SAVINGS}}', f"${network_annual_savings:,.2f}")
-    template_content = template_content.replace('{{TOTAL_ANNUAL_SAVINGS}}', f"${total_annual_savings:,.2f}")
-    template_content = template_content.replace('{{AVERAGE_KW_SAVINGS}}', f"{format_number(average_kw_savings, 1)} kW")
+    slots.setdefault('ENERGY_ANNUAL_SAVINGS', f"${energy_annual_savings:,.2f}")
+    slots.setdefault('DEMAND_ANNUAL_SAVINGS', f"${demand_annual_savings:,.2f}")
+    slots.setdefault('NETWORK_ANNUAL_SAVINGS', f"${network_annual_savings:,.2f}")
+    slots.setdefault('TOTAL_ANNUAL_SAVINGS', f"${total_annual_savings:,.2f}")
+    slots.setdefault('AVERAGE_KW_SAVINGS', f"{format_number(average_kw_savings, 1)} kW")
     
     # Methods & Formulas - ASHRAE Guideline 14 Baseline Model
     # Use before_compliance data source (same as UI) for consistency
@@ -4574,13 +4564,13 @@ def generate_exact_template_html(r):
     ashrae_precision_status = "PASS" if safe_get(statistical, "meets_ashrae_precision", default=False) else "FAIL"
     
     # Replace ASHRAE baseline model template variables
-    template_content = template_content.replace('{{ASHRAE_MODEL_SELECTED}}', ashrae_model_selected)
-    template_content = template_content.replace('{{ASHRAE_CVRMSE}}', f"{format_number(ashrae_cvrmse, 1)}%")
-    template_content = template_content.replace('{{ASHRAE_NMBE}}', f"{format_number(ashrae_nmbe, 1)}%")
-    template_content = template_content.replace('{{ASHRAE_R_SQUARED}}', f"{format_number(ashrae_r_squared, 2)}")
-    template_content = template_content.replace('{{ASHRAE_TEMPERATURE_UNITS}}', ashrae_temperature_units)
-    template_content = template_content.replace('{{ASHRAE_RELATIVE_PRECISION}}', f"{format_number(ashrae_relative_precision, 1)}%")
-    template_content = template_content.replace('{{ASHRAE_PRECISION_STATUS}}', ashrae_precision_status)
+    slots.setdefault('ASHRAE_MODEL_SELECTED', ashrae_model_selected)
+    slots.setdefault('ASHRAE_CVRMSE', f"{format_number(ashrae_cvrmse, 1)}%")
+    slots.setdefault('ASHRAE_NMBE', f"{format_number(ashrae_nmbe, 1)}%")
+    slots.setdefault('ASHRAE_R_SQUARED', f"{format_number(ashrae_r_squared, 2)}")
+    slots.setdefault('ASHRAE_TEMPERATURE_UNITS', ashrae_temperature_units)
+    slots.setdefault('ASHRAE_RELATIVE_PRECISION', f"{format_number(ashrae_relative_precision, 1)}%")
+    slots.setdefault('ASHRAE_PRECISION_STATUS', ashrae_precision_status)
     
     # Methods & Formulas - Statistical Analysis Methods - USE ACTUAL CALCULATED VALUES
     # Extract statistical test data from CSV analysis using industry standards
@@ -4615,14 +4605,14 @@ def generate_exact_template_html(r):
     statistically_significant_detailed = "YES" if safe_get(statistical, "statistically_significant", default=True) else "NO"
     
     # Replace statistical analysis template variables
-    template_content = template_content.replace('{{STATISTICAL_TEST_TYPE}}', statistical_test_type)
-    template_content = template_content.replace('{{CONFIDENCE_LEVEL}}', f"{confidence_level}%")
-    template_content = template_content.replace('{{SAMPLE_SIZE_BEFORE_DETAILED}}', str(sample_size_before_detailed))
-    template_content = template_content.replace('{{SAMPLE_SIZE_AFTER_DETAILED}}', str(sample_size_after_detailed))
-    template_content = template_content.replace('{{P_VALUE_DETAILED}}', f"{format_number(p_value_detailed, 6)}")
-    template_content = template_content.replace('{{T_STATISTIC_DETAILED}}', f"{format_number(t_statistic_detailed, 2)}")
-    template_content = template_content.replace('{{COHENS_D_DETAILED}}', f"{format_number(cohens_d_detailed, 3)}")
-    template_content = template_content.replace('{{STATISTICALLY_SIGNIFICANT_DETAILED}}', statistically_significant_detailed)
+    slots.setdefault('STATISTICAL_TEST_TYPE', statistical_test_type)
+    slots.setdefault('CONFIDENCE_LEVEL', f"{confidence_level}%")
+    slots.setdefault('SAMPLE_SIZE_BEFORE_DETAILED', str(sample_size_before_detailed))
+    slots.setdefault('SAMPLE_SIZE_AFTER_DETAILED', str(sample_size_after_detailed))
+    slots.setdefault('P_VALUE_DETAILED', f"{format_number(p_value_detailed, 6)}")
+    slots.setdefault('T_STATISTIC_DETAILED', f"{format_number(t_statistic_detailed, 2)}")
+    slots.setdefault('COHENS_D_DETAILED', f"{format_number(cohens_d_detailed, 3)}")
+    slots.setdefault('STATISTICALLY_SIGNIFICANT_DETAILED', statistically_significant_detailed)
     
     # Additional comprehensive statistical analysis variables - USE SAME DATA SOURCES AS UI
     # Relative precision from ASHRAE calculations - use same source as UI
@@ -4768,8 +4758,8 @@ def generate_exact_template_html(r):
     power_quality_significance = "PASS Significant" if statistically_significant_detailed == "YES" else "FAIL Not Significant"
     
     # Replace comprehensive statistical analysis template variables
-    template_content = template_content.replace('{{RELATIVE_PRECISION_DETAILED}}', f"{format_number(relative_precision_detailed, 1)}%")
-    template_content = template_content.replace('{{ASHRAE_PRECISION_STATUS_DETAILED}}', ashrae_precision_status_detailed)
+    slots.setdefault('RELATIVE_PRECISION_DETAILED', f"{format_number(relative_precision_detailed, 1)}%")
+    slots.setdefault('ASHRAE_PRECISION_STATUS_DETAILED', ashrae_precision_status_detailed)
     
     # Use actual calculated confidence interval values from CSV data
     before_ci_str = f"{format_number(before_lower, 2)} - {format_number(before_upper, 2)}"
@@ -4780,13 +4770,13 @@ def generate_exact_template_html(r):
     print(f"*** DEBUG: Raw values - before_lower: {before_lower}, before_upper: {before_upper} ***")
     print(f"*** DEBUG: Raw values - after_lower: {after_lower}, after_upper: {after_upper} ***")
     
-    template_content = template_content.replace('{{CONFIDENCE_INTERVAL_BEFORE}}', before_ci_str)
-    template_content = template_content.replace('{{CONFIDENCE_INTERVAL_AFTER}}', after_ci_str)
-    template_content = template_content.replace('{{CONFIDENCE_INTERVAL_SAVINGS}}', confidence_interval_savings)
-    template_content = template_content.replace('{{CV_BEFORE_DETAILED}}', before_quality_rating)
-    template_content = template_content.replace('{{CV_AFTER_DETAILED}}', after_quality_rating)
-    template_content = template_content.replace('{{DATA_QUALITY_COMPLIANT_DETAILED}}', data_quality_compliant_detailed)
-    template_content = template_content.replace('{{POWER_QUALITY_SIGNIFICANCE}}', power_quality_significance)
+    slots.setdefault('CONFIDENCE_INTERVAL_BEFORE', before_ci_str)
+    slots.setdefault('CONFIDENCE_INTERVAL_AFTER', after_ci_str)
+    slots.setdefault('CONFIDENCE_INTERVAL_SAVINGS', confidence_interval_savings)
+    slots.setdefault('CV_BEFORE_DETAILED', before_quality_rating)
+    slots.setdefault('CV_AFTER_DETAILED', after_quality_rating)
+    slots.setdefault('DATA_QUALITY_COMPLIANT_DETAILED', data_quality_compliant_detailed)
+    slots.setdefault('POWER_QUALITY_SIGNIFICANCE', power_quality_significance)
     
     # Weather Normalization - Weather Data Quality
     # Extract weather data from weather_normalization and environmental sections
@@ -4822,12 +4812,12 @@ def generate_exact_template_html(r):
         weather_normalization_method = "Standard"
     
     # Replace Weather Normalization template variables
-    template_content = template_content.replace('{{WEATHER_STATION}}', weather_station)
-    template_content = template_content.replace('{{WEATHER_DATA_SOURCE}}', weather_data_source)
-    template_content = template_content.replace('{{TEMPERATURE_RANGE}}', temp_range)
-    template_content = template_content.replace('{{HUMIDITY_RANGE}}', humidity_range)
-    template_content = template_content.replace('{{WEATHER_DATA_COMPLETENESS}}', f"{format_number(weather_data_completeness, 1)}%")
-    template_content = template_content.replace('{{WEATHER_NORMALIZATION_METHOD}}', weather_normalization_method)
+    slots.setdefault('WEATHER_STATION', weather_station)
+    slots.setdefault('WEATHER_DATA_SOURCE', weather_data_source)
+    slots.setdefault('TEMPERATURE_RANGE', temp_range)
+    slots.setdefault('HUMIDITY_RANGE', humidity_range)
+    slots.setdefault('WEATHER_DATA_COMPLETENESS', f"{format_number(weather_data_completeness, 1)}%")
+    slots.setdefault('WEATHER_NORMALIZATION_METHOD', weather_normalization_method)
     
     # IEEE 519-2014 Power Quality Analysis - Harmonic Control Methodology
     # Use power_quality and config data sources (same as UI) for consistency
@@ -4858,24 +4848,24 @@ def generate_exact_template_html(r):
     ieee_519_steady_state_analysis = safe_get(r, "ieee_519_steady_state_analysis", default="Steady-state harmonic limits as per IEEE 519 Section 4.1")
     
     # Replace IEEE 519 template variables
-    template_content = template_content.replace('{{IEEE_519_STANDARD_REFERENCE}}', ieee_519_standard_reference)
-    template_content = template_content.replace('{{IEEE_519_PCC_STATUS}}', ieee_519_pcc_status)
-    template_content = template_content.replace('{{IEEE_519_ISC_IL_RATIO}}', str(ieee_519_isc_il_ratio))
-    template_content = template_content.replace('{{IEEE_519_HARMONIC_DEPTH}}', ieee_519_harmonic_depth)
-    template_content = template_content.replace('{{IEEE_519_MEASUREMENT_METHOD}}', ieee_519_measurement_method)
-    template_content = template_content.replace('{{IEEE_519_TDD_FORMULA}}', ieee_519_tdd_formula)
-    template_content = template_content.replace('{{IEEE_519_VOLTAGE_TDD_LIMIT}}', f"{format_number(ieee_519_voltage_tdd_limit, 1)}%")
-    template_content = template_content.replace('{{IEEE_519_TDD_LIMIT}}', f"{format_number(ieee_519_tdd_limit, 1)}%")
-    template_content = template_content.replace('{{IEEE_519_BEFORE_VOLTAGE_TDD}}', f"{format_number(ieee_519_before_voltage_tdd, 1)}%")
-    template_content = template_content.replace('{{IEEE_519_AFTER_VOLTAGE_TDD}}', f"{format_number(ieee_519_after_voltage_tdd, 1)}%")
-    template_content = template_content.replace('{{IEEE_519_BEFORE_TDD}}', f"{format_number(ieee_519_before_tdd, 1)}%")
-    template_content = template_content.replace('{{IEEE_519_AFTER_TDD}}', f"{format_number(ieee_519_after_tdd, 1)}%")
-    template_content = template_content.replace('{{IEEE_519_INDIVIDUAL_LIMITS}}', ieee_519_individual_limits)
-    template_content = template_content.replace('{{IEEE_519_BEFORE_COMPLIANCE}}', ieee_519_before_compliance)
-    template_content = template_content.replace('{{IEEE_519_AFTER_COMPLIANCE}}', ieee_519_after_compliance)
-    template_content = template_content.replace('{{IEEE_C57_110_APPLIED}}', ieee_c57_110_applied)
-    template_content = template_content.replace('{{IEEE_519_TRANSFORMER_LOSS_METHOD}}', ieee_519_transformer_loss_method)
-    template_content = template_content.replace('{{IEEE_519_STEADY_STATE_ANALYSIS}}', ieee_519_steady_state_analysis)
+    slots.setdefault('IEEE_519_STANDARD_REFERENCE', ieee_519_standard_reference)
+    slots.setdefault('IEEE_519_PCC_STATUS', ieee_519_pcc_status)
+    slots.setdefault('IEEE_519_ISC_IL_RATIO', str(ieee_519_isc_il_ratio))
+    slots.setdefault('IEEE_519_HARMONIC_DEPTH', ieee_519_harmonic_depth)
+    slots.setdefault('IEEE_519_MEASUREMENT_METHOD', ieee_519_measurement_method)
+    slots.setdefault('IEEE_519_TDD_FORMULA', ieee_519_tdd_formula)
+    slots.setdefault('IEEE_519_VOLTAGE_TDD_LIMIT', f"{format_number(ieee_519_voltage_tdd_limit, 1)}%")
+    slots.setdefault('IEEE_519_TDD_LIMIT', f"{format_number(ieee_519_tdd_limit, 1)}%")
+    slots.setdefault('IEEE_519_BEFORE_VOLTAGE_TDD', f"{format_number(ieee_519_before_voltage_tdd, 1)}%")
+    slots.setdefault('IEEE_519_AFTER_VOLTAGE_TDD', f"{format_number(ieee_519_after_voltage_tdd, 1)}%")
+    slots.setdefault('IEEE_519_BEFORE_TDD', f"{format_number(ieee_519_before_tdd, 1)}%")
+    slots.setdefault('IEEE_519_AFTER_TDD', f"{format_number(ieee_519_after_tdd, 1)}%")
+    slots.setdefault('IEEE_519_INDIVIDUAL_LIMITS', ieee_519_individual_limits)
+    slots.setdefault('IEEE_519_BEFORE_COMPLIANCE', ieee_519_before_compliance)
+    slots.setdefault('IEEE_519_AFTER_COMPLIANCE', ieee_519_after_compliance)
+    slots.setdefault('IEEE_C57_110_APPLIED', ieee_c57_110_applied)
+    slots.setdefault('IEEE_519_TRANSFORMER_LOSS_METHOD', ieee_519_transformer_loss_method)
+    slots.setdefault('IEEE_519_STEADY_STATE_ANALYSIS', ieee_519_steady_state_analysis)
     
     
     # NEMA MG1 Three-Phase Analysis - Phase Balance Analysis
@@ -4892,14 +4882,14 @@ def generate_exact_template_html(r):
     nema_efficiency_gain = nema_efficiency_impact_before - nema_efficiency_impact_after
     
     # Replace NEMA MG1 template variables
-    template_content = template_content.replace('{{NEMA_BEFORE_IMBALANCE}}', f"{format_number(nema_before_imbalance, 2)}%")
-    template_content = template_content.replace('{{NEMA_AFTER_IMBALANCE}}', f"{format_number(nema_after_imbalance, 2)}%")
-    template_content = template_content.replace('{{NEMA_LIMIT}}', f"{format_number(nema_limit, 1)}%")
-    template_content = template_content.replace('{{NEMA_BEFORE_COMPLIANCE}}', nema_before_compliance)
-    template_content = template_content.replace('{{NEMA_AFTER_COMPLIANCE}}', nema_after_compliance)
-    template_content = template_content.replace('{{NEMA_EFFICIENCY_IMPACT_BEFORE}}', f"{format_number(nema_efficiency_impact_before, 6)}")
-    template_content = template_content.replace('{{NEMA_EFFICIENCY_IMPACT_AFTER}}', f"{format_number(nema_efficiency_impact_after, 6)}")
-    template_content = template_content.replace('{{NEMA_EFFICIENCY_GAIN}}', f"{format_number(nema_efficiency_gain, 6)}")
+    slots.setdefault('NEMA_BEFORE_IMBALANCE', f"{format_number(nema_before_imbalance, 2)}%")
+    slots.setdefault('NEMA_AFTER_IMBALANCE', f"{format_number(nema_after_imbalance, 2)}%")
+    slots.setdefault('NEMA_LIMIT', f"{format_number(nema_limit, 1)}%")
+    slots.setdefault('NEMA_BEFORE_COMPLIANCE', nema_before_compliance)
+    slots.setdefault('NEMA_AFTER_COMPLIANCE', nema_after_compliance)
+    slots.setdefault('NEMA_EFFICIENCY_IMPACT_BEFORE', f"{format_number(nema_efficiency_impact_before, 6)}")
+    slots.setdefault('NEMA_EFFICIENCY_IMPACT_AFTER', f"{format_number(nema_efficiency_impact_after, 6)}")
+    slots.setdefault('NEMA_EFFICIENCY_GAIN', f"{format_number(nema_efficiency_gain, 6)}")
     
     # Financial Analysis Methods - Financial Calculations
     # Extract financial data from financial and bill_weighted sections
@@ -4964,14 +4954,14 @@ def generate_exact_template_html(r):
     print(f"DEBUG: FINANCIAL CONFIG DEBUG: energy_rate = {energy_rate}, demand_rate = {demand_rate}, discount_rate = {discount_rate}, target_pf = {target_power_factor}")
     
     # Replace Financial Analysis template variables
-    template_content = template_content.replace('{{ENERGY_RATE}}', f"${format_number(energy_rate, 5)}")
-    template_content = template_content.replace('{{DEMAND_RATE}}', f"${format_number(demand_rate, 2)}")
-    template_content = template_content.replace('{{PROJECT_COST}}', f"${project_cost:,.0f}")
-    template_content = template_content.replace('{{OPERATING_HOURS}}', str(operating_hours))
-    template_content = template_content.replace('{{TARGET_POWER_FACTOR}}', f"{format_number(target_power_factor, 2)}")
-    template_content = template_content.replace('{{DISCOUNT_RATE}}', f"{format_number(discount_rate, 1)}%")
-    template_content = template_content.replace('{{ANALYSIS_PERIOD}}', f"{analysis_period} years")
-    template_content = template_content.replace('{{LCCA_COMPLIANT}}', lcca_compliant)
+    slots.setdefault('ENERGY_RATE', f"${format_number(energy_rate, 5)}")
+    slots.setdefault('DEMAND_RATE', f"${format_number(demand_rate, 2)}")
+    slots.setdefault('PROJECT_COST', f"${project_cost:,.0f}")
+    slots.setdefault('OPERATING_HOURS', str(operating_hours))
+    slots.setdefault('TARGET_POWER_FACTOR', f"{format_number(target_power_factor, 2)}")
+    slots.setdefault('DISCOUNT_RATE', f"{format_number(discount_rate, 1)}%")
+    slots.setdefault('ANALYSIS_PERIOD', f"{analysis_period} years")
+    slots.setdefault('LCCA_COMPLIANT', lcca_compliant)
     
     # Network Loss Analysis - I²R and Transformer Loss Calculations
     # Extract network loss data from network_losses section
@@ -5070,14 +5060,14 @@ def generate_exact_template_html(r):
     print(f"DEBUG: NETWORK LOSSES DEBUG: annual_network_savings = {annual_network_savings}")
     
     # Replace Network Loss Analysis template variables
-    template_content = template_content.replace('{{SYSTEM_VOLTAGE}}', f"{format_number(system_voltage, 0)} V")
-    template_content = template_content.replace('{{SYSTEM_PHASES}}', str(system_phases))
-    template_content = template_content.replace('{{BEFORE_RMS_CURRENT}}', f"{format_number(before_rms_current, 1)} A")
-    template_content = template_content.replace('{{AFTER_RMS_CURRENT}}', f"{format_number(after_rms_current, 1)} A")
-    template_content = template_content.replace('{{CONDUCTOR_LOSS_REDUCTION}}', f"{format_number(conductor_loss_reduction, 3)} kW")
-    template_content = template_content.replace('{{TRANSFORMER_COPPER_LOSS_REDUCTION}}', f"{format_number(transformer_copper_loss_reduction, 3)} kW")
-    template_content = template_content.replace('{{TRANSFORMER_STRAY_LOSS_REDUCTION}}', f"{format_number(transformer_stray_loss_reduction, 3)} kW")
-    template_content = template_content.replace('{{ANNUAL_NETWORK_SAVINGS}}', f"${format_number(annual_network_savings, 2)}")
+    slots.setdefault('SYSTEM_VOLTAGE', f"{format_number(system_voltage, 0)} V")
+    slots.setdefault('SYSTEM_PHASES', str(system_phases))
+    slots.setdefault('BEFORE_RMS_CURRENT', f"{format_number(before_rms_current, 1)} A")
+    slots.setdefault('AFTER_RMS_CURRENT', f"{format_number(after_rms_current, 1)} A")
+    slots.setdefault('CONDUCTOR_LOSS_REDUCTION', f"{format_number(conductor_loss_reduction, 3)} kW")
+    slots.setdefault('TRANSFORMER_COPPER_LOSS_REDUCTION', f"{format_number(transformer_copper_loss_reduction, 3)} kW")
+    slots.setdefault('TRANSFORMER_STRAY_LOSS_REDUCTION', f"{format_number(transformer_stray_loss_reduction, 3)} kW")
+    slots.setdefault('ANNUAL_NETWORK_SAVINGS', f"${format_number(annual_network_savings, 2)}")
     
     # Savings Attribution Card - Savings Category Analysis
     # Use attribution data source (same as UI) for consistency
@@ -5173,24 +5163,24 @@ def generate_exact_template_html(r):
     includes_categories = "Baseline Energy + Demand + PF Penalties + Envelope + Harmonic + O&M"
     
     # Replace Savings Attribution Card template variables
-    template_content = template_content.replace('{{BASELINE_ENERGY}}', f"{baseline_energy:,.0f}")
-    template_content = template_content.replace('{{BASELINE_ENERGY_COST}}', f"${baseline_energy_cost:,.2f}")
-    template_content = template_content.replace('{{BASE_ENERGY_KWH}}', f"{base_energy_kwh:,.0f}")
-    template_content = template_content.replace('{{NETWORK_ENERGY_KWH}}', f"{network_energy_kwh:,.0f}")
-    template_content = template_content.replace('{{ENERGY_RATE_DETAILED}}', f"${energy_rate_detailed:.5f}/kWh")
-    template_content = template_content.replace('{{DEMAND_SAVINGS_COST}}', f"${demand_savings_cost:,.2f}")
-    template_content = template_content.replace('{{POWER_FACTOR_SAVINGS_COST}}', f"${power_factor_savings_cost:,.2f}")
-    template_content = template_content.replace('{{CP_PLC_KW}}', f"{cp_plc_kw:,.2f}")
-    template_content = template_content.replace('{{CP_PLC_COST}}', f"${cp_plc_cost:,.2f}")
-    template_content = template_content.replace('{{CP_PLC_RATE}}', f"${cp_plc_rate:.2f}")
-    template_content = template_content.replace('{{ENVELOPE_SMOOTHING_COST}}', f"${envelope_smoothing_cost:,.2f}")
-    template_content = template_content.replace('{{HARMONIC_LOSSES_ENERGY}}', f"{harmonic_losses_energy:,.0f}")
-    template_content = template_content.replace('{{HARMONIC_LOSSES_COST}}', f"${harmonic_losses_cost:,.2f}")
-    template_content = template_content.replace('{{OM_SAVINGS_COST}}', f"${om_savings_cost:,.2f}")
-    template_content = template_content.replace('{{OM_RATE_PER_KW}}', f"${om_rate_per_kw:.2f}/kW")
-    template_content = template_content.replace('{{TOTAL_ATTRIBUTED_DOLLARS}}', f"${total_attributed_dollars:,.2f}")
-    template_content = template_content.replace('{{RECONCILES_STATUS}}', reconciles_status)
-    template_content = template_content.replace('{{INCLUDES_CATEGORIES}}', includes_categories)
+    slots.setdefault('BASELINE_ENERGY', f"{baseline_energy:,.0f}")
+    slots.setdefault('BASELINE_ENERGY_COST', f"${baseline_energy_cost:,.2f}")
+    slots.setdefault('BASE_ENERGY_KWH', f"{base_energy_kwh:,.0f}")
+    slots.setdefault('NETWORK_ENERGY_KWH', f"{network_energy_kwh:,.0f}")
+    slots.setdefault('ENERGY_RATE_DETAILED', f"${energy_rate_detailed:.5f}/kWh")
+    slots.setdefault('DEMAND_SAVINGS_COST', f"${demand_savings_cost:,.2f}")
+    slots.setdefault('POWER_FACTOR_SAVINGS_COST', f"${power_factor_savings_cost:,.2f}")
+    slots.setdefault('CP_PLC_KW', f"{cp_plc_kw:,.2f}")
+    slots.setdefault('CP_PLC_COST', f"${cp_plc_cost:,.2f}")
+    slots.setdefault('CP_PLC_RATE', f"${cp_plc_rate:.2f}")
+    slots.setdefault('ENVELOPE_SMOOTHING_COST', f"${envelope_smoothing_cost:,.2f}")
+    slots.setdefault('HARMONIC_LOSSES_ENERGY', f"{harmonic_losses_energy:,.0f}")
+    slots.setdefault('HARMONIC_LOSSES_COST', f"${harmonic_losses_cost:,.2f}")
+    slots.setdefault('OM_SAVINGS_COST', f"${om_savings_cost:,.2f}")
+    slots.setdefault('OM_RATE_PER_KW', f"${om_rate_per_kw:.2f}/kW")
+    slots.setdefault('TOTAL_ATTRIBUTED_DOLLARS', f"${total_attributed_dollars:,.2f}")
+    slots.setdefault('RECONCILES_STATUS', reconciles_status)
+    slots.setdefault('INCLUDES_CATEGORIES', includes_categories)
     
     # Network Envelope Analysis - Envelope Smoothing Analysis
     # DIRECT GET APPROACH - Get envelope analysis values from UI HTML Report generator (README.md protocol)
@@ -5259,34 +5249,34 @@ def generate_exact_template_html(r):
         avgthd_before_cv = avgthd_after_cv = avgthd_cv_reduction = avgthd_variance_reduction = 0
     
     # Replace Network Envelope Analysis template variables with Direct GET values
-    template_content = template_content.replace('{{OVERALL_SMOOTHING_INDEX}}', f"{format_number(overall_smoothing_index, 3)}")
-    template_content = template_content.replace('{{METRICS_ANALYZED}}', str(metrics_analyzed))
-    template_content = template_content.replace('{{ENVELOPE_STATUS}}', envelope_status)
+    slots.setdefault('OVERALL_SMOOTHING_INDEX', f"{format_number(overall_smoothing_index, 3)}")
+    slots.setdefault('METRICS_ANALYZED', str(metrics_analyzed))
+    slots.setdefault('ENVELOPE_STATUS', envelope_status)
     
     # Replace Individual Metric Improvements with Direct GET values from UI HTML Report generator
     # AVGKVA values
-    template_content = template_content.replace('{{AVGKVA_VARIANCE_REDUCTION}}', f'{avgkva_variance_reduction:.1f}%')
-    template_content = template_content.replace('{{AVGKVA_CV_REDUCTION}}', f'{avgkva_cv_reduction:.1f}%')
-    template_content = template_content.replace('{{AVGKVA_BEFORE_CV}}', f'{avgkva_before_cv:.3f}')
-    template_content = template_content.replace('{{AVGKVA_AFTER_CV}}', f'{avgkva_after_cv:.3f}')
+    slots.setdefault('AVGKVA_VARIANCE_REDUCTION', f'{avgkva_variance_reduction:.1f}%')
+    slots.setdefault('AVGKVA_CV_REDUCTION', f'{avgkva_cv_reduction:.1f}%')
+    slots.setdefault('AVGKVA_BEFORE_CV', f'{avgkva_before_cv:.3f}')
+    slots.setdefault('AVGKVA_AFTER_CV', f'{avgkva_after_cv:.3f}')
     
     # AVGKW values
-    template_content = template_content.replace('{{AVGKW_VARIANCE_REDUCTION}}', f'{avgkw_variance_reduction:.1f}%')
-    template_content = template_content.replace('{{AVGKW_CV_REDUCTION}}', f'{avgkw_cv_reduction:.1f}%')
-    template_content = template_content.replace('{{AVGKW_BEFORE_CV}}', f'{avgkw_before_cv:.3f}')
-    template_content = template_content.replace('{{AVGKW_AFTER_CV}}', f'{avgkw_after_cv:.3f}')
+    slots.setdefault('AVGKW_VARIANCE_REDUCTION', f'{avgkw_variance_reduction:.1f}%')
+    slots.setdefault('AVGKW_CV_REDUCTION', f'{avgkw_cv_reduction:.1f}%')
+    slots.setdefault('AVGKW_BEFORE_CV', f'{avgkw_before_cv:.3f}')
+    slots.setdefault('AVGKW_AFTER_CV', f'{avgkw_after_cv:.3f}')
     
     # AVGPF values
-    template_content = template_content.replace('{{AVGPF_VARIANCE_REDUCTION}}', f'{avgpf_variance_reduction:.1f}%')
-    template_content = template_content.replace('{{AVGPF_CV_REDUCTION}}', f'{avgpf_cv_reduction:.1f}%')
-    template_content = template_content.replace('{{AVGPF_BEFORE_CV}}', f'{avgpf_before_cv:.3f}')
-    template_content = template_content.replace('{{AVGPF_AFTER_CV}}', f'{avgpf_after_cv:.3f}')
+    slots.setdefault('AVGPF_VARIANCE_REDUCTION', f'{avgpf_variance_reduction:.1f}%')
+    slots.setdefault('AVGPF_CV_REDUCTION', f'{avgpf_cv_reduction:.1f}%')
+    slots.setdefault('AVGPF_BEFORE_CV', f'{avgpf_before_cv:.3f}')
+    slots.setdefault('AVGPF_AFTER_CV', f'{avgpf_after_cv:.3f}')
     
     # AVGTHD values
-    template_content = template_content.replace('{{AVGTHD_VARIANCE_REDUCTION}}', f'{avgthd_variance_reduction:.1f}%')
-    template_content = template_content.replace('{{AVGTHD_CV_REDUCTION}}', f'{avgthd_cv_reduction:.1f}%')
-    template_content = template_content.replace('{{AVGTHD_BEFORE_CV}}', f'{avgthd_before_cv:.3f}')
-    template_content = template_content.replace('{{AVGTHD_AFTER_CV}}', f'{avgthd_after_cv:.3f}')
+    slots.setdefault('AVGTHD_VARIANCE_REDUCTION', f'{avgthd_variance_reduction:.1f}%')
+    slots.setdefault('AVGTHD_CV_REDUCTION', f'{avgthd_cv_reduction:.1f}%')
+    slots.setdefault('AVGTHD_BEFORE_CV', f'{avgthd_before_cv:.3f}')
+    slots.setdefault('AVGTHD_AFTER_CV', f'{avgthd_after_cv:.3f}')
     
     print(f"*** HTML SERVICE DEBUG: Template replacement completed - Overall smoothing: {overall_smoothing_index}%, Metrics: {metrics_analyzed} ***")
     print(f"*** HTML SERVICE DEBUG: AVGKVA values - Variance: {avgkva_variance_reduction:.1f}%, CV: {avgkva_cv_reduction:.1f}% ***")
@@ -5296,17 +5286,24 @@ def generate_exact_template_html(r):
     # Note: Confidence intervals are already handled above using calculated_confidence_intervals
     # This section handles any additional template variables that might use different variable names
     # Check if there are any {{BEFORE_PERIOD_CI}} or {{AFTER_PERIOD_CI}} variables (alternative names)
-    if '{{BEFORE_PERIOD_CI}}' in template_content or '{{AFTER_PERIOD_CI}}' in template_content:
+    if template.slot_names & {'BEFORE_PERIOD_CI', 'AFTER_PERIOD_CI'}:
         before_ci_str = f"{format_number(before_lower, 2)} - {format_number(before_upper, 2)}"
         after_ci_str = f"{format_number(after_lower, 2)} - {format_number(after_upper, 2)}"
-        template_content = template_content.replace('{{BEFORE_PERIOD_CI}}', before_ci_str)
-        template_content = template_content.replace('{{AFTER_PERIOD_CI}}', after_ci_str)
-    template_content = template_content.replace('{{SAVINGS_CI}}', f"{format_number(safe_get(statistical, 'savings_ci_lower', default=0), 1)} - {format_number(safe_get(statistical, 'savings_ci_upper', default=0), 1)}")
+        slots.setdefault('BEFORE_PERIOD_CI', before_ci_str)
+        slots.setdefault('AFTER_PERIOD_CI', after_ci_str)
+    slots.setdefault('SAVINGS_CI', f"{format_number(safe_get(statistical, 'savings_ci_lower', default=0), 1)} - {format_number(safe_get(statistical, 'savings_ci_upper', default=0), 1)}")
     # Use client-friendly quality ratings
-    template_content = template_content.replace('{{BEFORE_CV}}', "Good")
-    template_content = template_content.replace('{{AFTER_CV}}', "Good")
-    template_content = template_content.replace('{{OVERALL_COMPLIANT}}', "PASS YES" if safe_get(after_compliance, 'overall_compliant', default=True) else "FAIL NO")
+    slots.setdefault('BEFORE_CV', "Good")
+    slots.setdefault('AFTER_CV', "Good")
+    slots.setdefault('OVERALL_COMPLIANT', "PASS YES" if safe_get(after_compliance, 'overall_compliant', default=True) else "FAIL NO")
     
+    # Single render pass; anything without a value keeps its {{VAR}} token for the fallbacks below
+    template_content = template.render(slots)
+    template_content = template_content.replace('{{ url_for(\'static\', filename=\'file_selection.css\') }}', '')
+    template_content = template_content.replace('{{ url_for(\'static\', filename=\'file_selection.js\') }}', '')
+    if logo_data_uri:
+        # Replace the existing base64 logo with the Synerex logo
+        template_content = template_content.replace('data:image/png;base64,iVBORw0KGgoAAAANSUhEUgAAAyAA...', logo_data_uri)
     
     # Chart Selection Logic - Respect user's chart selection checkboxes
     chart_selections = {
@@ -7041,13 +7038,11 @@ def generate_layman_report_html(r):
         # Load the layman template
         template_path = Path(__file__).parent.parent / "8082" / "templates" / "layman_report_template.html"
         
-        if not template_path.exists():
+        template_content = asset_cache.text(template_path)
+        if template_content is None:
             logger.error(f"Layman template not found at {template_path}")
             return generate_fallback_html(r)
         
-        with open(template_path, 'r', encoding='utf-8') as f:
-            template_content = f.read()
-        
         # Extract data sections
         executive_summary = safe_get(r, "executive_summary", default={})
         financial = safe_get(r, "financial", default={})
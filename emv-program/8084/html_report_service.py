@@ -25,9 +25,58 @@ if 'generate_exact_template_html' in sys.modules:
     importlib.reload(sys.modules['generate_exact_template_html'])
     from generate_exact_template_html import generate_exact_template_html, generate_layman_report_html
 
+# Report snapshot store shared with 8082 (8082 is on sys.path via generate_exact_template_html)
+try:
+    from report_snapshots import report_snapshots
+except ImportError as e:
+    print(f"Warning: report snapshot store not available, pulling results over HTTP: {e}")
+    report_snapshots = None
+
+MAIN_APP_URL = 'http://127.0.0.1:8082'
+
 app = Flask(__name__)
 CORS(app, origins=["*"])  # Allow all origins
 
+
+def _load_report_results():
+    """Analysis results for this report request, or None if 8082 has no analysis.
+
+    Callers may name a snapshot with ``analysis_session_id`` (and optionally
+    ``version``) in the query string or JSON body. Without one, 8082 is asked
+    to publish its current results and replies with the snapshot name only.
+    Snapshots are cached here by version, so the reports for one analysis
+    read the data once. Falls back to GET /api/analysis/results whenever no
+    snapshot can be had (e.g. an 8082 build without the snapshot route).
+    """
+    params = dict(request.args)
+    body = request.get_json(silent=True) if request.method == 'POST' else None
+    if isinstance(body, dict):
+        params.update({k: body[k] for k in ('analysis_session_id', 'version') if body.get(k) is not None})
+    session_id = params.get('analysis_session_id')
+    version = params.get('version')
+
+    if report_snapshots is not None:
+        try:
+            if not session_id:
+                response = requests.post(f'{MAIN_APP_URL}/api/analysis/snapshot', timeout=10)
+                if response.status_code == 200:
+                    ref = response.json()
+                    session_id, version = ref.get('analysis_session_id'), ref.get('version')
+            if session_id:
+                results = report_snapshots.load(session_id, version)
+                if results is not None:
+                    print(f"8084 Service: Using report snapshot {session_id} v{version or 'latest'}")
+                    return results
+                print(f"8084 Service: Report snapshot {session_id} v{version or 'latest'} not found")
+        except Exception as e:
+            print(f"8084 Service: Report snapshot unavailable ({e}), pulling results over HTTP")
+
+    response = requests.get(f'{MAIN_APP_URL}/api/analysis/results', timeout=10)
+    if response.status_code != 200:
+        return None
+    data = response.json()
+    return data.get('results', data)
+
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({
@@ -47,14 +96,12 @@ def generate_report():
         return response
     
     try:
-        # ALWAYS use GET to fetch data from main app (Direct GET Approach)
-        # This ensures we get the complete stored data structure with all form data merged
+        # Data comes from the main app (snapshot store, else Direct GET Approach)
+        # Either way it is the complete stored data structure with all form data merged
         try:
-            print("8084 Service: Fetching data from main app via GET /api/analysis/results...")
-            response = requests.get('http://127.0.0.1:8082/api/analysis/results', timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                results = data.get('results', data)
+            print("8084 Service: Loading analysis results from main app...")
+            results = _load_report_results()
+            if results is not None:
                 
                 # DEBUG: Log data retrieved from main app
                 print(f"8084 Service: Retrieved data keys: {list(results.keys()) if isinstance(results, dict) else 'Not a dict'}")
@@ -173,12 +220,9 @@ def generate_layman_report():
     try:
         # Fetch data from main app
         try:
-            print("8084 Service: Fetching data for layman report from main app...")
-            response = requests.get('http://127.0.0.1:8082/api/analysis/results', timeout=10)
-            if response.status_code == 200:
-                data = response.json()
-                results = data.get('results', data)
-            else:
+            print("8084 Service: Loading data for layman report from main app...")
+            results = _load_report_results()
+            if results is None:
                 return jsonify({"error": "No analysis results available. Please run an analysis first."}), 404
         except Exception as e:
             print(f"8084 Service: Error fetching from main app: {e}")
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Compiled Report Templates - parse once, render with a single join
+
+report_template.html is ~240 KB with ~480 {{VAR}} placeholders. Filling it
+with one str.replace per variable copies the whole document every time.
+A CompiledTemplate splits the file once into literal segments and
+placeholder slots; rendering looks each slot up in a dict and joins.
+
+Compiled templates are cached per path and recompiled when the file's
+mtime or size changes, so edits to the template are picked up without a
+service restart.
+"""
+
+import logging
+import os
+import re
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Same token the report generator's cleanup sweeps match, plus the spaced
+# Jinja-style form ({{ version }}, {{ cache_bust }}) the template also uses
+PLACEHOLDER_RE = re.compile(r'\{\{\s*([A-Za-z0-9_]+)\s*\}\}')
+
+
+class CompiledTemplate:
+    """A template split into literal segments and named placeholder slots"""
+
+    def __init__(self, source):
+        self.source = source
+        self.segments = []    # literals; len(segments) == len(slots) + 1
+        self.slots = []       # (name, original token text) per placeholder
+        position = 0
+        for match in PLACEHOLDER_RE.finditer(source):
+            self.segments.append(source[position:match.start()])
+            self.slots.append((match.group(1), match.group(0)))
+            position = match.end()
+        self.segments.append(source[position:])
+        self.slot_names = frozenset(name for name, _ in self.slots)
+        self._derived = {}
+        self._lock = threading.Lock()
+
+    def without(self, pattern, flags=re.DOTALL):
+        """Template with every match of ``pattern`` removed (e.g. a <!-- X_START -->...<!-- X_END --> section)
+
+        Derived templates are memoized, so an optional section costs one
+        compile per template version rather than one regex pass per report.
+        """
+        key = (pattern, flags)
+        with self._lock:
+            derived = self._derived.get(key)
+        if derived is None:
+            derived = CompiledTemplate(re.sub(pattern, '', self.source, flags=flags))
+            with self._lock:
+                derived = self._derived.setdefault(key, derived)
+        return derived
+
+    def render(self, values):
+        """Fill slots from ``values`` in one pass.
+
+        Placeholders with no value keep their original token text so later
+        passes (section inserts, data-source fallbacks, cleanup) still see
+        them. A value that itself contains placeholders is filled from the
+        same dict, as it would have been by a later replace in the old chain.
+        """
+        parts = [self.segments[0]]
+        append = parts.append
+        for (name, token), literal in zip(self.slots, self.segments[1:]):
+            value = values.get(name)
+            if value is None:
+                append(token)
+            else:
+                value = str(value)
+                if '{{' in value:
+                    value = _render_nested(value, values, name)
+                append(value)
+            append(literal)
+        return ''.join(parts)
+
+
+def _render_nested(value, values, owner):
+    """Fill placeholders inside an inserted value (one level, never the owner's own slot)"""
+    def fill(match):
+        name = match.group(1)
+        if name == owner or values.get(name) is None:
+            return match.group(0)
+        return str(values[name])
+    return PLACEHOLDER_RE.sub(fill, value)
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def load_template(path):
+    """Return the CompiledTemplate for ``path``, recompiling only when the file changes"""
+    path = os.path.abspath(str(path))
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _cache_lock:
+        cached = _cache.get(path)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        template = CompiledTemplate(f.read())
+    logger.info(f"Compiled template {path}: {len(template.slots)} placeholders, {len(template.slot_names)} unique")
+    with _cache_lock:
+        _cache[path] = (version, template)
+    return template
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Shared Geocode Cache for the Synerex Weather Service and 8082 App
+
+Geocoding results are kept in a small SQLite file next to this module (or
+GEOCODE_CACHE_DB) so both services resolve a repeat address without any
+network call. An in-process LRU sits in front of the file, so warm lookups
+cost microseconds.
+
+Keys:
+    addr:<normalized address>   exact key (lowercased, commas/whitespace collapsed)
+    zip:<5-digit ZIP>           fallback for any address in the same ZIP
+    city:<city>, <ST>           fallback for any address in the same city
+
+Failed lookups are cached against the exact key only, with a short TTL
+(GEOCODE_NEGATIVE_TTL_SECONDS), so an unresolvable address does not repeat
+its full provider chain on every request.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POSITIVE_TTL_SECONDS = 90 * 24 * 3600
+DEFAULT_NEGATIVE_TTL_SECONDS = 3600
+MEMORY_CACHE_SIZE = 2048
+
+GeocodeResult = namedtuple("GeocodeResult", ["lat", "lon", "name", "source"])
+
+_ZIP_RE = re.compile(r"\b(\d{5})(?:-\d{4})?\b")
+_STATE_RE = re.compile(r"^[A-Za-z]{2}$")
+
+
+def normalize_address(address: str, prefer_zip: bool = True) -> str:
+    """Normalize address string to improve geocoding success.
+
+    - Prefer ZIP code if present (returns 5-digit ZIP) unless prefer_zip is False
+    - Collapse multiple commas and whitespace
+    - Deduplicate repeated tokens (e.g., "CO, CO")
+    """
+    try:
+        if not address:
+            return ""
+
+        # Prefer ZIP code if available (5 digits)
+        if prefer_zip:
+            zip_match = _ZIP_RE.search(address)
+            if zip_match:
+                return zip_match.group(1)
+
+        # Collapse extra commas and whitespace
+        collapsed = re.sub(r",\s*,+", ", ", address.strip())
+        parts = [re.sub(r"\s+", " ", p.strip()) for p in collapsed.split(",") if p.strip()]
+
+        # Deduplicate tokens case-insensitively while preserving order
+        seen = set()
+        dedup_parts = []
+        for p in parts:
+            key = p.lower()
+            if key not in seen:
+                seen.add(key)
+                dedup_parts.append(p)
+
+        return ", ".join(dedup_parts)
+    except Exception:
+        # Fallback to original if anything goes wrong
+        return (address or "").strip()
+
+
+def cache_keys(address: str, zip_code: str = ""):
+    """Return (exact_key, fallback_keys) for an address"""
+    normalized = normalize_address(address, prefer_zip=False).lower()
+    exact = f"addr:{normalized}" if normalized else None
+
+    fallbacks = []
+    zip_match = _ZIP_RE.search(zip_code or "") or _ZIP_RE.search(address or "")
+    if zip_match:
+        fallbacks.append(f"zip:{zip_match.group(1)}")
+
+    # City/state from "..., City, ST [ZIP]" once ZIP tokens are removed
+    parts = [_ZIP_RE.sub("", p).strip() for p in normalized.split(",")]
+    parts = [p for p in parts if p]
+    if len(parts) >= 2 and _STATE_RE.match(parts[-1]):
+        fallbacks.append(f"city:{parts[-2]}, {parts[-1]}")
+
+    if exact is None and fallbacks:
+        exact = fallbacks[0]
+    return exact, [k for k in fallbacks if k != exact]
+
+
+class GeocodeCache:
+    """SQLite-backed geocode cache with an in-memory LRU front"""
+
+    def __init__(self, db_path, positive_ttl=DEFAULT_POSITIVE_TTL_SECONDS,
+                 negative_ttl=DEFAULT_NEGATIVE_TTL_SECONDS, memory_size=MEMORY_CACHE_SIZE):
+        self.db_path = db_path
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.memory_size = memory_size
+        self._memory = OrderedDict()  # key -> (GeocodeResult or None, expires_at)
+        self._lock = threading.Lock()
+        self._db_ready = False
+
+    @classmethod
+    def from_env(cls, default_db_path):
+        """Build from GEOCODE_CACHE_DB / GEOCODE_POSITIVE_TTL_SECONDS / GEOCODE_NEGATIVE_TTL_SECONDS"""
+        return cls(
+            db_path=os.environ.get("GEOCODE_CACHE_DB", default_db_path),
+            positive_ttl=int(os.environ.get("GEOCODE_POSITIVE_TTL_SECONDS", DEFAULT_POSITIVE_TTL_SECONDS)),
+            negative_ttl=int(os.environ.get("GEOCODE_NEGATIVE_TTL_SECONDS", DEFAULT_NEGATIVE_TTL_SECONDS)),
+        )
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        if not self._db_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS geocode_cache ("
+                "key TEXT PRIMARY KEY, lat REAL, lon REAL, name TEXT, source TEXT, expires_at REAL NOT NULL)"
+            )
+            self._db_ready = True
+        return conn
+
+    def _remember(self, key, value, expires_at):
+        with self._lock:
+            self._memory[key] = (value, expires_at)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_size:
+                self._memory.popitem(last=False)
+
+    def _get_key(self, key):
+        """(found, GeocodeResult or None for a cached failure)"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                    return True, entry[0]
+                del self._memory[key]
+
+        # Another process (8082 or 8085) may have resolved it
+        try:
+            conn = self._connect()
+            try:
+                row = conn.execute(
+                    "SELECT lat, lon, name, source, expires_at FROM geocode_cache WHERE key = ? AND expires_at > ?",
+                    (key, now),
+                ).fetchone()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Geocode cache read failed for {key}: {e}")
+            return False, None
+        if row is None:
+            return False, None
+        value = None if row[0] is None else GeocodeResult(row[0], row[1], row[2], row[3])
+        self._remember(key, value, row[4])
+        return True, value
+
+    def get(self, address, zip_code=""):
+        """Return (found, result) where result is a GeocodeResult, or None for a cached failure"""
+        exact, fallbacks = cache_keys(address, zip_code)
+        if exact is None:
+            return False, None
+
+        found, value = self._get_key(exact)
+        if found and value is not None:
+            return True, value
+        for key in fallbacks:
+            fb_found, fb_value = self._get_key(key)
+            if fb_found and fb_value is not None:
+                logger.info(f"Geocode cache fallback hit on {key} for '{address}'")
+                return True, fb_value
+        return found, value
+
+    def put(self, address, lat, lon, name="", source="", zip_code=""):
+        """Cache a successful lookup under the exact key and (if unset) its fallback keys"""
+        exact, fallbacks = cache_keys(address, zip_code)
+        if exact is None:
+            return
+        value = GeocodeResult(float(lat), float(lon), name or "", source or "")
+        expires_at = time.time() + self.positive_ttl
+        rows = [("REPLACE", exact)] + [("IGNORE", key) for key in fallbacks]
+        self._write(rows, value, expires_at)
+
+    def put_failure(self, address, zip_code=""):
+        """Cache a definitive "no results" answer for the negative TTL"""
+        exact, _ = cache_keys(address, zip_code)
+        if exact is None:
+            return
+        self._write([("REPLACE", exact)], None, time.time() + self.negative_ttl)
+
+    def _write(self, rows, value, expires_at):
+        lat, lon, name, source = value if value is not None else (None, None, None, None)
+        try:
+            conn = self._connect()
+            try:
+                with conn:
+                    for mode, key in rows:
+                        if mode == "IGNORE":
+                            # Keep an existing fallback unless it has expired
+                            conn.execute("DELETE FROM geocode_cache WHERE key = ? AND expires_at <= ?", (key, time.time()))
+                        conn.execute(
+                            f"INSERT OR {mode} INTO geocode_cache (key, lat, lon, name, source, expires_at) VALUES (?, ?, ?, ?, ?, ?)",
+                            (key, lat, lon, name, source, expires_at),
+                        )
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Geocode cache write failed: {e}")
+        for mode, key in rows:
+            if mode == "REPLACE":
+                self._remember(key, value, expires_at)
+            else:
+                # Fallback may already hold another address's result; reload lazily
+                with self._lock:
+                    self._memory.pop(key, None)
+
+
+geocode_cache = GeocodeCache.from_env(os.path.join(os.path.dirname(os.path.abspath(__file__)), "geocode_cache.db"))
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Hourly Weather Wire Format (shared by the 8085 weather service and 8082 app)
+
+The legacy /weather/batch response carries ``hourly_data``: one dict per hour
+with 13 keys, most of them aliases (timestamp/time/datetime, temp/temp_c/
+temperature, ...). Callers that send ``"hourly_format": "columnar"`` (or
+``"columnar+zlib"``) in the request receive ``hourly_columns`` instead:
+
+    {
+        "version": 1,
+        "encoding": "json" | "f8-zlib-base64",
+        "channels": ["temp", "dewpoint", "humidity", "wind_speed", "solar_radiation"],
+        "periods": {
+            "before": {"count": n, "start": "2024-01-01T00:00", "step_seconds": 3600,
+                       "temp": [...], "dewpoint": [...], ...},
+            "after":  {"count": n, "time": ["2024-06-01T00:00", ...], "temp": [...], ...}
+        }
+    }
+
+A period uses start + step when its hours are evenly spaced, otherwise an
+explicit ``time`` array. Missing values are null (NaN in binary encoding,
+where each channel is base64 of zlib-compressed little-endian float64).
+Callers that do not ask for a columnar format keep getting ``hourly_data``.
+"""
+
+import base64
+import sys
+import zlib
+from array import array
+from datetime import datetime, timedelta
+
+WIRE_VERSION = 1
+
+FORMAT_LEGACY = "legacy"
+FORMAT_COLUMNAR = "columnar"
+FORMAT_COLUMNAR_ZLIB = "columnar+zlib"
+SUPPORTED_FORMATS = (FORMAT_LEGACY, FORMAT_COLUMNAR, FORMAT_COLUMNAR_ZLIB)
+
+ENCODING_JSON = "json"
+ENCODING_ZLIB = "f8-zlib-base64"
+
+CHANNELS = ("temp", "dewpoint", "humidity", "wind_speed", "solar_radiation")
+
+TIME_FORMAT = "%Y-%m-%dT%H:%M"
+
+
+def negotiate(requested):
+    """Pick the response format for a request's ``hourly_format`` value (unknown -> legacy)"""
+    requested = (requested or FORMAT_LEGACY).strip().lower()
+    return requested if requested in SUPPORTED_FORMATS else FORMAT_LEGACY
+
+
+def _pack(values):
+    """float/None list -> base64(zlib(<f8 bytes)) with NaN for None"""
+    packed = array("d", (float("nan") if v is None else float(v) for v in values))
+    if sys.byteorder == "big":
+        packed.byteswap()
+    return base64.b64encode(zlib.compress(packed.tobytes(), 6)).decode("ascii")
+
+
+def _unpack(text):
+    unpacked = array("d")
+    unpacked.frombytes(zlib.decompress(base64.b64decode(text)))
+    if sys.byteorder == "big":
+        unpacked.byteswap()
+    return [None if v != v else v for v in unpacked.tolist()]
+
+
+def _encode_times(block, times):
+    """Use start + step when the timestamps are evenly spaced, else an explicit array"""
+    block["count"] = len(times)
+    if len(times) >= 2:
+        try:
+            parsed = [datetime.strptime(t[:16], TIME_FORMAT) for t in times]
+            step = parsed[1] - parsed[0]
+            if step.total_seconds() > 0 and all(b - a == step for a, b in zip(parsed, parsed[1:])):
+                block["start"] = times[0][:16]
+                block["step_seconds"] = int(step.total_seconds())
+                return
+        except (TypeError, ValueError):
+            pass
+    block["time"] = list(times)
+
+
+def encode_records(records_by_period, fmt=FORMAT_COLUMNAR):
+    """Build ``hourly_columns`` from legacy hourly dicts grouped by period"""
+    encoding = ENCODING_ZLIB if fmt == FORMAT_COLUMNAR_ZLIB else ENCODING_JSON
+    periods = {}
+    for period, records in records_by_period.items():
+        records = [r for r in records if isinstance(r, dict)]
+        times = [r.get("timestamp") or r.get("time") or r.get("datetime") for r in records]
+        block = {}
+        _encode_times(block, times)
+        for channel in CHANNELS:
+            values = [r.get(channel) for r in records]
+            block[channel] = _pack(values) if encoding == ENCODING_ZLIB else values
+        periods[period] = block
+    return {
+        "version": WIRE_VERSION,
+        "encoding": encoding,
+        "channels": list(CHANNELS),
+        "periods": periods,
+    }
+
+
+def decode(hourly_columns):
+    """Decode ``hourly_columns`` into {period: {"time": [...], channel: [...]}} with plain lists"""
+    version = hourly_columns.get("version")
+    if version != WIRE_VERSION:
+        raise ValueError(f"Unsupported hourly_columns version: {version}")
+    encoding = hourly_columns.get("encoding", ENCODING_JSON)
+    channels = hourly_columns.get("channels") or list(CHANNELS)
+
+    decoded = {}
+    for period, block in (hourly_columns.get("periods") or {}).items():
+        count = block.get("count", 0)
+        if "time" in block:
+            times = list(block["time"])
+        elif count:
+            start = datetime.strptime(block["start"][:16], TIME_FORMAT)
+            step = timedelta(seconds=block.get("step_seconds", 3600))
+            times = [(start + step * i).strftime(TIME_FORMAT) for i in range(count)]
+        else:
+            times = []
+        columns = {"time": times}
+        for channel in channels:
+            raw = block.get(channel)
+            if raw is None:
+                columns[channel] = [None] * len(times)
+            elif encoding == ENCODING_ZLIB:
+                columns[channel] = _unpack(raw)
+            else:
+                columns[channel] = list(raw)
+        decoded[period] = columns
+    return decoded
+
+
+def to_records(columns, period=None):
+    """Expand one decoded period back into legacy hourly dicts (all aliases, optional period marker)"""
+    records = []
+    temp, dewpoint, humidity = columns.get("temp", []), columns.get("dewpoint", []), columns.get("humidity", [])
+    wind, solar = columns.get("wind_speed", []), columns.get("solar_radiation", [])
+    for i, ts in enumerate(columns.get("time", [])):
+        record = {
+            "timestamp": ts,
+            "time": ts,
+            "datetime": ts,
+            "temp_c": temp[i],
+            "temperature": temp[i],
+            "temp": temp[i],
+            "dewpoint_c": dewpoint[i],
+            "dewpoint": dewpoint[i],
+            "dew_point": dewpoint[i],
+            "humidity": humidity[i],
+            "relative_humidity": humidity[i],
+            "wind_speed": wind[i],
+            "solar_radiation": solar[i],
+        }
+        if period is not None:
+            record["period"] = period
+        records.append(record)
+    return records
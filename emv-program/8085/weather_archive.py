@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Local Weather Archive for the Synerex Weather Service
+
+Keeps Open-Meteo archive data on disk so repeated analyses of the same site
+do not re-download the same date ranges.
+
+Layout:
+    <root>/<cell>/<year>.npz
+        hourly  float64 [channels, hours_in_year]   NaN = missing
+        daily   float64 [channels, days_in_year]    NaN = missing
+        have    bool    [days_in_year]              day fully archived
+
+A cell is the site's lat/lon rounded to WEATHER_ARCHIVE_CELL_DEG degrees
+(default 0.1, at or below the reanalysis grid resolution). All sites in a
+cell share one download, fetched at the cell centre.
+
+Only the missing days of a requested range are fetched (coalesced into
+contiguous gaps, one upstream request per gap). Gaps from ranges requested
+together (before/after periods) are merged when they overlap or touch, and
+the remaining gaps are fetched concurrently. A range that is fully archived
+is served without any network access. Days close to today are
+never archived because upstream values are still being filled in.
+"""
+
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+
+import numpy as np
+import requests
+
+logger = logging.getLogger(__name__)
+
+OPEN_METEO_ARCHIVE_URL = "https://archive-api.open-meteo.com/v1/archive"
+
+HOURLY_CHANNELS = (
+    "temperature_2m",
+    "relative_humidity_2m",
+    "dewpoint_2m",
+    "wind_speed_10m",
+    "shortwave_radiation",
+)
+DAILY_CHANNELS = (
+    "temperature_2m_mean",
+    "relative_humidity_2m_mean",
+    "dewpoint_2m_mean",
+    "wind_speed_10m_mean",
+    "shortwave_radiation_sum",
+)
+
+DEFAULT_CELL_DEGREES = 0.1
+DEFAULT_RECENT_DAYS = 7  # Open-Meteo archive lags real time by ~5 days
+DEFAULT_TIMEOUT = 60
+MAX_CONCURRENT_FETCHES = 4
+
+
+def _parse_day(value):
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def _days_in_year(year):
+    return (date(year + 1, 1, 1) - date(year, 1, 1)).days
+
+
+def _coalesce(ranges):
+    """Merge overlapping or adjacent (start, end) day ranges"""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + timedelta(days=1):
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _to_list(values):
+    """float array -> JSON-ready list with NaN as None"""
+    return [None if v != v else v for v in values.tolist()]
+
+
+def _to_array(values, length):
+    arr = np.full(length, np.nan)
+    if values:
+        n = min(len(values), length)
+        arr[:n] = [np.nan if v is None else float(v) for v in values[:n]]
+    return arr
+
+
+class _YearFile:
+    """One cell-year of archived data"""
+
+    def __init__(self, path, year):
+        self.path = path
+        self.year = year
+        self.days = _days_in_year(year)
+        self.dirty = False
+        if os.path.exists(path):
+            with np.load(path) as npz:
+                self.hourly = npz["hourly"]
+                self.daily = npz["daily"]
+                self.have = npz["have"]
+        else:
+            self.hourly = np.full((len(HOURLY_CHANNELS), self.days * 24), np.nan)
+            self.daily = np.full((len(DAILY_CHANNELS), self.days), np.nan)
+            self.have = np.zeros(self.days, dtype=bool)
+
+    def save(self):
+        if not self.dirty:
+            return
+        directory = os.path.dirname(self.path)
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as fh:
+                np.savez_compressed(fh, hourly=self.hourly, daily=self.daily, have=self.have)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        self.dirty = False
+
+
+class WeatherArchive:
+    """On-disk Open-Meteo archive with range-gap fetching"""
+
+    def __init__(self, root, base_url=OPEN_METEO_ARCHIVE_URL, cell_degrees=DEFAULT_CELL_DEGREES,
+                 recent_days=DEFAULT_RECENT_DAYS, timeout=DEFAULT_TIMEOUT, session=None):
+        self.root = root
+        self.base_url = base_url
+        self.cell_degrees = cell_degrees
+        self.recent_days = recent_days
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.upstream_requests = 0
+        self._counter_lock = threading.Lock()
+        self._locks = {}
+        self._locks_guard = threading.Lock()
+
+    @classmethod
+    def from_env(cls, default_root, session=None):
+        """Build from WEATHER_ARCHIVE_DIR / OPEN_METEO_ARCHIVE_URL / WEATHER_ARCHIVE_CELL_DEG"""
+        return cls(
+            root=os.environ.get("WEATHER_ARCHIVE_DIR", default_root),
+            base_url=os.environ.get("OPEN_METEO_ARCHIVE_URL", OPEN_METEO_ARCHIVE_URL),
+            cell_degrees=float(os.environ.get("WEATHER_ARCHIVE_CELL_DEG", DEFAULT_CELL_DEGREES)),
+            session=session,
+        )
+
+    def cell_for(self, lat, lon):
+        """Snap a coordinate to its archive cell centre"""
+        step = self.cell_degrees
+        return round(round(float(lat) / step) * step, 4), round(round(float(lon) / step) * step, 4)
+
+    def _cell_dir(self, cell):
+        return os.path.join(self.root, f"{cell[0]:+09.4f}_{cell[1]:+010.4f}")
+
+    def _cell_lock(self, cell):
+        with self._locks_guard:
+            lock = self._locks.get(cell)
+            if lock is None:
+                lock = self._locks[cell] = threading.Lock()
+            return lock
+
+    def get_range(self, lat, lon, start_date, end_date, include_hourly=True):
+        """Return an Open-Meteo shaped response for [start_date, end_date] (UTC).
+
+        Only missing days are fetched upstream; requests.RequestException from
+        a gap fetch propagates to the caller.
+        """
+        return self.get_ranges(lat, lon, [(start_date, end_date)], include_hourly=include_hourly)[0]
+
+    def get_ranges(self, lat, lon, ranges, include_hourly=True):
+        """Return one Open-Meteo shaped response per (start_date, end_date) in ``ranges``.
+
+        Missing days of all ranges are gathered first; overlapping or adjacent
+        gaps become a single upstream request and separate gaps are fetched
+        concurrently, so a before/after pair costs one round trip.
+        """
+        spans = []
+        for start_date, end_date in ranges:
+            start, end = _parse_day(start_date), _parse_day(end_date)
+            if end < start:
+                raise ValueError(f"end_date {end} is before start_date {start}")
+            spans.append((start, end))
+        cell = self.cell_for(lat, lon)
+        cell_dir = self._cell_dir(cell)
+        year_numbers = sorted({y for start, end in spans for y in range(start.year, end.year + 1)})
+
+        with self._cell_lock(cell):
+            years = {y: _YearFile(os.path.join(cell_dir, f"{y}.npz"), y) for y in year_numbers}
+
+            gaps = _coalesce([gap for start, end in spans for gap in self._missing_ranges(years, start, end)])
+            for gap_start, gap_end in gaps:
+                logger.info(f"Weather archive miss for cell {cell}: fetching {gap_start} to {gap_end}")
+            if len(gaps) == 1:
+                self._store(years, self._fetch(cell, *gaps[0]))
+            elif gaps:
+                with ThreadPoolExecutor(max_workers=min(MAX_CONCURRENT_FETCHES, len(gaps))) as pool:
+                    responses = list(pool.map(lambda gap: self._fetch(cell, *gap), gaps))
+                for data in responses:
+                    self._store(years, data)
+            else:
+                logger.info(f"Weather archive hit for cell {cell}: {spans} (no upstream request)")
+
+            for year_file in years.values():
+                try:
+                    year_file.save()
+                except OSError as e:
+                    logger.warning(f"Could not write weather archive file {year_file.path}: {e}")
+
+            return [self._slice(cell, years, start, end, include_hourly) for start, end in spans]
+
+    def _archivable_until(self):
+        return datetime.now(timezone.utc).date() - timedelta(days=self.recent_days)
+
+    def _missing_ranges(self, years, start, end):
+        """Contiguous runs of days in [start, end] that are not archived"""
+        ranges = []
+        run_start = None
+        day = start
+        while day <= end:
+            year_file = years[day.year]
+            if year_file.have[day.timetuple().tm_yday - 1]:
+                if run_start is not None:
+                    ranges.append((run_start, day - timedelta(days=1)))
+                    run_start = None
+            elif run_start is None:
+                run_start = day
+            day += timedelta(days=1)
+        if run_start is not None:
+            ranges.append((run_start, end))
+        return ranges
+
+    def _fetch(self, cell, start, end):
+        params = {
+            "latitude": cell[0],
+            "longitude": cell[1],
+            "start_date": start.isoformat(),
+            "end_date": end.isoformat(),
+            "daily": ",".join(DAILY_CHANNELS),
+            "hourly": ",".join(HOURLY_CHANNELS),
+            "timezone": "UTC",
+        }
+        with self._counter_lock:
+            self.upstream_requests += 1
+        response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+        logger.info(f"Open-Meteo API response status: {response.status_code}")
+        response.raise_for_status()
+        return response.json()
+
+    def _store(self, years, data):
+        """Write an upstream response into the year arrays and mark complete days"""
+        archivable_until = self._archivable_until()
+        hourly = data.get("hourly") or {}
+        daily = data.get("daily") or {}
+
+        hourly_times = hourly.get("time") or []
+        hourly_values = [_to_array(hourly.get(name), len(hourly_times)) for name in HOURLY_CHANNELS]
+        hours_seen = {}
+        for i, time_str in enumerate(hourly_times):
+            stamp = datetime.strptime(time_str[:13], "%Y-%m-%dT%H")
+            year_file = years.get(stamp.year)
+            if year_file is None:
+                continue
+            day_index = stamp.timetuple().tm_yday - 1
+            hour_index = day_index * 24 + stamp.hour
+            for c, values in enumerate(hourly_values):
+                year_file.hourly[c, hour_index] = values[i]
+            # Count hours with a temperature reading (the channel every consumer requires)
+            if not np.isnan(hourly_values[0][i]):
+                hours_seen[(stamp.year, day_index)] = hours_seen.get((stamp.year, day_index), 0) + 1
+            year_file.dirty = True
+
+        daily_times = daily.get("time") or []
+        daily_values = [_to_array(daily.get(name), len(daily_times)) for name in DAILY_CHANNELS]
+        for i, day_str in enumerate(daily_times):
+            day = _parse_day(day_str)
+            year_file = years.get(day.year)
+            if year_file is None:
+                continue
+            day_index = day.timetuple().tm_yday - 1
+            for c, values in enumerate(daily_values):
+                year_file.daily[c, day_index] = values[i]
+            # A day is archived once upstream has all 24 hours and it is old enough to be final
+            if day <= archivable_until and hours_seen.get((day.year, day_index), 0) == 24:
+                year_file.have[day_index] = True
+            year_file.dirty = True
+
+    def _slice(self, cell, years, start, end, include_hourly):
+        daily_times, hourly_times = [], []
+        daily_parts, hourly_parts = [], []
+        for year in range(start.year, end.year + 1):
+            year_file = years[year]
+            first = max(start, date(year, 1, 1))
+            last = min(end, date(year, 12, 31))
+            d0 = first.timetuple().tm_yday - 1
+            d1 = last.timetuple().tm_yday
+            daily_parts.append(year_file.daily[:, d0:d1])
+            for offset in range(d1 - d0):
+                daily_times.append((first + timedelta(days=offset)).isoformat())
+            if include_hourly:
+                hourly_parts.append(year_file.hourly[:, d0 * 24:d1 * 24])
+                for offset in range(d1 - d0):
+                    day_str = (first + timedelta(days=offset)).isoformat()
+                    hourly_times.extend(f"{day_str}T{hour:02d}:00" for hour in range(24))
+
+        daily = np.concatenate(daily_parts, axis=1)
+        result = {
+            "latitude": cell[0],
+            "longitude": cell[1],
+            "timezone": "UTC",
+            "daily": {"time": daily_times},
+        }
+        for c, name in enumerate(DAILY_CHANNELS):
+            result["daily"][name] = _to_list(daily[c])
+        if include_hourly:
+            hourly = np.concatenate(hourly_parts, axis=1)
+            result["hourly"] = {"time": hourly_times}
+            for c, name in enumerate(HOURLY_CHANNELS):
+                result["hourly"][name] = _to_list(hourly[c])
+        return result
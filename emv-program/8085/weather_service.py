@@ -6,7 +6,10 @@ Provides weather data via Open-Meteo API
 
 import json
 import logging
+import os
 import requests
+import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from flask import Flask, request, jsonify
 from flask_cors import CORS
@@ -15,6 +18,50 @@ from flask_cors import CORS
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Pooled keep-alive session for all upstream calls (geocoding and archive)
+http_session = requests.Session()
+http_session.mount("https://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16))
+http_session.mount("http://", requests.adapters.HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+# Local archive of Open-Meteo data (only missing date gaps are downloaded)
+try:
+    from weather_archive import WeatherArchive
+    weather_archive = WeatherArchive.from_env(
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "weather_archive_data"),
+        session=http_session,
+    )
+    logger.info(f"Weather archive enabled at {weather_archive.root}")
+except ImportError as e:
+    weather_archive = None
+    logger.warning(f"Weather archive unavailable (numpy not installed?), fetching directly: {e}")
+
+# Geocode cache shared with the 8082 app (exact address, ZIP and city/state keys)
+from geocode_cache import geocode_cache
+# Columnar hourly wire format, negotiated per request via "hourly_format"
+import hourly_wire
+
+# Static fallback coordinates for known project addresses (matched by substring)
+STATIC_COORDINATES = {
+    "1680 Great Western Drive, Windsor, CO, 80550": (40.4772, -104.9014, "Windsor, CO"),
+    "1680 Great Western Drive": (40.4772, -104.9014, "Windsor, CO"),
+    "Windsor, CO, 80550": (40.4772, -104.9014, "Windsor, CO"),
+    "80550": (40.4772, -104.9014, "Windsor, CO"),
+    # Lafayette, LA coordinates
+    "Lafayette, LA": (30.2241, -92.0198, "Lafayette, LA"),
+    "Lafayette, LA 70506": (30.2241, -92.0198, "Lafayette, LA"),
+    "70506": (30.2241, -92.0198, "Lafayette, LA"),
+    "Ambassador Caffery Parkway": (30.2241, -92.0198, "Lafayette, LA"),
+    # Frisco, TX coordinates
+    "Frisco, TX": (33.1507, -96.8236, "Frisco, TX"),
+    "Frisco, TX 75033": (33.1507, -96.8236, "Frisco, TX"),
+    "75033": (33.1507, -96.8236, "Frisco, TX"),
+    "Gateway Drive": (33.1507, -96.8236, "Frisco, TX"),
+}
+_STATIC_COORDINATES_LOWER = [(key, key.lower(), coords) for key, coords in STATIC_COORDINATES.items()]
+
+OPEN_METEO_GEOCODING_URL = "https://geocoding-api.open-meteo.com/v1/search"
+GEOCODE_WORKERS = 6  # Candidate queries issued concurrently on a cache miss
+
 app = Flask(__name__)
 try:
     CORS(app)
@@ -23,36 +70,45 @@ except Exception as e:
     logger.warning(f"Failed to initialize CORS (non-critical): {e}")
     # Continue without CORS if it fails - service can still work
 
+def _open_meteo_geocode(name):
+    """Single Open-Meteo geocoding query; returns (lat, lon, name) or None, raises on request errors"""
+    params = {
+        "name": name,
+        "count": 1,
+        "language": "en",
+        "format": "json"
+    }
+    logger.info(f"Trying Open-Meteo geocoding for: {name}")
+    response = http_session.get(OPEN_METEO_GEOCODING_URL, params=params, timeout=10)
+    response.raise_for_status()
+    data = response.json()
+    if data.get("results") and len(data["results"]) > 0:
+        result = data["results"][0]
+        return result["latitude"], result["longitude"], result.get("name", name)
+    return None
+
 def geocode_address(address):
     """Geocode address to get coordinates using Open-Meteo Geocoding API with fallbacks"""
     try:
         import re
         import time
         
-        # Static fallback coordinates for known project addresses
-        static_coordinates = {
-            "1680 Great Western Drive, Windsor, CO, 80550": (40.4772, -104.9014, "Windsor, CO"),
-            "1680 Great Western Drive": (40.4772, -104.9014, "Windsor, CO"),
-            "Windsor, CO, 80550": (40.4772, -104.9014, "Windsor, CO"),
-            "80550": (40.4772, -104.9014, "Windsor, CO"),
-            # Lafayette, LA coordinates
-            "Lafayette, LA": (30.2241, -92.0198, "Lafayette, LA"),
-            "Lafayette, LA 70506": (30.2241, -92.0198, "Lafayette, LA"),
-            "70506": (30.2241, -92.0198, "Lafayette, LA"),
-            "Ambassador Caffery Parkway": (30.2241, -92.0198, "Lafayette, LA"),
-            # Frisco, TX coordinates
-            "Frisco, TX": (33.1507, -96.8236, "Frisco, TX"),
-            "Frisco, TX 75033": (33.1507, -96.8236, "Frisco, TX"),
-            "75033": (33.1507, -96.8236, "Frisco, TX"),
-            "Gateway Drive": (33.1507, -96.8236, "Frisco, TX"),
-        }
-        
         # Check static coordinates first
-        for key, coords in static_coordinates.items():
-            if key.lower() in address.lower():
+        address_lower = address.lower()
+        for key, key_lower, coords in _STATIC_COORDINATES_LOWER:
+            if key_lower in address_lower:
                 logger.info(f"Using static coordinates for: {key}")
                 return coords[0], coords[1], coords[2]
         
+        # Then the shared geocode cache (includes cached failures)
+        found, cached = geocode_cache.get(address)
+        if found:
+            if cached is None:
+                logger.info(f"Geocode cache: recent lookup for '{address}' found no results")
+                return None, None, None
+            logger.info(f"Geocode cache hit for '{address}': ({cached.lat}, {cached.lon})")
+            return cached.lat, cached.lon, cached.name
+        
         # Parse the address components
         # Expected formats: 
         #   "Street Address, City, State, ZIP" (comma-separated)
@@ -122,36 +178,30 @@ def geocode_address(address):
             search_attempts = [address]
         
         # Try Open-Meteo Geocoding API first
-        url = "https://geocoding-api.open-meteo.com/v1/search"
-        
         logger.info(f"Attempting to geocode address: {address}")
         logger.info(f"Search attempts: {search_attempts}")
         
-        for attempt in search_attempts:
-            try:
-                params = {
-                    "name": attempt,
-                    "count": 1,
-                    "language": "en",
-                    "format": "json"
-                }
-                
-                logger.info(f"Trying Open-Meteo geocoding for: {attempt}")
-                response = requests.get(url, params=params, timeout=10)
-                response.raise_for_status()
-                
-                data = response.json()
-                if data.get("results") and len(data["results"]) > 0:
-                    result = data["results"][0]
+        # Query all candidates concurrently; take the first success in priority order
+        transient_failure = False
+        pool = ThreadPoolExecutor(max_workers=min(GEOCODE_WORKERS, len(search_attempts)))
+        try:
+            futures = [(attempt, pool.submit(_open_meteo_geocode, attempt)) for attempt in search_attempts]
+            for attempt, future in futures:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    logger.warning(f"   Open-Meteo geocoding attempt failed for '{attempt}': {e}")
+                    transient_failure = True
+                    continue
+                if result:
                     logger.info(f"✅ Geocoding successful via Open-Meteo for: {attempt}")
-                    logger.info(f"   Result: {result.get('name', attempt)} at ({result['latitude']}, {result['longitude']})")
-                    return result["latitude"], result["longitude"], result.get("name", attempt)
-                else:
-                    logger.warning(f"   Open-Meteo returned no results for: {attempt}")
-                    
-            except Exception as e:
-                logger.warning(f"   Open-Meteo geocoding attempt failed for '{attempt}': {e}")
-                continue
+                    logger.info(f"   Result: {result[2]} at ({result[0]}, {result[1]})")
+                    geocode_cache.put(address, result[0], result[1], result[2], source="open-meteo")
+                    return result
+                logger.warning(f"   Open-Meteo returned no results for: {attempt}")
+        finally:
+            # Don't wait on lower-priority candidates once one has answered
+            pool.shutdown(wait=False, cancel_futures=True)
         
         # Fallback to Nominatim (OpenStreetMap) geocoding service
         logger.info("Open-Meteo geocoding failed, trying Nominatim (OpenStreetMap) as fallback...")
@@ -171,7 +221,7 @@ def geocode_address(address):
                 }
                 
                 logger.info(f"Trying Nominatim geocoding for: {attempt}")
-                response = requests.get(nominatim_url, params=params, headers=headers, timeout=10)
+                response = http_session.get(nominatim_url, params=params, headers=headers, timeout=10)
                 response.raise_for_status()
                 
                 data = response.json()
@@ -182,6 +232,7 @@ def geocode_address(address):
                     display_name = result.get("display_name", attempt)
                     logger.info(f"✅ Geocoding successful via Nominatim for: {attempt}")
                     logger.info(f"   Result: {display_name} at ({lat}, {lon})")
+                    geocode_cache.put(address, lat, lon, display_name, source="nominatim")
                     return lat, lon, display_name
                 else:
                     logger.warning(f"   Nominatim returned no results for: {attempt}")
@@ -191,19 +242,52 @@ def geocode_address(address):
                     
             except Exception as e:
                 logger.warning(f"   Nominatim geocoding attempt failed for '{attempt}': {e}")
+                transient_failure = True
                 # Rate limiting even on error
                 time.sleep(1)
                 continue
         
         logger.error(f"❌ No geocoding results found for address: {address}")
         logger.error(f"   Tried {len(search_attempts)} different search formats")
+        if not transient_failure:
+            # Every provider answered "no results": remember that for the negative TTL
+            geocode_cache.put_failure(address)
         return None, None, None
         
     except Exception as e:
         logger.error(f"Geocoding error for {address}: {e}")
         return None, None, None
 
-def fetch_weather_data(lat, lon, start_date, end_date, include_hourly=False):
+def fetch_weather_ranges(lat, lon, periods, include_hourly=True):
+    """Fetch raw Open-Meteo responses for several (start_date, end_date) periods at once
+    
+    With the archive, overlapping/adjacent gaps are merged into one upstream
+    request and separate gaps are fetched concurrently. Without it, each
+    period is requested concurrently on the pooled session. Request errors
+    propagate to the caller.
+    """
+    if weather_archive is not None:
+        return weather_archive.get_ranges(lat, lon, periods, include_hourly=include_hourly)
+    
+    def _fetch(period):
+        params = {
+            "latitude": lat,
+            "longitude": lon,
+            "start_date": period[0],
+            "end_date": period[1],
+            "daily": "temperature_2m_mean,relative_humidity_2m_mean,dewpoint_2m_mean,wind_speed_10m_mean,shortwave_radiation_sum",
+            "timezone": "UTC"
+        }
+        if include_hourly:
+            params["hourly"] = "temperature_2m,relative_humidity_2m,dewpoint_2m,wind_speed_10m,shortwave_radiation"
+        response = http_session.get("https://archive-api.open-meteo.com/v1/archive", params=params, timeout=60)
+        response.raise_for_status()
+        return response.json()
+    
+    with ThreadPoolExecutor(max_workers=max(1, len(periods))) as pool:
+        return list(pool.map(_fetch, periods))
+
+def fetch_weather_data(lat, lon, start_date, end_date, include_hourly=False, data=None):
     """Fetch weather data from Open-Meteo Archive API
     
     Args:
@@ -212,6 +296,7 @@ def fetch_weather_data(lat, lon, start_date, end_date, include_hourly=False):
         start_date: Start date (YYYY-MM-DD)
         end_date: End date (YYYY-MM-DD)
         include_hourly: If True, also fetch hourly data for timestamp matching
+        data: Raw response already fetched by fetch_weather_ranges (skips the request)
     """
     try:
         url = "https://archive-api.open-meteo.com/v1/archive"
@@ -229,16 +314,22 @@ def fetch_weather_data(lat, lon, start_date, end_date, include_hourly=False):
             params["hourly"] = "temperature_2m,relative_humidity_2m,dewpoint_2m,wind_speed_10m,shortwave_radiation"
             logger.info(f"Fetching hourly weather data for timestamp matching: {start_date} to {end_date}")
         
-        logger.info(f"Making Open-Meteo API request: {url} with params: {params}")
-        logger.info(f"Request timeout: 60 seconds")
-        
         try:
-            response = requests.get(url, params=params, timeout=60)  # Increased timeout to 60 seconds for large date ranges
-            logger.info(f"Open-Meteo API response status: {response.status_code}")
-            response.raise_for_status()
-            
-            data = response.json()
-            logger.info(f"Open-Meteo API response received, keys: {list(data.keys())}")
+            if data is not None:
+                logger.info(f"Using prefetched weather data for {start_date} to {end_date}")
+            elif weather_archive is not None:
+                # Served from the local archive; only uncached date gaps hit Open-Meteo
+                data = weather_archive.get_range(lat, lon, start_date, end_date, include_hourly=include_hourly)
+                logger.info(f"Weather archive response ready, keys: {list(data.keys())}")
+            else:
+                logger.info(f"Making Open-Meteo API request: {url} with params: {params}")
+                logger.info(f"Request timeout: 60 seconds")
+                response = http_session.get(url, params=params, timeout=60)  # Increased timeout to 60 seconds for large date ranges
+                logger.info(f"Open-Meteo API response status: {response.status_code}")
+                response.raise_for_status()
+                
+                data = response.json()
+                logger.info(f"Open-Meteo API response received, keys: {list(data.keys())}")
         except requests.exceptions.Timeout:
             logger.error(f"Open-Meteo API request timed out after 60 seconds for {start_date} to {end_date}")
             return {"error": f"Open-Meteo API request timed out. The date range may be too large or the API is slow."}
@@ -624,16 +715,33 @@ def weather_batch():
         
         logger.info(f"Weather batch - include_hourly: {include_hourly}")
         
+        # Hourly payload format: legacy list of dicts unless the caller asks for columnar
+        hourly_format = hourly_wire.negotiate(data.get('hourly_format'))
+        logger.info(f"Weather batch - hourly_format: {hourly_format}")
+        
         # Fetch weather data for both periods
         # Log the date ranges to help debug timeout issues
         logger.info(f"Fetching before period: {before_start_date} to {before_end_date}")
         logger.info(f"Fetching after period: {after_start_date} to {after_end_date}")
         
+        # Both periods in one pass: overlapping/adjacent ranges share one upstream request,
+        # separate ones are fetched concurrently. If that fails, each period is fetched on its
+        # own below, so an error in one period's range does not fail the other.
+        before_data = after_data = None
+        try:
+            before_data, after_data = fetch_weather_ranges(
+                lat, lon,
+                [(before_start_date, before_end_date), (after_start_date, after_end_date)],
+                include_hourly=True
+            )
+        except Exception as e:
+            logger.warning(f"Weather prefetch failed, fetching each period separately: {e}")
+        
         # CRITICAL FIX: Always fetch with hourly data to ensure we have fallback
         # This ensures we can always calculate from hourly data if daily is None
         try:
             logger.info("Attempting to fetch before weather data (with hourly for fallback)...")
-            before_weather = fetch_weather_data(lat, lon, before_start_date, before_end_date, include_hourly=True)  # Always include hourly for fallback
+            before_weather = fetch_weather_data(lat, lon, before_start_date, before_end_date, include_hourly=True, data=before_data)  # Always include hourly for fallback
             logger.info(f"Before weather data received: temp_avg={before_weather.get('temp_avg')}, humidity_avg={before_weather.get('humidity_avg')}")
             logger.info(f"Before weather hourly_data count: {len(before_weather.get('hourly_data', []))}")
             
@@ -676,7 +784,7 @@ def weather_batch():
         
         try:
             logger.info("Attempting to fetch after weather data (with hourly for fallback)...")
-            after_weather = fetch_weather_data(lat, lon, after_start_date, after_end_date, include_hourly=True)  # Always include hourly for fallback
+            after_weather = fetch_weather_data(lat, lon, after_start_date, after_end_date, include_hourly=True, data=after_data)  # Always include hourly for fallback
             logger.info(f"After weather data received: temp_avg={after_weather.get('temp_avg')}, humidity_avg={after_weather.get('humidity_avg')}")
             logger.info(f"After weather hourly_data count: {len(after_weather.get('hourly_data', []))}")
             
@@ -824,7 +932,14 @@ def weather_batch():
         
         # Add hourly data if available
         if hourly_data_combined:
-            result["hourly_data"] = hourly_data_combined
+            result["hourly_format"] = hourly_format
+            if hourly_format == hourly_wire.FORMAT_LEGACY:
+                result["hourly_data"] = hourly_data_combined
+            else:
+                result["hourly_columns"] = hourly_wire.encode_records({
+                    "before": before_weather.get("hourly_data", []),
+                    "after": after_weather.get("hourly_data", []),
+                }, hourly_format)
         
         # CRITICAL FIX: Apply fallback calculation if daily averages are None but hourly data exists
         # This ensures we always have values if hourly data is available
@@ -963,7 +1078,7 @@ def weather_batch():
                     result["dewpoint_after"] = sum(dewpoint) / len(dewpoint)
                     logger.info(f"AGGRESSIVE FALLBACK: Calculated dewpoint_after from {len(dewpoint)} points: {result['dewpoint_after']:.2f}°C")
         
-        logger.info(f"Weather batch response: {result}")
+        logger.info(f"Weather batch response: { {k: v for k, v in result.items() if k not in ('hourly_data', 'hourly_columns')} }")
         logger.info(f"FINAL RESULT - temp_before: {result.get('temp_before')}, temp_after: {result.get('temp_after')}, humidity_before: {result.get('humidity_before')}, humidity_after: {result.get('humidity_after')}, dewpoint_before: {result.get('dewpoint_before')}, dewpoint_after: {result.get('dewpoint_after')}")
         return jsonify(result)
         
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Chart Rendering for the Chart Generation Service
+
+Pure functions that draw one chart with matplotlib's object-oriented
+Figure API and return the SVG text. They never touch pyplot's global
+figure state, so several charts can be drawn at once, in threads or in a
+process pool (each worker imports only this module and matplotlib).
+
+RENDER_VERSION is part of every cache key; bump it when a chart's look
+changes so cached SVGs are not served for the old style.
+"""
+
+import hashlib
+import json
+from io import StringIO
+
+import matplotlib
+matplotlib.use('Agg')  # Use non-interactive backend
+from matplotlib.figure import Figure
+import numpy as np
+
+RENDER_VERSION = 1
+
+CHART_RC = {
+    'figure.figsize': (10, 6),
+    'font.size': 10,
+    'axes.linewidth': 0.5,
+    'grid.alpha': 0.3,
+}
+
+
+def configure_matplotlib():
+    """Apply the service's chart defaults once per process (also the pool worker initializer)"""
+    import warnings
+    warnings.filterwarnings('ignore', category=UserWarning)
+    warnings.filterwarnings('ignore', category=FutureWarning)
+    import matplotlib.style
+    matplotlib.style.use('default')
+    matplotlib.rcParams.update(CHART_RC)
+
+
+def chart_key(kind, *args):
+    """Content hash of a chart request (kind + inputs + RENDER_VERSION)"""
+    payload = json.dumps([RENDER_VERSION, kind, args], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _to_svg(fig):
+    svg_buffer = StringIO()
+    fig.savefig(svg_buffer, format='svg', bbox_inches='tight', dpi=100)
+    return svg_buffer.getvalue()
+
+
+def render_envelope_svg(before_values, after_values, metric, title):
+    """Before/after envelope line chart for one metric"""
+    fig = Figure(figsize=(12, 8))
+    ax = fig.add_subplot()
+
+    # Plot data
+    ax.plot(range(len(before_values)), before_values, 'b-', linewidth=2, label='Before Synerex', alpha=0.8)
+    ax.plot(range(len(after_values)), after_values, 'r-', linewidth=2, label='After Synerex', alpha=0.8)
+
+    # Customize chart
+    ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
+    ax.set_xlabel('Time Points', fontsize=12)
+    ax.set_ylabel(metric.upper(), fontsize=12)
+    ax.grid(True, alpha=0.3)
+
+    # Position legend outside the chart area using figure coordinates
+    fig.legend(['Before Synerex', 'After Synerex'],
+               loc='lower center',
+               bbox_to_anchor=(0.5, 0.02),
+               bbox_transform=fig.transFigure,
+               ncol=2,
+               fontsize=9,
+               framealpha=0.9)
+
+    # Adjust layout with extra space for legend outside the chart
+    fig.tight_layout()
+    fig.subplots_adjust(bottom=0.15)
+    return _to_svg(fig)
+
+
+def render_smoothing_index_svg(metrics, variance_improvements, cv_improvements):
+    """Grouped bar chart of variance / CV reduction per metric"""
+    fig = Figure(figsize=(8, 4))
+    ax1 = fig.add_subplot()
+
+    # Combined smoothing improvement chart
+    x_pos = np.arange(len(metrics))
+    width = 0.35
+
+    bars1 = ax1.bar(x_pos - width/2, variance_improvements, width, label='Variance Reduction', color='skyblue', alpha=0.7)
+    bars2 = ax1.bar(x_pos + width/2, cv_improvements, width, label='CV Reduction', color='lightcoral', alpha=0.7)
+
+    ax1.set_title('Smoothing Improvement by Metric', fontsize=12, fontweight='bold')
+    ax1.set_xlabel('Metrics')
+    ax1.set_ylabel('Improvement (%)')
+    ax1.set_xticks(x_pos)
+    ax1.set_xticklabels(metrics, rotation=45, ha='right')
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+
+    # Set proper axis limits to ensure bars are visible
+    ax1.set_xlim(-0.5, len(metrics) - 0.5)
+    # Set y-axis limits based on data range with some padding
+    all_values = list(variance_improvements) + list(cv_improvements)
+    if all_values:
+        ax1.set_ylim(min(all_values) - 5, max(all_values) + 5)
+
+    # Add value labels on bars
+    for bar, value in zip(bars1, variance_improvements):
+        ax1.text(bar.get_x() + bar.get_width()/2., bar.get_height() + 1,
+                 f'{value:.1f}%', ha='center', va='bottom', fontsize=9)
+    for bar, value in zip(bars2, cv_improvements):
+        ax1.text(bar.get_x() + bar.get_width()/2., bar.get_height() + 1,
+                 f'{value:.1f}%', ha='center', va='bottom', fontsize=9)
+
+    # Adjust layout
+    fig.tight_layout()
+    return _to_svg(fig)
+
+
+RENDERERS = {
+    'envelope': render_envelope_svg,
+    'smoothing_index': render_smoothing_index_svg,
+}
+
+
+def render(kind, args):
+    """Render one chart by kind (the unit of work sent to pool workers)"""
+    return RENDERERS[kind](*args)
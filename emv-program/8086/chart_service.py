@@ -8,19 +8,15 @@ import os
 import sys
 import json
 import logging
+import threading
 import traceback
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend
-import matplotlib.pyplot as plt
-import numpy as np
-from io import StringIO
-import warnings
 
-# Suppress matplotlib warnings
-warnings.filterwarnings('ignore', category=UserWarning)
-warnings.filterwarnings('ignore', category=FutureWarning)
+from chart_render import chart_key, configure_matplotlib, render
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -29,83 +25,226 @@ logger = logging.getLogger(__name__)
 app = Flask(__name__)
 CORS(app)
 
+ENVELOPE_METRICS = ['avgKw', 'avgKva', 'avgPf', 'avgTHD']
+DEFAULT_CACHE_SIZE = 256
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
 class ChartGenerator:
-    """Handles chart generation with proper error handling"""
+    """Handles chart generation with proper error handling
+
+    Rendered SVGs are cached by a content hash of the chart inputs
+    (CHART_CACHE_SIZE entries, LRU), so regenerating a report re-renders
+    nothing. Cache misses are drawn in a process pool of CHART_WORKERS
+    workers (1 or 0 = draw in this process), so the charts of a report,
+    or of a whole batch of reports, render in parallel.
+    """
     
-    def __init__(self):
+    def __init__(self, cache_size=DEFAULT_CACHE_SIZE, workers=DEFAULT_WORKERS):
+        self.cache_size = cache_size
+        self.workers = workers
+        self._cache = OrderedDict()  # chart_key -> SVG text
+        self._lock = threading.Lock()
+        self._pool = None
+        self.hits = 0
+        self.renders = 0
         self.setup_matplotlib()
     
+    @classmethod
+    def from_env(cls):
+        """Build from CHART_CACHE_SIZE / CHART_WORKERS"""
+        return cls(
+            cache_size=int(os.environ.get('CHART_CACHE_SIZE', DEFAULT_CACHE_SIZE)),
+            workers=int(os.environ.get('CHART_WORKERS', DEFAULT_WORKERS)),
+        )
+    
     def setup_matplotlib(self):
         """Configure matplotlib for headless operation"""
         try:
-            plt.style.use('default')
-            plt.rcParams['figure.figsize'] = (10, 6)
-            plt.rcParams['font.size'] = 10
-            plt.rcParams['axes.linewidth'] = 0.5
-            plt.rcParams['grid.alpha'] = 0.3
+            configure_matplotlib()
             logger.info("Matplotlib configured successfully")
         except Exception as e:
             logger.error(f"Error configuring matplotlib: {e}")
     
+    def _get_pool(self):
+        if self.workers <= 1:
+            return None
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=configure_matplotlib)
+            return self._pool
+    
+    def _reset_pool(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    
+    def _remember(self, key, svg_content):
+        with self._lock:
+            self._cache[key] = svg_content
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def render_jobs(self, jobs):
+        """Render (kind, args) jobs; returns {chart_key: svg or None}
+
+        Cached charts are returned as-is, identical jobs render once, and
+        the remaining ones are drawn in parallel.
+        """
+        results = {}
+        pending = {}
+        for kind, args in jobs:
+            key = chart_key(kind, *args)
+            if key in results or key in pending:
+                continue
+            with self._lock:
+                svg_content = self._cache.get(key)
+                if svg_content is not None:
+                    self._cache.move_to_end(key)
+                    self.hits += 1
+            if svg_content is not None:
+                results[key] = svg_content
+            else:
+                pending[key] = (kind, args)
+        if not pending:
+            return results
+        
+        futures = {}
+        pool = self._get_pool() if len(pending) > 1 else None
+        if pool is not None:
+            try:
+                futures = {key: pool.submit(render, kind, args) for key, (kind, args) in pending.items()}
+            except (BrokenProcessPool, RuntimeError) as e:
+                logger.warning(f"Chart worker pool unavailable, rendering in-process: {e}")
+                self._reset_pool()
+                futures = {}
+        
+        for key, (kind, args) in pending.items():
+            try:
+                try:
+                    svg_content = futures[key].result() if key in futures else render(kind, args)
+                except BrokenProcessPool as e:
+                    logger.warning(f"Chart worker pool broke, rendering in-process: {e}")
+                    self._reset_pool()
+                    svg_content = render(kind, args)
+            except Exception as e:
+                logger.error(f"Error generating {kind} chart: {e}")
+                logger.error(traceback.format_exc())
+                svg_content = None
+            if svg_content:
+                self.renders += 1
+                self._remember(key, svg_content)
+            results[key] = svg_content
+        return results
+    
+    def envelope_job(self, data, metric, title):
+        """(kind, args) for an envelope chart, or None when the metric has no data"""
+        # Extract data
+        before_data = data.get('before', {}).get(metric, {})
+        after_data = data.get('after', {}).get(metric, {})
+        
+        if not before_data or not after_data:
+            logger.warning(f"Missing data for {metric}")
+            return None
+        
+        before_values = before_data.get('values', [])
+        after_values = after_data.get('values', [])
+        
+        if not before_values or not after_values:
+            logger.warning(f"Empty values for {metric}")
+            return None
+        return ('envelope', (list(before_values), list(after_values), metric, title))
+    
+    def smoothing_index_job(self, smoothing_data):
+        """(kind, args) for the smoothing index chart, or None when there is no data"""
+        if not smoothing_data:
+            logger.warning("No smoothing data provided")
+            return None
+        
+        # Extract metrics
+        metrics = list(smoothing_data.keys())
+        if not metrics:
+            logger.warning("No metrics in smoothing data")
+            return None
+        
+        # Prepare data
+        variance_improvements = []
+        cv_improvements = []
+        
+        for metric in metrics:
+            metric_data = smoothing_data.get(metric, {})
+            variance_improvements.append(metric_data.get('variance_improvement', 0))
+            cv_improvements.append(metric_data.get('cv_improvement', 0))
+        return ('smoothing_index', (metrics, variance_improvements, cv_improvements))
+    
+    def report_jobs(self, data):
+        """{chart name: (kind, args)} for every chart of one report's analysis data"""
+        jobs = {}
+        
+        # Envelope charts
+        envelope_analysis = data.get('envelope_analysis', {})
+        if envelope_analysis:
+            # Get before/after data
+            before_data = data.get('power_quality', {}).get('before', {})
+            after_data = data.get('power_quality', {}).get('after', {})
+            
+            if before_data and after_data:
+                chart_data = {
+                    'before': before_data,
+                    'after': after_data
+                }
+                
+                for metric in ENVELOPE_METRICS:
+                    if metric in before_data and metric in after_data:
+                        title = f"{metric.upper()} Network Envelope"
+                        job = self.envelope_job(chart_data, metric, title)
+                        if job:
+                            jobs[f"{metric}_envelope"] = job
+                    else:
+                        logger.warning(f"Missing {metric} data for chart generation")
+            else:
+                logger.warning("Missing before/after data for envelope charts")
+        
+        # Smoothing index chart
+        smoothing_data = envelope_analysis.get('smoothing_data', {}).get('metric_details', {})
+        if smoothing_data:
+            job = self.smoothing_index_job(smoothing_data)
+            if job:
+                jobs['smoothing_index'] = job
+        else:
+            logger.warning("No smoothing data for smoothing index chart")
+        return jobs
+    
+    def generate_report_charts(self, reports):
+        """Charts for several reports at once: {report id: {chart name: svg}}
+
+        All charts that are not cached are rendered in one parallel pass.
+        """
+        report_jobs = {report_id: self.report_jobs(data) for report_id, data in reports.items()}
+        rendered = self.render_jobs(job for jobs in report_jobs.values() for job in jobs.values())
+        charts = {}
+        for report_id, jobs in report_jobs.items():
+            charts[report_id] = {}
+            for name, (kind, args) in jobs.items():
+                svg_content = rendered.get(chart_key(kind, *args))
+                if svg_content:
+                    charts[report_id][name] = svg_content
+                else:
+                    logger.warning(f"Failed to generate {name} chart for report {report_id}")
+        return charts
+    
+    def _render_one(self, job):
+        if job is None:
+            return None
+        kind, args = job
+        return self.render_jobs([job]).get(chart_key(kind, *args))
+    
     def generate_envelope_chart_svg(self, data, metric, title):
         """Generate envelope chart as SVG"""
         try:
             logger.info(f"Generating envelope chart for {metric}")
-            
-            # Extract data
-            before_data = data.get('before', {}).get(metric, {})
-            after_data = data.get('after', {}).get(metric, {})
-            
-            if not before_data or not after_data:
-                logger.warning(f"Missing data for {metric}")
-                return None
-            
-            before_values = before_data.get('values', [])
-            after_values = after_data.get('values', [])
-            
-            if not before_values or not after_values:
-                logger.warning(f"Empty values for {metric}")
-                return None
-            
-            # Create figure
-            fig, ax = plt.subplots(figsize=(12, 8))
-            
-            # Plot data
-            x_before = range(len(before_values))
-            x_after = range(len(after_values))
-            
-            ax.plot(x_before, before_values, 'b-', linewidth=2, label='Before Synerex', alpha=0.8)
-            ax.plot(x_after, after_values, 'r-', linewidth=2, label='After Synerex', alpha=0.8)
-            
-            # Customize chart
-            ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
-            ax.set_xlabel('Time Points', fontsize=12)
-            ax.set_ylabel(metric.upper(), fontsize=12)
-            ax.grid(True, alpha=0.3)
-            
-            # Position legend outside the chart area using figure coordinates
-            legend = fig.legend(['Before Synerex', 'After Synerex'], 
-                              loc='lower center', 
-                              bbox_to_anchor=(0.5, 0.02), 
-                              bbox_transform=fig.transFigure,
-                              ncol=2, 
-                              fontsize=9, 
-                              framealpha=0.9)
-            
-            # Adjust layout with extra space for legend outside the chart
-            plt.tight_layout()
-            plt.subplots_adjust(bottom=0.15)
-            
-            # Convert to SVG
-            svg_buffer = StringIO()
-            plt.savefig(svg_buffer, format='svg', bbox_inches='tight', dpi=100)
-            svg_content = svg_buffer.getvalue()
-            svg_buffer.close()
-            plt.close(fig)
-            
-            logger.info(f"Successfully generated envelope chart for {metric}")
-            return svg_content
-            
+            return self._render_one(self.envelope_job(data, metric, title))
         except Exception as e:
             logger.error(f"Error generating envelope chart for {metric}: {e}")
             logger.error(traceback.format_exc())
@@ -115,88 +254,28 @@ class ChartGenerator:
         """Generate smoothing index chart as SVG"""
         try:
             logger.info("Generating smoothing index chart")
-            
-            if not smoothing_data:
-                logger.warning("No smoothing data provided")
-                return None
-            
-            # Extract metrics
-            metrics = list(smoothing_data.keys())
-            if not metrics:
-                logger.warning("No metrics in smoothing data")
-                return None
-            
-            # Prepare data
-            variance_improvements = []
-            cv_improvements = []
-            
-            for metric in metrics:
-                metric_data = smoothing_data.get(metric, {})
-                variance_improvements.append(metric_data.get('variance_improvement', 0))
-                cv_improvements.append(metric_data.get('cv_improvement', 0))
-            
-            # Create figure
-            fig, ax1 = plt.subplots(1, 1, figsize=(8, 4))
-            
-            # Combined smoothing improvement chart
-            x_pos = np.arange(len(metrics))
-            width = 0.35
-
-            bars1 = ax1.bar(x_pos - width/2, variance_improvements, width, label='Variance Reduction', color='skyblue', alpha=0.7)
-            bars2 = ax1.bar(x_pos + width/2, cv_improvements, width, label='CV Reduction', color='lightcoral', alpha=0.7)
-
-            ax1.set_title('Smoothing Improvement by Metric', fontsize=12, fontweight='bold')
-            ax1.set_xlabel('Metrics')
-            ax1.set_ylabel('Improvement (%)')
-            ax1.set_xticks(x_pos)
-            ax1.set_xticklabels(metrics, rotation=45, ha='right')
-            ax1.legend()
-            ax1.grid(True, alpha=0.3)
-            
-            # Set proper axis limits to ensure bars are visible
-            ax1.set_xlim(-0.5, len(metrics) - 0.5)
-            # Set y-axis limits based on data range with some padding
-            all_values = variance_improvements + cv_improvements
-            if all_values:
-                y_min = min(all_values) - 5
-                y_max = max(all_values) + 5
-                ax1.set_ylim(y_min, y_max)
-
-            # Add value labels on bars
-            for bar, value in zip(bars1, variance_improvements):
-                height = bar.get_height()
-                ax1.text(bar.get_x() + bar.get_width()/2., height + 1,
-                        f'{value:.1f}%', ha='center', va='bottom', fontsize=9)
-            for bar, value in zip(bars2, cv_improvements):
-                height = bar.get_height()
-                ax1.text(bar.get_x() + bar.get_width()/2., height + 1,
-                        f'{value:.1f}%', ha='center', va='bottom', fontsize=9)
-            
-            # Adjust layout
-            plt.tight_layout()
-            
-            # Convert to SVG
-            svg_buffer = StringIO()
-            plt.savefig(svg_buffer, format='svg', bbox_inches='tight', dpi=100)
-            svg_content = svg_buffer.getvalue()
-            svg_buffer.close()
-            plt.close(fig)
-            
-            logger.info("Successfully generated smoothing index chart")
-            return svg_content
-            
+            return self._render_one(self.smoothing_index_job(smoothing_data))
         except Exception as e:
             logger.error(f"Error generating smoothing index chart: {e}")
             logger.error(traceback.format_exc())
             return None
 
 # Initialize chart generator
-chart_generator = ChartGenerator()
+chart_generator = ChartGenerator.from_env()
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
-    return jsonify({"status": "healthy", "service": "chart_generation"})
+    return jsonify({
+        "status": "healthy",
+        "service": "chart_generation",
+        "chart_cache": {
+            "entries": len(chart_generator._cache),
+            "hits": chart_generator.hits,
+            "renders": chart_generator.renders,
+            "workers": chart_generator.workers,
+        },
+    })
 
 @app.route('/generate_charts', methods=['POST'])
 def generate_charts():
@@ -209,54 +288,32 @@ def generate_charts():
         if not data:
             return jsonify({"error": "No data provided"}), 400
         
-        logger.info(f"Data keys: {list(data.keys())}")
-        
-        # Initialize results
-        charts = {}
-        
-        # Generate envelope charts
-        envelope_analysis = data.get('envelope_analysis', {})
-        if envelope_analysis:
-            logger.info("Generating envelope charts")
-            
-            # Get before/after data
-            before_data = data.get('power_quality', {}).get('before', {})
-            after_data = data.get('power_quality', {}).get('after', {})
-            
-            if before_data and after_data:
-                chart_data = {
-                    'before': before_data,
-                    'after': after_data
-                }
-                
-                # Generate charts for each metric
-                metrics = ['avgKw', 'avgKva', 'avgPf', 'avgTHD']
-                for metric in metrics:
-                    if metric in before_data and metric in after_data:
-                        title = f"{metric.upper()} Network Envelope"
-                        svg_content = chart_generator.generate_envelope_chart_svg(chart_data, metric, title)
-                        if svg_content:
-                            charts[f"{metric}_envelope"] = svg_content
-                            logger.info(f"Generated {metric} envelope chart")
-                        else:
-                            logger.warning(f"Failed to generate {metric} envelope chart")
-                    else:
-                        logger.warning(f"Missing {metric} data for chart generation")
+        # Batch mode: {"reports": {id: analysis data}} or {"reports": [analysis data, ...]}
+        reports = data.get('reports')
+        if reports is not None:
+            if isinstance(reports, list):
+                report_charts = chart_generator.generate_report_charts(dict(enumerate(reports)))
+                report_charts = [report_charts[i] for i in range(len(reports))]
+                chart_count = sum(len(charts) for charts in report_charts)
+            elif isinstance(reports, dict):
+                report_charts = chart_generator.generate_report_charts(reports)
+                chart_count = sum(len(charts) for charts in report_charts.values())
             else:
-                logger.warning("Missing before/after data for envelope charts")
+                return jsonify({"error": "reports must be a list or an object"}), 400
+            
+            logger.info(f"Batch chart generation completed: {chart_count} charts for {len(reports)} reports")
+            return jsonify({
+                "success": True,
+                "reports": report_charts,
+                "report_count": len(reports),
+                "chart_count": chart_count,
+                "message": f"Generated {chart_count} charts for {len(reports)} reports successfully"
+            })
         
-        # Generate smoothing index chart
-        smoothing_data = envelope_analysis.get('smoothing_data', {}).get('metric_details', {})
-        if smoothing_data:
-            logger.info("Generating smoothing index chart")
-            svg_content = chart_generator.generate_smoothing_index_chart_svg(smoothing_data)
-            if svg_content:
-                charts['smoothing_index'] = svg_content
-                logger.info("Generated smoothing index chart")
-            else:
-                logger.warning("Failed to generate smoothing index chart")
-        else:
-            logger.warning("No smoothing data for smoothing index chart")
+        logger.info(f"Data keys: {list(data.keys())}")
+        
+        # Generate all charts for this report in one parallel pass
+        charts = chart_generator.generate_report_charts({'report': data})['report']
         
         # Return results
         result = {
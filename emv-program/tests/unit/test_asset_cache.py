@@ -0,0 +1,65 @@
+"""
+Unit tests for the shared static asset cache (8082/asset_cache.py)
+"""
+import base64
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add 8082 to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "8082"))
+
+try:
+    from asset_cache import AssetCache, minify_css
+except ImportError:
+    pytest.skip("asset_cache not available", allow_module_level=True)
+
+
+def _touch_later(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+
+class TestAssetCache:
+    """Tests for AssetCache text / css / data_uri"""
+
+    def test_assets_built_once(self, tmp_path):
+        """Repeat lookups reuse the prebuilt string until the file changes"""
+        logo = tmp_path / "logo.png"
+        logo.write_bytes(b"\x89PNG-one")
+        cache = AssetCache(check_seconds=0)
+
+        first = cache.data_uri(logo)
+        assert first == "data:image/png;base64," + base64.b64encode(b"\x89PNG-one").decode("ascii")
+        assert cache.data_uri(logo) is first
+        assert cache.loads == 1
+
+        logo.write_bytes(b"\x89PNG-two")
+        _touch_later(logo)
+        assert cache.data_uri(logo).endswith(base64.b64encode(b"\x89PNG-two").decode("ascii"))
+        assert cache.loads == 2
+
+    def test_check_interval_skips_stat(self, tmp_path):
+        """Within the check interval a changed file is not looked at"""
+        page = tmp_path / "head.html"
+        page.write_text("<head>one</head>", encoding="utf-8")
+        cache = AssetCache(check_seconds=3600)
+        assert cache.text(page) == "<head>one</head>"
+
+        page.write_text("<head>two!</head>", encoding="utf-8")
+        _touch_later(page)
+        assert cache.text(page) == "<head>one</head>"
+
+    def test_missing_files(self, tmp_path):
+        """Missing assets return None (and "" from first_data_uri) so callers fall back"""
+        cache = AssetCache()
+        assert cache.text(tmp_path / "nope.html") is None
+        assert cache.exists(tmp_path / "nope.png") is False
+        assert cache.first_data_uri([tmp_path / "a.png", tmp_path / "b.png"]) == ""
+
+    def test_minify_css(self):
+        """Comments and whitespace go; strings and descendant selectors stay intact"""
+        css = '/* header */\n.a :hover ,\n.b > .c {\n  color : red ;\n  content: "x, y; }" ;\n}\n'
+        assert minify_css(css) == '.a :hover,.b>.c{color :red;content:"x, y; }"}'
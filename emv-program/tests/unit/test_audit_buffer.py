@@ -0,0 +1,120 @@
+"""
+Unit tests for the 8082 analysis-scoped audit buffer
+"""
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+import pytest
+
+# Add 8082 to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "8082"))
+
+try:
+    import audit_buffer
+except ImportError:
+    pytest.skip("audit_buffer not available", allow_module_level=True)
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "app.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        """
+        CREATE TABLE calculation_audit (
+            id INTEGER PRIMARY KEY, analysis_session_id TEXT, calculation_type TEXT, standard_name TEXT,
+            input_values TEXT, output_values TEXT, methodology TEXT, formula TEXT,
+            standards_reference TEXT, calculated_by INTEGER
+        )
+        """
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+
+def _connector(db_path, opened):
+    @contextmanager
+    def connect(target):
+        opened.append(target)
+        conn = sqlite3.connect(db_path)
+        try:
+            yield conn
+        finally:
+            conn.close()
+    return connect
+
+
+def _row(n):
+    return ("S1", f"step_{n}", None, None, None, None, None, None, None)
+
+
+def _count(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT COUNT(*) FROM calculation_audit").fetchone()[0]
+    finally:
+        conn.close()
+
+
+class TestAuditBuffer:
+    """Tests for batch / record / replay"""
+
+    def test_batch_writes_once_at_exit(self, db_path, tmp_path):
+        """Rows recorded in a batch (including nested ones) go in with one connection at the end"""
+        opened = []
+        journal_dir = str(tmp_path / "journal")
+        assert audit_buffer.record("calculation_audit", _row(0)) is False
+
+        with audit_buffer.batch(_connector(db_path, opened), journal_dir):
+            for n in range(5):
+                assert audit_buffer.record("calculation_audit", _row(n), target="acme")
+            with audit_buffer.batch(_connector(db_path, opened), journal_dir):
+                audit_buffer.record("calculation_audit", _row(5), target="acme")
+            assert _count(db_path) == 0
+
+        assert _count(db_path) == 6
+        assert opened == ["acme"]
+        assert os.listdir(journal_dir) == []
+
+    def test_failed_flush_is_replayed_once(self, db_path, tmp_path):
+        """A batch that cannot write keeps its journal; replay writes it and skips rows already there"""
+        journal_dir = str(tmp_path / "journal")
+
+        @contextmanager
+        def broken(target):
+            raise sqlite3.OperationalError("database is locked")
+            yield
+
+        with audit_buffer.batch(broken, journal_dir):
+            audit_buffer.record("calculation_audit", _row(1))
+            audit_buffer.record("calculation_audit", _row(2))
+        assert len(os.listdir(journal_dir)) == 1
+
+        conn = sqlite3.connect(db_path)
+        audit_buffer.write(conn, "calculation_audit", [_row(1)])
+        conn.commit()
+        conn.close()
+
+        assert audit_buffer.replay(_connector(db_path, []), journal_dir) == 1
+        assert _count(db_path) == 2
+        assert os.listdir(journal_dir) == []
+
+    def test_replay_skips_journals_of_live_processes(self, db_path, tmp_path):
+        """Journals of running processes are left alone; those of exited ones are replayed at once"""
+        journal_dir = tmp_path / "journal"
+        journal_dir.mkdir()
+        exited = subprocess.Popen([sys.executable, "-c", "pass"])
+        exited.wait()
+        for pid, n in ((os.getppid(), 1), (exited.pid, 2)):
+            entry = {"kind": "calculation_audit", "target": None, "params": list(_row(n))}
+            (journal_dir / f"{pid}_{n}{audit_buffer.JOURNAL_SUFFIX}").write_text(json.dumps(entry) + "\n")
+
+        assert audit_buffer.replay(_connector(db_path, []), str(journal_dir)) == 1
+        assert _count(db_path) == 1
+        assert os.listdir(journal_dir) == [f"{os.getppid()}_1{audit_buffer.JOURNAL_SUFFIX}"]
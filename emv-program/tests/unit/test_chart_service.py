@@ -0,0 +1,63 @@
+"""
+Unit tests for the 8086 chart service cache and batch mode
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add 8086 to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "8086"))
+
+try:
+    from chart_service import ChartGenerator, app
+except ImportError:
+    pytest.skip("chart_service not available", allow_module_level=True)
+
+
+def _analysis(offset=0.0):
+    metrics = ['avgKw', 'avgKva', 'avgPf', 'avgTHD']
+    return {
+        'power_quality': {
+            'before': {m: {'values': [10.0 + offset, 12.0, 11.0]} for m in metrics},
+            'after': {m: {'values': [9.0, 9.5, 9.2]} for m in metrics},
+        },
+        'envelope_analysis': {'smoothing_data': {'metric_details': {
+            m: {'variance_improvement': 10.0, 'cv_improvement': 5.0} for m in metrics
+        }}},
+    }
+
+
+class TestChartGenerator:
+    """Tests for the content-hash SVG cache and batch rendering"""
+
+    def test_cached_by_content(self):
+        """Same inputs render once; changed inputs render again"""
+        generator = ChartGenerator(workers=0)
+        data = _analysis()['power_quality']
+        first = generator.generate_envelope_chart_svg(data, 'avgKw', 'AVGKW Network Envelope')
+        assert first.lstrip().startswith('<?xml')
+        assert generator.generate_envelope_chart_svg(data, 'avgKw', 'AVGKW Network Envelope') is first
+        assert generator.renders == 1 and generator.hits == 1
+
+        data['after']['avgKw']['values'][0] = 1.0
+        assert generator.generate_envelope_chart_svg(data, 'avgKw', 'AVGKW Network Envelope') is not first
+        assert generator.renders == 2
+
+    def test_missing_data(self):
+        """Charts without data are skipped, as before"""
+        generator = ChartGenerator(workers=0)
+        assert generator.generate_envelope_chart_svg({'before': {}, 'after': {}}, 'avgKw', 'x') is None
+        assert generator.generate_smoothing_index_chart_svg({}) is None
+
+    def test_batch_mode(self):
+        """/generate_charts returns every report's charts in one response"""
+        response = app.test_client().post('/generate_charts', json={'reports': {'a': _analysis(), 'b': _analysis(1.0)}})
+        body = response.get_json()
+        assert response.status_code == 200
+        assert set(body['reports']) == {'a', 'b'}
+        assert set(body['reports']['a']) == {'avgKw_envelope', 'avgKva_envelope', 'avgPf_envelope',
+                                             'avgTHD_envelope', 'smoothing_index'}
+        assert body['chart_count'] == 10
+        # Shared charts are the same render
+        assert body['reports']['a']['smoothing_index'] == body['reports']['b']['smoothing_index']
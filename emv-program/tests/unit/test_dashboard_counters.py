@@ -0,0 +1,146 @@
+"""
+Unit tests for the 8082 dashboard counters
+"""
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add 8082 to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "8082"))
+
+try:
+    import dashboard_counters
+    from dashboard_counters import DashboardCounters
+except ImportError:
+    pytest.skip("dashboard_counters not available", allow_module_level=True)
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "app.db"))
+    conn.executescript(
+        """
+        CREATE TABLE raw_meter_data (id INTEGER PRIMARY KEY, file_size INTEGER, fingerprint TEXT,
+                                     created_at TEXT DEFAULT CURRENT_TIMESTAMP);
+        CREATE TABLE data_modifications (id INTEGER PRIMARY KEY, file_id INTEGER);
+        CREATE TABLE html_reports (id INTEGER PRIMARY KEY, project_name TEXT, pe_reviewed INTEGER DEFAULT 0);
+        CREATE TABLE users (id INTEGER PRIMARY KEY, role TEXT);
+        """
+    )
+    yield conn
+    conn.close()
+
+
+class TestDashboardCounters:
+    """Tests for rebuild / trigger maintenance / caching"""
+
+    def test_existing_rows_are_counted(self, conn):
+        """Rows written before the triggers existed are picked up by the rebuild"""
+        conn.executemany("INSERT INTO raw_meter_data (file_size, fingerprint) VALUES (?, ?)", [(1024, "a"), (1024, None)])
+        conn.commit()
+        summary = DashboardCounters(cache_seconds=0).summary(conn)
+        assert summary["raw_files"]["total_files"] == 2
+        assert summary["raw_files"]["total_bytes"] == 2048
+        assert summary["raw_files"]["recent_uploads"] == 2
+        assert summary["clipping"]["integrity_status"] == "50.0%"
+
+    def test_writes_update_counters(self, conn):
+        """Inserts, updates and deletes keep plain and distinct counters exact"""
+        counters = DashboardCounters(cache_seconds=0)
+        counters.summary(conn)
+        conn.executemany("INSERT INTO data_modifications (file_id) VALUES (?)", [(1,), (1,), (2,)])
+        conn.executemany("INSERT INTO html_reports (project_name) VALUES (?)", [("A",), ("A",), ("B",)])
+        conn.execute("UPDATE html_reports SET pe_reviewed = 1 WHERE id = 1")
+        conn.execute("INSERT INTO users (role) VALUES ('user')")
+        conn.execute("UPDATE users SET role = 'pe'")
+        conn.execute("DELETE FROM data_modifications WHERE file_id = 2")
+        conn.commit()
+
+        summary = counters.summary(conn)
+        assert (summary["clipping"]["clipped_files"], summary["clipping"]["modifications"]) == (1, 2)
+        assert (summary["projects"]["completed_projects"], summary["projects"]["project_files"]) == (2, 3)
+        assert (summary["pe"]["registered_pes"], summary["pe"]["oversight_level"]) == (1, "33.3%")
+
+    def test_distinct_counts_ignore_nulls_and_follow_updates(self, conn):
+        """NULL values never count as distinct; changing a value moves it between distinct values"""
+        counters = DashboardCounters(cache_seconds=0)
+        counters.summary(conn)
+        conn.executemany("INSERT INTO data_modifications (file_id) VALUES (?)", [(None,), (None,), (1,), (2,)])
+        conn.execute("DELETE FROM data_modifications WHERE file_id IS NULL")
+        conn.commit()
+        assert counters.summary(conn)["clipping"]["clipped_files"] == 2
+
+        conn.execute("UPDATE data_modifications SET file_id = 1 WHERE file_id = 2")  # 2 gone, 1 already there
+        conn.execute("INSERT INTO data_modifications (file_id) VALUES (NULL)")
+        conn.execute("UPDATE data_modifications SET file_id = 3 WHERE file_id IS NULL")  # new value
+        conn.execute("UPDATE data_modifications SET file_id = NULL WHERE id = (SELECT MIN(id) FROM data_modifications WHERE file_id = 1)")
+        conn.commit()
+        expected = conn.execute("SELECT COUNT(DISTINCT file_id) FROM data_modifications").fetchone()[0]
+        assert counters.summary(conn)["clipping"]["clipped_files"] == expected == 2
+
+        conn.execute("DELETE FROM data_modifications")
+        conn.commit()
+        assert counters.summary(conn)["clipping"]["clipped_files"] == 0
+
+    def test_older_triggers_replaced(self, conn, monkeypatch):
+        """Triggers from an older version are dropped and the counters rebuilt"""
+        monkeypatch.setattr(dashboard_counters, "TRIGGER_PREFIX", "dashboard_v1_")
+        DashboardCounters(cache_seconds=0).summary(conn)
+        conn.execute("UPDATE dashboard_counters SET value = -5 WHERE name = 'clipped_files'")  # drifted
+        conn.commit()
+        monkeypatch.undo()
+
+        assert DashboardCounters(cache_seconds=0).summary(conn)["clipping"]["clipped_files"] == 0
+        triggers = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")]
+        assert triggers and all(name.startswith(dashboard_counters.TRIGGER_PREFIX) for name in triggers)
+
+    def test_refresh_is_read_only_once_set_up(self, tmp_path):
+        """After the first summary of a complete database, a refresh works while another writer holds the lock"""
+        conn = sqlite3.connect(str(tmp_path / "full.db"), timeout=0.1)
+        conn.executescript(
+            """
+            CREATE TABLE raw_meter_data (id INTEGER PRIMARY KEY, file_size INTEGER, fingerprint TEXT, created_at TEXT);
+            CREATE TABLE data_modifications (id INTEGER PRIMARY KEY, file_id INTEGER);
+            CREATE TABLE projects (id INTEGER PRIMARY KEY, created_at TEXT, updated_at TEXT);
+            CREATE TABLE html_reports (id INTEGER PRIMARY KEY, project_name TEXT, pe_reviewed INTEGER DEFAULT 0);
+            CREATE TABLE users (id INTEGER PRIMARY KEY, role TEXT);
+            """
+        )
+        counters = DashboardCounters(cache_seconds=0)
+        counters.summary(conn)
+        conn.execute("INSERT INTO projects (created_at) VALUES (datetime('now'))")
+        conn.commit()
+
+        writer = sqlite3.connect(str(tmp_path / "full.db"))
+        writer.execute("BEGIN IMMEDIATE")
+        try:
+            assert counters.summary(conn)["projects"]["total_projects"] == 1
+            assert not conn.in_transaction
+        finally:
+            writer.rollback()
+            writer.close()
+            conn.close()
+
+    def test_table_created_later_gets_triggers(self, conn):
+        """A source table added after the first summary is still picked up"""
+        counters = DashboardCounters(cache_seconds=0)
+        counters.summary(conn)
+        conn.execute("CREATE TABLE projects (id INTEGER PRIMARY KEY, created_at TEXT, updated_at TEXT)")
+        conn.execute("INSERT INTO projects (created_at) VALUES (datetime('now'))")
+        conn.commit()
+        assert counters.summary(conn)["projects"]["total_projects"] == 1
+        conn.execute("INSERT INTO projects (created_at) VALUES (datetime('now'))")
+        conn.commit()
+        assert counters.summary(conn)["projects"]["total_projects"] == 2
+
+    def test_summary_is_cached(self, conn):
+        """Within the TTL the cached summary is returned without reading the counters"""
+        counters = DashboardCounters(cache_seconds=60)
+        assert counters.summary(conn)["raw_files"]["total_files"] == 0
+        conn.execute("INSERT INTO raw_meter_data (file_size) VALUES (1)")
+        conn.commit()
+        assert counters.summary(conn)["raw_files"]["total_files"] == 0
+        counters.clear()
+        assert counters.summary(conn)["raw_files"]["total_files"] == 1
@@ -0,0 +1,81 @@
+"""
+Unit tests for the 8082 SQLite connection pool
+"""
+import os
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add 8082 to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "8082"))
+
+try:
+    from db_pool import SQLitePool
+except ImportError:
+    pytest.skip("db_pool not available", allow_module_level=True)
+
+
+class TestSQLitePool:
+    """Tests for acquire / release / eviction"""
+
+    def test_reuse_and_pragmas(self, tmp_path):
+        """Connections are configured once and reused; the tenant directory is created"""
+        db_path = str(tmp_path / "org_7" / "app.db")
+        pool = SQLitePool()
+        with pool.connection(db_path) as conn:
+            assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+            assert conn.execute("PRAGMA busy_timeout").fetchone()[0] == pool.busy_timeout_ms
+            first = conn
+        with pool.connection(db_path) as conn:
+            assert conn is first
+            assert isinstance(conn.execute("SELECT 1 AS one").fetchone(), sqlite3.Row)
+        stats = pool.stats()
+        assert stats["opened"] == 1 and stats["reused"] == 1
+        assert stats["databases"][db_path] == {"idle": 1, "in_use": 0}
+
+    def test_uncommitted_work_rolled_back(self, tmp_path):
+        """Released connections behave like closed ones: no leftover transaction"""
+        db_path = str(tmp_path / "app.db")
+        pool = SQLitePool()
+        with pool.connection(db_path) as conn:
+            conn.execute("CREATE TABLE t (v INTEGER)")
+            conn.commit()
+            conn.execute("INSERT INTO t VALUES (1)")
+        with pool.connection(db_path) as conn:
+            assert not conn.in_transaction
+            assert conn.execute("SELECT count(*) FROM t").fetchone()[0] == 0
+
+    def test_errors_and_eviction(self, tmp_path):
+        """Connections that saw an error are closed; idle ones expire; removed files reopen"""
+        db_path = str(tmp_path / "app.db")
+        pool = SQLitePool(idle_seconds=0)
+        with pytest.raises(sqlite3.OperationalError):
+            with pool.connection(db_path) as conn:
+                conn.execute("SELECT * FROM missing")
+        assert pool.stats()["databases"] == {}
+
+        with pool.connection(db_path):
+            pass
+        pool.evict_idle(force=True)
+        assert pool.stats()["evicted"] == 1
+
+        os.remove(db_path)
+        with pool.connection(db_path) as conn:
+            conn.execute("CREATE TABLE t (v INTEGER)")
+        assert os.path.exists(db_path)
+
+    def test_lru_cap_on_databases(self, tmp_path):
+        """Only max_databases tenants keep idle handles; the least recently used are closed"""
+        pool = SQLitePool(max_databases=2)
+        paths = [str(tmp_path / f"org_{n}" / "app.db") for n in range(3)]
+        for db_path in paths[:2]:
+            with pool.connection(db_path):
+                pass
+        with pool.connection(paths[0]):
+            pass
+        with pool.connection(paths[2]):
+            pass
+        assert set(pool.stats()["databases"]) == {paths[0], paths[2]}
+        assert pool.stats()["lru_closed"] == 1
@@ -0,0 +1,84 @@
+"""
+Unit tests for the 8083 PDF service's SVG drawing cache and worker pool
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Add 8083 to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "8083"))
+
+_cwd = os.getcwd()
+os.chdir(tempfile.mkdtemp())  # the service creates generated_pdfs/ in the working directory
+try:
+    import enhanced_pdf_service as pdf_service
+except ImportError:
+    pytest.skip("enhanced_pdf_service dependencies not available", allow_module_level=True)
+finally:
+    os.chdir(_cwd)
+
+if not pdf_service.HAVE_SVGLIB:
+    pytest.skip("svglib not available", allow_module_level=True)
+
+SVG = '<svg xmlns="http://www.w3.org/2000/svg" width="{w}" height="50"><rect width="{w}" height="50"/></svg>'
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(monkeypatch):
+    monkeypatch.setattr(pdf_service, "_drawing_cache", type(pdf_service._drawing_cache)())
+    monkeypatch.setattr(pdf_service, "_drawing_cache_counts", {"hits": 0, "misses": 0})
+    monkeypatch.setattr(pdf_service, "_pool_cache_stats", {})
+    monkeypatch.setattr(pdf_service, "_pdf_pool", None)
+    yield
+    if pdf_service._pdf_pool is not None:
+        pdf_service._pdf_pool.shutdown()
+
+
+class TestEnhancedPdfService:
+    """Tests for get_svg_drawing / build_pdf / status"""
+
+    def test_drawing_converted_once_per_content_and_size(self):
+        """The same SVG at the same size is reused; another size is converted again"""
+        first = pdf_service.get_svg_drawing(SVG.format(w=100), 400, 300)
+        assert pdf_service.get_svg_drawing(SVG.format(w=100), 400, 300) is first
+        assert pdf_service.get_svg_drawing(SVG.format(w=100), 200, 150) is not first
+        assert pdf_service.drawing_cache_stats() == {"entries": 2, "hits": 1, "misses": 2}
+
+    def test_least_recently_used_drawing_evicted(self, monkeypatch):
+        """Only SVG_DRAWING_CACHE_SIZE drawings are kept"""
+        monkeypatch.setattr(pdf_service, "SVG_DRAWING_CACHE_SIZE", 2)
+        a = pdf_service.get_svg_drawing(SVG.format(w=100), 400, 300)
+        pdf_service.get_svg_drawing(SVG.format(w=200), 400, 300)
+        assert pdf_service.get_svg_drawing(SVG.format(w=100), 400, 300) is a  # now most recent
+        pdf_service.get_svg_drawing(SVG.format(w=300), 400, 300)
+        assert pdf_service.drawing_cache_stats()["entries"] == 2
+        assert pdf_service.get_svg_drawing(SVG.format(w=100), 400, 300) is a
+
+    def test_pooled_build_reports_worker_cache(self, monkeypatch, tmp_path):
+        """PDFs built in the pool are written and the worker's cache shows up in /status"""
+        monkeypatch.setattr(pdf_service, "PDF_WORKERS", 2)
+        data = {"charts_data": {"power": SVG.format(w=100), "energy": SVG.format(w=100)}}
+        output = tmp_path / "report.pdf"
+
+        assert pdf_service.build_pdf(pdf_service.create_pdf_with_charts, data, output) is True
+        assert output.read_bytes().startswith(b"%PDF")
+        assert pdf_service.drawing_cache_stats()["entries"] == 0  # built elsewhere
+
+        status = pdf_service.app.test_client().get("/status").get_json()
+        [(pid, stats)] = status["svg_drawing_cache_by_process"].items()
+        assert int(pid) != os.getpid()
+        assert stats["entries"] == 1 and stats["hits"] >= 1
+        assert status["svg_drawing_cache_entries"] == 1
+
+    def test_builds_in_process_without_pool(self, monkeypatch, tmp_path):
+        """PDF_WORKERS=1 builds in the request thread and reports this process's cache"""
+        monkeypatch.setattr(pdf_service, "PDF_WORKERS", 1)
+        output = tmp_path / "report.pdf"
+        data = {"charts_data": {"power": SVG.format(w=100)}}
+
+        assert pdf_service.build_pdf(pdf_service.create_pdf_with_charts, data, output) is True
+        assert pdf_service._pdf_pool is None
+        assert pdf_service.drawing_cache_report() == {str(os.getpid()): {"entries": 1, "hits": 0, "misses": 1}}
@@ -0,0 +1,79 @@
+"""
+Unit tests for the shared geocode cache (8085/geocode_cache.py)
+"""
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add 8085 to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "8085"))
+
+try:
+    import geocode_cache as geocode_cache_module
+    from geocode_cache import GeocodeCache, cache_keys, normalize_address
+except ImportError:
+    pytest.skip("geocode_cache not available", allow_module_level=True)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return GeocodeCache(str(tmp_path / "geocode_cache.db"), negative_ttl=60)
+
+
+class TestGeocodeCache:
+    """Tests for key normalization, fallback lookups and the negative TTL"""
+
+    def test_normalize_address(self):
+        """ZIP preferred when asked; commas, whitespace and repeated tokens collapsed"""
+        assert normalize_address("1 Main St, Denver, CO 80202-1234") == "80202"
+        assert normalize_address("  1  Main St ,, Denver, CO, co ", prefer_zip=False) == "1 Main St, Denver, CO"
+        assert normalize_address("") == ""
+
+    def test_cache_keys_normalized(self):
+        """Spelling variants of one address share the exact key; ZIP and city are fallbacks"""
+        exact, fallbacks = cache_keys("1 Main St, Denver, CO 80202")
+        assert exact == "addr:1 main st, denver, co 80202"
+        assert cache_keys(" 1 MAIN  St,, Denver,  CO 80202 ")[0] == exact
+        assert fallbacks == ["zip:80202", "city:denver, co"]
+        assert cache_keys("", zip_code="80202") == ("zip:80202", [])
+
+    def test_exact_hit_shared_through_file(self, cache, tmp_path):
+        """A result stored by one process is found by another using the same file"""
+        cache.put("1 Main St, Denver, CO 80202", 39.75, -104.99, "Denver", source="open-meteo")
+        other = GeocodeCache(str(tmp_path / "geocode_cache.db"))
+        found, result = other.get("1 main st, denver, co 80202")
+        assert found and (result.lat, result.lon, result.source) == (39.75, -104.99, "open-meteo")
+
+    def test_fallback_to_zip_and_city(self, cache):
+        """Another address in the same ZIP or city resolves from the fallback keys"""
+        cache.put("1 Main St, Denver, CO 80202", 39.75, -104.99, "Denver")
+        found, result = cache.get("99 Other Ave, Denver, CO 80202")
+        assert found and result.lat == 39.75
+        found, result = cache.get("5 Elm St, Denver, CO")
+        assert found and result.name == "Denver"
+        assert cache.get("5 Elm St, Boulder, CO") == (False, None)
+
+    def test_first_result_keeps_fallback(self, cache):
+        """A later address in the same ZIP does not replace the fallback entry"""
+        cache.put("1 Main St, Denver, CO 80202", 39.75, -104.99)
+        cache.put("2 Side St, Denver, CO 80202", 40.0, -105.0)
+        assert cache.get("3 Third St, Denver, CO 80202")[1].lat == 39.75
+        assert cache.get("2 Side St, Denver, CO 80202")[1].lat == 40.0
+
+    def test_negative_result_expires(self, cache, monkeypatch):
+        """A cached failure answers until the negative TTL runs out"""
+        cache.put_failure("Nowhere Rd, Atlantis")
+        assert cache.get("Nowhere Rd, Atlantis") == (True, None)
+
+        later = time.time() + 61
+        monkeypatch.setattr(geocode_cache_module.time, "time", lambda: later)
+        assert cache.get("Nowhere Rd, Atlantis") == (False, None)
+
+    def test_failure_does_not_hide_fallback(self, cache):
+        """An address that failed on its own still resolves through its ZIP"""
+        cache.put("1 Main St, Denver, CO 80202", 39.75, -104.99)
+        cache.put_failure("Unknown Rd, Denver, CO 80202")
+        found, result = cache.get("Unknown Rd, Denver, CO 80202")
+        assert found and result.lat == 39.75
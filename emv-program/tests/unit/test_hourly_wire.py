@@ -0,0 +1,48 @@
+"""
+Unit tests for the hourly weather wire format shared by 8085 and 8082
+"""
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add 8085 to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "8085"))
+
+try:
+    import hourly_wire
+except ImportError:
+    pytest.skip("hourly_wire not available", allow_module_level=True)
+
+
+def _legacy(times, temps):
+    return [
+        {"timestamp": t, "time": t, "datetime": t, "temp_c": v, "temperature": v, "temp": v,
+         "dewpoint_c": None, "dewpoint": None, "dew_point": None, "humidity": 50, "relative_humidity": 50,
+         "wind_speed": 2.5, "solar_radiation": 0.0}
+        for t, v in zip(times, temps)
+    ]
+
+
+class TestHourlyWire:
+    """Tests for encode_records / decode / to_records"""
+
+    @pytest.mark.parametrize("fmt", [hourly_wire.FORMAT_COLUMNAR, hourly_wire.FORMAT_COLUMNAR_ZLIB])
+    def test_round_trip_matches_legacy(self, fmt):
+        """Decoding and expanding returns the legacy dicts unchanged"""
+        before = _legacy([f"2024-01-01T{h:02d}:00" for h in range(24)], [h / 10 for h in range(24)])
+        after = _legacy(["2024-06-01T00:00", "2024-06-01T03:00", "2024-06-02T00:00"], [21.3, -0.1, 18.0])
+
+        wire = hourly_wire.encode_records({"before": before, "after": after}, fmt)
+        assert wire["periods"]["before"]["step_seconds"] == 3600
+        assert "time" in wire["periods"]["after"]
+
+        decoded = hourly_wire.decode(wire)
+        assert hourly_wire.to_records(decoded["before"]) == before
+        assert hourly_wire.to_records(decoded["after"]) == after
+
+    def test_negotiate(self):
+        """Unknown or missing formats fall back to the legacy list"""
+        assert hourly_wire.negotiate(None) == hourly_wire.FORMAT_LEGACY
+        assert hourly_wire.negotiate("msgpack") == hourly_wire.FORMAT_LEGACY
+        assert hourly_wire.negotiate("Columnar+Zlib") == hourly_wire.FORMAT_COLUMNAR_ZLIB
@@ -0,0 +1,166 @@
+"""
+Unit tests for the 8082 background job queue
+"""
+import io
+import os
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add 8082 to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "8082"))
+
+try:
+    from flask import Flask, jsonify, request
+    from job_queue import JobQueue, _current
+except ImportError:
+    pytest.skip("job_queue not available", allow_module_level=True)
+
+
+def _wait(queue, job_id, statuses=("succeeded", "failed", "cancelled")):
+    for _ in range(200):
+        job = queue.get(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} stuck in {job['status']}")
+
+
+def _current_job_id():
+    return _current.get().id
+
+
+class TestJobQueue:
+    """Tests for per-org limits, cancellation, deferred requests and retention"""
+
+    def test_per_org_limit_and_cancel(self, tmp_path):
+        """One job per org runs at a time; queued jobs cancel at once, running ones at a checkpoint"""
+        queue = JobQueue(str(tmp_path / "jobs.db"), workers=4, max_per_org=1)
+        release = threading.Event()
+
+        @queue.handler("wait")
+        def wait(job):
+            while not release.is_set():
+                job.progress(0.5, "waiting", force=True)
+                time.sleep(0.01)
+            return "done"
+
+        first = queue.submit("wait", org_id="a")
+        second = queue.submit("wait", org_id="a")
+        other = queue.submit("wait", org_id="b")
+        _wait(queue, first, ("running",))
+        _wait(queue, other, ("running",))
+        assert queue.get(second)["status"] == "queued"
+
+        assert queue.cancel(second)["status"] == "cancelled"
+        assert queue.cancel(first)["cancel_requested"]
+        assert _wait(queue, first)["status"] == "cancelled"
+
+        release.set()
+        assert _wait(queue, other)["result"] == "done"
+        assert [job["id"] for job in queue.list(org_id="a")] == [second, first]
+
+    def test_deferred_request_is_replayed(self, tmp_path):
+        """?async=1 answers 202; the job replays the upload and keeps the view's response"""
+        app = Flask(__name__)
+        queue = JobQueue(str(tmp_path / "jobs.db"), retention_hours=0)
+        queue.init_app(app)
+
+        @app.route("/work", methods=["POST"])
+        @queue.deferrable("work")
+        def work():
+            upload = request.files["file"]
+            return jsonify({"name": request.form["name"], "size": len(upload.read())}), 201
+
+        def form():
+            return {"name": "meter", "file": (io.BytesIO(b"a,b\n1,2\n"), "meter.csv")}
+
+        client = app.test_client()
+        assert client.post("/work", data=form()).get_json() == {"name": "meter", "size": 8}
+
+        submitted = client.post("/work?async=1", data=form())
+        assert submitted.status_code == 202
+        job = _wait(queue, submitted.get_json()["job_id"])
+        assert job["status"] == "succeeded" and job["result"]["status_code"] == 201
+        with open(queue.file_path(job["id"], "response.body"), "rb") as f:
+            assert f.read().strip() == b'{"name":"meter","size":8}'
+
+        time.sleep(1.1)  # finished_at has one second resolution
+        assert queue.purge(force=True) == 1
+        assert queue.get(job["id"]) is None
+        assert not os.path.exists(os.path.join(queue.files_dir, job["id"]))
+
+    def test_claimed_request_leaves_no_credentials_in_db(self, tmp_path):
+        """The captured headers reach the view but are gone from jobs.db once a worker claims the job"""
+        app = Flask(__name__)
+        queue = JobQueue(str(tmp_path / "jobs.db"))
+        queue.init_app(app)
+        started, release = threading.Event(), threading.Event()
+
+        @app.route("/work", methods=["POST"])
+        @queue.deferrable("work")
+        def work():
+            started.set()
+            release.wait(5)
+            return jsonify({"auth": request.headers.get("Authorization")})
+
+        submitted = app.test_client().post("/work?async=1", json={}, headers={"Authorization": "Bearer secret"})
+        assert started.wait(5)
+        with sqlite3.connect(queue.db_path) as conn:
+            assert conn.execute("SELECT payload FROM jobs").fetchone() == (None,)
+        release.set()
+
+        job = _wait(queue, submitted.get_json()["job_id"])
+        with open(queue.file_path(job["id"], "response.body"), "rb") as f:
+            assert b"Bearer secret" in f.read()
+
+    def test_reimported_module_shares_the_running_queue(self, tmp_path):
+        """A module re-imported mid-job gets the same queue back and leaves the running job alone"""
+        db_path = str(tmp_path / "jobs.db")
+        app = Flask(__name__)
+        queue = JobQueue.from_env(db_path)
+        queue.init_app(app, org_of=lambda request: "org-1")
+        seen = []
+
+        @app.route("/work", methods=["POST"])
+        @queue.deferrable("work")
+        def work():
+            # what re-importing main_hardened_ready_fixed does inside the request
+            second = JobQueue.from_env(str(tmp_path / "." / "jobs.db"))
+            second.init_app(Flask("reimported"))
+            second.handler("work")(lambda job: "not me")
+            second.resume()
+            seen.append((second is queue, queue.app is app, queue.get(_current_job_id())["status"]))
+            return jsonify({"ok": True})
+
+        queue.resume()
+        submitted = app.test_client().post("/work?async=1", json={})
+        job = _wait(queue, submitted.get_json()["job_id"])
+        assert job["status"] == "succeeded" and job["org_id"] == "org-1"
+        assert seen == [(True, True, "running")]
+
+    def test_running_job_is_not_resumed_twice(self, tmp_path):
+        """A second queue on the same database never requeues a job running in this process"""
+        db_path = str(tmp_path / "jobs.db")
+        first, second = JobQueue(db_path), JobQueue(db_path)
+        started, release, ran = threading.Event(), threading.Event(), []
+
+        for name, queue in (("A", first), ("B", second)):
+            @queue.handler("profile", resumable=True)
+            def profile(job, name=name):
+                ran.append(name)
+                started.set()
+                release.wait(5)
+
+        job_id = first.submit("profile")
+        assert started.wait(5)
+        second.resume()
+        assert second.get(job_id)["status"] == "running"
+        release.set()
+        assert _wait(first, job_id)["status"] == "succeeded"
+        time.sleep(0.1)
+        assert ran == ["A"]
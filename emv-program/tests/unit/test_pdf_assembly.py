@@ -0,0 +1,78 @@
+"""
+Unit tests for streaming PDF / ZIP assembly (8082/pdf_assembly.py)
+"""
+import io
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+# Add 8082 to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "8082"))
+
+try:
+    from PyPDF2 import PdfReader
+    from reportlab.lib.pagesizes import A4, letter
+    from reportlab.pdfgen import canvas
+    from pdf_assembly import PackageZipFile, assemble_pdf
+except ImportError:
+    pytest.skip("PyPDF2 / reportlab not available", allow_module_level=True)
+
+
+def _make_pdf(path, pages, pagesize):
+    can = canvas.Canvas(str(path), pagesize=pagesize)
+    for i in range(pages):
+        can.drawString(100, 400, f"{path.stem} page {i + 1}")
+        can.showPage()
+    can.save()
+    return str(path)
+
+
+class TestAssemblePdf:
+    """Tests for assemble_pdf and PackageZipFile"""
+
+    def test_merge_with_footers(self, tmp_path):
+        """Pages keep their order and size, duplicates are skipped, every page is numbered"""
+        first = _make_pdf(tmp_path / "first.pdf", 2, letter)
+        second = _make_pdf(tmp_path / "second.pdf", 1, A4)
+        out = tmp_path / "merged.pdf"
+
+        counts = assemble_pdf([first, second, first, str(tmp_path / "missing.pdf")], str(out), "Audit Package")
+        assert counts == (2, 1, 3)
+
+        reader = PdfReader(str(out))
+        assert [round(float(p.mediabox.width)) for p in reader.pages] == [612, 612, 595]
+        last_text = reader.pages[2].extract_text()
+        assert "second page 1" in last_text
+        assert "Audit Package" in last_text and "Page 3 of 3" in last_text
+
+    def test_stream_into_zip(self, tmp_path):
+        """Merged PDF is written straight into a ZIP member; images are stored, not deflated"""
+        first = _make_pdf(tmp_path / "first.pdf", 1, letter)
+        zip_path = tmp_path / "package.zip"
+        with PackageZipFile(zip_path, "w") as zipf:
+            zipf.writestr("chart.png", b"\x89PNG" + b"\0" * 500)
+            zipf.writestr("notes.txt", "audit " * 100)
+            assemble_pdf([first], lambda: zipf.open_member("merged.pdf"), "Package")
+
+        with zipfile.ZipFile(zip_path) as zipf:
+            assert zipf.testzip() is None
+            assert zipf.getinfo("chart.png").compress_type == zipfile.ZIP_STORED
+            assert zipf.getinfo("notes.txt").compress_type == zipfile.ZIP_DEFLATED
+            merged = PdfReader(io.BytesIO(zipf.read("merged.pdf")))
+            assert "Page 1 of 1" in merged.pages[0].extract_text()
+
+    def test_failed_member_not_added(self, tmp_path):
+        """A writer that raises mid-member leaves no truncated member in the archive"""
+        zip_path = tmp_path / "package.zip"
+        with PackageZipFile(zip_path, "w") as zipf:
+            zipf.writestr("notes.txt", "audit")
+            with pytest.raises(RuntimeError):
+                with zipf.open_member("merged.pdf") as stream:
+                    stream.write(b"%PDF-1.4\n" + b"0" * 1000)
+                    raise RuntimeError("write failed")
+
+        with zipfile.ZipFile(zip_path) as zipf:
+            assert zipf.testzip() is None
+            assert zipf.namelist() == ["notes.txt"]
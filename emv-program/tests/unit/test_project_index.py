@@ -0,0 +1,61 @@
+"""
+Unit tests for the 8082 project summary / search index
+"""
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add 8082 to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "8082"))
+
+try:
+    import project_index
+except ImportError:
+    pytest.skip("project_index not available", allow_module_level=True)
+
+
+def _stored(fields):
+    """projects.data as written before storage version 2"""
+    return json.dumps({"payload": json.dumps(fields)})
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "app.db"))
+    conn.row_factory = sqlite3.Row
+    conn.execute("CREATE TABLE projects (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, data TEXT)")
+    yield conn
+    conn.close()
+
+
+class TestProjectIndex:
+    """Tests for backfill / upsert / search"""
+
+    def test_backfill_and_search(self, conn):
+        """Existing projects are indexed once; search matches company and city, not just the name"""
+        conn.execute(
+            "INSERT INTO projects (name, data) VALUES (?, ?)",
+            ("Plant A", _stored({"company": "Cloud Kitchen", "location": "Dallas", "facility_state": "TX"})),
+        )
+        conn.execute("INSERT INTO projects (name) VALUES ('Empty')")
+        conn.commit()
+        project_index.ensure_schema(conn)
+
+        rows = project_index.search(conn, "kitch dal")
+        assert [row["name"] for row in rows] == ["Plant A"]
+        assert rows[0]["facility_state"] == "TX" and rows[0]["field_count"] == 3
+        assert [row["name"] for row in project_index.search(conn, "empty")] == ["Empty"]
+
+    def test_upsert_replaces_summary(self, conn):
+        """Saving again updates both the summary and the search terms"""
+        conn.execute("INSERT INTO projects (name) VALUES ('Plant B')")
+        project_index.ensure_schema(conn)
+        project_index.upsert(conn, 1, "Plant B", {"company": "Acme"}, 10)
+        project_index.upsert(conn, 1, "Plant B", {"company": "Globex"}, 20)
+
+        assert project_index.search(conn, "acme") == []
+        row = project_index.search(conn, "globex")[0]
+        assert (row["company"], row["data_length"]) == ("Globex", 20)
@@ -0,0 +1,78 @@
+"""
+Unit tests for the 8082 sectioned project payload storage
+"""
+import json
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add 8082 to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "8082"))
+
+try:
+    import project_store
+except ImportError:
+    pytest.skip("project_store not available", allow_module_level=True)
+
+
+def _stored(fields):
+    """projects.data as written before storage version 2"""
+    return json.dumps({"payload": json.dumps(fields)})
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = sqlite3.connect(str(tmp_path / "app.db"))
+    conn.row_factory = sqlite3.Row
+    conn.execute("CREATE TABLE projects (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, data TEXT)")
+    yield conn
+    conn.close()
+
+
+class TestProjectStore:
+    """Tests for migration / save / load"""
+
+    def test_migration_in_place(self, conn):
+        """Legacy rows are converted to fields + compressed blobs and load back unchanged"""
+        fields = {
+            "company": "Acme",
+            "kva": 1500,
+            "results": {"energy": {"kwh": 12.5}, "rows": list(range(500))},
+            "feeder_table": "x" * 5000,
+        }
+        conn.execute("INSERT INTO projects (name, data) VALUES ('A', ?)", (_stored(fields),))
+        conn.execute("INSERT INTO projects (name, data) VALUES ('Broken', 'not json')")
+        conn.commit()
+        project_store.ensure_schema(conn)
+
+        row = conn.execute("SELECT * FROM projects WHERE name = 'A'").fetchone()
+        assert row["storage_version"] == project_store.STORAGE_VERSION and row["data"] is None
+        assert project_store.read_fields(conn, row) == fields
+        codecs = {r["name"]: r["codec"] for r in conn.execute("SELECT name, codec FROM project_blobs")}
+        assert set(codecs) == {"results", "feeder_table"} and "raw" not in codecs.values()
+
+        broken = conn.execute("SELECT * FROM projects WHERE name = 'Broken'").fetchone()
+        assert broken["data"] == "not json"
+        with pytest.raises(ValueError):
+            project_store.read_fields(conn, broken)
+
+    def test_partial_save(self, conn):
+        """Unchanged fields are not rewritten; removed fields are deleted"""
+        conn.execute("INSERT INTO projects (name) VALUES ('A')")
+        project_store.ensure_schema(conn)
+        fields = {"company": "Acme", "notes": "n", "results": {"kwh": 1}}
+        assert project_store.save(conn, 1, fields)["written"] == 3
+
+        stats = project_store.save(conn, 1, {"company": "Acme", "results": {"kwh": 2}})
+        assert (stats["written"], stats["deleted"]) == (1, 1)
+        assert project_store.load(conn, 1) == {"company": "Acme", "results": {"kwh": 2}}
+        assert project_store.load(conn, 1, names=["company"]) == {"company": "Acme"}
+
+    def test_decode_legacy_data(self):
+        """Double-encoded, dict and empty payloads all decode to form fields"""
+        assert project_store.decode_legacy_data(_stored({"a": 1})) == {"a": 1}
+        assert project_store.decode_legacy_data(json.dumps({"payload": {"a": 1}})) == {"a": 1}
+        assert project_store.decode_legacy_data(json.dumps({"payload": "{}", "b": 2})) == {"b": 2}
+        assert json.loads(json.loads(project_store.legacy_data({"a": 1}))["payload"]) == {"a": 1}
@@ -0,0 +1,77 @@
+"""
+Unit tests for the 8082 -> 8084 report snapshot store
+"""
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add 8082 to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "8082"))
+
+try:
+    from report_snapshots import ReportSnapshotStore
+except ImportError:
+    pytest.skip("report_snapshots not available", allow_module_level=True)
+
+
+class TestReportSnapshotStore:
+    """Tests for publish / resolve / load"""
+
+    def test_versions_and_dedupe(self, tmp_path):
+        """Identical content keeps its version; changed content gets the next one"""
+        store = ReportSnapshotStore(str(tmp_path / "snapshots.db"))
+        assert store.publish({"analysis_session_id": "A1", "kw": 1}) == ("A1", 1)
+        assert store.publish({"analysis_session_id": "A1", "kw": 1}) == ("A1", 1)
+        assert store.publish({"analysis_session_id": "A1", "kw": 2}) == ("A1", 2)
+        assert store.publish({"kw": 3}, analysis_session_id="B7") == ("B7", 1)
+
+        assert store.resolve() == ("B7", 1)
+        assert store.resolve("A1") == ("A1", 2)
+        assert store.load("A1", 1)["kw"] == 1
+        assert store.load("missing") is None
+
+    def test_reader_reads_once_per_version(self, tmp_path):
+        """A second process loads from the file once, then from memory, with independent copies"""
+        db_path = str(tmp_path / "snapshots.db")
+        ReportSnapshotStore(db_path).publish({"power_quality": {"kw_before": 10.5}}, "S1")
+
+        reader = ReportSnapshotStore(db_path)
+        first = reader.load("S1", "1")
+        first["power_quality"]["kw_before"] = 0
+        second = reader.load("S1")
+        assert second["power_quality"]["kw_before"] == 10.5
+        assert reader.transfers == 1
+
+    def test_old_versions_pruned(self, tmp_path):
+        """Only the newest keep_versions versions remain"""
+        store = ReportSnapshotStore(str(tmp_path / "snapshots.db"), keep_versions=2)
+        for i in range(4):
+            store.publish({"i": i}, "S")
+        assert store.resolve("S", 2) is None
+        assert store.resolve("S", 3) == ("S", 3)
+        assert store.load("S")["i"] == 3
+
+    def test_concurrent_publishes_get_distinct_versions(self, tmp_path):
+        """Publishers racing on one session each get their own version"""
+        db_path = str(tmp_path / "snapshots.db")
+        ReportSnapshotStore(db_path).publish({"i": -1}, "S")
+        barrier = threading.Barrier(6)
+        versions, errors = [], []
+
+        def publish(i):
+            store = ReportSnapshotStore(db_path, keep_versions=10)
+            barrier.wait()
+            try:
+                versions.append(store.publish({"i": i}, "S")[1])
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=publish, args=(i,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        assert sorted(versions) == [2, 3, 4, 5, 6, 7]
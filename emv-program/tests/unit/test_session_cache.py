@@ -0,0 +1,72 @@
+"""
+Unit tests for the 8082 session token cache
+"""
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+# Add 8082 to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "8082"))
+
+try:
+    import session_cache
+    from session_cache import SessionCache
+    from shared_state import SharedState
+except ImportError:
+    pytest.skip("session_cache not available", allow_module_level=True)
+
+
+def _session(user_id=1, org_id="acme", minutes=60):
+    return {
+        "user_id": user_id,
+        "org_id": org_id,
+        "expires_at": (datetime.now() + timedelta(minutes=minutes)).isoformat(),
+        "user": {"id": user_id, "role": "user"},
+    }
+
+
+class TestSessionCache:
+    """Tests for get / put / invalidation"""
+
+    def test_hit_and_scopes(self):
+        """A cached token resolves without a lookup; scopes are kept apart"""
+        cache = SessionCache()
+        cache.put("tok", _session())
+        assert cache.get("tok")["org_id"] == "acme"
+        assert cache.get("tok", scope="default") is None
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_respects_expires_at(self):
+        """Sessions past expires_at are never cached, even with a long TTL"""
+        cache = SessionCache(ttl_seconds=3600)
+        cache.put("old", _session(minutes=-1))
+        assert cache.get("old") is None
+
+    def test_invalidation(self):
+        """Logout drops the token; a password/role change drops all of the user's sessions"""
+        cache = SessionCache()
+        cache.put("a", _session(user_id=1))
+        cache.put("b", _session(user_id=1), scope="default")
+        cache.put("c", _session(user_id=2))
+
+        cache.invalidate_token("c")
+        assert cache.get("c") is None
+
+        cache.invalidate_user("1")
+        assert cache.get("a") is None and cache.get("b", scope="default") is None
+
+    def test_off_by_default_with_several_workers(self, monkeypatch, tmp_path):
+        """Multi-worker mode disables caching unless a TTL is set explicitly"""
+        monkeypatch.delenv("SESSION_CACHE_TTL_SECONDS", raising=False)
+        monkeypatch.setattr(session_cache, "shared_state", SharedState(str(tmp_path / "state.db")))
+        cache = SessionCache.from_env()
+        cache.put("tok", _session())
+        assert cache.get("tok") is None
+
+        monkeypatch.setenv("SESSION_CACHE_TTL_SECONDS", "30")
+        assert SessionCache.from_env().ttl_seconds == 30
+        monkeypatch.setattr(session_cache, "shared_state", SharedState())
+        monkeypatch.delenv("SESSION_CACHE_TTL_SECONDS")
+        assert SessionCache.from_env().ttl_seconds == 60
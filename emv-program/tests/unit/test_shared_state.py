@@ -0,0 +1,84 @@
+"""
+Unit tests for the 8082 multi-worker shared state
+"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add 8082 to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "8082"))
+
+try:
+    from shared_state import SharedAttribute, SharedState, fcntl, run_as_leader
+    from confirmation_system import ConfirmationSystem
+except ImportError:
+    pytest.skip("shared_state not available", allow_module_level=True)
+
+
+class TestSharedState:
+    """Tests for SQLite-backed mappings, shared attributes and leader election"""
+
+    def test_workers_see_each_others_writes(self, tmp_path):
+        """Two SharedState instances on one file stand in for two worker processes"""
+        path = str(tmp_path / "shared_state.db")
+        first, second = SharedState(path).mapping("cache"), SharedState(path).mapping("cache")
+
+        first["a"] = {"kw": 1}
+        first["b"] = 2
+        first["a"] = {"kw": 3}
+        assert second["a"] == {"kw": 3} and list(second) == ["a", "b"] and len(second) == 2
+        assert second["a"] is second["a"]  # unchanged versions are not unpickled again
+
+        del second["b"]
+        assert "b" not in first and first.get("b") is None
+        first.clear()
+        assert len(second) == 0
+        assert SharedState().mapping("cache") == {}  # single-process mode stays a dict
+
+    def test_shared_attribute_and_confirmations(self, tmp_path):
+        """Missing attributes raise AttributeError; confirmations survive a change of worker"""
+        path = str(tmp_path / "shared_state.db")
+
+        def make_app(state):
+            class App:
+                _latest_analysis_results = SharedAttribute(state, "app")
+            return App()
+
+        writer, reader = make_app(SharedState(path)), make_app(SharedState(path))
+        assert getattr(reader, "_latest_analysis_results", None) is None
+        writer._latest_analysis_results = {"results": [1]}
+        assert reader._latest_analysis_results == {"results": [1]}
+
+        created = ConfirmationSystem(SharedState(path).mapping("confirmations"))
+        confirmed = ConfirmationSystem(SharedState(path).mapping("confirmations"))
+        conf_id = created.create_confirmation("file_delete", {"file_path": "x.csv"})
+        assert confirmed.confirm_operation(conf_id, True)
+        assert created.get_confirmation_details(conf_id)["status"] == "confirmed"
+
+    @pytest.mark.skipif(fcntl is None, reason="leader election needs fcntl")
+    def test_one_leader_at_a_time(self, tmp_path):
+        """A second candidate runs only after the leader's target returns"""
+        lock_path = str(tmp_path / "leader.lock")
+        release = threading.Event()
+        ran = []
+
+        def lead(name):
+            ran.append(name)
+            if name == "first":
+                release.wait(5)
+
+        first = threading.Thread(target=run_as_leader, args=(lock_path, lead, "first"))
+        first.start()
+        time.sleep(0.1)
+        second = threading.Thread(target=run_as_leader, args=(lock_path, lead, "second"))
+        second.start()
+        time.sleep(0.2)
+        assert ran == ["first"]
+
+        release.set()
+        first.join(5)
+        second.join(5)
+        assert ran == ["first", "second"]
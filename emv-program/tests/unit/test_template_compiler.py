@@ -0,0 +1,57 @@
+"""
+Unit tests for the 8084 compiled report templates
+"""
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add 8084 to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "8084"))
+
+try:
+    from template_compiler import CompiledTemplate, load_template
+except ImportError:
+    pytest.skip("template_compiler not available", allow_module_level=True)
+
+
+class TestCompiledTemplate:
+    """Tests for CompiledTemplate.render / without and load_template"""
+
+    def test_render_matches_replace_chain(self):
+        """Every occurrence is filled; unset placeholders keep their token"""
+        source = "<p>{{A}} and {{A}}</p><b>{{ version }}</b><i>{{MISSING}}</i>{not} {{lower_case}}"
+        template = CompiledTemplate(source)
+        values = {"A": "1", "version": "3.8", "lower_case": "x"}
+
+        expected = source
+        for name, value in values.items():
+            expected = expected.replace("{{" + name + "}}", value).replace("{{ " + name + " }}", value)
+        assert template.render(values) == expected
+        assert "{{MISSING}}" in template.render(values)
+
+    def test_nested_placeholders_filled(self):
+        """A value that carries a placeholder is filled from the same values"""
+        template = CompiledTemplate("{{SECTION}}")
+        assert template.render({"SECTION": "<td>{{CELL}}</td>", "CELL": "42"}) == "<td>42</td>"
+
+    def test_without_removes_section(self):
+        """Removed sections drop their placeholders too"""
+        template = CompiledTemplate("a<!-- X_START -->{{B}}<!-- X_END -->{{C}}")
+        trimmed = template.without(r"<!-- X_START -->.*?<!-- X_END -->")
+        assert trimmed.render({"B": "b", "C": "c"}) == "ac"
+        assert "B" not in trimmed.slot_names
+        assert template.without(r"<!-- X_START -->.*?<!-- X_END -->") is trimmed
+
+    def test_load_template_recompiles_on_change(self, tmp_path):
+        """The cached compile is reused until the file changes"""
+        path = tmp_path / "report.html"
+        path.write_text("<h1>{{TITLE}}</h1>", encoding="utf-8")
+        first = load_template(path)
+        assert load_template(path) is first
+
+        path.write_text("<h2>{{TITLE}}</h2>!", encoding="utf-8")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        assert load_template(path).render({"TITLE": "T"}) == "<h2>T</h2>!"
@@ -0,0 +1,51 @@
+"""
+Unit tests for the 8082 tenant database migrations
+"""
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add 8082 to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "8082"))
+
+try:
+    import tenant_db
+except ImportError:
+    pytest.skip("tenant_db not available", allow_module_level=True)
+
+
+def _tables(conn):
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+
+
+class TestTenantDb:
+    """Tests for migrate / ensure_migrated"""
+
+    def test_new_tenant_gets_full_schema(self, tmp_path):
+        """A new tenant file is migrated to SCHEMA_VERSION; running again applies nothing"""
+        conn = sqlite3.connect(str(tmp_path / "app.db"))
+        assert tenant_db.migrate(conn) == [version for version, _, _ in tenant_db.MIGRATIONS]
+        assert tenant_db.user_version(conn) == tenant_db.SCHEMA_VERSION
+        assert {"users", "projects", "raw_meter_data", "calculation_audit",
+                "project_summaries", "dashboard_counters"} <= _tables(conn)
+        assert tenant_db.migrate(conn) == []
+        conn.close()
+
+    def test_existing_tenant_keeps_rows(self, tmp_path):
+        """Tenants whose tables were created ad hoc (user_version 0) are migrated in place"""
+        db_path = str(tmp_path / "app.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE projects (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, data TEXT)")
+        conn.execute("INSERT INTO projects (name, data) VALUES ('Plant', ?)", ('{"payload": "{\\"company\\": \\"Acme\\"}"}',))
+        conn.commit()
+
+        tenant_db.ensure_migrated(conn, db_path)
+        assert tenant_db.user_version(conn) == tenant_db.SCHEMA_VERSION
+        assert conn.execute("SELECT company FROM project_summaries").fetchone()[0] == "Acme"
+        conn.execute("PRAGMA user_version = 0")
+        tenant_db.ensure_migrated(conn, db_path)  # remembered: no schema work
+        assert tenant_db.user_version(conn) == 0
+        tenant_db.forget(db_path)
+        conn.close()
@@ -0,0 +1,75 @@
+"""
+Unit tests for the 8082 streaming upload pipeline and background jobs
+"""
+import hashlib
+import hmac
+import io
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Add 8082 to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "8082"))
+
+try:
+    import upload_pipeline
+    from job_queue import JobQueue
+except ImportError:
+    pytest.skip("upload_pipeline not available", allow_module_level=True)
+
+
+def _normalize(text):
+    """CSVIntegrityProtection._normalize_csv_content"""
+    if text.startswith("\ufeff"):
+        text = text[1:]
+    lines = [line.rstrip() for line in text.replace("\r\n", "\n").replace("\r", "\n").split("\n")]
+    while lines and not lines[-1]:
+        lines.pop()
+    return "\n".join(lines)
+
+
+class TestUploadPipeline:
+    """Tests for spool_upload / profile_csv / JobQueue"""
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 7, 1024])
+    def test_streaming_fingerprint_matches_normalization(self, tmp_path, chunk_size):
+        """Hashes and metadata equal those of the in-memory normalization, whatever the chunking"""
+        raw = "\ufeffStart Time,kW  \r\n\r\n2024-01-01 00:00,1.5\t\r2024-01-01 00:01,ü2\n\n  \r\n".encode("utf-8")
+        dest = tmp_path / "upload.csv"
+        result = upload_pipeline.spool_upload(io.BytesIO(raw), str(dest), "key", chunk_size=chunk_size)
+
+        normalized = _normalize(raw.decode("utf-8").replace("\r\n", "\n").replace("\r", "\n"))
+        assert dest.read_bytes() == raw and result["size"] == len(raw)
+        assert result["content_hash"] == hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        assert result["hmac_signature"] == hmac.new(b"key", normalized.encode("utf-8"), hashlib.sha256).hexdigest()
+        assert result["metadata"]["line_count"] == len(normalized.split("\n"))
+        assert result["metadata"]["normalized_size"] == len(normalized)
+        assert not (tmp_path / "upload.csv.part").exists()
+
+    def test_profile_runs_as_job(self, tmp_path):
+        """A profile job reports columns, numeric statistics and the interval"""
+        csv_path = tmp_path / "meter.csv"
+        csv_path.write_text(
+            "Start Time,avgKw,note\n2024-01-01 00:00,1,a\n2024-01-01 00:15,3,b\n2024-01-01 00:30,2,c\n",
+            encoding="utf-8",
+        )
+        queue = JobQueue(str(tmp_path / "jobs.db"))
+
+        @queue.handler("profile")
+        def profile(job, path):
+            return upload_pipeline.profile_csv(path, {"timestamp": ["Start Time"]}, progress=job.progress)
+
+        job_id = queue.submit("profile", {"path": str(csv_path)}, org_id="7")
+        for _ in range(100):
+            job = queue.get(job_id)
+            if job["status"] in ("succeeded", "failed"):
+                break
+            time.sleep(0.05)
+
+        assert job["status"] == "succeeded" and job["org_id"] == "7"
+        result = job["result"]
+        assert result["row_count"] == 3 and result["detected_columns"] == {"timestamp": "Start Time"}
+        assert result["numeric_columns"] == {"avgKw": {"count": 3, "min": 1.0, "max": 3.0, "mean": 2.0}}
+        assert result["interval_seconds"] == 900
@@ -0,0 +1,122 @@
+"""
+Unit tests for the 8085 weather archive (range-gap fetching against a local Open-Meteo stand-in)
+"""
+import json
+import sys
+import threading
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+# Add 8085 to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "8085"))
+
+try:
+    from weather_archive import WeatherArchive, HOURLY_CHANNELS, DAILY_CHANNELS
+except ImportError:
+    pytest.skip("weather_archive not available", allow_module_level=True)
+
+
+class _OpenMeteoStandIn(BaseHTTPRequestHandler):
+    """Serves deterministic archive data and records every requested range"""
+
+    requests_seen = []
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        start = date.fromisoformat(query["start_date"][0])
+        end = date.fromisoformat(query["end_date"][0])
+        self.requests_seen.append((start, end))
+
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        hourly_times = [f"{d.isoformat()}T{h:02d}:00" for d in days for h in range(24)]
+        body = {
+            "daily": {"time": [d.isoformat() for d in days]},
+            "hourly": {"time": hourly_times},
+        }
+        for c, name in enumerate(DAILY_CHANNELS):
+            body["daily"][name] = [d.toordinal() % 30 + c for d in days]
+        for c, name in enumerate(HOURLY_CHANNELS):
+            body["hourly"][name] = [d.toordinal() % 30 + h / 10 + c for d in days for h in range(24)]
+
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in():
+    _OpenMeteoStandIn.requests_seen = []
+    server = HTTPServer(("127.0.0.1", 0), _OpenMeteoStandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}/v1/archive", _OpenMeteoStandIn.requests_seen
+    server.shutdown()
+    server.server_close()
+
+
+class TestWeatherArchive:
+    """Tests for WeatherArchive.get_range / get_ranges"""
+
+    def test_fully_cached_range_makes_no_request(self, stand_in, tmp_path):
+        """A second read of the same range is served from disk"""
+        url, seen = stand_in
+        archive = WeatherArchive(str(tmp_path), base_url=url)
+        first = archive.get_range(40.01, -105.27, "2023-12-30", "2024-01-02")
+        assert len(seen) == 1
+
+        # New instance: nothing held in memory, same cell (rounded lat/lon)
+        archive = WeatherArchive(str(tmp_path), base_url=url)
+        second = archive.get_range(40.04, -105.26, "2023-12-30", "2024-01-02")
+        assert len(seen) == 1
+        assert archive.upstream_requests == 0
+        assert second["hourly"] == first["hourly"]
+        assert second["daily"] == first["daily"]
+        assert len(second["hourly"]["time"]) == 4 * 24
+        assert second["hourly"]["time"][0] == "2023-12-30T00:00"
+
+    def test_only_missing_gaps_are_fetched(self, stand_in, tmp_path):
+        """Overlapping ranges fetch only the days not yet archived"""
+        url, seen = stand_in
+        archive = WeatherArchive(str(tmp_path), base_url=url)
+        archive.get_range(40.0, -105.3, "2024-03-10", "2024-03-12")
+        archive.get_range(40.0, -105.3, "2024-03-20", "2024-03-21")
+        result = archive.get_range(40.0, -105.3, "2024-03-08", "2024-03-22")
+
+        assert sorted(seen[2:]) == [
+            (date(2024, 3, 8), date(2024, 3, 9)),
+            (date(2024, 3, 13), date(2024, 3, 19)),
+            (date(2024, 3, 22), date(2024, 3, 22)),
+        ]
+        assert len(result["daily"]["time"]) == 15
+        assert None not in result["hourly"]["temperature_2m"]
+
+    def test_recent_days_are_not_archived(self, stand_in, tmp_path):
+        """Days inside the upstream settling window are fetched again"""
+        url, seen = stand_in
+        archive = WeatherArchive(str(tmp_path), base_url=url)
+        recent = (date.today() - timedelta(days=2)).isoformat()
+        archive.get_range(40.0, -105.3, recent, recent)
+        archive.get_range(40.0, -105.3, recent, recent)
+        assert len(seen) == 2
+
+    def test_ranges_fetched_together(self, stand_in, tmp_path):
+        """Adjacent before/after ranges share one request; separate gaps are fetched once each"""
+        url, seen = stand_in
+        archive = WeatherArchive(str(tmp_path), base_url=url)
+        before, after = archive.get_ranges(40.0, -105.3, [("2024-05-01", "2024-05-10"), ("2024-05-11", "2024-05-20")])
+        assert seen == [(date(2024, 5, 1), date(2024, 5, 20))]
+        assert before["daily"]["time"][-1] == "2024-05-10"
+        assert after["daily"]["time"][0] == "2024-05-11"
+
+        archive.get_ranges(40.0, -105.3, [("2023-01-01", "2023-01-05"), ("2023-07-01", "2023-07-05")])
+        assert sorted(seen[1:]) == [(date(2023, 1, 1), date(2023, 1, 5)), (date(2023, 7, 1), date(2023, 7, 5))]
@@ -0,0 +1,87 @@
+"""
+Unit tests for the 8085 /weather/batch endpoint (8085/weather_service.py)
+"""
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+# Add 8085 to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / "8085"))
+
+# Keep the archive and geocode cache the service opens at import out of the source tree
+_scratch = tempfile.mkdtemp(prefix="weather_batch_")
+atexit.register(shutil.rmtree, _scratch, ignore_errors=True)
+os.environ.setdefault("WEATHER_ARCHIVE_DIR", os.path.join(_scratch, "archive"))
+os.environ.setdefault("GEOCODE_CACHE_DB", os.path.join(_scratch, "geocode_cache.db"))
+
+try:
+    import requests
+    import weather_service
+except ImportError:
+    pytest.skip("weather_service not available", allow_module_level=True)
+
+
+class _Response:
+    def __init__(self, start, end):
+        self.status_code = 200
+        self._days = [start, end]
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {
+            "daily": {"time": self._days, "temperature_2m_mean": [10.0, 12.0],
+                      "relative_humidity_2m_mean": [50.0, 60.0], "dewpoint_2m_mean": [1.0, 2.0]},
+            "hourly": {"time": [f"{self._days[0]}T00:00"], "temperature_2m": [11.0]},
+        }
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(weather_service, "geocode_address", lambda address: (40.0, -105.0, "Test, CO"))
+    monkeypatch.setattr(weather_service, "weather_archive", None)
+    return weather_service.app.test_client()
+
+
+def _batch(client):
+    return client.post("/weather/batch", json={
+        "address": "1 Main St", "before_start": "2024-01-01", "before_end": "2024-01-02",
+        "after_start": "2024-06-01", "after_end": "2024-06-02",
+    }).get_json()
+
+
+class TestWeatherBatch:
+    """Prefetch failures in weather_batch"""
+
+    def test_failed_prefetch_falls_back_per_period(self, client, monkeypatch):
+        """A failed joint fetch is retried per period instead of failing both"""
+        def failing_ranges(*args, **kwargs):
+            raise requests.exceptions.ConnectionError("reset")
+
+        monkeypatch.setattr(weather_service, "fetch_weather_ranges", failing_ranges)
+        monkeypatch.setattr(weather_service.http_session, "get",
+                            lambda url, params, timeout: _Response(params["start_date"], params["end_date"]))
+        result = _batch(client)
+        assert result["success"] is True
+
+    def test_error_reported_for_failing_period_only(self, client, monkeypatch):
+        """Only the period whose range fails is reported as failed"""
+        def failing_ranges(*args, **kwargs):
+            raise requests.exceptions.Timeout()
+
+        def get(url, params, timeout):
+            if params["start_date"].startswith("2024-06"):
+                raise requests.exceptions.Timeout()
+            return _Response(params["start_date"], params["end_date"])
+
+        monkeypatch.setattr(weather_service, "fetch_weather_ranges", failing_ranges)
+        monkeypatch.setattr(weather_service.http_session, "get", get)
+        result = _batch(client)
+        assert result["success"] is False
+        assert "After period" in result["error"] and "Before period" not in result["error"]
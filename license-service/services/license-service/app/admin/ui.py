@@ -16,7 +16,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy import case, or_, func
 
 from ..config import settings
-from ..db import SessionLocal
+from ..db import get_db
 from ..models.org import Organization
 from ..models.api_key import ApiKey
 from ..models.authorization import ProgramAuthorization
@@ -33,13 +33,6 @@ templates = Jinja2Templates(directory=str(ADMIN_TEMPLATES_DIR))
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
-def db_session():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 def _is_logged_in(request: Request) -> bool:
     """Check if user is logged in. Returns False if session is not available."""
     try:
@@ -120,7 +113,7 @@ def logout(request: Request):
     return RedirectResponse("/admin/login", status_code=303)
 
 @router.get("", response_class=HTMLResponse)
-def dashboard(request: Request, _=Depends(require_admin), db: Session = Depends(db_session)):
+def dashboard(request: Request, _=Depends(require_admin), db: Session = Depends(get_db)):
     counts = {
         "orgs": db.query(Organization).count(),
         "api_keys": db.query(ApiKey).count(),
@@ -131,7 +124,7 @@ def dashboard(request: Request, _=Depends(require_admin), db: Session = Depends(
 
 # ---- Orgs ----
 @router.get("/pe-registrations", response_class=HTMLResponse)
-def pe_registrations_page(request: Request, _=Depends(require_admin), db: Session = Depends(db_session)):
+def pe_registrations_page(request: Request, _=Depends(require_admin), db: Session = Depends(get_db)):
     """Page to view and manage PE registrations."""
     try:
         status_filter = request.query_params.get("status", "").strip()  # pending, approved, rejected
@@ -204,7 +197,7 @@ def pe_registrations_page(request: Request, _=Depends(require_admin), db: Sessio
         return HTMLResponse(content=error_html, status_code=500)
 
 @router.post("/pe-registrations/{org_id}/approve")
-def approve_pe(request: Request, org_id: str, _=Depends(require_admin), db: Session = Depends(db_session)):
+def approve_pe(request: Request, org_id: str, _=Depends(require_admin), db: Session = Depends(get_db)):
     """Approve a PE registration and sync to EMV."""
     org = db.get(Organization, org_id)
     if not org:
@@ -234,7 +227,7 @@ def approve_pe(request: Request, org_id: str, _=Depends(require_admin), db: Sess
     return RedirectResponse(f"/admin/pe-registrations?status=approved&message=PE+approved+and+synced+to+EMV&message_type=success", status_code=303)
 
 @router.post("/pe-registrations/{org_id}/reject")
-def reject_pe(request: Request, org_id: str, reason: str = Form(None), _=Depends(require_admin), db: Session = Depends(db_session)):
+def reject_pe(request: Request, org_id: str, reason: str = Form(None), _=Depends(require_admin), db: Session = Depends(get_db)):
     """Reject a PE registration."""
     org = db.get(Organization, org_id)
     if not org:
@@ -253,7 +246,7 @@ def reject_pe(request: Request, org_id: str, reason: str = Form(None), _=Depends
     return RedirectResponse(f"/admin/pe-registrations?status=rejected&message=PE+registration+rejected&message_type=success", status_code=303)
 
 @router.post("/pe-registrations/{org_id}/sync")
-def sync_pe_to_emv_endpoint(request: Request, org_id: str, _=Depends(require_admin), db: Session = Depends(db_session)):
+def sync_pe_to_emv_endpoint(request: Request, org_id: str, _=Depends(require_admin), db: Session = Depends(get_db)):
     """Manually sync a PE to EMV."""
     org = db.get(Organization, org_id)
     if not org:
@@ -308,7 +301,7 @@ def sync_pe_to_emv(org: Organization):
         raise Exception(f"Failed to sync to EMV: {str(e)}")
 
 @router.get("/orgs", response_class=HTMLResponse)
-def orgs_page(request: Request, _=Depends(require_admin), db: Session = Depends(db_session)):
+def orgs_page(request: Request, _=Depends(require_admin), db: Session = Depends(get_db)):
     search = request.query_params.get("search", "").strip()
     org_type_filter = request.query_params.get("type", "").strip()
     
@@ -352,7 +345,7 @@ def orgs_page(request: Request, _=Depends(require_admin), db: Session = Depends(
     })
 
 @router.post("/orgs")
-def orgs_create(request: Request, org_id: str = Form(...), org_name: str = Form(...), org_type: str = Form(...), _=Depends(require_admin), db: Session = Depends(db_session)):
+def orgs_create(request: Request, org_id: str = Form(...), org_name: str = Form(...), org_type: str = Form(...), _=Depends(require_admin), db: Session = Depends(get_db)):
     if org_type not in ("oem", "customer", "pe"):
         raise HTTPException(400, "org_type must be oem, customer, or pe")
     if db.get(Organization, org_id):
@@ -363,7 +356,7 @@ def orgs_create(request: Request, org_id: str = Form(...), org_name: str = Form(
     return RedirectResponse("/admin/orgs", status_code=303)
 
 @router.get("/orgs/{org_id}", response_class=HTMLResponse)
-def org_detail(org_id: str, request: Request, tab: str = "overview", _=Depends(require_admin), db: Session = Depends(db_session)):
+def org_detail(org_id: str, request: Request, tab: str = "overview", _=Depends(require_admin), db: Session = Depends(get_db)):
     """Organization detail page with tabs."""
     org = db.get(Organization, org_id)
     if not org:
@@ -403,7 +396,7 @@ def org_detail(org_id: str, request: Request, tab: str = "overview", _=Depends(r
     })
 
 @router.get("/orgs/{org_id}/edit", response_class=HTMLResponse)
-def org_edit_page(org_id: str, request: Request, _=Depends(require_admin), db: Session = Depends(db_session)):
+def org_edit_page(org_id: str, request: Request, _=Depends(require_admin), db: Session = Depends(get_db)):
     """Edit organization page."""
     org = db.get(Organization, org_id)
     if not org:
@@ -429,7 +422,7 @@ def org_update(org_id: str, request: Request,
                address: str = Form(None),
                billing_email: str = Form(None),
                _=Depends(require_admin), 
-               db: Session = Depends(db_session)):
+               db: Session = Depends(get_db)):
     """Update organization."""
     org = db.get(Organization, org_id)
     if not org:
@@ -459,7 +452,7 @@ def org_update(org_id: str, request: Request,
     return RedirectResponse(f"/admin/orgs/{org_id}/edit?message=Organization+updated+successfully&message_type=success", status_code=303)
 
 @router.post("/orgs/{org_id}/delete")
-def org_delete(org_id: str, request: Request, _=Depends(require_admin), db: Session = Depends(db_session)):
+def org_delete(org_id: str, request: Request, _=Depends(require_admin), db: Session = Depends(get_db)):
     """Delete organization (with safety checks)."""
     org = db.get(Organization, org_id)
     if not org:
@@ -479,12 +472,12 @@ def org_delete(org_id: str, request: Request, _=Depends(require_admin), db: Sess
 
 # ---- API Keys ----
 @router.get("/api-keys", response_class=HTMLResponse)
-def api_keys_page(request: Request, _=Depends(require_admin), db: Session = Depends(db_session)):
+def api_keys_page(request: Request, _=Depends(require_admin), db: Session = Depends(get_db)):
     keys = db.query(ApiKey).order_by(ApiKey.key_id.desc()).limit(500).all()
     return templates.TemplateResponse("api_keys.html", {"request": request, "keys": keys, "issued": None, "error": None})
 
 @router.post("/api-keys/issue")
-def api_keys_issue(request: Request, org_id: str = Form(...), scopes_csv: str = Form(...), _=Depends(require_admin), db: Session = Depends(db_session)):
+def api_keys_issue(request: Request, org_id: str = Form(...), scopes_csv: str = Form(...), _=Depends(require_admin), db: Session = Depends(get_db)):
     org = db.get(Organization, org_id)
     if not org:
         keys = db.query(ApiKey).order_by(ApiKey.key_id.desc()).limit(500).all()
@@ -500,7 +493,7 @@ def api_keys_issue(request: Request, org_id: str = Form(...), scopes_csv: str =
     return templates.TemplateResponse("api_keys.html", {"request": request, "keys": keys, "issued": {"key_id": key_id, "api_key": raw}, "error": None})
 
 @router.post("/api-keys/{key_id}/disable")
-def api_keys_disable(key_id: str, request: Request, _=Depends(require_admin), db: Session = Depends(db_session)):
+def api_keys_disable(key_id: str, request: Request, _=Depends(require_admin), db: Session = Depends(get_db)):
     rec = db.get(ApiKey, key_id)
     if not rec:
         raise HTTPException(404, "Not found")
@@ -584,7 +577,7 @@ def template_detail(program_id: str, filename: str, request: Request, _=Depends(
 
 # ---- Authorizations ----
 @router.get("/authorizations", response_class=HTMLResponse)
-def authorizations_page(request: Request, _=Depends(require_admin), db: Session = Depends(db_session)):
+def authorizations_page(request: Request, _=Depends(require_admin), db: Session = Depends(get_db)):
     search = request.query_params.get("search", "").strip()
     program_filter = request.query_params.get("program", "").strip()
     status_filter = request.query_params.get("status", "").strip()
@@ -649,7 +642,7 @@ def authorizations_create(
     bindings_override_json: str = Form("{}"),
     issued_by: str = Form("admin"),
     _=Depends(require_admin),
-    db: Session = Depends(db_session),
+    db: Session = Depends(get_db),
 ):
     if program_id not in ("emv","tracking"):
         raise HTTPException(400, "program_id must be emv or tracking")
@@ -702,7 +695,7 @@ def authorizations_create(
     return RedirectResponse("/admin/authorizations", status_code=303)
 
 @router.get("/authorizations/{authorization_id}", response_class=HTMLResponse)
-def authorization_detail(authorization_id: str, request: Request, tab: str = "overview", _=Depends(require_admin), db: Session = Depends(db_session)):
+def authorization_detail(authorization_id: str, request: Request, tab: str = "overview", _=Depends(require_admin), db: Session = Depends(get_db)):
     """Authorization detail page with tabs."""
     auth = db.get(ProgramAuthorization, authorization_id)
     if not auth:
@@ -747,7 +740,7 @@ def authorization_detail(authorization_id: str, request: Request, tab: str = "ov
     })
 
 @router.get("/authorizations/{authorization_id}/edit", response_class=HTMLResponse)
-def authorization_edit_page(authorization_id: str, request: Request, _=Depends(require_admin), db: Session = Depends(db_session)):
+def authorization_edit_page(authorization_id: str, request: Request, _=Depends(require_admin), db: Session = Depends(get_db)):
     """Edit authorization page."""
     auth = db.get(ProgramAuthorization, authorization_id)
     if not auth:
@@ -782,7 +775,7 @@ def authorization_update(
     scope_json: str = Form(None),
     bindings_override_json: str = Form(None),
     _=Depends(require_admin),
-    db: Session = Depends(db_session),
+    db: Session = Depends(get_db),
 ):
     """Update authorization."""
     auth = db.get(ProgramAuthorization, authorization_id)
@@ -826,7 +819,7 @@ def authorization_update(
     return RedirectResponse(f"/admin/authorizations/{authorization_id}/edit?message=Authorization+updated+successfully&message_type=success", status_code=303)
 
 @router.post("/authorizations/{authorization_id}/suspend")
-def authorization_suspend(authorization_id: str, request: Request, _=Depends(require_admin), db: Session = Depends(db_session)):
+def authorization_suspend(authorization_id: str, request: Request, _=Depends(require_admin), db: Session = Depends(get_db)):
     """Suspend authorization."""
     auth = db.get(ProgramAuthorization, authorization_id)
     if not auth:
@@ -838,7 +831,7 @@ def authorization_suspend(authorization_id: str, request: Request, _=Depends(req
     return RedirectResponse(f"/admin/authorizations/{authorization_id}?tab=overview&message=Authorization+suspended&message_type=success", status_code=303)
 
 @router.post("/authorizations/{authorization_id}/activate")
-def authorization_activate(authorization_id: str, request: Request, _=Depends(require_admin), db: Session = Depends(db_session)):
+def authorization_activate(authorization_id: str, request: Request, _=Depends(require_admin), db: Session = Depends(get_db)):
     """Activate authorization."""
     auth = db.get(ProgramAuthorization, authorization_id)
     if not auth:
@@ -850,7 +843,7 @@ def authorization_activate(authorization_id: str, request: Request, _=Depends(re
     return RedirectResponse(f"/admin/authorizations/{authorization_id}?tab=overview&message=Authorization+activated&message_type=success", status_code=303)
 
 @router.post("/authorizations/{authorization_id}/terminate")
-def authorization_terminate(authorization_id: str, request: Request, _=Depends(require_admin), db: Session = Depends(db_session)):
+def authorization_terminate(authorization_id: str, request: Request, _=Depends(require_admin), db: Session = Depends(get_db)):
     """Terminate authorization."""
     auth = db.get(ProgramAuthorization, authorization_id)
     if not auth:
@@ -862,7 +855,7 @@ def authorization_terminate(authorization_id: str, request: Request, _=Depends(r
     return RedirectResponse(f"/admin/authorizations/{authorization_id}?tab=overview&message=Authorization+terminated&message_type=success", status_code=303)
 
 @router.post("/authorizations/{authorization_id}/issue-license")
-def authorization_issue_license(authorization_id: str, request: Request, _=Depends(require_admin), db: Session = Depends(db_session)):
+def authorization_issue_license(authorization_id: str, request: Request, _=Depends(require_admin), db: Session = Depends(get_db)):
     """Issue a license from this authorization."""
     auth = db.get(ProgramAuthorization, authorization_id)
     if not auth:
@@ -936,7 +929,7 @@ def authorization_issue_license(authorization_id: str, request: Request, _=Depen
 
 # ---- Licenses ----
 @router.get("/licenses", response_class=HTMLResponse)
-def licenses_page(request: Request, _=Depends(require_admin), db: Session = Depends(db_session)):
+def licenses_page(request: Request, _=Depends(require_admin), db: Session = Depends(get_db)):
     search = request.query_params.get("search", "").strip()
     program_filter = request.query_params.get("program", "").strip()
     status_filter = request.query_params.get("status", "").strip()
@@ -971,7 +964,7 @@ def licenses_page(request: Request, _=Depends(require_admin), db: Session = Depe
     })
 
 @router.get("/licenses/{license_id}", response_class=HTMLResponse)
-def license_detail(license_id: str, request: Request, tab: str = "overview", _=Depends(require_admin), db: Session = Depends(db_session)):
+def license_detail(license_id: str, request: Request, tab: str = "overview", _=Depends(require_admin), db: Session = Depends(get_db)):
     """License detail page with tabs."""
     lic = db.get(License, license_id)
     if not lic:
@@ -1019,7 +1012,7 @@ def license_detail(license_id: str, request: Request, tab: str = "overview", _=D
     })
 
 @router.post("/licenses/{license_id}/revoke")
-def license_revoke(license_id: str, request: Request, _=Depends(require_admin), db: Session = Depends(db_session)):
+def license_revoke(license_id: str, request: Request, _=Depends(require_admin), db: Session = Depends(get_db)):
     """Revoke a license."""
     lic = db.get(License, license_id)
     if not lic:
@@ -1032,7 +1025,7 @@ def license_revoke(license_id: str, request: Request, _=Depends(require_admin),
     return RedirectResponse(f"/admin/licenses/{license_id}?tab=overview&message=License+revoked&message_type=success", status_code=303)
 
 @router.post("/licenses/{license_id}/suspend")
-def license_suspend(license_id: str, request: Request, reason: str = Form("admin_action"), _=Depends(require_admin), db: Session = Depends(db_session)):
+def license_suspend(license_id: str, request: Request, reason: str = Form("admin_action"), _=Depends(require_admin), db: Session = Depends(get_db)):
     """Suspend a license."""
     lic = db.get(License, license_id)
     if not lic:
@@ -1046,7 +1039,7 @@ def license_suspend(license_id: str, request: Request, reason: str = Form("admin
     return RedirectResponse(f"/admin/licenses/{license_id}?tab=overview&message=License+suspended&message_type=success", status_code=303)
 
 @router.post("/licenses/{license_id}/unsuspend")
-def license_unsuspend(license_id: str, request: Request, _=Depends(require_admin), db: Session = Depends(db_session)):
+def license_unsuspend(license_id: str, request: Request, _=Depends(require_admin), db: Session = Depends(get_db)):
     """Unsuspend a license."""
     lic = db.get(License, license_id)
     if not lic:
@@ -1060,7 +1053,7 @@ def license_unsuspend(license_id: str, request: Request, _=Depends(require_admin
     return RedirectResponse(f"/admin/licenses/{license_id}?tab=overview&message=License+unsuspended&message_type=success", status_code=303)
 
 @router.get("/audit", response_class=HTMLResponse)
-def audit_page(request: Request, _=Depends(require_admin), db: Session = Depends(db_session)):
+def audit_page(request: Request, _=Depends(require_admin), db: Session = Depends(get_db)):
     events = db.query(AuditEvent).order_by(AuditEvent.at.desc()).limit(500).all()
     return templates.TemplateResponse("audit.html", {"request": request, "events": events})
 
@@ -1136,7 +1129,7 @@ def _format_uptime(seconds: float) -> str:
         return f"{minutes}m"
 
 @router.post("/server/reload")
-def server_reload(request: Request, _=Depends(require_admin), db: Session = Depends(db_session)):
+def server_reload(request: Request, _=Depends(require_admin), db: Session = Depends(get_db)):
     """Trigger server reload by touching a watched file."""
     # Log that we're attempting reload
     try:
@@ -1218,7 +1211,7 @@ def server_reload(request: Request, _=Depends(require_admin), db: Session = Depe
         return RedirectResponse(f"/admin/server?message={error_msg}&message_type=error", status_code=303)
 
 @router.post("/server/restart")
-def server_restart(request: Request, _=Depends(require_admin), db: Session = Depends(db_session)):
+def server_restart(request: Request, _=Depends(require_admin), db: Session = Depends(get_db)):
     """Restart the server by executing the restart script."""
     try:
         log_event(db, actor="admin", action="server.restart", ref_id="server", detail={"method": "script_execution"})
@@ -1237,7 +1230,7 @@ def server_restart(request: Request, _=Depends(require_admin), db: Session = Dep
         return RedirectResponse(f"/admin/server?message=Restart+failed%3A+{str(e).replace(' ', '+')}&message_type=error", status_code=303)
 
 @router.post("/server/shutdown")
-def server_shutdown(request: Request, _=Depends(require_admin), db: Session = Depends(db_session)):
+def server_shutdown(request: Request, _=Depends(require_admin), db: Session = Depends(get_db)):
     """Gracefully shutdown the server."""
     import signal
     import threading
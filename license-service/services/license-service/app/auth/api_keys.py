@@ -2,7 +2,7 @@ import hmac, hashlib, os, secrets
 from typing import Optional, Set
 from fastapi import Header, HTTPException, Depends
 from sqlalchemy.orm import Session
-from ..db import SessionLocal
+from ..db import get_db
 from ..models.api_key import ApiKey
 from ..config import settings
 
@@ -14,15 +14,8 @@ def create_api_key(prefix: str = "syx") -> tuple[str, str]:
     raw = f"{prefix}_" + secrets.token_urlsafe(32)
     return raw, _hash_key(raw)
 
-def _db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 def require_api_key(required_scopes: Set[str]):
-    def _dep(x_api_key: Optional[str] = Header(default=None), db: Session = Depends(_db)):
+    def _dep(x_api_key: Optional[str] = Header(default=None), db: Session = Depends(get_db)):
         if not x_api_key:
             raise HTTPException(401, "Missing X-API-Key")
         key_hash = _hash_key(x_api_key)
@@ -4,6 +4,13 @@ from pathlib import Path
 
 class Settings(BaseSettings):
     db_url: str = "sqlite:///./licensing.db"
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout_seconds: int = 30
+    db_pool_recycle_seconds: int = 1800  # Server databases only
+    sqlite_busy_timeout_ms: int = 5000  # Wait for the write lock instead of failing with "database is locked"
+    sqlite_mmap_size: int = 268435456  # 256 MB memory-mapped reads
+    sqlite_cache_size_kib: int = 65536  # 64 MB page cache per connection
     issuer_name: str = "Synerex Laboratories, LLC"
     key_id: str = "SYX-MASTER-KEY-01"
     api_key_secret: str = "CHANGE_ME"
@@ -59,6 +66,12 @@ class Settings(BaseSettings):
     webhook_timeout_seconds: int = 10
     webhook_max_retries: int = 3
     webhook_retry_delay_seconds: int = 60
+    webhook_max_retry_delay_seconds: int = 3600  # Cap for exponential backoff
+    webhook_worker_enabled: bool = True  # Run the background delivery worker in-process
+    webhook_worker_concurrency: int = 20  # Max deliveries in flight across all hosts
+    webhook_per_host_concurrency: int = 4  # Max deliveries in flight per subscriber host
+    webhook_poll_interval_seconds: float = 5.0  # How often the worker checks for due retries
+    webhook_batch_size: int = 100  # Deliveries claimed per poll
     
     # Rate limiting
     rate_limit_per_minute: int = 60
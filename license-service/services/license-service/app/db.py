@@ -1,9 +1,100 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.pool import StaticPool
+from starlette.requests import Request
 from .config import settings
 
-engine = create_engine(settings.db_url, connect_args={"check_same_thread": False})
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    """Per-connection SQLite tuning: WAL lets readers run alongside a writer."""
+    cursor = dbapi_connection.cursor()
+    try:
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute(f"PRAGMA busy_timeout={int(settings.sqlite_busy_timeout_ms)}")
+        cursor.execute(f"PRAGMA mmap_size={int(settings.sqlite_mmap_size)}")
+        cursor.execute(f"PRAGMA cache_size={int(settings.sqlite_cache_size_kib) * -1}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+    finally:
+        cursor.close()
+
+def build_engine(db_url: str) -> Engine:
+    """Create an engine with pooling and dialect-specific tuning.
+
+    SQLite files get WAL, synchronous=NORMAL, busy_timeout and mmap on every
+    pooled connection; in-memory SQLite shares one connection. Server databases
+    (e.g. PostgreSQL) get a sized pool with pre-ping and recycling.
+    """
+    url = make_url(db_url)
+    if url.get_backend_name() == "sqlite":
+        connect_args = {
+            "check_same_thread": False,
+            "timeout": settings.sqlite_busy_timeout_ms / 1000,
+        }
+        if url.database in (None, "", ":memory:"):
+            return create_engine(db_url, connect_args=connect_args, poolclass=StaticPool)
+        engine = create_engine(
+            db_url,
+            connect_args=connect_args,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout_seconds,
+        )
+        event.listen(engine, "connect", _apply_sqlite_pragmas)
+        return engine
+
+    return create_engine(
+        db_url,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds,
+        pool_recycle=settings.db_pool_recycle_seconds,
+        pool_pre_ping=True,
+    )
+
+engine = build_engine(settings.db_url)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
 class Base(DeclarativeBase):
     pass
+
+class RequestSessionMiddleware:
+    """Attach one lazily-connected session to each HTTP request as ``request.state.db``.
+
+    Pure ASGI so the session stays open until streaming responses finish, and is
+    shared by the other middlewares and the route dependencies via ``get_db``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        db = SessionLocal()
+        scope.setdefault("state", {})["db"] = db
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            db.close()
+
+def get_db(request: Request):
+    """FastAPI dependency yielding the request-scoped session.
+
+    Falls back to a private session when ``RequestSessionMiddleware`` is not
+    installed (e.g. a router mounted on a bare app in a script).
+    """
+    db = getattr(request.state, "db", None)
+    if db is not None:
+        try:
+            yield db
+        except Exception:
+            db.rollback()
+            raise
+        return
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
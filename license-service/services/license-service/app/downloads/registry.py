@@ -0,0 +1,132 @@
+from __future__ import annotations
+import hashlib
+import json
+import threading
+from collections import OrderedDict, defaultdict
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+ADMIN_ROLES = frozenset({"admin", "synerex_admin"})
+LISTING_CACHE_SIZE = 256
+
+class RegistryIndex:
+    """Parsed download registry with lookup indexes.
+
+    Mirrors ``_doc_allowed`` in routes/downloads.py: a listing is the
+    intersection of the program, role, entitlement and lifecycle sets instead
+    of a scan over every document.
+    """
+
+    def __init__(self, data: Dict[str, Any], digest: str):
+        self.data = data
+        self.digest = digest
+        self.documents: List[Dict[str, Any]] = list(data.get("documents", []) or [])
+        self.by_id: Dict[str, Dict[str, Any]] = {}
+
+        self._approved: Set[int] = set()
+        self._retired: Set[int] = set()
+        self._any_program: Set[int] = set()
+        self._by_program: Dict[str, Set[int]] = defaultdict(set)
+        self._any_role: Set[int] = set()
+        self._by_role: Dict[str, Set[int]] = defaultdict(set)
+        self._no_requirements: Set[int] = set()
+        self._required_count: Dict[int, int] = {}
+        self._by_required_feature: Dict[str, Set[int]] = defaultdict(set)
+
+        for pos, doc in enumerate(self.documents):
+            doc_id = doc.get("id")
+            if doc_id is not None and doc_id not in self.by_id:
+                self.by_id[doc_id] = doc
+
+            lifecycle = doc.get("lifecycle", "approved")
+            if lifecycle == "approved":
+                self._approved.add(pos)
+            elif lifecycle == "retired":
+                self._retired.add(pos)
+
+            programs = set(doc.get("programs", []) or [])
+            if not programs:
+                self._any_program.add(pos)
+            for program in programs:
+                self._by_program[program].add(pos)
+
+            allowed_roles = set(doc.get("allowed_roles", []) or [])
+            if not allowed_roles:
+                self._any_role.add(pos)
+            for role in allowed_roles:
+                self._by_role[role].add(pos)
+
+            required = set(doc.get("required_entitlements", []) or [])
+            if not required:
+                self._no_requirements.add(pos)
+            else:
+                self._required_count[pos] = len(required)
+                for feature in required:
+                    self._by_required_feature[feature].add(pos)
+
+        self._listing_cache: "OrderedDict[Tuple[str, FrozenSet[str], FrozenSet[str]], List[Dict[str, Any]]]" = OrderedDict()
+        self._listing_lock = threading.Lock()
+
+    def allowed_documents(self, program_id: str, roles: Set[str], features: Set[str]) -> List[Dict[str, Any]]:
+        """Documents visible to a license, in registry order."""
+        key = (program_id, frozenset(roles), frozenset(features))
+        with self._listing_lock:
+            cached = self._listing_cache.get(key)
+            if cached is not None:
+                self._listing_cache.move_to_end(key)
+                return cached
+
+        lifecycle = self._approved | self._retired if not ADMIN_ROLES.isdisjoint(roles) else self._approved
+        program = self._any_program | self._by_program.get(program_id, set())
+        role = set(self._any_role)
+        for r in roles:
+            role |= self._by_role.get(r, set())
+
+        entitled = set(self._no_requirements)
+        matched: Dict[int, int] = defaultdict(int)
+        for feature in features:
+            for pos in self._by_required_feature.get(feature, ()):
+                matched[pos] += 1
+        entitled.update(pos for pos, count in matched.items() if count == self._required_count[pos])
+
+        docs = [self.documents[pos] for pos in sorted(lifecycle & program & role & entitled)]
+        with self._listing_lock:
+            self._listing_cache[key] = docs
+            while len(self._listing_cache) > LISTING_CACHE_SIZE:
+                self._listing_cache.popitem(last=False)
+        return docs
+
+    def listing_etag(self, program_id: str, roles: Set[str], features: Set[str]) -> str:
+        """Weak ETag for a listing: changes when the registry or the license's access changes."""
+        scope = json.dumps([program_id, sorted(roles), sorted(features)])
+        return 'W/"%s-%s"' % (self.digest[:16], hashlib.sha256(scope.encode("utf-8")).hexdigest()[:16])
+
+class RegistryCache:
+    """Registry index reloaded only when registry.json's mtime or size changes."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._signature: Optional[Tuple[int, int]] = None
+        self._index: Optional[RegistryIndex] = None
+        self._lock = threading.Lock()
+
+    def get(self) -> RegistryIndex:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            with self._lock:
+                self._signature, self._index = None, RegistryIndex({"documents": []}, hashlib.sha256(b"").hexdigest())
+                return self._index
+
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if self._index is not None and self._signature == signature:
+                return self._index
+            raw = self.path.read_bytes()
+            self._index = RegistryIndex(json.loads(raw.decode("utf-8")), hashlib.sha256(raw).hexdigest())
+            self._signature = signature
+            return self._index
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._signature, self._index = None, None
@@ -1,11 +1,144 @@
 from __future__ import annotations
 import io
+import re
+import threading
+import tempfile
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import Optional
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
 
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import ArrayObject, DecodedStreamObject, DictionaryObject, NameObject
+
+SOURCE_CACHE_MAX_DOCS = 32
+STREAM_CHUNK_BYTES = 256 * 1024
+SPOOL_MAX_BYTES = 8 * 1024 * 1024  # Larger outputs spill to a temp file
+
+class SourcePdfCache:
+    """Parsed source PDFs keyed by path, invalidated when mtime or size changes.
+
+    Readers are never modified (pages are cloned into each output writer), but
+    PdfReader reads lazily from a shared stream, so each entry carries a lock
+    that is held while a request clones pages out of it.
+    """
+
+    def __init__(self, max_docs: int = SOURCE_CACHE_MAX_DOCS):
+        self._max_docs = max_docs
+        self._entries: "OrderedDict[str, Tuple[Tuple[int, int], PdfReader, threading.Lock]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: Path) -> Tuple[PdfReader, threading.Lock]:
+        stat = path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        key = str(path)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == signature:
+                self._entries.move_to_end(key)
+                return entry[1], entry[2]
+
+        reader = PdfReader(io.BytesIO(path.read_bytes()))
+        lock = threading.Lock()
+        with self._lock:
+            self._entries[key] = (signature, reader, lock)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_docs:
+                self._entries.popitem(last=False)
+        return reader, lock
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+source_pdf_cache = SourcePdfCache()
+
+def _stamp_text(*, recipient_type: str, recipient_id: str, version: str, program_id: str, role: str, license_id: str, doc_id: str) -> str:
+    return (
+        f"SYNEREX CONFIDENTIAL | doc:{doc_id} | v{version} | "
+        f"{recipient_type.upper()}:{recipient_id} | program:{program_id} | role:{role} | "
+        f"license:{license_id} | {datetime.now(timezone.utc).replace(microsecond=0).isoformat()}Z"
+    )
+
+def _render_overlay(stamp: str) -> Tuple[bytes, Dict[str, DictionaryObject]]:
+    """Render the stamp once with ReportLab; return its content stream and fonts.
+
+    Font resource names are prefixed so they cannot collide with the page's own.
+    """
+    packet = io.BytesIO()
+    c = canvas.Canvas(packet, pagesize=letter)
+    c.setFont("Helvetica", 8)
+    c.setFillGray(0.7)
+    c.drawString(40, 20, stamp)
+    c.save()
+
+    page = PdfReader(io.BytesIO(packet.getvalue())).pages[0]
+    content = page.get_contents().get_data()
+    fonts = {}
+    page_fonts = page["/Resources"].get_object().get("/Font")
+    if page_fonts is not None:
+        for name, font in page_fonts.get_object().items():
+            renamed = "/SyxWm" + name[1:]
+            content = re.sub(re.escape(name.encode()) + rb"(?=[\s/\[<(])", renamed.encode(), content)
+            fonts[renamed] = font.get_object()
+    return content, fonts
+
+def _stamped_writer(reader: PdfReader, stamp: str, reader_lock: Optional[threading.Lock] = None) -> PdfWriter:
+    """Clone every page of ``reader`` into a new writer with the stamp appended.
+
+    The overlay is added as one shared content stream referenced from every
+    page (wrapped so the page's own graphics state cannot leak into it), which
+    avoids PyPDF2's per-page content-stream re-parse in ``merge_page``.
+    """
+    content, fonts = _render_overlay(stamp)
+    writer = PdfWriter()
+
+    push = DecodedStreamObject()
+    push.set_data(b"q\n")
+    push_ref = writer._add_object(push)
+    overlay = DecodedStreamObject()
+    overlay.set_data(b"\nQ\n" + content)
+    overlay_ref = writer._add_object(overlay)
+    font_refs = {}
+    for name, font in fonts.items():
+        cloned = font.clone(writer)
+        ref = getattr(cloned, "indirect_reference", None)
+        font_refs[name] = ref if ref is not None and ref.pdf is writer else writer._add_object(cloned)
+
+    if reader_lock is not None:
+        reader_lock.acquire()
+    try:
+        pages = [writer.add_page(page) for page in reader.pages]
+    finally:
+        if reader_lock is not None:
+            reader_lock.release()
+
+    for page in pages:
+        contents = page.get("/Contents")
+        if contents is None:
+            items = []
+        elif isinstance(contents.get_object(), ArrayObject):
+            items = list(contents.get_object())
+        else:
+            items = [contents]
+        page[NameObject("/Contents")] = ArrayObject([push_ref, *items, overlay_ref])
+
+        resources = page.get("/Resources")
+        if resources is None:
+            resources = DictionaryObject()
+            page[NameObject("/Resources")] = resources
+        resources = resources.get_object()
+        page_fonts = resources.get("/Font")
+        if page_fonts is None:
+            page_fonts = DictionaryObject()
+            resources[NameObject("/Font")] = page_fonts
+        page_fonts = page_fonts.get_object()
+        for name, ref in font_refs.items():
+            page_fonts[NameObject(name)] = ref
+
+    return writer
 
 def watermark_pdf_bytes(
     input_pdf_bytes: bytes,
@@ -19,27 +152,51 @@ def watermark_pdf_bytes(
     doc_id: str,
 ) -> bytes:
     reader = PdfReader(io.BytesIO(input_pdf_bytes))
-    writer = PdfWriter()
+    stamp = _stamp_text(
+        recipient_type=recipient_type, recipient_id=recipient_id, version=version,
+        program_id=program_id, role=role, license_id=license_id, doc_id=doc_id,
+    )
+    out = io.BytesIO()
+    _stamped_writer(reader, stamp).write(out)
+    return out.getvalue()
 
-    stamp = (
-        f"SYNEREX CONFIDENTIAL | doc:{doc_id} | v{version} | "
-        f"{recipient_type.upper()}:{recipient_id} | program:{program_id} | role:{role} | "
-        f"license:{license_id} | {datetime.now(timezone.utc).replace(microsecond=0).isoformat()}Z"
+def watermark_pdf_file(
+    path: Path,
+    *,
+    recipient_type: str,
+    recipient_id: str,
+    version: str,
+    program_id: str,
+    role: str,
+    license_id: str,
+    doc_id: str,
+) -> Tuple[Iterator[bytes], int]:
+    """Watermark a cached source PDF; return a chunk iterator and the byte length."""
+    reader, reader_lock = source_pdf_cache.get(path)
+    stamp = _stamp_text(
+        recipient_type=recipient_type, recipient_id=recipient_id, version=version,
+        program_id=program_id, role=role, license_id=license_id, doc_id=doc_id,
     )
+    writer = _stamped_writer(reader, stamp, reader_lock)
 
-    for page in reader.pages:
-        packet = io.BytesIO()
-        c = canvas.Canvas(packet, pagesize=letter)
-        c.setFont("Helvetica", 8)
-        c.setFillGray(0.7)
-        c.drawString(40, 20, stamp)
-        c.save()
-        packet.seek(0)
+    spool = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    writer.write(spool)
+    length = spool.tell()
+    spool.seek(0)
+    return _iter_file(spool), length
 
-        wm = PdfReader(packet).pages[0]
-        page.merge_page(wm)
-        writer.add_page(page)
+def iter_file_chunks(path: Path) -> Tuple[Iterator[bytes], int]:
+    """Stream an unwatermarked file; return a chunk iterator and the byte length."""
+    def chunks() -> Iterator[bytes]:
+        yield from _iter_file(open(path, "rb"))
+    return chunks(), path.stat().st_size
 
-    out = io.BytesIO()
-    writer.write(out)
-    return out.getvalue()
+def _iter_file(fh) -> Iterator[bytes]:
+    try:
+        while True:
+            chunk = fh.read(STREAM_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        fh.close()
@@ -1,12 +1,13 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Depends
 from fastapi.responses import RedirectResponse, FileResponse, HTMLResponse, JSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.sessions import SessionMiddleware
 from starlette.requests import Request
+from sqlalchemy.orm import Session
 from pathlib import Path
 from .config import settings
-from .db import Base, engine
+from .db import Base, engine, RequestSessionMiddleware, get_db
 # Import all models to ensure they're registered
 from .models import (
     org, license as license_model, authorization, api_key, 
@@ -30,10 +31,24 @@ from .routes.exports import router as exports_router
 from .routes.access import router as access_router
 from .admin.ui import router as admin_router
 
+from .services.webhooks import ensure_webhook_delivery_schema
+from .services.webhook_worker import webhook_worker
+
 Base.metadata.create_all(bind=engine)
+ensure_webhook_delivery_schema(engine)
 
 app = FastAPI(title="License Service")
 
+@app.on_event("startup")
+def start_background_workers():
+    """Start the webhook delivery worker so queued deliveries are sent off the request path."""
+    if settings.webhook_worker_enabled:
+        webhook_worker.start()
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    webhook_worker.stop()
+
 # Add CORS middleware BEFORE other middleware
 app.add_middleware(
     CORSMiddleware,
@@ -57,6 +72,9 @@ if settings.enable_usage_tracking:
 from .middleware.rate_limit import RateLimitMiddleware
 app.add_middleware(RateLimitMiddleware)
 
+# Outermost: one pooled session per request, shared by middleware and routes via get_db
+app.add_middleware(RequestSessionMiddleware)
+
 # Add exception handler for 401 errors to prevent redirect loops
 @app.exception_handler(HTTPException)
 def unauthorized_handler(request: Request, exc: HTTPException):
@@ -96,83 +114,44 @@ app.include_router(access_router)
 
 # Auth endpoint for website MyAccount page
 @app.get("/auth/api/check-session")
-def check_session(request: Request):
+def check_session(request: Request, db: Session = Depends(get_db)):
     """
     Check session and return user info.
     Used by website MyAccount page.
     Supports both user login sessions and admin sessions.
     """
-    from .db import SessionLocal
     from .models.org import Organization
     from .models.user import User
     
-    db = SessionLocal()
-    try:
-        # Check for user login session first
-        username = request.session.get("username")
-        user_logged_in = request.session.get("user_logged_in", False)
-        
-        if user_logged_in and username:
-            # User is logged in via client login
-            user = db.get(User, username)
-            if not user or not user.is_active:
-                return JSONResponse(
-                    status_code=401,
-                    content={"authenticated": False, "message": "User session invalid"}
-                )
-            
-            org = db.get(Organization, user.org_id)
-            if not org:
-                return JSONResponse(
-                    status_code=404,
-                    content={"authenticated": False, "message": "Organization not found"}
-                )
-            
-            # Build response for logged-in user
-            response = {
-                "authenticated": True,
-                "user_type": "client",
-                "username": username,
-                "org_id": org.org_id,
-                "org_name": org.org_name,
-                "org_type": org.org_type,
-                "email": user.email
-            }
-            
-            # Add PE-specific fields if org_type is 'pe'
-            if org.org_type == "pe":
-                response["user_type"] = "licensed_pe"
-                response["pe_approval_status"] = org.pe_approval_status or "pending"
-                response["pe_license_number"] = org.pe_license_number
-                response["pe_license_state"] = org.pe_license_state
-                response["pe_linked_org_id"] = org.pe_linked_org_id
-            
-            return response
-        
-        # Fallback: Check for org_id in session (legacy or admin sessions)
-        org_id = request.session.get("org_id") or request.query_params.get("org_id")
-        
-        if not org_id:
+    # Check for user login session first
+    username = request.session.get("username")
+    user_logged_in = request.session.get("user_logged_in", False)
+    
+    if user_logged_in and username:
+        # User is logged in via client login
+        user = db.get(User, username)
+        if not user or not user.is_active:
             return JSONResponse(
                 status_code=401,
-                content={"authenticated": False, "message": "No session found"}
+                content={"authenticated": False, "message": "User session invalid"}
             )
         
-        # Get organization
-        org = db.get(Organization, org_id)
+        org = db.get(Organization, user.org_id)
         if not org:
             return JSONResponse(
                 status_code=404,
                 content={"authenticated": False, "message": "Organization not found"}
             )
         
-        # Build response based on org_type
+        # Build response for logged-in user
         response = {
             "authenticated": True,
+            "user_type": "client",
+            "username": username,
             "org_id": org.org_id,
             "org_name": org.org_name,
             "org_type": org.org_type,
-            "email": org.email
+            "email": user.email
         }
         
         # Add PE-specific fields if org_type is 'pe'
@@ -184,8 +163,42 @@ def check_session(request: Request):
             response["pe_linked_org_id"] = org.pe_linked_org_id
         
         return response
-    finally:
-        db.close()
+    
+    # Fallback: Check for org_id in session (legacy or admin sessions)
+    org_id = request.session.get("org_id") or request.query_params.get("org_id")
+    
+    if not org_id:
+        return JSONResponse(
+            status_code=401,
+            content={"authenticated": False, "message": "No session found"}
+        )
+    
+    # Get organization
+    org = db.get(Organization, org_id)
+    if not org:
+        return JSONResponse(
+            status_code=404,
+            content={"authenticated": False, "message": "Organization not found"}
+        )
+    
+    # Build response based on org_type
+    response = {
+        "authenticated": True,
+        "org_id": org.org_id,
+        "org_name": org.org_name,
+        "org_type": org.org_type,
+        "email": org.email
+    }
+    
+    # Add PE-specific fields if org_type is 'pe'
+    if org.org_type == "pe":
+        response["user_type"] = "licensed_pe"
+        response["pe_approval_status"] = org.pe_approval_status or "pending"
+        response["pe_license_number"] = org.pe_license_number
+        response["pe_license_state"] = org.pe_license_state
+        response["pe_linked_org_id"] = org.pe_linked_org_id
+    
+    return response
 
 @app.get("/")
 def root():
@@ -222,7 +235,7 @@ def debug_eft_config():
     }
 
 @app.post("/api/server/restart")
-def api_server_restart(request: Request):
+def api_server_restart(request: Request, db: Session = Depends(get_db)):
     """
     API endpoint to restart the License Service. Returns JSON for cross-origin calls.
     Uses session-based authentication only (same as other admin endpoints).
@@ -240,13 +253,11 @@ def api_server_restart(request: Request):
             content={"success": False, "message": "Not authenticated. Please log in as admin at /admin/login first."}
         )
     
-    from .db import SessionLocal
     from .admin.ui import log_event
     import platform
     import subprocess
     from pathlib import Path
     
-    db = SessionLocal()
     try:
         log_event(db, actor="admin", action="server.restart", ref_id="server", detail={"method": "api_call", "source": "website_dashboard"})
         
@@ -275,13 +286,10 @@ def api_server_restart(request: Request):
             status_code=500,
             content={"success": False, "message": f"Restart failed: {str(e)}"}
         )
-    finally:
-        db.close()
 
 @app.get("/api/stats")
-def get_stats():
+def get_stats(db: Session = Depends(get_db)):
     """Get system statistics and counts."""
-    from .db import SessionLocal
     from .models.org import Organization
     from .models.api_key import ApiKey
     from .models.authorization import ProgramAuthorization
@@ -289,7 +297,6 @@ def get_stats():
     from .models.seats import SeatAssignment
     from .models.billing import BillingOrder
     
-    db = SessionLocal()
     try:
         # Wrap queries in try/except to handle potential database errors gracefully
         try:
@@ -379,8 +386,6 @@ def get_stats():
                 "billing_orders_paid": 0,
             }
         )
-    finally:
-        db.close()
 
 # Mount static files - must be after all routes
 STATIC_DIR = Path(__file__).resolve().parent.parent / "static"
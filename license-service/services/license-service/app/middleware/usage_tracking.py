@@ -32,7 +32,9 @@ class UsageTrackingMiddleware(BaseHTTPMiddleware):
         
         # Track API call
         if license_id and request.url.path.startswith("/api/"):
-            db = SessionLocal()
+            # Reuse the request-scoped session from RequestSessionMiddleware when present
+            shared = getattr(request.state, "db", None)
+            db = shared if shared is not None else SessionLocal()
             try:
                 event = UsageEvent(
                     license_id=license_id,
@@ -50,9 +52,11 @@ class UsageTrackingMiddleware(BaseHTTPMiddleware):
                 db.add(event)
                 db.commit()
             except Exception as e:
+                db.rollback()
                 print(f"[USAGE TRACKING ERROR] {e}")
             finally:
-                db.close()
+                if shared is None:
+                    db.close()
         
         response = await call_next(request)
         return response
@@ -8,7 +8,7 @@ from starlette.requests import Request
 from sqlalchemy.orm import Session
 from pathlib import Path
 
-from ..db import SessionLocal
+from ..db import get_db
 from ..models.license import License
 from ..models.org import Organization
 from ..models.authorization import ProgramAuthorization
@@ -24,13 +24,6 @@ router = APIRouter(prefix="/access", tags=["access"])
 TEMPLATES_DIR = Path(__file__).resolve().parents[1] / "admin" / "templates"
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 
-def db_session():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 KEYS_DIR = Path(__file__).resolve().parents[2] / "keys"
 PUB = load_public_key(KEYS_DIR / "issuer_public.key")
 
@@ -46,7 +39,7 @@ def access_program(
     request: Request,
     license_id: Optional[str] = Query(None),
     token: Optional[str] = Query(None),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """
     Access gateway page for EM&V or Tracking programs.
@@ -106,7 +99,7 @@ def verify_and_redirect(
     program_id: str,
     request: Request,
     license_id: str = Form(...),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """
     Verify license and generate session token, then redirect to program.
@@ -234,7 +227,7 @@ def verify_and_redirect(
 @router.post("/api/validate-session-token")
 async def validate_session_token_endpoint(
     body: Dict[str, Any] = Body(...),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """
     Validate a session token and return license information.
@@ -306,7 +299,7 @@ async def validate_session_token_endpoint(
         )
 
 @router.get("/auth/api/check-session")
-def check_session(request: Request, db: Session = Depends(db_session)):
+def check_session(request: Request, db: Session = Depends(get_db)):
     """
     Check session and return user info.
     Used by website MyAccount page.
@@ -5,7 +5,7 @@ import json
 from fastapi import APIRouter, Depends, HTTPException, Query, Body
 from sqlalchemy.orm import Session
 from sqlalchemy import func
-from ..db import SessionLocal
+from ..db import get_db
 from ..models.license import License
 from ..models.usage import UsageEvent
 from ..models.billing import BillingOrder
@@ -15,19 +15,12 @@ from ..admin.ui import require_admin
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
-def db_session():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("/revenue")
 def revenue_report(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
     _=Depends(require_admin),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """Get revenue report."""
     query = db.query(Payment).filter(Payment.status == "completed")
@@ -62,7 +55,7 @@ def usage_report(
     start_date: Optional[str] = Query(None),
     end_date: Optional[str] = Query(None),
     _=Depends(require_admin),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """Get usage analytics."""
     query = db.query(UsageEvent)
@@ -108,7 +101,7 @@ def usage_report(
 def get_license_users(
     license_id: str,
     _=Depends(require_admin),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """
     Get list of users who have logged in with a specific license.
@@ -162,7 +155,7 @@ def get_license_users(
     }
 
 @router.get("/license-utilization")
-def license_utilization(_=Depends(require_admin), db: Session = Depends(db_session)):
+def license_utilization(_=Depends(require_admin), db: Session = Depends(get_db)):
     """Get license utilization metrics."""
     total = db.query(License).count()
     active = db.query(License).filter(License.revoked == False, License.suspended == False).count()
@@ -196,7 +189,7 @@ def track_usage(
     event_type: str = Body("feature_usage"),
     metadata: Optional[Dict[str, Any]] = Body(None),
     ip_address: Optional[str] = Body(None),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """
     Track feature usage by user.
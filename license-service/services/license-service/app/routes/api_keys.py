@@ -4,7 +4,7 @@ from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from ..db import SessionLocal
+from ..db import get_db
 from ..models.api_key import ApiKey
 from ..models.org import Organization
 from ..auth.api_keys import create_api_key
@@ -12,20 +12,13 @@ from ..audit.events import log_event
 
 router = APIRouter(prefix="/api", tags=["api-keys"])
 
-def db_session():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("/api-keys")
 def list_api_keys(
     org_id: Optional[str] = Query(None, description="Filter by organization ID"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
     offset: int = Query(0, ge=0, description="Number of results to skip"),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """List all API keys with optional filtering."""
     query = db.query(ApiKey)
@@ -51,7 +44,7 @@ def list_api_keys(
     }
 
 @router.get("/api-keys/{key_id}")
-def get_api_key(key_id: str, db: Session = Depends(db_session)):
+def get_api_key(key_id: str, db: Session = Depends(get_db)):
     """Get a single API key (metadata only, raw key is never returned)."""
     rec = db.get(ApiKey, key_id)
     if not rec:
@@ -64,7 +57,7 @@ def get_api_key(key_id: str, db: Session = Depends(db_session)):
     }
 
 @router.post("/api-keys/issue")
-def issue_api_key(org_id: str, scopes_csv: str, db: Session = Depends(db_session)):
+def issue_api_key(org_id: str, scopes_csv: str, db: Session = Depends(get_db)):
     """Issue a new API key."""
     org = db.get(Organization, org_id)
     if not org:
@@ -88,7 +81,7 @@ def issue_api_key(org_id: str, scopes_csv: str, db: Session = Depends(db_session
     return {"key_id": key_id, "org_id": org_id, "scopes": scopes_csv, "api_key": raw}
 
 @router.post("/api-keys/{key_id}/disable")
-def disable_api_key(key_id: str, db: Session = Depends(db_session)):
+def disable_api_key(key_id: str, db: Session = Depends(get_db)):
     """Disable an API key."""
     rec = db.get(ApiKey, key_id)
     if not rec:
@@ -99,7 +92,7 @@ def disable_api_key(key_id: str, db: Session = Depends(db_session)):
     return {"ok": True}
 
 @router.post("/api-keys/{key_id}/enable")
-def enable_api_key(key_id: str, db: Session = Depends(db_session)):
+def enable_api_key(key_id: str, db: Session = Depends(get_db)):
     """Re-enable a disabled API key."""
     rec = db.get(ApiKey, key_id)
     if not rec:
@@ -110,7 +103,7 @@ def enable_api_key(key_id: str, db: Session = Depends(db_session)):
     return {"ok": True, "key_id": key_id, "is_active": True}
 
 @router.delete("/api-keys/{key_id}")
-def delete_api_key(key_id: str, db: Session = Depends(db_session)):
+def delete_api_key(key_id: str, db: Session = Depends(get_db)):
     """Delete an API key permanently."""
     rec = db.get(ApiKey, key_id)
     if not rec:
@@ -5,19 +5,12 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 
-from ..db import SessionLocal
+from ..db import get_db
 from ..models.audit import AuditEvent
 from ..auth.api_keys import require_api_key
 
 router = APIRouter(prefix="/api/audit", tags=["audit-api"])
 
-def db_session():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("/events")
 def list_events(
     actor: Optional[str] = Query(None, description="Filter by actor"),
@@ -28,7 +21,7 @@ def list_events(
     limit: int = Query(200, ge=1, le=1000, description="Maximum number of results"),
     offset: int = Query(0, ge=0, description="Number of results to skip"),
     api_key = Depends(require_api_key({"utility:read"})),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """List audit events with optional filtering."""
     query = db.query(AuditEvent)
@@ -73,7 +66,7 @@ def list_events(
 def get_event(
     event_id: int,
     api_key = Depends(require_api_key({"utility:read"})),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """Get a single audit event by ID."""
     # Note: This assumes AuditEvent has an 'id' field. Adjust if using a different primary key.
@@ -8,7 +8,7 @@ from starlette.requests import Request
 from sqlalchemy.orm import Session
 from pathlib import Path
 
-from ..db import SessionLocal
+from ..db import get_db
 from ..models.user import User
 from ..models.org import Organization
 
@@ -18,13 +18,6 @@ router = APIRouter(prefix="/auth", tags=["auth"])
 TEMPLATES_DIR = Path(__file__).resolve().parents[1] / "admin" / "templates"
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 
-def db_session():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 def _is_user_logged_in(request: Request) -> bool:
     """Check if user is logged in."""
     try:
@@ -81,7 +74,7 @@ def client_login_submit(
     request: Request,
     username: str = Form(...),
     password: str = Form(...),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """Handle client login."""
     return_url = request.query_params.get("return_url", "")
@@ -4,7 +4,7 @@ from datetime import datetime, timedelta, date
 from pathlib import Path
 from fastapi import APIRouter, Depends, HTTPException, Query, Body
 from sqlalchemy.orm import Session
-from ..db import SessionLocal
+from ..db import get_db
 from ..models.authorization import ProgramAuthorization
 from ..models.license import License
 from ..models.org import Organization
@@ -17,13 +17,6 @@ from ..licensing import build_license_payload, sign_license
 
 router = APIRouter(prefix="/api/programs", tags=["authorizations"])
 
-def db_session():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 PRIV = load_private_key(Path(__file__).resolve().parents[2] / "keys" / "issuer_private.key")
 
 @router.get("/{program_id}/authorizations")
@@ -33,7 +26,7 @@ def list_authorizations(
     status: Optional[str] = Query(None, description="Filter by status (active, suspended, terminated)"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
     offset: int = Query(0, ge=0, description="Number of results to skip"),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """List authorizations for a program with optional filtering."""
     if program_id not in ("emv", "tracking"):
@@ -68,7 +61,7 @@ def list_authorizations(
     }
 
 @router.get("/{program_id}/authorizations/{authorization_id}")
-def get_authorization(program_id: str, authorization_id: str, db: Session = Depends(db_session)):
+def get_authorization(program_id: str, authorization_id: str, db: Session = Depends(get_db)):
     """Get a single authorization by ID."""
     if program_id not in ("emv", "tracking"):
         raise HTTPException(400, "program_id must be emv or tracking")
@@ -92,7 +85,7 @@ def get_authorization(program_id: str, authorization_id: str, db: Session = Depe
     }
 
 @router.post("/{program_id}/authorizations")
-def create_authorization(program_id: str, body: dict, db: Session = Depends(db_session)):
+def create_authorization(program_id: str, body: dict, db: Session = Depends(get_db)):
     if program_id not in ("emv","tracking"):
         raise HTTPException(400, "program_id must be emv or tracking")
     auth_id = body.get("authorization_id")
@@ -124,7 +117,7 @@ def create_authorization(program_id: str, body: dict, db: Session = Depends(db_s
     return {"ok": True, "authorization_id": auth_id}
 
 @router.post("/{program_id}/authorizations/{authorization_id}/issue-license")
-def issue_from_authorization(program_id: str, authorization_id: str, db: Session = Depends(db_session)):
+def issue_from_authorization(program_id: str, authorization_id: str, db: Session = Depends(get_db)):
     auth = db.get(ProgramAuthorization, authorization_id)
     if not auth or auth.program_id != program_id:
         raise HTTPException(404, "Authorization not found")
@@ -204,7 +197,7 @@ def update_authorization(
     program_id: str,
     authorization_id: str,
     body: Dict[str, Any] = Body(...),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """Update an authorization."""
     if program_id not in ("emv", "tracking"):
@@ -246,7 +239,7 @@ def update_authorization(
     return {"ok": True, "authorization_id": authorization_id}
 
 @router.post("/{program_id}/authorizations/{authorization_id}/suspend")
-def suspend_authorization(program_id: str, authorization_id: str, reason: str = "admin_action", db: Session = Depends(db_session)):
+def suspend_authorization(program_id: str, authorization_id: str, reason: str = "admin_action", db: Session = Depends(get_db)):
     """Suspend an authorization."""
     if program_id not in ("emv", "tracking"):
         raise HTTPException(400, "program_id must be emv or tracking")
@@ -261,7 +254,7 @@ def suspend_authorization(program_id: str, authorization_id: str, reason: str =
     return {"ok": True, "authorization_id": authorization_id, "status": "suspended"}
 
 @router.post("/{program_id}/authorizations/{authorization_id}/activate")
-def activate_authorization(program_id: str, authorization_id: str, db: Session = Depends(db_session)):
+def activate_authorization(program_id: str, authorization_id: str, db: Session = Depends(get_db)):
     """Activate an authorization."""
     if program_id not in ("emv", "tracking"):
         raise HTTPException(400, "program_id must be emv or tracking")
@@ -276,7 +269,7 @@ def activate_authorization(program_id: str, authorization_id: str, db: Session =
     return {"ok": True, "authorization_id": authorization_id, "status": "active"}
 
 @router.post("/{program_id}/authorizations/{authorization_id}/terminate")
-def terminate_authorization(program_id: str, authorization_id: str, reason: str = "admin_action", db: Session = Depends(db_session)):
+def terminate_authorization(program_id: str, authorization_id: str, reason: str = "admin_action", db: Session = Depends(get_db)):
     """Terminate an authorization."""
     if program_id not in ("emv", "tracking"):
         raise HTTPException(400, "program_id must be emv or tracking")
@@ -295,7 +288,7 @@ def delete_authorization(
     program_id: str,
     authorization_id: str,
     force: bool = Query(False, description="Force delete even if licenses exist"),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """Delete an authorization. Checks for related licenses unless force=true."""
     if program_id not in ("emv", "tracking"):
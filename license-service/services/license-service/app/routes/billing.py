@@ -6,7 +6,7 @@ from typing import Any, Dict, Optional
 from fastapi import APIRouter, Depends, HTTPException, Query, Body
 from sqlalchemy.orm import Session
 
-from ..db import SessionLocal
+from ..db import get_db
 from ..models.billing import BillingOrder
 from ..models.authorization import ProgramAuthorization
 from ..models.license import License
@@ -15,13 +15,6 @@ from ..licensing.issuer import issue_license_record
 
 router = APIRouter(prefix="/admin/billing", tags=["billing"])
 
-def db_session():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 def _today_iso():
     return datetime.utcnow().date().isoformat()
 
@@ -32,7 +25,7 @@ def list_orders(
     status: Optional[str] = Query(None, description="Filter by status (pending, paid, overdue)"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
     offset: int = Query(0, ge=0, description="Number of results to skip"),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """List all billing orders with optional filtering."""
     query = db.query(BillingOrder)
@@ -70,7 +63,7 @@ def list_orders(
     }
 
 @router.post("/orders")
-def create_order(body: Dict[str, Any], db: Session = Depends(db_session)):
+def create_order(body: Dict[str, Any], db: Session = Depends(get_db)):
     """Create a billing order (pending) that will gate license issuance/activation."""
     order_id = body.get("order_id")
     if not order_id:
@@ -122,7 +115,7 @@ def create_order(body: Dict[str, Any], db: Session = Depends(db_session)):
     return {"ok": True, "order_id": order_id, "status": rec.status, "due_at": rec.due_at.isoformat()}
 
 @router.get("/orders/{order_id}")
-def get_order(order_id: str, db: Session = Depends(db_session)):
+def get_order(order_id: str, db: Session = Depends(get_db)):
     """Get a single billing order."""
     rec = db.get(BillingOrder, order_id)
     if not rec:
@@ -150,7 +143,7 @@ def get_order(order_id: str, db: Session = Depends(db_session)):
 def update_order(
     order_id: str,
     body: Dict[str, Any] = Body(...),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """Update a billing order."""
     order = db.get(BillingOrder, order_id)
@@ -184,7 +177,7 @@ def update_order(
 def delete_order(
     order_id: str,
     force: bool = Query(False, description="Force delete even if paid"),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """Delete a billing order."""
     order = db.get(BillingOrder, order_id)
@@ -200,7 +193,7 @@ def delete_order(
     return {"ok": True, "order_id": order_id}
 
 @router.post("/orders/{order_id}/mark-paid")
-def mark_paid_and_issue(order_id: str, body: Dict[str, Any] = {}, db: Session = Depends(db_session)):
+def mark_paid_and_issue(order_id: str, body: Dict[str, Any] = {}, db: Session = Depends(get_db)):
     """Mark order as paid and issue (or activate) the license. Only call this after payment has been verified and cleared."""
     from ..models.payment import Payment
     
@@ -284,7 +277,7 @@ def mark_paid_and_issue(order_id: str, body: Dict[str, Any] = {}, db: Session =
     return {"ok": True, "order_id": order_id, "status": "paid", "license": signed}
 
 @router.post("/payments/{payment_id}/verify")
-def verify_payment_and_issue_license(payment_id: str, body: Dict[str, Any] = {}, db: Session = Depends(db_session)):
+def verify_payment_and_issue_license(payment_id: str, body: Dict[str, Any] = {}, db: Session = Depends(get_db)):
     """
     Verify a payment (mark as completed) and issue license.
     This is used for EFT payments or when manually verifying credit card/PayPal payments.
@@ -323,7 +316,7 @@ def verify_payment_and_issue_license(payment_id: str, body: Dict[str, Any] = {},
     return mark_paid_and_issue(payment.order_id, body, db)
 
 @router.post("/orders/{order_id}/mark-overdue")
-def mark_overdue_and_suspend(order_id: str, reason: str = "nonpayment", db: Session = Depends(db_session)):
+def mark_overdue_and_suspend(order_id: str, reason: str = "nonpayment", db: Session = Depends(get_db)):
     order = db.get(BillingOrder, order_id)
     if not order:
         raise HTTPException(404, "Not found")
@@ -344,7 +337,7 @@ def mark_overdue_and_suspend(order_id: str, reason: str = "nonpayment", db: Sess
     return {"ok": True, "order_id": order_id, "status": "overdue"}
 
 @router.post("/run-suspension-scan")
-def run_suspension_scan(db: Session = Depends(db_session)):
+def run_suspension_scan(db: Session = Depends(get_db)):
     """Automation endpoint: scan pending orders past due_at and suspend linked licenses."""
     now = datetime.utcnow()
     orders = db.query(BillingOrder).filter(BillingOrder.status == "pending").all()
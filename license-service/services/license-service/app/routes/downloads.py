@@ -4,13 +4,14 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional, Set
 
 from fastapi import APIRouter, Header, HTTPException, Request, Body, Depends
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import StreamingResponse, JSONResponse, Response
 from sqlalchemy.orm import Session
 
-from ..db import SessionLocal
+from ..db import get_db
 from ..models.license import License
 from ..audit.events import log_event
-from ..downloads.watermark import watermark_pdf_bytes
+from ..downloads.watermark import watermark_pdf_file, iter_file_chunks
+from ..downloads.registry import RegistryCache
 
 router = APIRouter(prefix="/downloads", tags=["downloads"])
 
@@ -18,17 +19,16 @@ DOWNLOADS_DIR = Path(__file__).resolve().parents[3] / "downloads"
 REGISTRY_PATH = DOWNLOADS_DIR / "registry.json"
 FILES_DIR = Path(__file__).resolve().parents[4] / "governance" / "pdfs"
 
-def db_session():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+registry_cache = RegistryCache(REGISTRY_PATH)
 
 def _load_registry() -> Dict[str, Any]:
-    if not REGISTRY_PATH.exists():
-        return {"documents": []}
-    return json.loads(REGISTRY_PATH.read_text(encoding="utf-8"))
+    """Parsed registry (cached; treat as read-only)."""
+    return registry_cache.get().data
+
+def _save_registry(reg: Dict[str, Any]) -> None:
+    REGISTRY_PATH.parent.mkdir(parents=True, exist_ok=True)
+    REGISTRY_PATH.write_text(json.dumps(reg, indent=2, ensure_ascii=False), encoding="utf-8")
+    registry_cache.invalidate()
 
 def _parse_license_header(x_license: Optional[str]) -> Dict[str, Any]:
     if not x_license:
@@ -105,18 +105,21 @@ def list_downloads(
     roles = _license_roles(lic_payload)
     features = _license_features(lic_payload)
     program_id = _license_program(lic_payload)
-    reg = _load_registry()
+    index = registry_cache.get()
+
+    etag = index.listing_etag(program_id, roles, features)
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
 
     docs = []
-    for d in reg.get("documents", []):
-        if _doc_allowed(d, program_id, roles, features):
-            docs.append({
-                "id": d.get("id"),
-                "filename": d.get("filename"),
-                "version": d.get("version", "1.0"),
-                "category": d.get("category"),
-            })
-    return {"documents": docs}
+    for d in index.allowed_documents(program_id, roles, features):
+        docs.append({
+            "id": d.get("id"),
+            "filename": d.get("filename"),
+            "version": d.get("version", "1.0"),
+            "category": d.get("category"),
+        })
+    return JSONResponse({"documents": docs}, headers={"ETag": etag, "Cache-Control": "private, no-cache"})
 
 @router.get("/{doc_id}")
 def get_document(
@@ -126,77 +129,76 @@ def get_document(
     x_recipient_id: Optional[str] = Header(None),
     x_recipient_type: Optional[str] = Header(None),
     x_role: Optional[str] = Header(None),
+    db: Session = Depends(get_db),
 ):
-    db = SessionLocal()
-    try:
-        lic_payload = _parse_license_header(x_license)
-        rec = _validate_license_online(db, lic_payload)
-
-        roles = _license_roles(lic_payload)
-        features = _license_features(lic_payload)
-        program_id = _license_program(lic_payload)
-
-        reg = _load_registry()
-        doc = next((d for d in reg.get("documents", []) if d.get("id") == doc_id), None)
-        if not doc:
-            raise HTTPException(404, "Document not found")
-
-        if not _doc_allowed(doc, program_id, roles, features):
-            raise HTTPException(403, "Not authorized for this document")
-
-        filename = doc.get("filename")
-        if not filename:
-            raise HTTPException(500, "Registry missing filename")
-
-        src = (FILES_DIR / filename)
-        if not src.exists():
-            raise HTTPException(404, "Document file missing on server")
-
-        pdf_bytes = src.read_bytes()
-
-        # Determine recipient identifiers for watermarking
-        recipient_type = x_recipient_type or ("investor" if "investor" in roles else ("utility" if ("utility" in roles or "regulator" in roles) else ("oem" if "oem" in roles or "oem_engineer" in roles else "customer")))
-        recipient_id = x_recipient_id or _license_org(lic_payload)
-        role = x_role or (next(iter(roles)) if roles else "licensed_user")
-
-        out_bytes = pdf_bytes
-        if bool(doc.get("watermark", True)):
-            out_bytes = watermark_pdf_bytes(
-                pdf_bytes,
-                recipient_type=recipient_type,
-                recipient_id=recipient_id,
-                version=str(doc.get("version", "1.0")),
-                program_id=program_id,
-                role=role,
-                license_id=rec.license_id,
-                doc_id=doc_id,
-            )
-
-        # Audit event
-        actor = _license_user(lic_payload)
-        log_event(
-            db,
-            actor=actor,
-            action="document.download",
-            ref_id=doc_id,
-            detail={
-                "filename": filename,
-                "version": doc.get("version", "1.0"),
-                "category": doc.get("category"),
-                "program_id": program_id,
-                "org_id": _license_org(lic_payload),
-                "roles": sorted(list(roles)),
-                "recipient_type": recipient_type,
-                "recipient_id": recipient_id,
-                "watermarked": bool(doc.get("watermark", True)),
-                "license_id": rec.license_id,
-            },
-        )
+    lic_payload = _parse_license_header(x_license)
+    rec = _validate_license_online(db, lic_payload)
 
-        import io
-        return StreamingResponse(io.BytesIO(out_bytes), media_type="application/pdf", headers={"Content-Disposition": f"inline; filename={filename}"})
-    finally:
-        db.close()
+    roles = _license_roles(lic_payload)
+    features = _license_features(lic_payload)
+    program_id = _license_program(lic_payload)
+
+    doc = registry_cache.get().by_id.get(doc_id)
+    if not doc:
+        raise HTTPException(404, "Document not found")
+
+    if not _doc_allowed(doc, program_id, roles, features):
+        raise HTTPException(403, "Not authorized for this document")
+
+    filename = doc.get("filename")
+    if not filename:
+        raise HTTPException(500, "Registry missing filename")
+
+    src = (FILES_DIR / filename)
+    if not src.exists():
+        raise HTTPException(404, "Document file missing on server")
+
+    # Determine recipient identifiers for watermarking
+    recipient_type = x_recipient_type or ("investor" if "investor" in roles else ("utility" if ("utility" in roles or "regulator" in roles) else ("oem" if "oem" in roles or "oem_engineer" in roles else "customer")))
+    recipient_id = x_recipient_id or _license_org(lic_payload)
+    role = x_role or (next(iter(roles)) if roles else "licensed_user")
+
+    if bool(doc.get("watermark", True)):
+        # Source PDF is parsed once and cached; the stamp is rendered once per request
+        body, length = watermark_pdf_file(
+            src,
+            recipient_type=recipient_type,
+            recipient_id=recipient_id,
+            version=str(doc.get("version", "1.0")),
+            program_id=program_id,
+            role=role,
+            license_id=rec.license_id,
+            doc_id=doc_id,
+        )
+    else:
+        body, length = iter_file_chunks(src)
+
+    # Audit event
+    actor = _license_user(lic_payload)
+    log_event(
+        db,
+        actor=actor,
+        action="document.download",
+        ref_id=doc_id,
+        detail={
+            "filename": filename,
+            "version": doc.get("version", "1.0"),
+            "category": doc.get("category"),
+            "program_id": program_id,
+            "org_id": _license_org(lic_payload),
+            "roles": sorted(list(roles)),
+            "recipient_type": recipient_type,
+            "recipient_id": recipient_id,
+            "watermarked": bool(doc.get("watermark", True)),
+            "license_id": rec.license_id,
+        },
+    )
+
+    return StreamingResponse(
+        body,
+        media_type="application/pdf",
+        headers={"Content-Disposition": f"inline; filename={filename}", "Content-Length": str(length)},
+    )
 
 @router.get("/registry")
 def get_registry():
@@ -207,7 +209,7 @@ def get_registry():
 @router.post("/registry")
 def update_registry(
     body: Dict[str, Any] = Body(...),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """Update the document registry (admin endpoint)."""
     # Validate structure
@@ -215,8 +217,7 @@ def update_registry(
         raise HTTPException(400, "Missing 'documents' field")
     
     # Write updated registry
-    REGISTRY_PATH.parent.mkdir(parents=True, exist_ok=True)
-    REGISTRY_PATH.write_text(json.dumps(body, indent=2, ensure_ascii=False), encoding="utf-8")
+    _save_registry(body)
     
     log_event(db, actor="admin", action="downloads.registry.update", ref_id="registry", detail={"document_count": len(body.get("documents", []))})
     return {"ok": True, "documents": len(body.get("documents", []))}
@@ -224,7 +225,7 @@ def update_registry(
 @router.delete("/{doc_id}")
 def delete_document(
     doc_id: str,
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """Remove a document from the registry (admin endpoint)."""
     reg = _load_registry()
@@ -236,9 +237,7 @@ def delete_document(
     if len(docs) == original_count:
         raise HTTPException(404, "Document not found in registry")
     
-    reg["documents"] = docs
-    REGISTRY_PATH.parent.mkdir(parents=True, exist_ok=True)
-    REGISTRY_PATH.write_text(json.dumps(reg, indent=2, ensure_ascii=False), encoding="utf-8")
+    _save_registry({**reg, "documents": docs})
     
     log_event(db, actor="admin", action="downloads.document.delete", ref_id=doc_id)
     return {"ok": True, "doc_id": doc_id}
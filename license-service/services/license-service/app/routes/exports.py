@@ -1,11 +1,20 @@
-"""Export routes for CSV/Excel data."""
+"""Export routes for CSV/Excel data.
+
+Exports are streamed: rows are read in keyset-paginated batches (server-side
+cursors where the driver supports them) and encoded incrementally, so memory
+stays flat regardless of table size.
+"""
 import csv
 import io
-from typing import List
-from fastapi import APIRouter, Depends, Response
+import os
+import tempfile
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi.responses import StreamingResponse
+from sqlalchemy import select
 from sqlalchemy.orm import Session
-from ..db import SessionLocal
+from ..db import get_db
 from ..models.license import License
 from ..models.org import Organization
 from ..models.billing import BillingOrder
@@ -13,79 +22,227 @@ from ..admin.ui import require_admin
 
 router = APIRouter(prefix="/api/exports", tags=["exports"])
 
-def db_session():
-    db = SessionLocal()
+EXPORT_PAGE_SIZE = 1000  # Rows fetched per keyset page
+CSV_FLUSH_BYTES = 64 * 1024  # Encoded bytes buffered before yielding a chunk
+FILE_CHUNK_BYTES = 256 * 1024
+
+def _parse_date(value: Optional[str], name: str) -> Optional[datetime]:
+    if not value:
+        return None
     try:
-        yield db
-    finally:
-        db.close()
-
-def _export_to_csv(data: List[dict], filename: str) -> StreamingResponse:
-    """Export data to CSV."""
-    if not data:
-        return Response(content="No data to export", media_type="text/plain")
-    
-    output = io.StringIO()
-    writer = csv.DictWriter(output, fieldnames=data[0].keys())
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(400, f"Invalid {name}: expected ISO date (YYYY-MM-DD)")
+
+def _on_or_before(column, end: datetime, value: str):
+    """``column <= end``, where a date-only ``value`` includes the whole of that day."""
+    if "T" not in value.upper() and " " not in value.strip():
+        return column < end + timedelta(days=1)
+    return column <= end
+
+def _iter_rows(db: Session, stmt, key_column, page_size: int = EXPORT_PAGE_SIZE) -> Iterator[Any]:
+    """Yield rows of ``stmt`` in ``key_column`` order using keyset pagination.
+
+    Each page is a short ``WHERE key > last ORDER BY key LIMIT n`` query, so no
+    read transaction or cursor is held open between pages.
+    """
+    last_key = None
+    while True:
+        page_stmt = stmt.order_by(key_column).limit(page_size)
+        if last_key is not None:
+            page_stmt = page_stmt.where(key_column > last_key)
+        result = db.execute(page_stmt.execution_options(yield_per=page_size, stream_results=True))
+        count = 0
+        for row in result:
+            count += 1
+            last_key = row[0]
+            yield row
+        # End the implicit read transaction between pages
+        db.rollback()
+        if count < page_size:
+            return
+
+def _csv_chunks(fieldnames: List[str], records: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    """Encode records to CSV, yielding ~CSV_FLUSH_BYTES chunks."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames)
     writer.writeheader()
-    writer.writerows(data)
-    
-    output.seek(0)
+    for record in records:
+        writer.writerow(record)
+        if buffer.tell() >= CSV_FLUSH_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+def _xlsx_chunks(fieldnames: List[str], records: Iterator[Dict[str, Any]], sheet_title: str) -> Iterator[bytes]:
+    """Write records with openpyxl's write-only (constant-memory) workbook, then stream the file."""
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_title)
+    sheet.append(fieldnames)
+    for record in records:
+        sheet.append([record[name] for name in fieldnames])
+
+    fd, path = tempfile.mkstemp(suffix=".xlsx")
+    os.close(fd)
+    try:
+        workbook.save(path)
+        with open(path, "rb") as fh:
+            while True:
+                chunk = fh.read(FILE_CHUNK_BYTES)
+                if not chunk:
+                    break
+                yield chunk
+    finally:
+        os.unlink(path)
+
+def _export_response(
+    fieldnames: List[str],
+    records: Iterator[Dict[str, Any]],
+    basename: str,
+    fmt: str,
+) -> StreamingResponse:
+    """Stream records as CSV or XLSX."""
+    if fmt == "xlsx":
+        try:
+            import openpyxl  # noqa: F401
+        except ImportError:
+            raise HTTPException(501, "XLSX export requires openpyxl (pip install openpyxl)")
+        return StreamingResponse(
+            _xlsx_chunks(fieldnames, records, basename),
+            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            headers={"Content-Disposition": f"attachment; filename={basename}_export.xlsx"}
+        )
     return StreamingResponse(
-        iter([output.getvalue()]),
+        _csv_chunks(fieldnames, records),
         media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename={filename}"}
+        headers={"Content-Disposition": f"attachment; filename={basename}_export.csv"}
     )
 
+def _records(rows: Iterator[Any], to_record: Callable[[Any], Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    for row in rows:
+        yield to_record(row)
+
+def _isoformat(value: Optional[datetime]) -> str:
+    return value.isoformat() if value else ""
+
+LICENSE_FIELDS = ["license_id", "org_id", "program_id", "issued_at", "expires_at", "revoked", "suspended", "is_trial", "auto_renew"]
+
 @router.get("/licenses")
-def export_licenses(_=Depends(require_admin), db: Session = Depends(db_session)):
-    """Export all licenses to CSV."""
-    licenses = db.query(License).all()
-    data = [{
-        "license_id": l.license_id,
-        "org_id": l.org_id,
-        "program_id": l.program_id,
-        "issued_at": l.issued_at.isoformat() if l.issued_at else "",
-        "expires_at": l.expires_at.isoformat() if l.expires_at else "",
-        "revoked": l.revoked,
-        "suspended": l.suspended,
-        "is_trial": getattr(l, 'is_trial', False),
-        "auto_renew": getattr(l, 'auto_renew', False)
-    } for l in licenses]
-    
-    return _export_to_csv(data, "licenses_export.csv")
+def export_licenses(
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    org_id: Optional[str] = Query(None),
+    program_id: Optional[str] = Query(None),
+    start_date: Optional[str] = Query(None, description="Issued on or after (ISO date)"),
+    end_date: Optional[str] = Query(None, description="Issued on or before (ISO date)"),
+    _=Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Export licenses to CSV or XLSX."""
+    start, end = _parse_date(start_date, "start_date"), _parse_date(end_date, "end_date")
+    # Select only exported columns; payload_json/signature_b64 are never loaded
+    stmt = select(
+        License.license_id, License.org_id, License.program_id, License.issued_at,
+        License.expires_at, License.revoked, License.suspended, License.is_trial, License.auto_renew,
+    )
+    if org_id:
+        stmt = stmt.where(License.org_id == org_id)
+    if program_id:
+        stmt = stmt.where(License.program_id == program_id)
+    if start:
+        stmt = stmt.where(License.issued_at >= start)
+    if end:
+        stmt = stmt.where(_on_or_before(License.issued_at, end, end_date))
+
+    def to_record(row) -> Dict[str, Any]:
+        return {
+            "license_id": row.license_id,
+            "org_id": row.org_id,
+            "program_id": row.program_id,
+            "issued_at": _isoformat(row.issued_at),
+            "expires_at": _isoformat(row.expires_at),
+            "revoked": row.revoked,
+            "suspended": row.suspended,
+            "is_trial": bool(row.is_trial),
+            "auto_renew": bool(row.auto_renew),
+        }
+
+    rows = _iter_rows(db, stmt, License.license_id)
+    return _export_response(LICENSE_FIELDS, _records(rows, to_record), "licenses", format)
+
+ORGANIZATION_FIELDS = ["org_id", "org_name", "org_type", "email", "contact_name", "phone"]
 
 @router.get("/organizations")
-def export_organizations(_=Depends(require_admin), db: Session = Depends(db_session)):
-    """Export all organizations to CSV."""
-    orgs = db.query(Organization).all()
-    data = [{
-        "org_id": o.org_id,
-        "org_name": o.org_name,
-        "org_type": o.org_type,
-        "email": getattr(o, 'email', '') or "",
-        "contact_name": getattr(o, 'contact_name', '') or "",
-        "phone": getattr(o, 'phone', '') or ""
-    } for o in orgs]
-    
-    return _export_to_csv(data, "organizations_export.csv")
+def export_organizations(
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    org_type: Optional[str] = Query(None),
+    _=Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Export organizations to CSV or XLSX."""
+    stmt = select(
+        Organization.org_id, Organization.org_name, Organization.org_type,
+        Organization.email, Organization.contact_name, Organization.phone,
+    )
+    if org_type:
+        stmt = stmt.where(Organization.org_type == org_type)
+
+    def to_record(row) -> Dict[str, Any]:
+        return {
+            "org_id": row.org_id,
+            "org_name": row.org_name,
+            "org_type": row.org_type,
+            "email": row.email or "",
+            "contact_name": row.contact_name or "",
+            "phone": row.phone or "",
+        }
+
+    rows = _iter_rows(db, stmt, Organization.org_id)
+    return _export_response(ORGANIZATION_FIELDS, _records(rows, to_record), "organizations", format)
+
+BILLING_FIELDS = ["order_id", "org_id", "program_id", "plan", "amount_total", "currency", "status", "due_at", "paid_at"]
 
 @router.get("/billing")
-def export_billing(_=Depends(require_admin), db: Session = Depends(db_session)):
-    """Export billing orders to CSV."""
-    orders = db.query(BillingOrder).all()
-    data = [{
-        "order_id": o.order_id,
-        "org_id": o.org_id,
-        "program_id": o.program_id,
-        "plan": o.plan,
-        "amount_total": o.amount_total,
-        "currency": o.currency,
-        "status": o.status,
-        "due_at": o.due_at.isoformat() if o.due_at else "",
-        "paid_at": getattr(o, 'paid_at', None).isoformat() if hasattr(o, 'paid_at') and o.paid_at else ""
-    } for o in orders]
-    
-    return _export_to_csv(data, "billing_export.csv")
+def export_billing(
+    format: str = Query("csv", pattern="^(csv|xlsx)$"),
+    org_id: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    start_date: Optional[str] = Query(None, description="Created on or after (ISO date)"),
+    end_date: Optional[str] = Query(None, description="Created on or before (ISO date)"),
+    _=Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Export billing orders to CSV or XLSX."""
+    start, end = _parse_date(start_date, "start_date"), _parse_date(end_date, "end_date")
+    stmt = select(
+        BillingOrder.order_id, BillingOrder.org_id, BillingOrder.program_id, BillingOrder.plan,
+        BillingOrder.amount_total, BillingOrder.currency, BillingOrder.status,
+        BillingOrder.due_at, BillingOrder.paid_at,
+    )
+    if org_id:
+        stmt = stmt.where(BillingOrder.org_id == org_id)
+    if status:
+        stmt = stmt.where(BillingOrder.status == status)
+    if start:
+        stmt = stmt.where(BillingOrder.created_at >= start)
+    if end:
+        stmt = stmt.where(_on_or_before(BillingOrder.created_at, end, end_date))
 
+    def to_record(row) -> Dict[str, Any]:
+        return {
+            "order_id": row.order_id,
+            "org_id": row.org_id,
+            "program_id": row.program_id,
+            "plan": row.plan,
+            "amount_total": row.amount_total,
+            "currency": row.currency,
+            "status": row.status,
+            "due_at": _isoformat(row.due_at),
+            "paid_at": _isoformat(row.paid_at),
+        }
 
+    rows = _iter_rows(db, stmt, BillingOrder.order_id)
+    return _export_response(BILLING_FIELDS, _records(rows, to_record), "billing", format)
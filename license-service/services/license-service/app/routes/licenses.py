@@ -5,7 +5,7 @@ from pathlib import Path
 from fastapi import APIRouter, Depends, HTTPException, Query, Body
 from sqlalchemy.orm import Session
 
-from ..db import SessionLocal
+from ..db import get_db
 from ..models.license import License
 from ..models.authorization import ProgramAuthorization
 from ..crypto.signing import load_public_key
@@ -14,13 +14,6 @@ from ..audit.events import log_event
 
 router = APIRouter(prefix="/api", tags=["licenses"])
 
-def db_session():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 KEYS_DIR = Path(__file__).resolve().parents[2] / "keys"
 PUB = load_public_key(KEYS_DIR / "issuer_public.key")
 
@@ -34,7 +27,7 @@ def list_licenses(
     status: Optional[str] = Query(None, description="Filter by status (active, revoked, suspended)"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
     offset: int = Query(0, ge=0, description="Number of results to skip"),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """List all licenses with optional filtering."""
     query = db.query(License)
@@ -75,7 +68,7 @@ def list_licenses(
     }
 
 @router.post("/licenses/verify")
-def verify_license_endpoint(license_payload: dict, db: Session = Depends(db_session)):
+def verify_license_endpoint(license_payload: dict, db: Session = Depends(get_db)):
     # 1) signature
     if not verify_license(PUB, license_payload):
         return {"valid": False, "reason": "bad_signature"}
@@ -121,7 +114,7 @@ def verify_license_endpoint(license_payload: dict, db: Session = Depends(db_sess
     return {"valid": True, "license_id": license_id, "program_id": rec.program_id, "authorization_id": rec.authorization_id, "cache_ttl_sec": cache_ttl, "grace_seconds": grace}
 
 @router.get("/licenses/{license_id}")
-def get_license(license_id: str, db: Session = Depends(db_session)):
+def get_license(license_id: str, db: Session = Depends(get_db)):
     rec = db.get(License, license_id)
     if not rec:
         raise HTTPException(404, "Not found")
@@ -131,7 +124,7 @@ def get_license(license_id: str, db: Session = Depends(db_session)):
 def update_license(
     license_id: str,
     body: Dict[str, Any] = Body(...),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """Update license metadata (limited fields)."""
     rec = db.get(License, license_id)
@@ -150,7 +143,7 @@ def update_license(
     return {"ok": True, "license_id": license_id}
 
 @router.post("/licenses/{license_id}/revoke")
-def revoke_license(license_id: str, reason: str = "breach", db: Session = Depends(db_session)):
+def revoke_license(license_id: str, reason: str = "breach", db: Session = Depends(get_db)):
     """Revoke a license."""
     rec = db.get(License, license_id)
     if not rec:
@@ -162,7 +155,7 @@ def revoke_license(license_id: str, reason: str = "breach", db: Session = Depend
     return {"ok": True, "license_id": license_id, "reason": reason}
 
 @router.post("/licenses/{license_id}/suspend")
-def suspend_license(license_id: str, reason: str = "admin_action", db: Session = Depends(db_session)):
+def suspend_license(license_id: str, reason: str = "admin_action", db: Session = Depends(get_db)):
     """Suspend a license."""
     rec = db.get(License, license_id)
     if not rec:
@@ -175,7 +168,7 @@ def suspend_license(license_id: str, reason: str = "admin_action", db: Session =
     return {"ok": True, "license_id": license_id, "suspended": True, "reason": reason}
 
 @router.post("/licenses/{license_id}/unsuspend")
-def unsuspend_license(license_id: str, db: Session = Depends(db_session)):
+def unsuspend_license(license_id: str, db: Session = Depends(get_db)):
     """Unsuspend a license."""
     rec = db.get(License, license_id)
     if not rec:
@@ -188,7 +181,7 @@ def unsuspend_license(license_id: str, db: Session = Depends(db_session)):
     return {"ok": True, "license_id": license_id, "suspended": False}
 
 @router.get("/licenses/{license_id}/status")
-def get_license_status(license_id: str, db: Session = Depends(db_session)):
+def get_license_status(license_id: str, db: Session = Depends(get_db)):
     """Get license status summary."""
     rec = db.get(License, license_id)
     if not rec:
@@ -223,7 +216,7 @@ def get_license_status(license_id: str, db: Session = Depends(db_session)):
     }
 
 @router.get("/licenses/{license_id}/authorization")
-def get_license_authorization(license_id: str, db: Session = Depends(db_session)):
+def get_license_authorization(license_id: str, db: Session = Depends(get_db)):
     """Get the authorization associated with a license."""
     rec = db.get(License, license_id)
     if not rec:
@@ -244,7 +237,7 @@ def get_license_authorization(license_id: str, db: Session = Depends(db_session)
     }
 
 @router.get("/licenses/by-serial/{license_id}")
-def get_license_by_serial(license_id: str, db: Session = Depends(db_session)):
+def get_license_by_serial(license_id: str, db: Session = Depends(get_db)):
     """
     Get full license JSON by serial number (license_id).
     
@@ -264,7 +257,7 @@ def get_license_by_serial(license_id: str, db: Session = Depends(db_session)):
 def track_user_session(
     license_id: str,
     user_info: Dict[str, Any] = Body(...),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """
     Track user login session for a license.
@@ -354,7 +347,7 @@ def track_user_session(
     }
 
 @router.post("/licenses/{license_id}/resend-receipt")
-def resend_license_receipt(license_id: str, db: Session = Depends(db_session)):
+def resend_license_receipt(license_id: str, db: Session = Depends(get_db)):
     """
     Resend license receipt email to licensee (admin endpoint).
     
@@ -2,7 +2,7 @@ from typing import Optional, List
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from sqlalchemy import or_
-from ..db import SessionLocal
+from ..db import get_db
 from ..models.org import Organization
 from ..models.authorization import ProgramAuthorization
 from ..models.license import License
@@ -11,19 +11,12 @@ from ..audit.events import log_event
 
 router = APIRouter(prefix="/api", tags=["orgs"])
 
-def db_session():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("/orgs")
 def list_orgs(
     org_type: Optional[str] = Query(None, description="Filter by org_type (oem or customer)"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
     offset: int = Query(0, ge=0, description="Number of results to skip"),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """List all organizations with optional filtering."""
     query = db.query(Organization)
@@ -43,7 +36,7 @@ def list_orgs(
     }
 
 @router.get("/orgs/{org_id}")
-def get_org(org_id: str, db: Session = Depends(db_session)):
+def get_org(org_id: str, db: Session = Depends(get_db)):
     """Get a single organization by ID."""
     org = db.get(Organization, org_id)
     if not org:
@@ -51,7 +44,7 @@ def get_org(org_id: str, db: Session = Depends(db_session)):
     return {"org_id": org.org_id, "org_name": org.org_name, "org_type": org.org_type}
 
 @router.post("/orgs")
-def create_org(org_id: str, org_name: str, org_type: str, db: Session = Depends(db_session)):
+def create_org(org_id: str, org_name: str, org_type: str, db: Session = Depends(get_db)):
     """Create a new organization."""
     if org_type not in ("oem", "customer", "pe"):
         raise HTTPException(400, "org_type must be oem, customer, or pe")
@@ -67,7 +60,7 @@ def update_org(
     org_id: str,
     org_name: Optional[str] = None,
     org_type: Optional[str] = None,
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """Update an organization."""
     org = db.get(Organization, org_id)
@@ -87,7 +80,7 @@ def update_org(
     return {"ok": True, "org_id": org.org_id, "org_name": org.org_name, "org_type": org.org_type}
 
 @router.delete("/orgs/{org_id}")
-def delete_org(org_id: str, force: bool = Query(False, description="Force delete even if related records exist"), db: Session = Depends(db_session)):
+def delete_org(org_id: str, force: bool = Query(False, description="Force delete even if related records exist"), db: Session = Depends(get_db)):
     """Delete an organization. Checks for related records unless force=true."""
     org = db.get(Organization, org_id)
     if not org:
@@ -108,7 +101,7 @@ def delete_org(org_id: str, force: bool = Query(False, description="Force delete
     return {"ok": True, "org_id": org_id}
 
 @router.get("/orgs/{org_id}/summary")
-def org_summary(org_id: str, db: Session = Depends(db_session)):
+def org_summary(org_id: str, db: Session = Depends(get_db)):
     """Get organization summary with related records."""
     org = db.get(Organization, org_id)
     if not org:
@@ -12,7 +12,7 @@ from fastapi.templating import Jinja2Templates
 from starlette.requests import Request
 from sqlalchemy.orm import Session
 
-from ..db import SessionLocal
+from ..db import get_db
 from ..models.org import Organization
 from ..models.user import User
 from ..models.authorization import ProgramAuthorization
@@ -41,31 +41,20 @@ if not TEMPLATES_DIR.exists():
     warnings.warn(f"Template directory not found: {TEMPLATES_DIR}. Registration page may not work.")
 templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
 
-def db_session():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-def _generate_org_id(org_name: str, org_type: str) -> str:
-    """Generate a unique org_id from org_name."""
+def _generate_org_id(db: Session, org_name: str, org_type: str) -> str:
+    """Generate a unique org_id from org_name, checked against ``db``."""
     # Clean org name: remove special chars, convert to uppercase, replace spaces with hyphens
     clean = re.sub(r'[^a-zA-Z0-9\s-]', '', org_name)
     clean = re.sub(r'\s+', '-', clean.strip()).upper()
     base_id = f"{org_type.upper()}-{clean[:20]}"
     
     # Check for uniqueness and append number if needed
-    db = SessionLocal()
-    try:
-        counter = 1
-        org_id = base_id
-        while db.get(Organization, org_id):
-            org_id = f"{base_id}-{counter:03d}"
-            counter += 1
-        return org_id
-    finally:
-        db.close()
+    counter = 1
+    org_id = base_id
+    while db.get(Organization, org_id):
+        org_id = f"{base_id}-{counter:03d}"
+        counter += 1
+    return org_id
 
 def _create_default_authorization(
     db: Session,
@@ -192,7 +181,7 @@ def payment_page(
     request: Request,
     order_id: str,
     return_url: Optional[str] = None,
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """Display payment page for an order."""
     order = db.get(BillingOrder, order_id)
@@ -241,7 +230,7 @@ def process_payment(
     order_id: str = Form(...),
     payment_method: str = Form(...),  # "stripe", "paypal", "eft", or "demo"
     return_url: Optional[str] = Form(None),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """Process payment and issue license."""
     try:
@@ -486,7 +475,7 @@ def process_payment(
         )
 
 @router.get("/eft-instructions", response_class=HTMLResponse)
-def eft_instructions(request: Request, order_id: str, db: Session = Depends(db_session)):
+def eft_instructions(request: Request, order_id: str, db: Session = Depends(get_db)):
     """Display EFT payment instructions page."""
     order = db.get(BillingOrder, order_id)
     if not order:
@@ -536,7 +525,7 @@ def payment_success(
     order_id: Optional[str] = None,
     license_id: Optional[str] = None,
     return_url: Optional[str] = None,
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """Display success page after payment."""
     # If return_url is provided, redirect to website with license info
@@ -606,7 +595,7 @@ def resend_receipt(
     request: Request,
     order_id: Optional[str] = Form(None),
     license_id: Optional[str] = Form(None),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """
     Resend license receipt email to licensee.
@@ -699,7 +688,7 @@ def register_submit(
     pe_license_state: Optional[str] = Form(None),
     agreement_accepted: Optional[str] = Form(None),  # Checkbox returns "on" if checked
     return_url: Optional[str] = Form(None),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """Handle registration submission for PE or Licensee."""
     try:
@@ -769,7 +758,7 @@ def register_submit(
                 )
         
         # Generate org_id
-        org_id = _generate_org_id(org_name, org_type)
+        org_id = _generate_org_id(db, org_name, org_type)
         
         # Check if org_id already exists
         if db.get(Organization, org_id):
@@ -864,7 +853,7 @@ def register_api(
     plan: str = Form(None),  # Optional for PE
     pe_license_number: str = Form(None),
     pe_license_state: str = Form(None),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """API endpoint for PE or Licensee registration."""
     try:
@@ -903,7 +892,7 @@ def register_api(
                 raise HTTPException(400, f"Invalid plan '{plan}' for program '{program}'")
         
         # Generate org_id
-        org_id = _generate_org_id(org_name, org_type)
+        org_id = _generate_org_id(db, org_name, org_type)
         
         # Check if org_id already exists
         if db.get(Organization, org_id):
@@ -5,20 +5,13 @@ from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
-from ..db import SessionLocal
+from ..db import get_db
 from ..models.license import License
 from ..models.seats import SeatAssignment
 from ..audit.events import log_event
 
 router = APIRouter(prefix="/api", tags=["seats"])
 
-def db_session():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 def _seat_limit(license_payload: dict) -> int:
     return int(license_payload.get("entitlements", {}).get("limits", {}).get("seat_limit", 0) or 0)
 
@@ -29,7 +22,7 @@ def list_all_seats(
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of results"),
     offset: int = Query(0, ge=0, description="Number of results to skip"),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """List all seat assignments with optional filtering."""
     query = db.query(SeatAssignment)
@@ -58,12 +51,12 @@ def list_all_seats(
     }
 
 @router.get("/licenses/{license_id}/seats")
-def list_seats(license_id: str, db: Session = Depends(db_session)):
+def list_seats(license_id: str, db: Session = Depends(get_db)):
     rows = db.query(SeatAssignment).filter(SeatAssignment.license_id == license_id, SeatAssignment.is_active == True).all()
     return {"license_id": license_id, "active_seats": [{"user_id": r.user_id, "assigned_at": r.assigned_at.isoformat()} for r in rows]}
 
 @router.post("/licenses/{license_id}/seats/assign")
-def assign_seat(license_id: str, user_id: str, db: Session = Depends(db_session)):
+def assign_seat(license_id: str, user_id: str, db: Session = Depends(get_db)):
     lic = db.get(License, license_id)
     if not lic:
         raise HTTPException(404, "license not found")
@@ -93,7 +86,7 @@ def assign_seat(license_id: str, user_id: str, db: Session = Depends(db_session)
     return {"ok": True, "license_id": license_id, "user_id": user_id, "already_assigned": False}
 
 @router.get("/licenses/{license_id}/seats/{user_id}")
-def get_seat(license_id: str, user_id: str, db: Session = Depends(db_session)):
+def get_seat(license_id: str, user_id: str, db: Session = Depends(get_db)):
     """Get a specific seat assignment."""
     seat_id = f"{license_id}:{user_id}"
     rec = db.get(SeatAssignment, seat_id)
@@ -108,7 +101,7 @@ def get_seat(license_id: str, user_id: str, db: Session = Depends(db_session)):
     }
 
 @router.post("/licenses/{license_id}/seats/release")
-def release_seat(license_id: str, user_id: str, db: Session = Depends(db_session)):
+def release_seat(license_id: str, user_id: str, db: Session = Depends(get_db)):
     """Release a seat assignment."""
     seat_id = f"{license_id}:{user_id}"
     rec = db.get(SeatAssignment, seat_id)
@@ -4,25 +4,19 @@ from datetime import datetime
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, Body, Query
 from sqlalchemy.orm import Session
-from ..db import SessionLocal
+from ..db import get_db
 from ..models.webhook import Webhook, WebhookDelivery
 from ..admin.ui import require_admin
-from ..services.webhooks import trigger_webhook
+from ..services.webhooks import trigger_webhook, DELIVERY_PENDING, DELIVERY_IN_FLIGHT, DELIVERY_FAILED
+from ..services.webhook_worker import webhook_worker
 
 router = APIRouter(prefix="/api/webhooks", tags=["webhooks"])
 
-def db_session():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 @router.get("")
 def list_webhooks(
     org_id: Optional[str] = Query(None),
     _=Depends(require_admin),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """List all webhooks."""
     query = db.query(Webhook)
@@ -49,7 +43,7 @@ def create_webhook(
     org_id: Optional[str] = Body(None),
     secret: Optional[str] = Body(None),
     _=Depends(require_admin),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """Create a new webhook."""
     webhook = Webhook(
@@ -63,8 +57,13 @@ def create_webhook(
     db.commit()
     return {"ok": True, "webhook_id": webhook.id}
 
+@router.get("/metrics")
+def webhook_metrics(_=Depends(require_admin)):
+    """Delivery worker metrics and queue depth."""
+    return webhook_worker.metrics()
+
 @router.get("/{webhook_id}")
-def get_webhook(webhook_id: int, _=Depends(require_admin), db: Session = Depends(db_session)):
+def get_webhook(webhook_id: int, _=Depends(require_admin), db: Session = Depends(get_db)):
     """Get a webhook."""
     webhook = db.get(Webhook, webhook_id)
     if not webhook:
@@ -87,7 +86,7 @@ def update_webhook(
     is_active: Optional[bool] = Body(None),
     secret: Optional[str] = Body(None),
     _=Depends(require_admin),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """Update a webhook."""
     webhook = db.get(Webhook, webhook_id)
@@ -107,7 +106,7 @@ def update_webhook(
     return {"ok": True, "webhook_id": webhook_id}
 
 @router.delete("/{webhook_id}")
-def delete_webhook(webhook_id: int, _=Depends(require_admin), db: Session = Depends(db_session)):
+def delete_webhook(webhook_id: int, _=Depends(require_admin), db: Session = Depends(get_db)):
     """Delete a webhook."""
     webhook = db.get(Webhook, webhook_id)
     if not webhook:
@@ -121,7 +120,7 @@ def list_deliveries(
     webhook_id: int,
     limit: int = Query(50, ge=1, le=100),
     _=Depends(require_admin),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """List webhook delivery attempts."""
     deliveries = db.query(WebhookDelivery).filter(
@@ -132,20 +131,55 @@ def list_deliveries(
         "deliveries": [{
             "id": d.id,
             "event_type": d.event_type,
+            "status": d.status,
             "status_code": d.status_code,
             "attempt_number": d.attempt_number,
+            "next_attempt_at": d.next_attempt_at.isoformat() if d.next_attempt_at else None,
+            "duration_ms": d.duration_ms,
             "delivered_at": d.delivered_at.isoformat() if d.delivered_at else None,
             "error_message": d.error_message,
             "created_at": d.created_at.isoformat()
         } for d in deliveries]
     }
 
+@router.post("/{webhook_id}/deliveries/{delivery_id}/retry")
+def retry_delivery(
+    webhook_id: int,
+    delivery_id: int,
+    _=Depends(require_admin),
+    db: Session = Depends(get_db)
+):
+    """Re-queue a failed delivery for immediate redelivery."""
+    delivery = db.get(WebhookDelivery, delivery_id)
+    if not delivery or delivery.webhook_id != webhook_id:
+        raise HTTPException(404, "Delivery not found")
+    if delivery.delivered_at:
+        raise HTTPException(400, "Delivery already succeeded")
+    if delivery.status == DELIVERY_IN_FLIGHT:
+        raise HTTPException(409, "Delivery is being sent")
+    
+    # Conditional so a worker claiming the row in between is not overridden
+    reset = db.query(WebhookDelivery).filter(
+        WebhookDelivery.id == delivery_id,
+        WebhookDelivery.status.in_([DELIVERY_PENDING, DELIVERY_FAILED]),
+        WebhookDelivery.delivered_at == None,
+    ).update({
+        "status": DELIVERY_PENDING,
+        "attempt_number": 1,
+        "next_attempt_at": datetime.utcnow(),
+    }, synchronize_session=False)
+    db.commit()
+    if not reset:
+        raise HTTPException(409, "Delivery is being sent")
+    webhook_worker.notify()
+    return {"ok": True, "delivery_id": delivery_id}
+
 @router.post("/{webhook_id}/test")
 def test_webhook(
     webhook_id: int,
     event_type: str = Body("test"),
     _=Depends(require_admin),
-    db: Session = Depends(db_session)
+    db: Session = Depends(get_db)
 ):
     """Test a webhook with a test event."""
     webhook = db.get(Webhook, webhook_id)
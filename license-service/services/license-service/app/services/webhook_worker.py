@@ -0,0 +1,382 @@
+"""Background webhook delivery worker.
+
+Runs an asyncio event loop on a daemon thread and drains pending
+``WebhookDelivery`` rows with a shared ``httpx.AsyncClient`` (connection reuse)
+and a global concurrency limit. A host never has more than
+``webhook_per_host_concurrency`` deliveries claimed by this worker: rows for a
+saturated host stay queued, so one slow subscriber cannot hold claims or
+concurrency slots that other hosts could use. Retries are scheduled by
+``record_delivery_result`` using exponential backoff from
+``webhook_retry_delay_seconds``. Rows left in flight (by a crashed process, or
+because recording the outcome failed) are returned to the queue periodically.
+
+A worker never holds more claims than it can send at once (the global and
+per-host limits), and each request is bounded by ``webhook_timeout_seconds``
+in total, so a live worker's claims are always younger than the reclaim
+cutoff and another process never resends them.
+"""
+import asyncio
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from ..config import settings
+from ..db import SessionLocal
+from ..models.webhook import Webhook, WebhookDelivery
+from .webhooks import (
+    DELIVERY_PENDING,
+    DELIVERY_IN_FLIGHT,
+    DELIVERY_FAILED,
+    build_webhook_headers,
+    record_delivery_result,
+)
+
+class WebhookDeliveryWorker:
+    """Persistent-queue webhook sender running on its own thread and event loop."""
+
+    def __init__(self, session_factory=SessionLocal):
+        self._session_factory = session_factory
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._stopping = threading.Event()
+        self._host_limits: Dict[str, asyncio.Semaphore] = {}
+        self._claims_lock = threading.Lock()
+        self._host_claims: Dict[str, int] = defaultdict(int)  # Claimed here and not yet recorded
+        self._active_ids: set = set()
+        self._metrics_lock = threading.Lock()
+        self._metrics: Dict[str, Any] = {
+            "attempts": 0,
+            "delivered": 0,
+            "retries_scheduled": 0,
+            "failed": 0,
+            "in_flight": 0,
+            "record_errors": 0,
+            "reclaimed": 0,
+            "total_duration_ms": 0,
+            "started_at": None,
+            "last_poll_at": None,
+        }
+        self._per_host: Dict[str, Dict[str, int]] = defaultdict(lambda: {"attempts": 0, "delivered": 0, "errors": 0})
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """Start the worker thread (no-op if already running)."""
+        if self.running:
+            return
+        self._stopping.clear()
+        self._reset_stale_claims()
+        started = threading.Event()
+        self._thread = threading.Thread(
+            target=self._thread_main, args=(started,), name="webhook-delivery-worker", daemon=True
+        )
+        self._thread.start()
+        started.wait(timeout=5)
+        with self._metrics_lock:
+            self._metrics["started_at"] = datetime.utcnow().isoformat()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        """Stop the worker, giving in-flight deliveries up to ``timeout`` seconds."""
+        if not self.running:
+            return
+        self._stopping.set()
+        self.notify()
+        self._thread.join(timeout=timeout)
+        self._thread = None
+
+    def notify(self) -> None:
+        """Wake the worker because new deliveries are due. Safe from any thread."""
+        loop, wake = self._loop, self._wake
+        if loop is not None and wake is not None and not loop.is_closed():
+            try:
+                loop.call_soon_threadsafe(wake.set)
+            except RuntimeError:
+                pass  # Loop shutting down
+
+    def metrics(self) -> Dict[str, Any]:
+        """Delivery counters plus current queue depth."""
+        with self._metrics_lock:
+            snapshot = dict(self._metrics)
+            snapshot["per_host"] = {host: dict(counts) for host, counts in self._per_host.items()}
+        completed = snapshot["delivered"] + snapshot["retries_scheduled"] + snapshot["failed"]
+        snapshot["avg_duration_ms"] = round(snapshot["total_duration_ms"] / completed, 1) if completed else None
+        snapshot["running"] = self.running
+
+        db = self._session_factory()
+        try:
+            snapshot["queue_pending"] = db.query(WebhookDelivery).filter(
+                WebhookDelivery.status == DELIVERY_PENDING
+            ).count()
+            snapshot["queue_due"] = db.query(WebhookDelivery).filter(
+                WebhookDelivery.status == DELIVERY_PENDING,
+                WebhookDelivery.next_attempt_at <= datetime.utcnow(),
+            ).count()
+        finally:
+            db.close()
+        return snapshot
+
+    # ------------------------------------------------------------------
+    # Event loop
+    # ------------------------------------------------------------------
+
+    def _thread_main(self, started: threading.Event) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        self._wake = asyncio.Event()
+        started.set()
+        try:
+            loop.run_until_complete(self._run())
+        finally:
+            self._loop = None
+            self._wake = None
+            loop.close()
+
+    async def _run(self) -> None:
+        limits = httpx.Limits(
+            max_connections=settings.webhook_worker_concurrency,
+            max_keepalive_connections=settings.webhook_worker_concurrency,
+        )
+        timeout = httpx.Timeout(settings.webhook_timeout_seconds)
+        global_limit = asyncio.Semaphore(settings.webhook_worker_concurrency)
+        active: set = set()
+        reclaim_every = self._stale_after_seconds()
+        last_reclaim = time.monotonic()
+
+        async with httpx.AsyncClient(limits=limits, timeout=timeout, follow_redirects=False) as client:
+            while not self._stopping.is_set():
+                self._wake.clear()
+                if time.monotonic() - last_reclaim >= reclaim_every:
+                    last_reclaim = time.monotonic()
+                    with self._claims_lock:
+                        own = set(self._active_ids)
+                    reclaimed = await asyncio.to_thread(self._reset_stale_claims, own)
+                    if reclaimed:
+                        with self._metrics_lock:
+                            self._metrics["reclaimed"] += reclaimed
+                capacity = self._claim_capacity(len(active))
+                jobs = await asyncio.to_thread(self._claim_due, capacity) if capacity > 0 else []
+                for job in jobs:
+                    task = asyncio.create_task(self._process(client, global_limit, job))
+                    active.add(task)
+                    task.add_done_callback(active.discard)
+
+                if jobs and len(jobs) == capacity:
+                    # More may be due; yield briefly before claiming the next batch
+                    await asyncio.sleep(0)
+                    continue
+
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=settings.webhook_poll_interval_seconds)
+                except asyncio.TimeoutError:
+                    pass
+
+            if active:
+                await asyncio.wait(active, timeout=settings.webhook_timeout_seconds)
+
+    # ------------------------------------------------------------------
+    # Queue access (runs on a thread; SQLAlchemy sessions are blocking)
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _claim_capacity(in_progress: int) -> int:
+        """How many more deliveries may be claimed while ``in_progress`` are unfinished.
+
+        Claims are capped at the concurrency limit so every claimed row is
+        sent right away rather than aging on the semaphores.
+        """
+        return min(settings.webhook_batch_size, settings.webhook_worker_concurrency) - in_progress
+
+    @staticmethod
+    def _stale_after_seconds() -> float:
+        """How long a claim may stay in flight before it counts as abandoned."""
+        return settings.webhook_timeout_seconds * 2
+
+    def _reset_stale_claims(self, exclude_ids=()) -> int:
+        """Return abandoned in-flight deliveries to the queue; returns how many.
+
+        Deliveries this worker is still processing (``exclude_ids``) are kept.
+        """
+        stale_before = datetime.utcnow() - timedelta(seconds=self._stale_after_seconds())
+        db = self._session_factory()
+        try:
+            query = db.query(WebhookDelivery).filter(
+                WebhookDelivery.status == DELIVERY_IN_FLIGHT,
+                (WebhookDelivery.last_attempt_at == None) | (WebhookDelivery.last_attempt_at < stale_before),
+            )
+            if exclude_ids:
+                query = query.filter(WebhookDelivery.id.notin_(list(exclude_ids)))
+            reset = query.update(
+                {"status": DELIVERY_PENDING, "next_attempt_at": datetime.utcnow()}, synchronize_session=False
+            )
+            db.commit()
+            return reset
+        finally:
+            db.close()
+
+    def _claim_due(self, limit: int) -> List[Dict[str, Any]]:
+        """Atomically mark up to ``limit`` due deliveries as in flight and snapshot them.
+
+        Deliveries for hosts that already have ``webhook_per_host_concurrency``
+        claims in this worker are left queued.
+        """
+        now = datetime.utcnow()
+        per_host = settings.webhook_per_host_concurrency
+        db = self._session_factory()
+        try:
+            with self._metrics_lock:
+                self._metrics["last_poll_at"] = now.isoformat()
+            query = db.query(WebhookDelivery).filter(
+                WebhookDelivery.status == DELIVERY_PENDING,
+                (WebhookDelivery.next_attempt_at == None) | (WebhookDelivery.next_attempt_at <= now),
+            )
+            with self._claims_lock:
+                saturated = {host for host, count in self._host_claims.items() if count >= per_host}
+            if saturated:
+                blocked = [
+                    webhook_id for webhook_id, url in db.query(Webhook.id, Webhook.url)
+                    if _host(url) in saturated
+                ]
+                if blocked:
+                    query = query.filter(WebhookDelivery.webhook_id.notin_(blocked))
+            candidates = query.order_by(WebhookDelivery.next_attempt_at, WebhookDelivery.id).limit(limit).all()
+
+            jobs = []
+            webhooks: Dict[int, Optional[Webhook]] = {}
+            for delivery in candidates:
+                if delivery.webhook_id not in webhooks:
+                    webhooks[delivery.webhook_id] = db.get(Webhook, delivery.webhook_id)
+                webhook = webhooks[delivery.webhook_id]
+                host = _host(webhook.url) if webhook is not None else None
+                if host is not None:
+                    with self._claims_lock:
+                        if self._host_claims.get(host, 0) >= per_host:
+                            continue  # Picked up once one of this host's deliveries finishes
+
+                claimed = db.query(WebhookDelivery).filter(
+                    WebhookDelivery.id == delivery.id,
+                    WebhookDelivery.status == DELIVERY_PENDING,
+                ).update({"status": DELIVERY_IN_FLIGHT, "last_attempt_at": now}, synchronize_session=False)
+                if not claimed:
+                    continue  # Another worker got it first
+
+                if webhook is None or not webhook.is_active:
+                    delivery.status = DELIVERY_FAILED
+                    delivery.next_attempt_at = None
+                    delivery.error_message = "Webhook deleted or inactive"
+                    continue
+
+                with self._claims_lock:
+                    self._host_claims[host] += 1
+                    self._active_ids.add(delivery.id)
+                jobs.append({
+                    "delivery_id": delivery.id,
+                    "webhook_id": webhook.id,
+                    "url": webhook.url,
+                    "payload": delivery.payload,
+                    "headers": build_webhook_headers(webhook, delivery),
+                })
+            db.commit()
+            return jobs
+        finally:
+            db.close()
+
+    def _record(self, job: Dict[str, Any], **result) -> tuple:
+        """Persist an attempt outcome; return the new status and seconds until any retry."""
+        db = self._session_factory()
+        try:
+            delivery = db.get(WebhookDelivery, job["delivery_id"])
+            if delivery is None:
+                return DELIVERY_FAILED, None
+            webhook = db.get(Webhook, job["webhook_id"])
+            record_delivery_result(webhook, delivery, **result)
+            db.commit()
+            retry_in = None
+            if delivery.status == DELIVERY_PENDING and delivery.next_attempt_at is not None:
+                retry_in = max((delivery.next_attempt_at - datetime.utcnow()).total_seconds(), 0.0)
+            return delivery.status, retry_in
+        finally:
+            db.close()
+
+    # ------------------------------------------------------------------
+    # Delivery
+    # ------------------------------------------------------------------
+
+    def _host_limit(self, url: str) -> tuple:
+        host = _host(url)
+        limit = self._host_limits.get(host)
+        if limit is None:
+            limit = asyncio.Semaphore(settings.webhook_per_host_concurrency)
+            self._host_limits[host] = limit
+        return host, limit
+
+    async def _process(self, client: httpx.AsyncClient, global_limit: asyncio.Semaphore, job: Dict[str, Any]) -> None:
+        host, host_limit = self._host_limit(job["url"])
+        try:
+            await self._attempt(client, global_limit, host, host_limit, job)
+        finally:
+            with self._claims_lock:
+                self._host_claims[host] -= 1
+                if self._host_claims[host] <= 0:
+                    del self._host_claims[host]
+                self._active_ids.discard(job["delivery_id"])
+            self._wake.set()  # The host may have queued deliveries that were skipped
+
+    async def _attempt(self, client: httpx.AsyncClient, global_limit: asyncio.Semaphore, host: str,
+                       host_limit: asyncio.Semaphore, job: Dict[str, Any]) -> None:
+        # Host slot first: waiting on a busy host must not hold a global slot
+        async with host_limit, global_limit:
+            with self._metrics_lock:
+                self._metrics["in_flight"] += 1
+                self._metrics["attempts"] += 1
+                self._per_host[host]["attempts"] += 1
+            started = time.perf_counter()
+            try:
+                # httpx timeouts apply per phase; bound the whole request
+                response = await asyncio.wait_for(
+                    client.post(job["url"], content=job["payload"].encode(), headers=job["headers"]),
+                    settings.webhook_timeout_seconds,
+                )
+                result = {"status_code": response.status_code, "response_body": response.text}
+            except Exception as e:
+                result = {"error": str(e) or e.__class__.__name__}
+            duration_ms = int((time.perf_counter() - started) * 1000)
+            with self._metrics_lock:
+                self._metrics["in_flight"] -= 1
+
+        try:
+            status, retry_in = await asyncio.to_thread(self._record, job, duration_ms=duration_ms, **result)
+        except Exception:
+            # Row stays in flight; _reset_stale_claims returns it to the queue
+            with self._metrics_lock:
+                self._metrics["record_errors"] += 1
+            return
+
+        with self._metrics_lock:
+            self._metrics["total_duration_ms"] += duration_ms
+            if status == DELIVERY_PENDING:
+                self._metrics["retries_scheduled"] += 1
+                self._per_host[host]["errors"] += 1
+            elif status == DELIVERY_FAILED:
+                self._metrics["failed"] += 1
+                self._per_host[host]["errors"] += 1
+            else:
+                self._metrics["delivered"] += 1
+                self._per_host[host]["delivered"] += 1
+
+        if retry_in is not None:
+            # Wake up when the retry becomes due rather than waiting for the next poll
+            asyncio.get_running_loop().call_later(retry_in, self._wake.set)
+
+def _host(url: str) -> str:
+    return urlsplit(url).netloc.lower() or url
+
+webhook_worker = WebhookDeliveryWorker()
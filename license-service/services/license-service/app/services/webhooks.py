@@ -1,37 +1,66 @@
-"""Webhook delivery service."""
+"""Webhook delivery service.
+
+Deliveries are persisted as ``WebhookDelivery`` rows and sent by the background
+worker in ``webhook_worker``, so callers never wait on a slow subscriber.
+"""
 import json
 import hmac
 import hashlib
+import time
 import requests
 from typing import List, Dict, Any, Optional
-from datetime import datetime
+from datetime import datetime, timedelta
+from sqlalchemy import inspect, text
 from ..config import settings
 from ..db import SessionLocal
 from ..models.webhook import Webhook, WebhookDelivery
 from ..audit.events import log_event
 
-def trigger_webhook(webhook: Webhook, event_type: str, payload: Dict[str, Any], db) -> bool:
-    """Trigger a webhook delivery."""
-    delivery = WebhookDelivery(
-        webhook_id=webhook.id,
-        event_type=event_type,
-        payload=json.dumps(payload, ensure_ascii=False),
-        attempt_number=1
-    )
-    db.add(delivery)
-    db.commit()
-    
-    return _deliver_webhook(webhook, delivery, db)
+DELIVERY_PENDING = "pending"
+DELIVERY_IN_FLIGHT = "delivering"
+DELIVERY_DELIVERED = "delivered"
+DELIVERY_FAILED = "failed"
 
-def _deliver_webhook(webhook: Webhook, delivery: WebhookDelivery, db) -> bool:
-    """Actually deliver the webhook with retry logic."""
+# Columns added to webhook_deliveries after the table first shipped
+_DELIVERY_QUEUE_COLUMNS = {
+    "status": "VARCHAR",
+    "next_attempt_at": "DATETIME",
+    "last_attempt_at": "DATETIME",
+    "duration_ms": "INTEGER",
+}
+
+def ensure_webhook_delivery_schema(engine) -> None:
+    """Add the delivery-queue columns to an existing webhook_deliveries table.
+
+    ``create_all`` does not alter tables that already exist, so databases created
+    before the queue columns were introduced are upgraded here. Legacy rows are
+    closed out (delivered or failed) rather than re-sent.
+    """
+    inspector = inspect(engine)
+    if "webhook_deliveries" not in inspector.get_table_names():
+        return
+    existing = {col["name"] for col in inspector.get_columns("webhook_deliveries")}
+    missing = [name for name in _DELIVERY_QUEUE_COLUMNS if name not in existing]
+    if not missing:
+        return
+    with engine.begin() as conn:
+        for name in missing:
+            conn.execute(text(f"ALTER TABLE webhook_deliveries ADD COLUMN {name} {_DELIVERY_QUEUE_COLUMNS[name]}"))
+        conn.execute(text(
+            "UPDATE webhook_deliveries SET status = CASE WHEN delivered_at IS NOT NULL "
+            "THEN :delivered ELSE :failed END WHERE status IS NULL"
+        ), {"delivered": DELIVERY_DELIVERED, "failed": DELIVERY_FAILED})
+
+def build_webhook_headers(webhook: Webhook, delivery: WebhookDelivery) -> Dict[str, str]:
+    """Build request headers for a delivery, including the HMAC signature."""
     headers = {
         "Content-Type": "application/json",
         "User-Agent": "Synerex-License-Service/1.0",
         "X-Webhook-Event": delivery.event_type,
-        "X-Webhook-ID": str(webhook.id)
+        "X-Webhook-ID": str(webhook.id),
+        "X-Webhook-Delivery": str(delivery.id),
     }
-    
+
     # Add HMAC signature if secret is configured
     if webhook.secret:
         signature = hmac.new(
@@ -40,7 +69,85 @@ def _deliver_webhook(webhook: Webhook, delivery: WebhookDelivery, db) -> bool:
             hashlib.sha256
         ).hexdigest()
         headers["X-Webhook-Signature"] = f"sha256={signature}"
-    
+
+    return headers
+
+def retry_delay_seconds(attempt_number: int) -> int:
+    """Exponential backoff delay before the attempt after ``attempt_number``."""
+    delay = settings.webhook_retry_delay_seconds * (2 ** max(attempt_number - 1, 0))
+    return min(delay, settings.webhook_max_retry_delay_seconds)
+
+def record_delivery_result(
+    webhook: Optional[Webhook],
+    delivery: WebhookDelivery,
+    status_code: Optional[int] = None,
+    response_body: Optional[str] = None,
+    error: Optional[str] = None,
+    duration_ms: Optional[int] = None,
+) -> bool:
+    """Apply the outcome of one delivery attempt to the delivery row.
+
+    Failed attempts are rescheduled with exponential backoff until
+    ``webhook_max_retries`` attempts have been made. The caller commits.
+    Returns True if the delivery succeeded.
+    """
+    now = datetime.utcnow()
+    delivery.last_attempt_at = now
+    delivery.duration_ms = duration_ms
+    delivery.status_code = status_code
+    if response_body is not None:
+        delivery.response_body = response_body[:1000]  # Limit response size
+
+    if error is None and status_code is not None and 200 <= status_code < 300:
+        delivery.status = DELIVERY_DELIVERED
+        delivery.delivered_at = now
+        delivery.next_attempt_at = None
+        delivery.error_message = None
+        if webhook is not None:
+            webhook.last_triggered_at = now
+        return True
+
+    reason = error or f"HTTP {status_code}"
+    if delivery.attempt_number < settings.webhook_max_retries:
+        delivery.status = DELIVERY_PENDING
+        delivery.error_message = reason
+        delivery.next_attempt_at = now + timedelta(seconds=retry_delay_seconds(delivery.attempt_number))
+        delivery.attempt_number += 1
+    else:
+        delivery.status = DELIVERY_FAILED
+        delivery.next_attempt_at = None
+        delivery.error_message = f"Failed after {delivery.attempt_number} attempts: {reason}"
+    return False
+
+def enqueue_delivery(webhook: Webhook, event_type: str, payload: str, db) -> WebhookDelivery:
+    """Persist a pending delivery for the background worker. The caller commits."""
+    delivery = WebhookDelivery(
+        webhook_id=webhook.id,
+        event_type=event_type,
+        payload=payload,
+        attempt_number=1,
+        status=DELIVERY_PENDING,
+        next_attempt_at=datetime.utcnow(),
+    )
+    db.add(delivery)
+    return delivery
+
+def trigger_webhook(webhook: Webhook, event_type: str, payload: Dict[str, Any], db) -> bool:
+    """Trigger a webhook delivery and send the first attempt immediately.
+
+    Used where the caller needs the result (e.g. the test endpoint). Failed
+    attempts are left pending for the background worker to retry.
+    """
+    delivery = enqueue_delivery(webhook, event_type, json.dumps(payload, ensure_ascii=False), db)
+    delivery.status = DELIVERY_IN_FLIGHT
+    db.commit()
+
+    return _deliver_webhook(webhook, delivery, db)
+
+def _deliver_webhook(webhook: Webhook, delivery: WebhookDelivery, db) -> bool:
+    """Send one attempt synchronously and record the outcome."""
+    headers = build_webhook_headers(webhook, delivery)
+    started = time.perf_counter()
     try:
         response = requests.post(
             webhook.url,
@@ -48,55 +155,55 @@ def _deliver_webhook(webhook: Webhook, delivery: WebhookDelivery, db) -> bool:
             headers=headers,
             timeout=settings.webhook_timeout_seconds
         )
-        
-        delivery.status_code = response.status_code
-        delivery.response_body = response.text[:1000]  # Limit response size
-        
-        if 200 <= response.status_code < 300:
-            delivery.delivered_at = datetime.utcnow()
-            webhook.last_triggered_at = datetime.utcnow()
-            db.commit()
-            return True
-        else:
-            # Retry logic
-            if delivery.attempt_number < settings.webhook_max_retries:
-                delivery.attempt_number += 1
-                db.commit()
-                # In production, use a task queue for retries
-                return False
-            else:
-                delivery.error_message = f"Failed after {delivery.attempt_number} attempts: {response.status_code}"
-                db.commit()
-                return False
-                
+        success = record_delivery_result(
+            webhook, delivery,
+            status_code=response.status_code,
+            response_body=response.text,
+            duration_ms=int((time.perf_counter() - started) * 1000),
+        )
     except Exception as e:
-        delivery.error_message = str(e)
-        if delivery.attempt_number < settings.webhook_max_retries:
-            delivery.attempt_number += 1
-            db.commit()
-            return False
-        else:
-            db.commit()
-            return False
+        success = record_delivery_result(
+            webhook, delivery,
+            error=str(e),
+            duration_ms=int((time.perf_counter() - started) * 1000),
+        )
+    db.commit()
+    if not success and delivery.status == DELIVERY_PENDING:
+        from .webhook_worker import webhook_worker
+        webhook_worker.notify()
+    return success
 
 def trigger_webhooks_for_event(event_type: str, payload: Dict[str, Any], org_id: Optional[str] = None):
-    """Trigger all relevant webhooks for an event."""
+    """Queue deliveries for all webhooks subscribed to an event.
+
+    Returns as soon as the deliveries are committed; the background worker
+    sends them.
+    """
     db = SessionLocal()
+    queued = 0
     try:
         # Get active webhooks that subscribe to this event
         query = db.query(Webhook).filter(Webhook.is_active == True)
         if org_id:
             query = query.filter((Webhook.org_id == org_id) | (Webhook.org_id == None))
-        
+
         webhooks = query.all()
-        
+        body = json.dumps(payload, ensure_ascii=False)
+
         for webhook in webhooks:
             try:
                 events = json.loads(webhook.events)
                 if "*" in events or event_type in events:
-                    trigger_webhook(webhook, event_type, payload, db)
+                    enqueue_delivery(webhook, event_type, body, db)
+                    queued += 1
             except Exception as e:
                 log_event(db, actor="system", action="webhook.error", ref_id=str(webhook.id), detail={"error": str(e)})
+
+        if queued:
+            db.commit()
     finally:
         db.close()
 
+    if queued:
+        from .webhook_worker import webhook_worker
+        webhook_worker.notify()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Database Layer Load Test
+
+Compares request throughput of the legacy engine setup (default SQLite engine,
+rollback journal, one session per middleware plus one per route) against the
+pooled engine from app.db.build_engine (WAL, synchronous=NORMAL, busy_timeout,
+one shared session per request).
+
+Each simulated request does what a licensed API call does: the usage-tracking
+middleware inserts a UsageEvent and the route reads a license and writes an
+audit event. Both runs use a fresh temporary database.
+
+Usage:
+    python load_test_db.py [threads] [seconds]
+
+Example:
+    python load_test_db.py 16 10
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db import Base, build_engine
+from app.models import license as license_model, usage, audit
+from app.models.license import License
+from app.models.usage import UsageEvent
+from app.models.audit import AuditEvent
+
+def _legacy_engine(url):
+    return create_engine(url, connect_args={"check_same_thread": False})
+
+def _one_request(Session, shared_session):
+    def usage_event(db):
+        db.add(UsageEvent(
+            license_id="LIC-LOAD", org_id="ORG-LOAD", program_id="emv",
+            event_type="api_call", feature_name="/api/licenses/LIC-LOAD",
+        ))
+        db.commit()
+
+    def route(db):
+        db.query(License).filter(License.license_id == "LIC-LOAD").first()
+        db.add(AuditEvent(actor="load-test", action="license.read", ref_id="LIC-LOAD"))
+        db.commit()
+
+    if shared_session:
+        db = Session()
+        try:
+            usage_event(db)
+            route(db)
+        finally:
+            db.close()
+    else:
+        for step in (usage_event, route):
+            db = Session()
+            try:
+                step(db)
+            finally:
+                db.close()
+
+def run(label, engine, shared_session, threads, seconds):
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    deadline = time.perf_counter() + seconds
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+
+    def worker():
+        local = []
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                _one_request(Session, shared_session)
+                local.append(time.perf_counter() - started)
+            except OperationalError:
+                with lock:
+                    errors[0] += 1
+        with lock:
+            latencies.extend(local)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for t in pool:
+        t.start()
+    for t in pool:
+        t.join()
+    engine.dispose()
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0
+    print(f"{label:<8} {len(latencies) / seconds:>10.1f} req/s   p95 {p95:>8.1f} ms   locked errors {errors[0]}")
+    return len(latencies) / seconds
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 16
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    print(f"{threads} threads, {seconds:.0f}s per run")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = run("legacy", _legacy_engine(f"sqlite:///{tmp}/legacy.db"), False, threads, seconds)
+        tuned = run("pooled", build_engine(f"sqlite:///{tmp}/pooled.db"), True, threads, seconds)
+
+    if legacy:
+        print(f"Throughput change: {tuned / legacy:.2f}x")
+
+if __name__ == "__main__":
+    main()
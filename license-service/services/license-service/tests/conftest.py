@@ -0,0 +1,24 @@
+"""Shared fixtures for the license service tests."""
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.db import Base  # noqa: E402
+import app.models  # noqa: E402,F401  (registers every table on Base.metadata)
+
+
+@pytest.fixture
+def session_factory():
+    """Sessions bound to a fresh in-memory database with all tables created."""
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    yield sessionmaker(bind=engine, autoflush=False, autocommit=False)
+    engine.dispose()
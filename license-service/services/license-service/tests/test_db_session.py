@@ -0,0 +1,72 @@
+"""Tests for the request-scoped database session."""
+import pytest
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import db as db_module
+from app.db import RequestSessionMiddleware, get_db
+from app.models.org import Organization
+from app.routes.registration import _generate_org_id
+
+
+class TrackingSession(Session):
+    created = []
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.closed = False
+        TrackingSession.created.append(self)
+
+    def close(self):
+        self.closed = True
+        super().close()
+
+
+@pytest.fixture
+def tracking_sessions(session_factory, monkeypatch):
+    TrackingSession.created = []
+    factory = sessionmaker(bind=session_factory.kw["bind"], class_=TrackingSession, autoflush=False)
+    monkeypatch.setattr(db_module, "SessionLocal", factory)
+    return TrackingSession.created
+
+
+def _app(with_middleware=True):
+    app = FastAPI()
+    if with_middleware:
+        app.add_middleware(RequestSessionMiddleware)
+
+    def nested(db: Session = Depends(get_db)):
+        return db
+
+    @app.get("/ids")
+    def ids(request: Request, db: Session = Depends(get_db), other: Session = Depends(nested)):
+        return {"same": db is other and db is getattr(request.state, "db", db)}
+
+    return app
+
+
+class TestRequestSession:
+    """RequestSessionMiddleware / get_db"""
+
+    def test_one_session_per_request_closed_after(self, tracking_sessions):
+        """Every dependency in a request shares one session, closed when the response is done"""
+        client = TestClient(_app())
+        assert client.get("/ids").json() == {"same": True}
+        assert client.get("/ids").json() == {"same": True}
+        assert len(tracking_sessions) == 2
+        assert all(session.closed for session in tracking_sessions)
+
+    def test_private_session_without_middleware(self, tracking_sessions):
+        """A router on a bare app still gets a session, closed after the request"""
+        assert TestClient(_app(with_middleware=False)).get("/ids").json() == {"same": True}
+        assert len(tracking_sessions) == 1 and tracking_sessions[0].closed
+
+    def test_org_id_checked_in_callers_session(self, session_factory):
+        """_generate_org_id sees organizations pending in the caller's session"""
+        db = session_factory()
+        db.add(Organization(org_id="PE-ACME-ENERGY", org_name="Acme Energy", org_type="pe"))
+        db.flush()
+        assert _generate_org_id(db, "Acme Energy!", "pe") == "PE-ACME-ENERGY-001"
+        assert _generate_org_id(db, "Other Co", "customer") == "CUSTOMER-OTHER-CO"
+        db.close()
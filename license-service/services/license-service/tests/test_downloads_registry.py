@@ -0,0 +1,81 @@
+"""Tests for the cached download registry and listing ETags."""
+import json
+import os
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.downloads.registry import RegistryCache
+from app.routes import downloads
+
+DOCUMENTS = [
+    {"id": "guide", "filename": "guide.pdf", "programs": ["emv"]},
+    {"id": "pro", "filename": "pro.pdf", "required_entitlements": ["pro"]},
+    {"id": "admin", "filename": "admin.pdf", "allowed_roles": ["admin"]},
+    {"id": "old", "filename": "old.pdf", "lifecycle": "retired"},
+    {"id": "wip", "filename": "wip.pdf", "lifecycle": "draft"},
+    {"id": "tracking", "filename": "tracking.pdf", "programs": ["tracking"]},
+]
+
+
+def _license(roles=(), features=()):
+    return json.dumps({
+        "license_id": "LIC-1",
+        "program": {"program_id": "emv"},
+        "roles": list(roles),
+        "entitlements": {"features": list(features)},
+    })
+
+
+@pytest.fixture
+def registry_path(tmp_path, monkeypatch):
+    path = tmp_path / "registry.json"
+    path.write_text(json.dumps({"documents": DOCUMENTS}), encoding="utf-8")
+    monkeypatch.setattr(downloads, "registry_cache", RegistryCache(path))
+    return path
+
+
+@pytest.fixture
+def client(registry_path):
+    app = FastAPI()
+    app.include_router(downloads.router)
+    return TestClient(app)
+
+
+class TestDownloadListing:
+    """GET /downloads"""
+
+    def test_index_matches_per_document_check(self, registry_path):
+        """The indexed listing returns what _doc_allowed allows, in registry order"""
+        index = downloads.registry_cache.get()
+        for roles, features in [(set(), set()), ({"admin"}, {"pro"}), ({"user"}, {"pro", "x"})]:
+            expected = [d["id"] for d in DOCUMENTS if downloads._doc_allowed(d, "emv", roles, features)]
+            assert [d["id"] for d in index.allowed_documents("emv", roles, features)] == expected
+
+    def test_if_none_match_returns_304(self, client):
+        """A repeat request with the listing's ETag gets 304 and no body"""
+        first = client.get("/downloads", headers={"X-License": _license()})
+        assert first.status_code == 200
+        assert [d["id"] for d in first.json()["documents"]] == ["guide"]
+        etag = first.headers["ETag"]
+
+        repeat = client.get("/downloads", headers={"X-License": _license(), "If-None-Match": f'"other", {etag}'})
+        assert repeat.status_code == 304
+        assert repeat.headers["ETag"] == etag and repeat.content == b""
+
+    def test_etag_changes_with_access_and_registry(self, client, registry_path):
+        """Different roles/entitlements or an edited registry get a fresh listing"""
+        etag = client.get("/downloads", headers={"X-License": _license()}).headers["ETag"]
+
+        upgraded = client.get("/downloads", headers={"X-License": _license(features=["pro"]), "If-None-Match": etag})
+        assert upgraded.status_code == 200
+        assert [d["id"] for d in upgraded.json()["documents"]] == ["guide", "pro"]
+
+        registry_path.write_text(json.dumps({"documents": DOCUMENTS[:1] + [{"id": "new", "filename": "new.pdf"}]}))
+        stat = registry_path.stat()
+        os.utime(registry_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        edited = client.get("/downloads", headers={"X-License": _license(), "If-None-Match": etag})
+        assert edited.status_code == 200
+        assert edited.headers["ETag"] != etag
+        assert [d["id"] for d in edited.json()["documents"]] == ["guide", "new"]
@@ -0,0 +1,72 @@
+"""Tests for the CSV export routes."""
+import csv
+import io
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.admin.ui import require_admin
+from app.db import get_db
+from app.models.billing import BillingOrder
+from app.models.license import License
+from app.routes import exports
+
+
+@pytest.fixture
+def client(session_factory):
+    db = session_factory()
+    db.add_all([
+        License(license_id=f"L{day}", org_id="org", program_id="emv", authorization_id="auth",
+                issued_at=datetime(2026, 3, day, 18, 30), expires_at=datetime(2027, 3, day),
+                payload_json="{}", signature_b64="")
+        for day in (1, 2, 3)
+    ])
+    db.add_all([
+        BillingOrder(order_id=f"B{day}", org_id="org", program_id="emv", plan="pro",
+                     term_start="2026-03-01", term_end="2027-03-01", created_at=datetime(2026, 3, day, 23, 59))
+        for day in (1, 2, 3)
+    ])
+    db.commit()
+    db.close()
+
+    def session():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(exports.router)
+    app.dependency_overrides[require_admin] = lambda: True
+    app.dependency_overrides[get_db] = session
+    return TestClient(app)
+
+
+def _column(response, name):
+    assert response.status_code == 200
+    return [row[name] for row in csv.DictReader(io.StringIO(response.text))]
+
+
+class TestExportDateRange:
+    """start_date / end_date filtering"""
+
+    def test_date_only_end_includes_that_day(self, client):
+        """end_date=YYYY-MM-DD keeps rows from later in that day"""
+        response = client.get("/api/exports/licenses", params={"start_date": "2026-03-02", "end_date": "2026-03-02"})
+        assert _column(response, "license_id") == ["L2"]
+        response = client.get("/api/exports/billing", params={"end_date": "2026-03-02"})
+        assert _column(response, "order_id") == ["B1", "B2"]
+
+    def test_end_with_time_is_exact(self, client):
+        """An end_date with a time component is an inclusive instant"""
+        response = client.get("/api/exports/licenses", params={"end_date": "2026-03-02T18:30:00"})
+        assert _column(response, "license_id") == ["L1", "L2"]
+        response = client.get("/api/exports/licenses", params={"end_date": "2026-03-02T18:00:00"})
+        assert _column(response, "license_id") == ["L1"]
+
+    def test_invalid_date_is_rejected(self, client):
+        """A malformed date is a 400"""
+        assert client.get("/api/exports/licenses", params={"end_date": "March 2"}).status_code == 400
@@ -0,0 +1,54 @@
+"""Tests for download watermarking and the source PDF cache."""
+import io
+import os
+
+from PyPDF2 import PdfReader
+from reportlab.pdfgen import canvas
+
+from app.downloads.watermark import SourcePdfCache, source_pdf_cache, watermark_pdf_file
+
+STAMP_FIELDS = dict(
+    recipient_type="org", recipient_id="ORG-1", version="2.0", program_id="emv",
+    role="admin", license_id="LIC-1", doc_id="DOC-1",
+)
+
+
+def _write_pdf(path, pages, label="page"):
+    c = canvas.Canvas(str(path))
+    for number in range(1, pages + 1):
+        c.setFont("Times-Roman", 12)
+        c.drawString(72, 720, f"{label} {number}")
+        c.showPage()
+    c.save()
+    return path
+
+
+class TestWatermark:
+    """watermark_pdf_file"""
+
+    def test_every_page_stamped_and_content_kept(self, tmp_path):
+        """Each page keeps its text and gains the recipient stamp"""
+        source_pdf_cache.clear()
+        chunks, length = watermark_pdf_file(_write_pdf(tmp_path / "doc.pdf", 3), **STAMP_FIELDS)
+        data = b"".join(chunks)
+        assert len(data) == length
+
+        reader = PdfReader(io.BytesIO(data))
+        assert len(reader.pages) == 3
+        for number, page in enumerate(reader.pages, start=1):
+            text = page.extract_text()
+            assert f"page {number}" in text
+            assert "ORG:ORG-1" in text and "license:LIC-1" in text
+
+    def test_source_cache_reloads_changed_file(self, tmp_path):
+        """A cached source is reused until the file changes on disk"""
+        cache = SourcePdfCache()
+        path = _write_pdf(tmp_path / "doc.pdf", 1)
+        reader, _ = cache.get(path)
+        assert cache.get(path)[0] is reader
+
+        _write_pdf(path, 2, label="revised")
+        stat = path.stat()
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        reloaded, _ = cache.get(path)
+        assert reloaded is not reader and len(reloaded.pages) == 2
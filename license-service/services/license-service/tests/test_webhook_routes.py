@@ -0,0 +1,77 @@
+"""Tests for the webhook management routes."""
+from datetime import datetime
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.admin.ui import require_admin
+from app.db import get_db
+from app.models.webhook import Webhook, WebhookDelivery
+from app.routes import webhooks
+from app.services.webhooks import DELIVERY_DELIVERED, DELIVERY_FAILED, DELIVERY_IN_FLIGHT, DELIVERY_PENDING
+
+
+@pytest.fixture
+def client(session_factory):
+    def session():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(webhooks.router)
+    app.dependency_overrides[require_admin] = lambda: True
+    app.dependency_overrides[get_db] = session
+    return TestClient(app)
+
+
+@pytest.fixture
+def add_delivery(session_factory):
+    def add(**fields):
+        db = session_factory()
+        webhook = Webhook(url="https://a.example/hook", events="[]")
+        db.add(webhook)
+        db.flush()
+        delivery = WebhookDelivery(webhook_id=webhook.id, event_type="test", payload="{}", **fields)
+        db.add(delivery)
+        db.commit()
+        ids = webhook.id, delivery.id
+        db.close()
+        return ids
+    return add
+
+
+def _delivery(session_factory, delivery_id):
+    db = session_factory()
+    try:
+        return db.get(WebhookDelivery, delivery_id)
+    finally:
+        db.close()
+
+
+class TestRetryDelivery:
+    """POST /api/webhooks/{id}/deliveries/{id}/retry"""
+
+    def test_failed_delivery_requeued(self, client, add_delivery, session_factory):
+        """A failed delivery goes back to pending with a fresh attempt count"""
+        webhook_id, delivery_id = add_delivery(status=DELIVERY_FAILED, attempt_number=3)
+        response = client.post(f"/api/webhooks/{webhook_id}/deliveries/{delivery_id}/retry")
+        assert response.status_code == 200
+        delivery = _delivery(session_factory, delivery_id)
+        assert (delivery.status, delivery.attempt_number) == (DELIVERY_PENDING, 1)
+
+    def test_in_flight_delivery_conflicts(self, client, add_delivery, session_factory):
+        """A delivery being sent is left alone"""
+        webhook_id, delivery_id = add_delivery(status=DELIVERY_IN_FLIGHT, attempt_number=2)
+        response = client.post(f"/api/webhooks/{webhook_id}/deliveries/{delivery_id}/retry")
+        assert response.status_code == 409
+        delivery = _delivery(session_factory, delivery_id)
+        assert (delivery.status, delivery.attempt_number) == (DELIVERY_IN_FLIGHT, 2)
+
+    def test_delivered_is_rejected(self, client, add_delivery):
+        """A delivery that already succeeded cannot be retried"""
+        webhook_id, delivery_id = add_delivery(status=DELIVERY_DELIVERED, delivered_at=datetime.utcnow())
+        assert client.post(f"/api/webhooks/{webhook_id}/deliveries/{delivery_id}/retry").status_code == 400
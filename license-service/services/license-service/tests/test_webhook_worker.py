@@ -0,0 +1,287 @@
+"""Tests for the webhook delivery queue and background worker."""
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.config import settings
+from app.db import Base
+from app.models.webhook import Webhook, WebhookDelivery
+from app.services.webhook_worker import WebhookDeliveryWorker
+from app.services.webhooks import (
+    DELIVERY_DELIVERED,
+    DELIVERY_FAILED,
+    DELIVERY_IN_FLIGHT,
+    DELIVERY_PENDING,
+    record_delivery_result,
+    retry_delay_seconds,
+)
+
+
+@pytest.fixture(autouse=True)
+def webhook_settings(monkeypatch):
+    monkeypatch.setattr(settings, "webhook_retry_delay_seconds", 60)
+    monkeypatch.setattr(settings, "webhook_max_retry_delay_seconds", 3600)
+    monkeypatch.setattr(settings, "webhook_max_retries", 3)
+    monkeypatch.setattr(settings, "webhook_per_host_concurrency", 2)
+    monkeypatch.setattr(settings, "webhook_timeout_seconds", 10)
+
+
+def _webhook(db, url, is_active=True):
+    webhook = Webhook(url=url, events="[]", is_active=is_active)
+    db.add(webhook)
+    db.flush()
+    return webhook
+
+
+def _delivery(db, webhook, **fields):
+    fields.setdefault("status", DELIVERY_PENDING)
+    fields.setdefault("next_attempt_at", datetime.utcnow() - timedelta(seconds=1))
+    delivery = WebhookDelivery(webhook_id=webhook.id, event_type="test", payload="{}", attempt_number=1, **fields)
+    db.add(delivery)
+    db.flush()
+    return delivery
+
+
+class TestBackoff:
+    """Retry scheduling in record_delivery_result"""
+
+    def test_delay_doubles_per_attempt_up_to_cap(self, monkeypatch):
+        """Delays are 60, 120, 240, ... seconds, capped at the maximum"""
+        assert [retry_delay_seconds(n) for n in (1, 2, 3)] == [60, 120, 240]
+        monkeypatch.setattr(settings, "webhook_max_retry_delay_seconds", 100)
+        assert retry_delay_seconds(3) == 100
+
+    def test_failed_attempt_is_rescheduled(self):
+        """A non-2xx response leaves the delivery pending with a later next attempt"""
+        delivery = WebhookDelivery(attempt_number=1, status=DELIVERY_IN_FLIGHT)
+        before = datetime.utcnow()
+        assert record_delivery_result(None, delivery, status_code=500) is False
+        assert delivery.status == DELIVERY_PENDING
+        assert delivery.attempt_number == 2
+        assert delivery.error_message == "HTTP 500"
+        assert before + timedelta(seconds=59) <= delivery.next_attempt_at <= datetime.utcnow() + timedelta(seconds=60)
+
+    def test_gives_up_after_max_retries(self):
+        """The last allowed attempt failing marks the delivery failed"""
+        delivery = WebhookDelivery(attempt_number=3, status=DELIVERY_IN_FLIGHT)
+        record_delivery_result(None, delivery, error="timeout")
+        assert delivery.status == DELIVERY_FAILED
+        assert delivery.next_attempt_at is None
+        assert "Failed after 3 attempts" in delivery.error_message
+
+    def test_success_is_delivered(self):
+        """A 2xx response marks the delivery delivered"""
+        delivery = WebhookDelivery(attempt_number=2, status=DELIVERY_IN_FLIGHT)
+        assert record_delivery_result(None, delivery, status_code=204) is True
+        assert delivery.status == DELIVERY_DELIVERED
+        assert delivery.next_attempt_at is None
+
+
+class TestClaiming:
+    """WebhookDeliveryWorker._claim_due and stale claim recovery"""
+
+    def test_claims_due_deliveries_once(self, session_factory):
+        """Due rows are marked in flight; future and already claimed rows are left"""
+        db = session_factory()
+        webhook = _webhook(db, "https://a.example/hook")
+        due = _delivery(db, webhook)
+        later = _delivery(db, webhook, next_attempt_at=datetime.utcnow() + timedelta(hours=1))
+        db.commit()
+
+        worker = WebhookDeliveryWorker(session_factory)
+        jobs = worker._claim_due(10)
+        assert [job["delivery_id"] for job in jobs] == [due.id]
+        assert worker._claim_due(10) == []
+
+        db.expire_all()
+        assert db.get(WebhookDelivery, due.id).status == DELIVERY_IN_FLIGHT
+        assert db.get(WebhookDelivery, later.id).status == DELIVERY_PENDING
+        db.close()
+
+    def test_inactive_webhook_fails_delivery(self, session_factory):
+        """Deliveries for an inactive webhook are failed instead of sent"""
+        db = session_factory()
+        delivery = _delivery(db, _webhook(db, "https://a.example/hook", is_active=False))
+        db.commit()
+
+        assert WebhookDeliveryWorker(session_factory)._claim_due(10) == []
+        db.expire_all()
+        assert db.get(WebhookDelivery, delivery.id).status == DELIVERY_FAILED
+        db.close()
+
+    def test_per_host_limit_leaves_extra_deliveries_queued(self, session_factory):
+        """A busy host gets at most webhook_per_host_concurrency claims; other hosts still get theirs"""
+        db = session_factory()
+        slow = _webhook(db, "https://slow.example/hook")
+        other = _webhook(db, "https://other.example/hook")
+        for _ in range(5):
+            _delivery(db, slow)
+        _delivery(db, other)
+        db.commit()
+
+        worker = WebhookDeliveryWorker(session_factory)
+        jobs = worker._claim_due(10)
+        assert sorted(job["url"] for job in jobs) == ["https://other.example/hook"] + ["https://slow.example/hook"] * 2
+        assert worker._claim_due(10) == []  # slow.example is saturated
+
+        # One slow.example delivery finishing frees one claim
+        worker._host_claims["slow.example"] -= 1
+        assert [job["url"] for job in worker._claim_due(10)] == ["https://slow.example/hook"]
+        db.close()
+
+    def test_stale_claims_are_reclaimed(self, session_factory):
+        """Old in-flight rows go back to pending unless this worker is still sending them"""
+        db = session_factory()
+        webhook = _webhook(db, "https://a.example/hook")
+        long_ago = datetime.utcnow() - timedelta(minutes=5)
+        abandoned = _delivery(db, webhook, status=DELIVERY_IN_FLIGHT, last_attempt_at=long_ago)
+        own = _delivery(db, webhook, status=DELIVERY_IN_FLIGHT, last_attempt_at=long_ago)
+        recent = _delivery(db, webhook, status=DELIVERY_IN_FLIGHT, last_attempt_at=datetime.utcnow())
+        db.commit()
+
+        assert WebhookDeliveryWorker(session_factory)._reset_stale_claims({own.id}) == 1
+        db.expire_all()
+        assert db.get(WebhookDelivery, abandoned.id).status == DELIVERY_PENDING
+        assert db.get(WebhookDelivery, own.id).status == DELIVERY_IN_FLIGHT
+        assert db.get(WebhookDelivery, recent.id).status == DELIVERY_IN_FLIGHT
+        db.close()
+
+
+class _Response:
+    status_code = 200
+    text = "ok"
+
+
+class _GatedClient:
+    """Stand-in for httpx.AsyncClient whose requests to one host wait on a gate"""
+
+    def __init__(self, slow_host):
+        self.slow_host = slow_host
+        self.gate = asyncio.Event()
+        self.sent = []
+
+    async def post(self, url, content=None, headers=None):
+        if self.slow_host in url:
+            await self.gate.wait()
+        self.sent.append(url)
+        return _Response()
+
+
+class TestProcess:
+    """WebhookDeliveryWorker._process"""
+
+    def test_waiting_on_busy_host_does_not_hold_global_slot(self, monkeypatch):
+        """Deliveries queued behind a slow host leave global slots free for other hosts"""
+        monkeypatch.setattr(settings, "webhook_per_host_concurrency", 1)
+        worker = WebhookDeliveryWorker()
+        monkeypatch.setattr(worker, "_record", lambda job, **result: (DELIVERY_DELIVERED, None))
+
+        def job(delivery_id, url):
+            return {"delivery_id": delivery_id, "webhook_id": 1, "url": url, "payload": "{}", "headers": {}}
+
+        async def scenario():
+            worker._wake = asyncio.Event()
+            client = _GatedClient("slow.example")
+            global_limit = asyncio.Semaphore(2)
+            slow = [asyncio.create_task(worker._process(client, global_limit, job(i, "https://slow.example/hook")))
+                    for i in (1, 2)]
+            await asyncio.sleep(0)
+            await asyncio.wait_for(worker._process(client, global_limit, job(3, "https://fast.example/hook")), 1)
+            sent_before_gate = list(client.sent)
+            client.gate.set()
+            await asyncio.gather(*slow)
+            return sent_before_gate
+
+        assert asyncio.run(scenario()) == ["https://fast.example/hook"]
+
+    def test_record_failure_leaves_row_for_reclaim(self, session_factory, monkeypatch):
+        """If saving the outcome fails the task survives and the claim is released"""
+        db = session_factory()
+        webhook = _webhook(db, "https://a.example/hook")
+        _delivery(db, webhook)
+        db.commit()
+        worker = WebhookDeliveryWorker(session_factory)
+        [job] = worker._claim_due(10)
+
+        def broken_record(job, **result):
+            raise RuntimeError("database is locked")
+
+        monkeypatch.setattr(worker, "_record", broken_record)
+
+        async def scenario():
+            worker._wake = asyncio.Event()
+            await worker._process(_GatedClient("unused"), asyncio.Semaphore(1), job)
+
+        asyncio.run(scenario())
+        assert worker._metrics["record_errors"] == 1
+        assert worker._active_ids == set() and dict(worker._host_claims) == {}
+        db.expire_all()
+        assert db.get(WebhookDelivery, job["delivery_id"]).status == DELIVERY_IN_FLIGHT
+        db.close()
+
+
+class _SlowClient:
+    """Stand-in for httpx.AsyncClient that records every send and takes ``delay`` seconds"""
+
+    sent = []
+    delay = 0.0
+
+    def __init__(self, **kwargs):
+        pass
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def post(self, url, content=None, headers=None):
+        _SlowClient.sent.append(headers["X-Webhook-Delivery"])
+        await asyncio.sleep(self.delay)
+        return _Response()
+
+
+class TestTwoWorkers:
+    """Two worker processes draining one queue"""
+
+    def test_no_delivery_sent_twice(self, tmp_path, monkeypatch):
+        """Claims waiting on a busy worker are never reclaimed and resent by the other"""
+        engine = create_engine(f"sqlite:///{tmp_path / 'queue.db'}", connect_args={"check_same_thread": False})
+        Base.metadata.create_all(engine)
+        factory = sessionmaker(bind=engine, autoflush=False, autocommit=False)
+        monkeypatch.setattr(settings, "webhook_timeout_seconds", 0.5)  # claims are stale after 1 s
+        monkeypatch.setattr(settings, "webhook_worker_concurrency", 2)
+        monkeypatch.setattr(settings, "webhook_batch_size", 100)
+        monkeypatch.setattr(settings, "webhook_poll_interval_seconds", 0.05)
+        monkeypatch.setattr(httpx, "AsyncClient", _SlowClient)
+        monkeypatch.setattr(_SlowClient, "sent", [])
+        monkeypatch.setattr(_SlowClient, "delay", 0.4)
+
+        db = factory()
+        for n in range(10):
+            _delivery(db, _webhook(db, f"https://host{n}.example/hook"))
+        db.commit()
+
+        workers = [WebhookDeliveryWorker(factory), WebhookDeliveryWorker(factory)]
+        for worker in workers:
+            worker.start()
+        try:
+            deadline = time.monotonic() + 10
+            while time.monotonic() < deadline:
+                db.expire_all()
+                if db.query(WebhookDelivery).filter(WebhookDelivery.status == DELIVERY_DELIVERED).count() == 10:
+                    break
+                time.sleep(0.05)
+        finally:
+            for worker in workers:
+                worker.stop()
+            db.close()
+            engine.dispose()
+
+        assert len(_SlowClient.sent) == 10
+        assert len(set(_SlowClient.sent)) == 10